@@ -0,0 +1,127 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, emperor development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE.md, distributed with this software.
+# ----------------------------------------------------------------------------
+"""On-disk cache of rendered plots
+
+This cache is used by ``emperor.core.Emperor.make_emperor`` when the
+``cache`` attribute is set.
+"""
+from __future__ import division
+
+import os
+import re
+from os.path import exists, getsize, join
+from tempfile import NamedTemporaryFile
+
+
+_KEY = re.compile('^[0-9a-f]+$')
+
+
+class RenderCache(object):
+    """A directory of rendered plots with a least recently used eviction
+
+    Parameters
+    ----------
+    directory : str
+        Where the entries are stored, it's created if it doesn't exist.
+    max_size : int, optional
+        Maximum size in bytes of all the entries. When an entry is added and
+        the size is exceeded, the least recently used entries are removed.
+        Defaults to 256 MiB.
+
+    Notes
+    -----
+    Each entry is a file named after its key, and the modification time of
+    the file is updated every time the entry is read, so the least recently
+    used entries are the oldest files. Entries are written to a temporary
+    file and renamed, so concurrent readers never see a partial entry.
+    """
+    def __init__(self, directory, max_size=256 * 2 ** 20):
+        self.directory = directory
+        self.max_size = max_size
+
+        if not exists(directory):
+            os.makedirs(directory)
+
+    def _path(self, key):
+        if not _KEY.match(key):
+            raise ValueError('Cache keys should be hexadecimal strings, not '
+                             '%r' % key)
+        return join(self.directory, key + '.html')
+
+    def get(self, key):
+        """Retrieve an entry
+
+        Parameters
+        ----------
+        key : str
+            The hexadecimal key of the entry.
+
+        Returns
+        -------
+        str or None
+            The contents of the entry or ``None`` if it's not in the cache.
+        """
+        path = self._path(key)
+
+        try:
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+        except (IOError, OSError):
+            return None
+
+        # mark the entry as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        return text
+
+    def put(self, key, text):
+        """Add an entry and evict the least recently used ones if needed
+
+        Parameters
+        ----------
+        key : str
+            The hexadecimal key of the entry.
+        text : str
+            The contents of the entry.
+        """
+        path = self._path(key)
+
+        with NamedTemporaryFile('w', dir=self.directory, suffix='.tmp',
+                                delete=False, encoding='utf-8') as f:
+            f.write(text)
+        os.replace(f.name, path)
+
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until they fit in the cache
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.html'):
+                continue
+
+            path = join(self.directory, name)
+            try:
+                entries.append((os.stat(path).st_mtime, getsize(path), path))
+            except OSError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
@@ -0,0 +1,681 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, emperor development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE.md, distributed with this software.
+# ----------------------------------------------------------------------------
+"""Helpers to draw static images of a plot without a browser
+
+These functions are used by ``emperor.core.Emperor.to_image`` and mirror the
+way the JavaScript code colors, scales and draws the markers in a plot.
+"""
+from __future__ import division
+
+import re
+import struct
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+# color names understood by THREE.Color (the CSS color keywords)
+_COLOR_NAMES = dict(zip(*[iter("""
+    aliceblue f0f8ff antiquewhite faebd7 aqua 00ffff aquamarine 7fffd4
+    azure f0ffff beige f5f5dc bisque ffe4c4 black 000000
+    blanchedalmond ffebcd blue 0000ff blueviolet 8a2be2 brown a52a2a
+    burlywood deb887 cadetblue 5f9ea0 chartreuse 7fff00 chocolate d2691e
+    coral ff7f50 cornflowerblue 6495ed cornsilk fff8dc crimson dc143c
+    cyan 00ffff darkblue 00008b darkcyan 008b8b darkgoldenrod b8860b
+    darkgray a9a9a9 darkgreen 006400 darkgrey a9a9a9 darkkhaki bdb76b
+    darkmagenta 8b008b darkolivegreen 556b2f darkorange ff8c00
+    darkorchid 9932cc darkred 8b0000 darksalmon e9967a darkseagreen 8fbc8f
+    darkslateblue 483d8b darkslategray 2f4f4f darkslategrey 2f4f4f
+    darkturquoise 00ced1 darkviolet 9400d3 deeppink ff1493
+    deepskyblue 00bfff dimgray 696969 dimgrey 696969 dodgerblue 1e90ff
+    firebrick b22222 floralwhite fffaf0 forestgreen 228b22 fuchsia ff00ff
+    gainsboro dcdcdc ghostwhite f8f8ff gold ffd700 goldenrod daa520
+    gray 808080 green 008000 greenyellow adff2f grey 808080 honeydew f0fff0
+    hotpink ff69b4 indianred cd5c5c indigo 4b0082 ivory fffff0 khaki f0e68c
+    lavender e6e6fa lavenderblush fff0f5 lawngreen 7cfc00
+    lemonchiffon fffacd lightblue add8e6 lightcoral f08080 lightcyan e0ffff
+    lightgoldenrodyellow fafad2 lightgray d3d3d3 lightgreen 90ee90
+    lightgrey d3d3d3 lightpink ffb6c1 lightsalmon ffa07a
+    lightseagreen 20b2aa lightskyblue 87cefa lightslategray 778899
+    lightslategrey 778899 lightsteelblue b0c4de lightyellow ffffe0
+    lime 00ff00 limegreen 32cd32 linen faf0e6 magenta ff00ff maroon 800000
+    mediumaquamarine 66cdaa mediumblue 0000cd mediumorchid ba55d3
+    mediumpurple 9370db mediumseagreen 3cb371 mediumslateblue 7b68ee
+    mediumspringgreen 00fa9a mediumturquoise 48d1cc mediumvioletred c71585
+    midnightblue 191970 mintcream f5fffa mistyrose ffe4e1 moccasin ffe4b5
+    navajowhite ffdead navy 000080 oldlace fdf5e6 olive 808000
+    olivedrab 6b8e23 orange ffa500 orangered ff4500 orchid da70d6
+    palegoldenrod eee8aa palegreen 98fb98 paleturquoise afeeee
+    palevioletred db7093 papayawhip ffefd5 peachpuff ffdab9 peru cd853f
+    pink ffc0cb plum dda0dd powderblue b0e0e6 purple 800080
+    rebeccapurple 663399 red ff0000 rosybrown bc8f8f royalblue 4169e1
+    saddlebrown 8b4513 salmon fa8072 sandybrown f4a460 seagreen 2e8b57
+    seashell fff5ee sienna a0522d silver c0c0c0 skyblue 87ceeb
+    slateblue 6a5acd slategray 708090 slategrey 708090 snow fffafa
+    springgreen 00ff7f steelblue 4682b4 tan d2b48c teal 008080
+    thistle d8bfd8 tomato ff6347 turquoise 40e0d0 violet ee82ee wheat f5deb3
+    white ffffff whitesmoke f5f5f5 yellow ffff00 yellowgreen 9acd32
+""".split())] * 2))
+
+# same colormaps as ColorViewController.Colormaps, the palettes are taken
+# from chroma.brewer
+_DISCRETE_COLORMAPS = {
+    # taken from the qiime/colors.py module; a total of 24 colors
+    'discrete-coloring-qiime': [
+        '#ff0000', '#0000ff', '#f27304', '#008000', '#91278d', '#ffff00',
+        '#7cecf4', '#f49ac2', '#5da09e', '#6b440b', '#808080', '#f79679',
+        '#7da9d8', '#fcc688', '#80c99b', '#a287bf', '#fff899', '#c49c6b',
+        '#c0c0c0', '#ed008a', '#00b6ff', '#a54700', '#808000', '#008080'],
+    'Paired': [
+        '#a6cee3', '#1f78b4', '#b2df8a', '#33a02c', '#fb9a99', '#e31a1c',
+        '#fdbf6f', '#ff7f00', '#cab2d6', '#6a3d9a', '#ffff99', '#b15928'],
+    'Accent': [
+        '#7fc97f', '#beaed4', '#fdc086', '#ffff99', '#386cb0', '#f0027f',
+        '#bf5b17', '#666666'],
+    'Dark2': [
+        '#1b9e77', '#d95f02', '#7570b3', '#e7298a', '#66a61e', '#e6ab02',
+        '#a6761d', '#666666'],
+    'Set1': [
+        '#e41a1c', '#377eb8', '#4daf4a', '#984ea3', '#ff7f00', '#ffff33',
+        '#a65628', '#f781bf', '#999999'],
+    'Set2': [
+        '#66c2a5', '#fc8d62', '#8da0cb', '#e78ac3', '#a6d854', '#ffd92f',
+        '#e5c494', '#b3b3b3'],
+    'Set3': [
+        '#8dd3c7', '#ffffb3', '#bebada', '#fb8072', '#80b1d3', '#fdb462',
+        '#b3de69', '#fccde5', '#d9d9d9', '#bc80bd', '#ccebc5', '#ffed6f'],
+    'Pastel1': [
+        '#fbb4ae', '#b3cde3', '#ccebc5', '#decbe4', '#fed9a6', '#ffffcc',
+        '#e5d8bd', '#fddaec', '#f2f2f2'],
+    'Pastel2': [
+        '#b3e2cd', '#fdcdac', '#cbd5e8', '#f4cae4', '#e6f5c9', '#fff2ae',
+        '#f1e2cc', '#cccccc']
+}
+
+_CONTINUOUS_COLORMAPS = {
+    'Viridis': ['#440154', '#482777', '#3f4a8a', '#31678e', '#26838f',
+                '#1f9d8a', '#6cce5a', '#b6de2b', '#fee825'],
+    'Reds': ['#fff5f0', '#fee0d2', '#fcbba1', '#fc9272', '#fb6a4a',
+             '#ef3b2c', '#cb181d', '#a50f15', '#67000d'],
+    'RdPu': ['#fff7f3', '#fde0dd', '#fcc5c0', '#fa9fb5', '#f768a1',
+             '#dd3497', '#ae017e', '#7a0177', '#49006a'],
+    'Oranges': ['#fff5eb', '#fee6ce', '#fdd0a2', '#fdae6b', '#fd8d3c',
+                '#f16913', '#d94801', '#a63603', '#7f2704'],
+    'OrRd': ['#fff7ec', '#fee8c8', '#fdd49e', '#fdbb84', '#fc8d59',
+             '#ef6548', '#d7301f', '#b30000', '#7f0000'],
+    'YlOrBr': ['#ffffe5', '#fff7bc', '#fee391', '#fec44f', '#fe9929',
+               '#ec7014', '#cc4c02', '#993404', '#662506'],
+    'YlOrRd': ['#ffffcc', '#ffeda0', '#fed976', '#feb24c', '#fd8d3c',
+               '#fc4e2a', '#e31a1c', '#bd0026', '#800026'],
+    'YlGn': ['#ffffe5', '#f7fcb9', '#d9f0a3', '#addd8e', '#78c679',
+             '#41ab5d', '#238443', '#006837', '#004529'],
+    'YlGnBu': ['#ffffd9', '#edf8b1', '#c7e9b4', '#7fcdbb', '#41b6c4',
+               '#1d91c0', '#225ea8', '#253494', '#081d58'],
+    'Greens': ['#f7fcf5', '#e5f5e0', '#c7e9c0', '#a1d99b', '#74c476',
+               '#41ab5d', '#238b45', '#006d2c', '#00441b'],
+    'GnBu': ['#f7fcf0', '#e0f3db', '#ccebc5', '#a8ddb5', '#7bccc4',
+             '#4eb3d3', '#2b8cbe', '#0868ac', '#084081'],
+    'Blues': ['#f7fbff', '#deebf7', '#c6dbef', '#9ecae1', '#6baed6',
+              '#4292c6', '#2171b5', '#08519c', '#08306b'],
+    'BuGn': ['#f7fcfd', '#e5f5f9', '#ccece6', '#99d8c9', '#66c2a4',
+             '#41ae76', '#238b45', '#006d2c', '#00441b'],
+    'BuPu': ['#f7fcfd', '#e0ecf4', '#bfd3e6', '#9ebcda', '#8c96c6',
+             '#8c6bb1', '#88419d', '#810f7c', '#4d004b'],
+    'Purples': ['#fcfbfd', '#efedf5', '#dadaeb', '#bcbddc', '#9e9ac8',
+                '#807dba', '#6a51a3', '#54278f', '#3f007d'],
+    'PuRd': ['#f7f4f9', '#e7e1ef', '#d4b9da', '#c994c7', '#df65b0',
+             '#e7298a', '#ce1256', '#980043', '#67001f'],
+    'PuBuGn': ['#fff7fb', '#ece2f0', '#d0d1e6', '#a6bddb', '#67a9cf',
+               '#3690c0', '#02818a', '#016c59', '#014636'],
+    'Greys': ['#ffffff', '#f0f0f0', '#d9d9d9', '#bdbdbd', '#969696',
+              '#737373', '#525252', '#252525', '#000000'],
+    'Spectral': ['#9e0142', '#d53e4f', '#f46d43', '#fdae61', '#fee08b',
+                 '#ffffbf', '#e6f598', '#abdda4', '#66c2a5', '#3288bd',
+                 '#5e4fa2'],
+    'RdBu': ['#67001f', '#b2182b', '#d6604d', '#f4a582', '#fddbc7',
+             '#f7f7f7', '#d1e5f0', '#92c5de', '#4393c3', '#2166ac',
+             '#053061'],
+    'RdYlGn': ['#a50026', '#d73027', '#f46d43', '#fdae61', '#fee08b',
+               '#ffffbf', '#d9ef8b', '#a6d96a', '#66bd63', '#1a9850',
+               '#006837'],
+    'RdYlBu': ['#a50026', '#d73027', '#f46d43', '#fdae61', '#fee090',
+               '#ffffbf', '#e0f3f8', '#abd9e9', '#74add1', '#4575b4',
+               '#313695'],
+    'RdGy': ['#67001f', '#b2182b', '#d6604d', '#f4a582', '#fddbc7',
+             '#ffffff', '#e0e0e0', '#bababa', '#878787', '#4d4d4d',
+             '#1a1a1a'],
+    'PiYG': ['#8e0152', '#c51b7d', '#de77ae', '#f1b6da', '#fde0ef',
+             '#f7f7f7', '#e6f5d0', '#b8e186', '#7fbc41', '#4d9221',
+             '#276419'],
+    'BrBG': ['#543005', '#8c510a', '#bf812d', '#dfc27d', '#f6e8c3',
+             '#f5f5f5', '#c7eae5', '#80cdc1', '#35978f', '#01665e',
+             '#003c30'],
+    'PuOr': ['#7f3b08', '#b35806', '#e08214', '#fdb863', '#fee0b6',
+             '#f7f7f7', '#d8daeb', '#b2abd2', '#8073ac', '#542788',
+             '#2d004b'],
+    'PRGn': ['#40004b', '#762a83', '#9970ab', '#c2a5cf', '#e7d4e8',
+             '#f7f7f7', '#d9f0d3', '#a6dba0', '#5aae61', '#1b7837',
+             '#00441b']
+}
+
+# color for non-numeric values when coloring by a continuous category
+NAN_COLOR = '#64655d'
+
+# resolution of the continuous colormaps, an odd size keeps the middle of the
+# range exact
+LUT_SIZE = 1025
+_LUTS = {}
+
+# the markers are rasterized from front to back in batches, and markers that
+# fall in tiles of the image that are already covered are skipped
+_BATCH_SIZE = 2048
+_TILE_SIZE = 8
+
+_HEX = re.compile(r'^#?([0-9a-f]{3}|[0-9a-f]{6})$')
+_RGB = re.compile(r'^rgba?\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*'
+                  r'(,\s*[\d.]+\s*)?\)$')
+_LEADING_FLOAT = re.compile(r'^\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?')
+
+
+def parse_color(color):
+    """Convert a color into RGB values
+
+    Parameters
+    ----------
+    color: str or int
+        A color name, a hex string (``'#ff0000'`` or ``'#f00'``), an
+        ``rgb(255, 0, 0)`` string or an integer like ``0xff0000``.
+
+    Returns
+    -------
+    np.ndarray
+        Red, green and blue components between 0 and 1.
+
+    Raises
+    ------
+    ValueError
+        If the color cannot be interpreted.
+    """
+    if isinstance(color, (int, np.integer)) and not isinstance(color, bool):
+        return np.array([(color >> 16) & 255, (color >> 8) & 255,
+                         color & 255]) / 255.0
+
+    value = str(color).strip().lower()
+    value = _COLOR_NAMES.get(value, value)
+
+    match = _HEX.match(value)
+    if match is not None:
+        value = match.group(1)
+        if len(value) == 3:
+            value = ''.join(c * 2 for c in value)
+        return np.array([int(value[i:i + 2], 16) for i in (0, 2, 4)]) / 255.0
+
+    match = _RGB.match(value)
+    if match is not None:
+        return np.minimum([int(c) for c in match.groups()[:3]], 255) / 255.0
+
+    raise ValueError('Cannot interpret %r as a color' % (color, ))
+
+
+def to_hex(rgb):
+    """Convert RGB values between 0 and 1 into a hex string"""
+    return '#%02x%02x%02x' % tuple(np.round(np.asarray(rgb) * 255).astype(int))
+
+
+def is_numeric(value):
+    try:
+        return bool(np.isfinite(float(value)))
+    except ValueError:
+        return False
+
+
+def natural_sort(values):
+    """Sort values the same way as ``util.naturalSort`` in JavaScript
+
+    Non-numeric values go first (sorted ignoring case), followed by the
+    numeric values in ascending order.
+    """
+    alpha, numeric = [], []
+    for value in values:
+        match = _LEADING_FLOAT.match(value)
+        if match is None or not np.isfinite(float(match.group(0))):
+            alpha.append(value)
+        else:
+            numeric.append((float(match.group(0)), value))
+
+    alpha = sorted(alpha, key=lambda v: v.lower())
+    numeric = [v for _, v in sorted(numeric, key=lambda n: n[0])]
+
+    return alpha + numeric
+
+
+def _interpolate_rgb(palette, positions):
+    """Interpolate a palette in RGB space, positions are between 0 and 1"""
+    palette = np.array([parse_color(c) for c in palette])
+
+    positions = np.clip(positions, 0, 1) * (len(palette) - 1)
+    low = np.floor(positions).astype(int)
+    high = np.minimum(low + 1, len(palette) - 1)
+    weight = (positions - low)[:, np.newaxis]
+
+    return palette[low] * (1 - weight) + palette[high] * weight
+
+
+def _interpolate(palette, positions):
+    """Interpolate a palette in RGB space and return hex colors"""
+    return [to_hex(c) for c in _interpolate_rgb(palette, positions)]
+
+
+def colormap_colors(values, colormap, continuous=False):
+    """Assign a color to each value in a category
+
+    Mirrors ``ColorViewController.getColorList``.
+
+    Parameters
+    ----------
+    values: list of str
+        Unique values in a metadata category, sorted with ``natural_sort``.
+    colormap: str
+        Name of the colormap, see ``Emperor.color_by``.
+    continuous: bool, optional
+        Whether the colors should be scaled by the numeric value of each
+        category (only used by non-discrete colormaps).
+
+    Returns
+    -------
+    dict
+        Mapping of values to hex colors.
+
+    Raises
+    ------
+    ValueError
+        If the colormap is not known.
+        If ``continuous`` is ``True`` and there are less than two numeric
+        values.
+    """
+    if colormap in _DISCRETE_COLORMAPS:
+        palette = _DISCRETE_COLORMAPS[colormap]
+        return {v: palette[i % len(palette)] for i, v in enumerate(values)}
+
+    if colormap not in _CONTINUOUS_COLORMAPS:
+        raise ValueError('Could not find %s as a colormap.' % colormap)
+
+    palette = _CONTINUOUS_COLORMAPS[colormap]
+
+    if len(values) == 1 and not continuous:
+        return {values[0]: palette[0]}
+
+    if continuous:
+        numeric = [v for v in values if is_numeric(v)]
+        if len(numeric) < 2:
+            raise ValueError('Continuous coloration requires at least 2 '
+                             'numeric values in the category.')
+
+        numbers = np.array(numeric, dtype=float)
+        positions = ((numbers - numbers.min()) /
+                     (numbers.max() - numbers.min()))
+
+        colors = {v: NAN_COLOR for v in values}
+        colors.update(zip(numeric, _interpolate(palette, positions)))
+        return colors
+
+    positions = np.arange(len(values)) / (len(values) - 1)
+    return dict(zip(values, _interpolate(palette, positions)))
+
+
+def scaled_values(values, low, high):
+    """Scale a category by its numeric values
+
+    Mirrors ``ScalarViewControllerABC.getScale``, numeric values are mapped
+    linearly between ``low`` and ``high``, and non-numeric values are set to
+    zero (i.e. hidden).
+
+    Parameters
+    ----------
+    values: list of str
+        Unique values in a metadata category.
+    low, high: float
+        Range of the scaled values.
+
+    Returns
+    -------
+    dict
+        Mapping of values to scalars.
+
+    Raises
+    ------
+    ValueError
+        If there are less than two numeric values.
+    """
+    numeric = [v for v in values if is_numeric(v)]
+    if len(numeric) < 2:
+        raise ValueError('Not enough numeric values in category, can not '
+                         'scale by value.')
+
+    numbers = np.array(numeric, dtype=float)
+    numbers = low + ((numbers - numbers.min()) * (high - low) /
+                     (numbers.max() - numbers.min()))
+
+    scaled = {v: 0.0 for v in values}
+    scaled.update(zip(numeric, np.round(numbers, 4)))
+    return scaled
+
+
+def colormap_lut(colormap):
+    """Lookup table of a continuous colormap
+
+    Parameters
+    ----------
+    colormap: str
+        Name of a continuous colormap, see ``Emperor.color_by``.
+
+    Returns
+    -------
+    np.ndarray
+        ``(LUT_SIZE, 3)`` array with the colors (between 0 and 1) of evenly
+        spaced positions of the colormap.
+
+    Raises
+    ------
+    ValueError
+        If the colormap is not a known continuous colormap.
+    """
+    if colormap not in _CONTINUOUS_COLORMAPS:
+        raise ValueError('Could not find %s as a continuous colormap.' %
+                         colormap)
+
+    if colormap not in _LUTS:
+        _LUTS[colormap] = _interpolate_rgb(_CONTINUOUS_COLORMAPS[colormap],
+                                           np.linspace(0, 1, LUT_SIZE))
+    return _LUTS[colormap]
+
+
+def _to_numbers(values):
+    """Numeric value of each sample, ``NaN`` if the value is not numeric
+
+    Numeric columns are used as they are, and only columns of strings are
+    parsed. Booleans are not numeric, the same as their string form.
+    """
+    values = pd.Series(values)
+    if values.dtype == bool:
+        return np.full(len(values), np.nan)
+
+    numbers = pd.to_numeric(values, errors='coerce')
+    numbers = numbers.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.where(np.isfinite(numbers), numbers, np.nan)
+
+
+def colormap_rgb(values, colormap, continuous=False):
+    """Assign a color to each sample
+
+    Per-sample version of ``colormap_colors``. Continuous colors are looked
+    up in ``colormap_lut`` after normalizing the numeric values.
+
+    Parameters
+    ----------
+    values: list, np.ndarray or pd.Series
+        Value of a metadata category for each sample. Continuous colors use
+        the numeric values, otherwise the values are formatted as strings.
+    colormap: str
+        Name of the colormap, see ``Emperor.color_by``.
+    continuous: bool, optional
+        Whether the colors should be scaled by the numeric value of each
+        sample (only used by non-discrete colormaps).
+
+    Returns
+    -------
+    np.ndarray
+        ``(n, 3)`` array with the color of each sample (between 0 and 1).
+
+    Raises
+    ------
+    ValueError
+        If the colormap is not known.
+        If ``continuous`` is ``True`` and there are less than two numeric
+        values.
+    """
+    if continuous and colormap in _CONTINUOUS_COLORMAPS:
+        numbers = _to_numbers(values)
+        missing = np.isnan(numbers)
+
+        if len(np.unique(numbers[~missing])) < 2:
+            raise ValueError('Continuous coloration requires at least 2 '
+                             'numeric values in the category.')
+
+        low, high = numbers[~missing].min(), numbers[~missing].max()
+        positions = np.where(missing, 0, (numbers - low) / (high - low))
+        rgb = colormap_lut(colormap)[np.rint(positions *
+                                             (LUT_SIZE - 1)).astype(int)]
+        rgb[missing] = parse_color(NAN_COLOR)
+        return rgb
+
+    unique, inverse = np.unique(np.asarray(values, dtype=str),
+                                return_inverse=True)
+    mapping = colormap_colors(natural_sort(unique.tolist()), colormap,
+                              continuous)
+    palette = np.array([parse_color(mapping[v]) for v in unique])
+    return palette.reshape(-1, 3)[inverse.ravel()]
+
+
+def scaled_array(values, low, high):
+    """Scale each sample by its numeric value
+
+    Per-sample version of ``scaled_values``.
+
+    Parameters
+    ----------
+    values: list, np.ndarray or pd.Series
+        Value of a metadata category for each sample, either numbers or
+        strings.
+    low, high: float
+        Range of the scaled values.
+
+    Returns
+    -------
+    np.ndarray
+        The scaled value of each sample, zero for non-numeric values.
+
+    Raises
+    ------
+    ValueError
+        If there are less than two numeric values.
+    """
+    numbers = _to_numbers(values)
+    missing = np.isnan(numbers)
+
+    if len(np.unique(numbers[~missing])) < 2:
+        raise ValueError('Not enough numeric values in category, can not '
+                         'scale by value.')
+
+    minimum, maximum = numbers[~missing].min(), numbers[~missing].max()
+    scaled = low + ((numbers - minimum) * (high - low) / (maximum - minimum))
+    scaled[missing] = 0.0
+    return np.round(scaled, 4)
+
+
+def rasterize(x, y, z, radius, rgb, alpha, width, height, background):
+    """Draw markers as discs with a depth buffer
+
+    Parameters
+    ----------
+    x, y: np.ndarray
+        Center of each marker in pixels, the origin is the top left corner.
+    z: np.ndarray
+        Depth of each marker, markers with a larger value are drawn on top.
+    radius: np.ndarray
+        Radius of each marker in pixels.
+    rgb: np.ndarray
+        ``(n, 3)`` array with the color of each marker (between 0 and 1).
+    alpha: np.ndarray
+        Opacity of each marker.
+    width, height: int
+        Size of the image in pixels.
+    background: np.ndarray
+        Color of the background (between 0 and 1).
+
+    Returns
+    -------
+    np.ndarray
+        ``(height, width, 3)`` array of ``np.uint8`` values.
+
+    Notes
+    -----
+    Each pixel shows the marker closest to the camera, translucent markers
+    are blended with the background only. Markers with the same radius
+    (rounded to half a pixel) share a stencil of pixel offsets, so the work
+    is proportional to the number of covered pixels and not to the size of
+    the image.
+
+    The markers are drawn from front to back in batches of ``_BATCH_SIZE``.
+    Before a batch is drawn, the markers that only overlap tiles of
+    ``_TILE_SIZE`` by ``_TILE_SIZE`` pixels that are already covered are
+    skipped, because they are hidden by the markers in front of them. With
+    many overlapping markers most of them are never drawn.
+    """
+    # the depth buffer stores the rank of each marker from back to front
+    order = np.argsort(z, kind='mergesort')
+    depth = np.full(width * height, -1, dtype=np.int64)
+
+    cx = np.round(x).astype(np.int64)[order]
+    cy = np.round(y).astype(np.int64)[order]
+    radius = np.maximum(np.round(radius * 2) / 2, 0.5)[order]
+    extent = np.ceil(radius).astype(np.int64)
+
+    # bounding box of each marker in tiles, clipped to the image
+    columns, rows = -(-width // _TILE_SIZE), -(-height // _TILE_SIZE)
+    left = np.clip(cx - extent, 0, width) // _TILE_SIZE
+    right = np.clip(cx + extent, -1, width - 1) // _TILE_SIZE + 1
+    top = np.clip(cy - extent, 0, height) // _TILE_SIZE
+    bottom = np.clip(cy + extent, -1, height - 1) // _TILE_SIZE + 1
+    tiles = (right - left) * (bottom - top)
+
+    stencils = {}
+    for stop in range(len(z), 0, -_BATCH_SIZE):
+        ranks = np.arange(max(stop - _BATCH_SIZE, 0), stop)
+
+        # count the covered tiles in each bounding box with a summed-area
+        # table, markers outside the image have no tiles
+        covered = np.zeros((rows * _TILE_SIZE, columns * _TILE_SIZE), bool)
+        covered[:height, :width] = (depth >= 0).reshape(height, width)
+        full = covered.reshape(rows, _TILE_SIZE, columns, _TILE_SIZE)
+        full = full.all(axis=(1, 3))
+
+        table = np.zeros((rows + 1, columns + 1), dtype=np.int64)
+        table[1:, 1:] = full.cumsum(axis=0).cumsum(axis=1)
+        hidden = (table[bottom[ranks], right[ranks]] -
+                  table[top[ranks], right[ranks]] -
+                  table[bottom[ranks], left[ranks]] +
+                  table[top[ranks], left[ranks]])
+        ranks = ranks[hidden < tiles[ranks]]
+        if len(ranks) == 0:
+            continue
+
+        pixels, values = [], []
+        for r in np.unique(radius[ranks]):
+            if r not in stencils:
+                size = int(np.ceil(r))
+                dy, dx = np.mgrid[-size:size + 1, -size:size + 1]
+                inside = (dx ** 2 + dy ** 2) <= r ** 2
+                stencils[r] = dx[inside], dy[inside]
+            dx, dy = stencils[r]
+
+            keep = ranks[radius[ranks] == r]
+            px = cx[keep, np.newaxis] + dx
+            py = cy[keep, np.newaxis] + dy
+            visible = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+
+            pixels.append((py * width + px)[visible])
+            values.append(np.broadcast_to(keep[:, np.newaxis],
+                                          px.shape)[visible])
+
+        # within a batch the pixels are written from back to front, so when
+        # a pixel is assigned more than once the marker in front wins, and
+        # pixels drawn by a previous batch are in front of this one
+        pixels, values = np.concatenate(pixels), np.concatenate(values)
+        sort = np.argsort(values, kind='mergesort')
+        pixels, values = pixels[sort], values[sort]
+
+        empty = depth[pixels] < 0
+        depth[pixels[empty]] = values[empty]
+
+    covered = depth >= 0
+    drawn = order[depth[covered]]
+    opacity = alpha[drawn, np.newaxis]
+
+    image = np.empty((width * height, 3))
+    image[:] = background
+    image[covered] = rgb[drawn] * opacity + image[covered] * (1 - opacity)
+
+    image = np.round(np.clip(image, 0, 1) * 255).astype(np.uint8)
+    return image.reshape(height, width, 3)
+
+
+def _png_chunk(kind, data):
+    chunk = kind + data
+    return (struct.pack('>I', len(data)) + chunk +
+            struct.pack('>I', zlib.crc32(chunk) & 0xffffffff))
+
+
+def encode_png(image):
+    """Encode an RGB image as a PNG file
+
+    Parameters
+    ----------
+    image: np.ndarray
+        ``(height, width, 3)`` array of ``np.uint8`` values.
+
+    Returns
+    -------
+    bytes
+        The contents of the PNG file.
+    """
+    height, width = image.shape[:2]
+
+    # each scanline starts with the filter type, zero means no filtering
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = image.reshape(height, width * 3)
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+
+    return (b'\x89PNG\r\n\x1a\n' +
+            _png_chunk(b'IHDR', header) +
+            _png_chunk(b'IDAT', zlib.compress(raw.tobytes(), 6)) +
+            _png_chunk(b'IEND', b''))
+
+
+def encode_svg(x, y, z, radius, colors, alpha, width, height, background):
+    """Draw markers as SVG circles
+
+    Parameters
+    ----------
+    x, y, z, radius, alpha: np.ndarray
+        See ``rasterize``.
+    colors: list of str
+        Hex color of each marker.
+    width, height: int
+        Size of the image in pixels.
+    background: str
+        Hex color of the background.
+
+    Returns
+    -------
+    str
+        The contents of the SVG file.
+    """
+    circles = []
+    for i in np.argsort(z, kind='mergesort'):
+        opacity = '' if alpha[i] >= 1 else ' fill-opacity="%.4g"' % alpha[i]
+        circles.append('<circle cx="%.2f" cy="%.2f" r="%.2f" fill="%s"%s/>' %
+                       (x[i], y[i], radius[i], colors[i], opacity))
+
+    return '\n'.join(
+        ['<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" '
+         'viewBox="0 0 %d %d">' % (width, height, width, height),
+         '<rect width="100%%" height="100%%" fill="%s"/>' % background] +
+        circles + ['</svg>', ''])
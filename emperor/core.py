@@ -23,10 +23,16 @@ Classes
 # ----------------------------------------------------------------------------
 from __future__ import division
 
+from base64 import b64encode
+from collections import namedtuple
 from copy import deepcopy
-from os.path import join
+from hashlib import sha1
+from os import makedirs
+from os.path import exists, join
 from distutils.dir_util import copy_tree
+import json
 import warnings
+import zlib
 import numpy as np
 import pandas as pd
 
@@ -35,8 +41,13 @@ from jinja2.environment import Environment
 from skbio import OrdinationResults
 
 from emperor import __version__ as emperor_version
-from emperor.util import (get_emperor_support_files_dir,
-                          preprocess_coords_file, resolve_stable_url,
+from emperor._cache import RenderCache
+from emperor._image import (colormap_rgb, encode_png, encode_svg,
+                            is_numeric, parse_color, rasterize, scaled_array,
+                            to_hex)
+from emperor.util import (fingerprint, get_emperor_support_files_dir,
+                          procrustes_superimposition, quantize_coordinates,
+                          resolve_stable_url,
                           validate_and_process_custom_axes, EmperorWarning)
 
 # we are going to use this remote location to load external resources
@@ -49,9 +60,25 @@ STYLE_PATH = 'style-template.html'
 LOGIC_PATH = 'logic-template.html'
 HTML_CONTAINER_PATH = 'html-container-template.html'
 
+# shapes in the plot and their closest symbol in Vega, see
+# DecompositionView._buildVegaSpec
+VEGA_SHAPES = {'Sphere': 'circle', 'Diamond': 'diamond',
+               'Cone': 'triangle-down', 'Cylinder': 'square', 'Ring': 'circle',
+               'Square': 'square', 'Icosahedron': 'cross', 'Star': 'cross'}
+
 STANDALONE_PATH = 'standalone-template.html'
 JUPYTER_PATH = 'jupyter-template.html'
 
+# the coordinates of a master ordination followed by its jackknifed or
+# procrustes ordinations, see Emperor._replicate_set
+ReplicateSet = namedtuple('ReplicateSet', ['coords', 'disparities'])
+
+# the coordinates and metadata in a plot, see Emperor._build_plot
+PlotData = namedtuple('PlotData', ['sample_ids', 'coords', 'pct_var', 'ci',
+                                   'headers', 'metadata', 'replicates',
+                                   'names', 'edges', 'bi_coords', 'bi_ids',
+                                   'bi_headers', 'bi_metadata'])
+
 
 class Emperor(object):
     """Display principal coordinates analysis plots
@@ -78,7 +105,8 @@ class Emperor(object):
     dimensions: int, optional
         Number of dimensions to keep from the ordination data, defaults to 5.
         Be aware that this value will determine the number of dimensions for
-        all computations.
+        all computations, and that the remaining dimensions of ``ordination``
+        are not kept.
     remote: bool or str, optional
         This parameter can have one of the following three behaviors according
         to the value: (1) ``str`` - load the resources from a user-specified
@@ -88,29 +116,54 @@ class Emperor(object):
         ``True``. See the Notes section for more information.
     jackknifed: list of OrdinationResults, optional
         A list of the OrdinationResults objects with the same sample
-        identifiers as the identifiers in ``ordination``.
+        identifiers as the identifiers in ``ordination``. The samples can be
+        in any order, and the objects are not modified.
     procrustes: list of OrdinationResults, optional
         A list of the OrdinationResults objects with the same sample
-        identifiers as the identifiers in ``ordination``.
+        identifiers as the identifiers in ``ordination``. The samples can be
+        in any order, and the objects are not modified.
     ignore_missing_samples: bool, optional
         If set to `True` samples and features without metadata are included by
         setting all metadata values to: ``This element has no metadata``. By
         default an exception will be raised if missing elements are
         encountered. Note, this flag only takes effect if there's at least one
         overlapping element.
+    superimpose: bool, optional
+        Whether or not the ``procrustes`` ordinations should be rotated,
+        scaled and translated to best match ``ordination`` before they are
+        plotted. Defaults to ``False``, i.e. the ordinations are assumed to be
+        superimposed already. See ``procrustes_disparities``.
+    copy: bool, optional
+        Whether or not the metadata should be copied. Defaults to ``True``.
+        When ``False`` and the metadata already has the same rows (in the same
+        order) as the ordination, ``mf`` and ``feature_mf`` share their data
+        with ``mapping_file`` and ``feature_mapping_file``, otherwise only the
+        rows that are needed are copied. In either case the metadata should
+        not be modified after the object is created.
+    metadata_columns: list of str, optional
+        Names of the sample metadata columns to keep, by default all the
+        columns are kept.
+    exclude_columns: list of str, optional
+        Names of the sample metadata columns to remove.
+    drop_unique_columns: bool, optional
+        Whether or not to remove non-numeric sample metadata columns with a
+        different value for each sample, e.g. free text descriptions. Columns
+        listed in ``metadata_columns`` are never removed. Defaults to
+        ``False``.
 
     Attributes
     ----------
     jackknifed: list
-        List of OrdinationResults objects in the same sample-order as
-        ``self.ordination``.
+        List of OrdinationResults objects as passed to the constructor.
     procrustes: list
-        List of OrdinationResults objects in the same sample-order as
-        ``self.ordination``.
+        List of OrdinationResults objects as passed to the constructor.
     procrustes_names: list
         A list of names that will be used to distinguish samples from each
         ordination in a procrustes plot. The GUI will display a category
         labeled ``__Procrustes_Names__``.
+    superimpose: bool
+        Whether or not the ``procrustes`` ordinations are superimposed onto
+        ``ordination`` before they are plotted.
     width: str
         Width of the plot when displayed in the Jupyter notebook (in CSS
         units).
@@ -137,6 +190,47 @@ class Emperor(object):
         file). Valid values are ``"IQR"`` (for inter-quartile ranges) and
         ``"sdev"`` (for standard deviation). This argument is ignored if
         ``self.jackknifed`` is ``None`` or an empty list.
+    replicates_dtype : np.dtype, optional
+        Data type used to store the coordinates of the jackknifed and
+        procrustes ordinations while the plot is built. Defaults to
+        ``np.float64``, ``np.float32`` halves the memory that's needed.
+    replicates_path : str, optional
+        If set, the coordinates of the jackknifed and procrustes ordinations
+        are stored in a memory-mapped file at this path instead of in
+        memory. Defaults to ``None``.
+    shared_renderer : bool, optional
+        Whether the plot should draw using a WebGL context that is shared with
+        every other plot in the page (that also sets this attribute). Browsers
+        only allow a small number of live WebGL contexts per page, so enable
+        this option when displaying many plots in the same notebook. Plots
+        that are scrolled out of view are not rendered. Defaults to ``False``.
+    lazy_metadata : bool, optional
+        Whether only the sample metadata columns used by ``settings`` should
+        be decoded when the plot is loaded. The rest of the columns are sent
+        as compressed blocks that are decoded when they are selected in the
+        user interface. This option requires a browser that supports the
+        Compression Streams API. Defaults to ``False``.
+    metadata_url : str, optional
+        If set (and ``lazy_metadata`` is ``True``), the compressed metadata
+        blocks are not embedded in the plot, instead they are fetched from
+        this URL when they are needed, see ``write_metadata_blocks``.
+        Defaults to ``None``.
+    precision : {None, 'float32', 'int16', 'uint16'}, optional
+        Data type used to send the coordinates to the browser. ``None``
+        (the default) sends them at full precision, ``'float32'`` halves the
+        size of the coordinates, and ``'int16'`` or ``'uint16'`` quantize
+        each axis to 65,536 values. See ``precision_tolerance``.
+    precision_tolerance : float, optional
+        Maximum error in the position of a sample introduced by ``precision``,
+        as a fraction of the extent of the plot (the widest range of the
+        axes). Defaults to ``1e-4``.
+    cache : str, optional
+        Directory where the plots created by ``make_emperor`` are cached. A
+        cached plot is returned when the inputs, settings and options of the
+        plot are the same. Defaults to ``None``, plots are not cached.
+    cache_size : int, optional
+        Maximum size in bytes of the cached plots, the least recently used
+        plots are removed first. Defaults to 256 MiB.
 
     Examples
     --------
@@ -229,37 +323,46 @@ class Emperor(object):
     """
     def __init__(self, ordination, mapping_file, feature_mapping_file=None,
                  dimensions=5, remote=True, jackknifed=None, procrustes=None,
-                 ignore_missing_samples=False):
+                 ignore_missing_samples=False, superimpose=False, copy=True,
+                 metadata_columns=None, exclude_columns=None,
+                 drop_unique_columns=False):
 
         if ordination.samples.shape[1] < 2:
             raise ValueError('Ordinations with less than two dimensions are'
                              ' not supported.')
 
-        self.ordination = ordination
+        if ordination.proportion_explained.shape[0] < dimensions:
+            self.dimensions = ordination.proportion_explained.shape[0]
+        else:
+            self.dimensions = dimensions
+
+        self.ordination = self._truncate_ordination(ordination,
+                                                    self.dimensions)
         self.jackknifed = jackknifed if jackknifed is not None else []
         self.procrustes = procrustes if procrustes is not None else []
+        self.superimpose = superimpose
 
-        self.mf = mapping_file.copy()
+        mapping_file = self._select_columns(mapping_file, metadata_columns,
+                                            exclude_columns)
+        self.mf = self._validate_metadata(mapping_file,
+                                          self.ordination.samples,
+                                          ignore_missing_samples, copy=copy)
 
-        self.mf = self._validate_metadata(self.mf, self.ordination.samples,
-                                          ignore_missing_samples)
+        if drop_unique_columns:
+            self.mf = self._drop_unique_columns(self.mf, metadata_columns)
 
         # if biplots are to be visualized
         if self.ordination.features is not None:
             self.feature_mf = \
                 self._validate_metadata(feature_mapping_file,
                                         self.ordination.features,
-                                        ignore_missing_samples, kind='feature')
+                                        ignore_missing_samples, kind='feature',
+                                        copy=copy)
 
         self._validate_ordinations()
 
         self._html = None
 
-        if self.ordination.proportion_explained.shape[0] < dimensions:
-            self.dimensions = self.ordination.proportion_explained.shape[0]
-        else:
-            self.dimensions = dimensions
-
         if isinstance(remote, bool):
             if remote:
                 self.base_url = resolve_stable_url(emperor_version,
@@ -288,9 +391,28 @@ class Emperor(object):
 
         self.js_on_ready = ''
 
+        self.shared_renderer = False
+
+        self.lazy_metadata = False
+        self.metadata_url = None
+
+        self.precision = None
+        self.precision_tolerance = 1e-4
+
+        self.cache = None
+        self.cache_size = 256 * 2 ** 20
+
         # label each ordination by index
         self.procrustes_names = []
         self.jackknifing_method = 'IQR'
+
+        # storage for the coordinates of the replicates, see _replicate_set
+        self.replicates_dtype = np.float64
+        self.replicates_path = None
+
+        # fingerprint of the superimposed replicates and their disparities,
+        # see procrustes_disparities
+        self._disparities = (None, None)
         if self.procrustes:
             self.procrustes_names = ['Ordination %d' % i
                                      for i in range(len(self.procrustes) + 1)]
@@ -308,8 +430,144 @@ class Emperor(object):
 
         return display(HTML(str(self)))
 
+    @staticmethod
+    def _truncate_ordination(ordination, dimensions):
+        """Keep only the dimensions that can be plotted
+
+        Parameters
+        ----------
+        ordination : skbio.OrdinationResults
+            The ordination to truncate, this object is not modified.
+        dimensions : int
+            Number of dimensions to keep.
+
+        Returns
+        -------
+        skbio.OrdinationResults
+            ``ordination`` if it has no more than ``dimensions`` dimensions,
+            otherwise a new object with the sample and feature coordinates,
+            eigenvalues and proportion explained of the first ``dimensions``
+            dimensions.
+        """
+        def first(data):
+            if data is None or data.shape[-1] <= dimensions:
+                return data
+
+            # copy the slice so the rest of the data can be garbage collected
+            if data.ndim == 1:
+                return data.iloc[:dimensions].copy()
+            return data.iloc[:, :dimensions].copy()
+
+        truncated = [first(ordination.samples), first(ordination.features),
+                     first(ordination.eigvals),
+                     first(ordination.proportion_explained)]
+
+        if all(new is old for new, old in
+               zip(truncated, [ordination.samples, ordination.features,
+                               ordination.eigvals,
+                               ordination.proportion_explained])):
+            return ordination
+
+        samples, features, eigvals, proportion_explained = truncated
+        return OrdinationResults(
+            short_method_name=ordination.short_method_name,
+            long_method_name=ordination.long_method_name,
+            eigvals=eigvals, samples=samples, features=features,
+            proportion_explained=proportion_explained)
+
+    @staticmethod
+    def _select_columns(metadata, include=None, exclude=None):
+        """Select a subset of the metadata columns
+
+        Parameters
+        ----------
+        metadata : pd.DataFrame
+            The metadata, this object is not modified.
+        include : list of str, optional
+            Columns to keep, all columns are kept by default.
+        exclude : list of str, optional
+            Columns to remove.
+
+        Returns
+        -------
+        pd.DataFrame
+            ``metadata`` if all columns are kept, otherwise a copy of the
+            selected columns.
+
+        Raises
+        ------
+        KeyError
+            If any of the columns in ``include`` or ``exclude`` are not present
+            in the metadata.
+        """
+        if metadata is None or (include is None and not exclude):
+            return metadata
+
+        columns = metadata.columns
+        requested = list(include if include is not None else []) + \
+            list(exclude if exclude is not None else [])
+        missing = [str(c) for c in requested if c not in columns]
+
+        if missing:
+            raise KeyError("One or more of the metadata columns are not "
+                           "present in the sample information: %s" %
+                           ', '.join(missing))
+
+        if include is not None:
+            columns = pd.Index(include)
+        if exclude:
+            columns = columns.difference(exclude, sort=False)
+
+        if columns.equals(metadata.columns):
+            return metadata
+        return metadata[columns]
+
+    @staticmethod
+    def _drop_unique_columns(metadata, keep=None):
+        """Remove text columns with a different value for each element
+
+        Parameters
+        ----------
+        metadata : pd.DataFrame
+            The validated metadata.
+        keep : list of str, optional
+            Columns that shouldn't be removed.
+
+        Returns
+        -------
+        pd.DataFrame
+            The metadata without the unique columns.
+
+        Notes
+        -----
+        Columns where every element has a distinct value (for example free
+        text descriptions or alternate identifiers) can't be used to group
+        elements in the user interface. Numeric columns are kept, as they
+        can still be used as gradients or custom axes.
+        """
+        if len(metadata) < 2:
+            return metadata
+
+        keep = set(keep if keep is not None else [])
+
+        unique = []
+        for column in metadata.columns:
+            if column in keep:
+                continue
+
+            values = metadata[column]
+            if values.nunique(dropna=False) != len(metadata):
+                continue
+
+            if pd.to_numeric(values, errors='coerce').isnull().any():
+                unique.append(column)
+
+        if unique:
+            metadata = metadata.drop(columns=unique)
+        return metadata
+
     def _validate_metadata(self, metadata, matrix, ignore_missing_samples,
-                           kind='sample'):
+                           kind='sample', copy=True):
 
         if kind not in {'sample', 'feature'}:
             raise ValueError('Unsupported "kind" value %s' % kind)
@@ -320,6 +578,59 @@ class Emperor(object):
             metadata['all'] = 'All elements'
             return metadata
 
+        # duplicated identifiers can't be resolved to a single row
+        if not metadata.index.is_unique:
+            return self._validate_metadata_legacy(
+                metadata, matrix, ignore_missing_samples, kind)
+
+        # nothing to filter or sort, so the data can be shared with the caller
+        if metadata.index.equals(matrix.index):
+            metadata = metadata.copy(deep=copy)
+            metadata.index = matrix.index
+            return metadata
+
+        # position of each element in the metadata, -1 if it's missing
+        positions = metadata.index.get_indexer(matrix.index)
+        missing = positions == -1
+
+        if len(matrix.index) and missing.all():
+            raise ValueError('None of the %s identifiers match between the'
+                             ' metadata and the coordinates. Verify that you '
+                             'are using metadata and coordinates corresponding'
+                             ' to the same dataset.' % kind)
+
+        difference = matrix.index[missing].unique()
+
+        if len(difference) and not ignore_missing_samples:
+            self._missing_metadata_error(difference, kind)
+        elif len(difference):
+            warnings.warn("%d out of %d %ss have no metadata and are being"
+                          " included with a placeholder value." %
+                          (len(difference), matrix.index.nunique(), kind),
+                          EmperorWarning)
+
+        # only the rows for which we have coordinates are taken, this also
+        # ensures that the coordinates are in the same order as the metadata
+        metadata = metadata.take(np.where(missing, 0, positions))
+        metadata.index = matrix.index
+
+        # pad the missing elements
+        if len(difference):
+            metadata = metadata.astype(object)
+            metadata.iloc[np.flatnonzero(missing)] = \
+                'This element has no metadata'
+
+        return metadata
+
+    def _validate_metadata_legacy(self, metadata, matrix,
+                                  ignore_missing_samples, kind):
+        """Validate metadata with duplicated identifiers
+
+        Notes
+        -----
+        This is the same validation as ``_validate_metadata`` but with sets,
+        as the rows with duplicated identifiers are all included.
+        """
         ordination_elements = set(matrix.index)
         difference = ordination_elements - set(metadata.index)
 
@@ -330,22 +641,7 @@ class Emperor(object):
                              ' to the same dataset.' % kind)
 
         if difference and not ignore_missing_samples:
-            # sort the elements so we have a deterministic output
-            difference = sorted([str(i) for i in difference])
-
-            # if there's more than 5 missing elements, truncate the list
-            if len(difference) > 5:
-                elements = ', '.join(difference[:5])
-                suffix = ("Showing only the first 5 %ss out of %d: %s ..." %
-                          (kind, len(difference), elements))
-            else:
-                elements = ', '.join(difference)
-                suffix = ("Offending %ss: %s" % (kind, elements))
-
-            raise KeyError("There are %ss not included in the %s mapping "
-                           "file. Override this error by using the "
-                           "`ignore_missing_samples` argument. %s" %
-                           (kind, kind, suffix))
+            self._missing_metadata_error(difference, kind)
         elif difference and ignore_missing_samples:
             warnings.warn("%d out of %d %ss have no metadata and are being"
                           " included with a placeholder value." %
@@ -353,8 +649,8 @@ class Emperor(object):
                           EmperorWarning)
 
             # pad the missing elements
-            pad = pd.DataFrame(index=difference, columns=metadata.columns,
-                               dtype=str)
+            pad = pd.DataFrame(index=list(difference),
+                               columns=metadata.columns, dtype=str)
             pad.fillna('This element has no metadata', inplace=True)
             metadata = pd.concat([metadata, pad])
 
@@ -365,7 +661,44 @@ class Emperor(object):
 
         return metadata
 
+    @staticmethod
+    def _missing_metadata_error(difference, kind):
+        """Raise an error listing the elements without metadata
+
+        Parameters
+        ----------
+        difference : iterable
+            The identifiers without metadata.
+        kind : {'sample', 'feature'}
+            The kind of elements.
+
+        Raises
+        ------
+        KeyError
+            Always.
+        """
+        # sort the elements so we have a deterministic output
+        difference = sorted([str(i) for i in difference])
+
+        # if there's more than 5 missing elements, truncate the list
+        if len(difference) > 5:
+            elements = ', '.join(difference[:5])
+            suffix = ("Showing only the first 5 %ss out of %d: %s ..." %
+                      (kind, len(difference), elements))
+        else:
+            elements = ', '.join(difference)
+            suffix = ("Offending %ss: %s" % (kind, elements))
+
+        raise KeyError("There are %ss not included in the %s mapping "
+                       "file. Override this error by using the "
+                       "`ignore_missing_samples` argument. %s" %
+                       (kind, kind, suffix))
+
     def _validate_ordinations(self):
+        # positions of the master samples in each of the ordinations, see
+        # _replicate_set
+        self._alignment = []
+
         # bail if the value is non or an empty list
         if self.jackknifed == [] and self.procrustes == []:
             return
@@ -381,31 +714,35 @@ class Emperor(object):
                             'OrdinationResults instances.')
 
         master_ids = self.ordination.samples.index
-        master = set(self.ordination.samples.index)
 
-        aligned = []
+        # replicates usually share the same sample order, so each distinct
+        # order is only aligned once, and samples already in the master's
+        # order are used as they are. The fingerprint is not cryptographic,
+        # so a match is confirmed by comparing the indices
+        positions = {fingerprint(master_ids): (master_ids, None)}
 
         for i, ord_res in enumerate(ordinations):
-            other = set(ord_res.samples.index)
-
-            # samples must be represented identically
-            if master != other:
-                raise ValueError('The ordination at index (%d) does not '
-                                 'represent the exact same samples. Mismatches'
-                                 ' are: %s.' % (i, ', '.join(master - other)))
-
-            # we need to ensure the copy we have is aligned one-to-one with the
-            # *master* ordination, making copies might be inefficient for large
-            # datasets
-            ord_res.samples = ord_res.samples.loc[master_ids].copy()
-            aligned.append(ord_res)
-
-        # need to test this carefully i.e. that when one is set the other one
-        # doesn't have anything or is none
-        if self.jackknifed:
-            self.jackknifed = aligned
-        elif self.procrustes:
-            self.procrustes = aligned
+            index = ord_res.samples.index
+            key = fingerprint(index)
+
+            if key in positions and index.equals(positions[key][0]):
+                indexer = positions[key][1]
+            else:
+                indexer = None
+                if index.is_unique and len(index) == len(master_ids):
+                    indexer = index.get_indexer(master_ids)
+
+                # samples must be represented identically
+                if indexer is None or (indexer == -1).any():
+                    master, other = set(master_ids), set(index)
+                    raise ValueError('The ordination at index (%d) does not '
+                                     'represent the exact same samples. '
+                                     'Mismatches are: %s.' %
+                                     (i, ', '.join(map(str, master ^ other))))
+
+                positions[key] = (index, indexer)
+
+            self._alignment.append(indexer)
 
     def copy_support_files(self, target=None):
         """Copies the support files to a target directory
@@ -451,40 +788,569 @@ class Emperor(object):
         that refers to resources locally. In this case you will need to copy
         the support files by calling the ``copy_support_files`` method.
 
+        When ``cache`` is set, the plot is looked up in the cache before it's
+        built. Cached plots are stored with a placeholder identifier that is
+        replaced with a new random identifier every time the plot is
+        returned, so the same plot can be displayed more than once in a page.
+
         See Also
         --------
         emperor.core.Emperor.copy_support_files
         """
-        main_template = self._get_template(standalone)
-
-        # _process_data does a lot of munging to the coordinates data and
-        # _to_dict puts the data into a dictionary-like object for consumption
-        data = self._to_dict(self._process_data(self.custom_axes,
-                                                self.jackknifing_method))
-
         # yes, we could have used UUID, but we couldn't find an easier way to
         # test that deterministically and with this approach we can seed the
         # random number generator and test accordingly
         plot_id = 'emperor-notebook-' + str(hex(np.random.randint(2**32)))
 
+        cache, placeholder = None, None
+        if self.cache is not None:
+            cache = RenderCache(self.cache, self.cache_size)
+            key = self._render_key(standalone)
+
+            # the cached plot can't depend on the identifier of the div
+            placeholder = 'emperor-notebook-cached-' + key
+
+            plot = cache.get(key)
+            if plot is not None:
+                return plot.replace(placeholder, plot_id)
+
+        main_template = self._get_template(standalone)
+
+        # _build_plot does a lot of munging to the coordinates data and
+        # _to_dict puts the data into a dictionary-like object for consumption
+        data = self._to_dict(self._build_plot(self.custom_axes,
+                                              self.jackknifing_method))
+
         # need to do something about low and high
         plot = main_template.render(
-            data=data, plot_id=plot_id,
+            data=data, plot_id=plot_id if cache is None else placeholder,
             logic_template_path=LOGIC_PATH, style_template_path=STYLE_PATH,
             base_dependencies_path=BASE_DEPENDENCIES_PATH,
             html_container_path=HTML_CONTAINER_PATH,
             base_url=self.base_url, js_on_ready=self.js_on_ready,
+            shared_renderer=self.shared_renderer,
             width=self.width, height=self.height)
 
+        if cache is not None:
+            cache.put(key, plot)
+            plot = plot.replace(placeholder, plot_id)
+
         return plot
 
-    def _to_dict(self, data):
+    def _render_key(self, standalone):
+        """Hash everything that determines the output of ``make_emperor``
+
+        Parameters
+        ----------
+        standalone : bool
+            Whether or not the plot is a standalone HTML file.
+
+        Returns
+        -------
+        str
+            Hexadecimal digest of the plot's fingerprint and the options used
+            to render the plot.
+        """
+        digest = sha1()
+
+        options = {
+            'version': emperor_version, 'standalone': standalone,
+            'base_url': self.base_url, 'dimensions': self.dimensions,
+            'custom_axes': self.custom_axes,
+            'jackknifing_method': self.jackknifing_method,
+            'settings': self.settings, 'width': self.width,
+            'height': self.height, 'js_on_ready': self.js_on_ready,
+            'shared_renderer': self.shared_renderer,
+            'lazy_metadata': self.lazy_metadata,
+            'metadata_url': self.metadata_url, 'precision': self.precision,
+            'precision_tolerance': self.precision_tolerance,
+            'procrustes_names': self.procrustes_names,
+            'superimpose': self.superimpose,
+            'replicates_dtype': np.dtype(self.replicates_dtype).str,
+            'fingerprint': self.fingerprint}
+        digest.update(json.dumps(options, sort_keys=True,
+                                 default=str).encode('utf-8'))
+
+        return digest.hexdigest()
+
+    def to_image(self, path=None, width=800, height=600, format='png'):
+        """Draw a static image of the plot without a browser
+
+        Parameters
+        ----------
+        path: str, optional
+            File where the image is saved. If ``None`` the image is returned
+            instead.
+        width: int, optional
+            Width of the image in pixels. Defaults to 800.
+        height: int, optional
+            Height of the image in pixels. Defaults to 600.
+        format: {'png', 'svg'}, optional
+            Format of the image. Defaults to ``'png'``.
+
+        Returns
+        -------
+        bytes, str or None
+            The contents of the PNG (``bytes``) or SVG (``str``) file if
+            ``path`` is ``None``, otherwise ``None``.
+
+        Raises
+        ------
+        TypeError
+            If ``width`` or ``height`` are not integers.
+        ValueError
+            If ``width`` or ``height`` are not positive.
+            If ``format`` is not ``'png'`` or ``'svg'``.
+            If a color in the settings cannot be interpreted.
+
+        Notes
+        -----
+        The image shows the samples as the plot looks when it's first
+        displayed, i.e. with the default camera looking at the visible
+        dimensions in ``set_axes``. Colors, visibility, scale and opacity
+        are taken from the settings, and the background color from
+        ``set_background_color``.
+
+        Markers are always drawn as circles, and translucent markers are
+        blended with the background only. Axes, labels, biplot arrows,
+        confidence ellipsoids, procrustes edges and animations are not drawn.
+
+        See Also
+        --------
+        emperor.core.Emperor.color_by
+        emperor.core.Emperor.scale_by
+        emperor.core.Emperor.opacity_by
+        emperor.core.Emperor.visibility_by
+        emperor.core.Emperor.set_axes
+        emperor.core.Emperor.set_background_color
+        """
+        if format not in {'png', 'svg'}:
+            raise ValueError('Unsupported image format "%s", the supported '
+                             'formats are "png" and "svg"' % format)
+
+        for value in (width, height):
+            if not isinstance(value, (int, np.integer)) or \
+               isinstance(value, bool):
+                raise TypeError('The width and height should be integers')
+            if value <= 0:
+                raise ValueError('The width and height should be greater '
+                                 'than zero')
+
+        plot = self._build_plot(self.custom_axes, self.jackknifing_method)
+        coords = plot.coords
+
+        colors, visible, scale, opacity, _ = self._marker_attributes(
+            self._sample_metadata(plot))
+
+        axes = self.settings.get('axes', {})
+        positions = self._view_positions(coords)[0]
+
+        # same as the camera in ScenePlotView3D, the height of the data fits
+        # the height of the plot (with a zoom of 0.7) and the radius of the
+        # markers depends on the range of the first dimension
+        low, high = positions.min(axis=0), positions.max(axis=0)
+        center = (low + high) / 2
+        span = high[1] - low[1] if high[1] > low[1] else 1.0
+        pixels = height * 0.7 / span
+
+        x = (width / 2) + (positions[:, 0] - center[0]) * pixels
+        y = (height / 2) - (positions[:, 1] - center[1]) * pixels
+        z = positions[:, 2]
+        radius = ((coords[:, 0].max() - coords[:, 0].min()) * 0.012 *
+                  pixels * scale)
+
+        keep = visible & (scale > 0) & (opacity > 0)
+        x, y, z, radius = x[keep], y[keep], z[keep], radius[keep]
+        opacity, colors = opacity[keep], colors[keep]
+
+        background = parse_color(axes.get('backgroundColor', 'black'))
+
+        if format == 'png':
+            image = encode_png(rasterize(x, y, z, radius, colors, opacity,
+                                         width, height, background))
+        else:
+            # format each distinct color once
+            unique, inverse = np.unique(colors.reshape(-1, 3), axis=0,
+                                        return_inverse=True)
+            hexes = np.array([to_hex(c) for c in unique], dtype=object)
+            image = encode_svg(x, y, z, radius, hexes[inverse.ravel()],
+                               opacity, width, height, to_hex(background))
+
+        if path is None:
+            return image
+
+        with open(path, 'wb' if format == 'png' else 'w') as f:
+            f.write(image)
+
+    def _marker_attributes(self, md):
+        """Compute the color, visibility, scale, opacity and shape of samples
+
+        Parameters
+        ----------
+        md : pd.DataFrame
+            Metadata for each sample in the plot, see ``_sample_metadata``.
+
+        Returns
+        -------
+        np.ndarray
+            ``(n, 3)`` array with the color of each sample (between 0 and 1).
+        np.ndarray
+            Whether or not each sample is visible.
+        np.ndarray
+            Scale of each sample.
+        np.ndarray
+            Opacity of each sample.
+        np.ndarray
+            Shape of each sample.
+
+        Notes
+        -----
+        Values that are not specified in the settings are resolved the same
+        way as the controllers in the browser do it, i.e. colors are taken
+        from the colormap, and the scale and opacity are scaled by value if
+        ``scaled`` is set. Only the columns in the settings are formatted as
+        strings, the way they are shown in the browser.
+        """
+        n = len(md.index)
+        settings = self.settings
+
+        visible = np.ones(n, dtype=bool)
+        if 'visibility' in settings:
+            visibility = settings['visibility']
+            mapping = {str(k): v for k, v in visibility['data'].items()}
+            visible = (self._marker_column(md, 'visibility').map(mapping)
+                       .fillna(True).values.astype(bool))
+
+        shapes = np.full(n, 'Sphere', dtype=object)
+        if 'shape' in settings:
+            shape = settings['shape']
+            mapping = {str(k): v for k, v in shape['data'].items()}
+            shapes = (self._marker_column(md, 'shape').map(mapping)
+                      .fillna('Sphere').values)
+
+        return (self._marker_colors(md), visible,
+                self._marker_scalars(md, 'scale'),
+                self._marker_scalars(md, 'opacity'), shapes)
+
+    def _marker_column(self, md, key):
+        """Values of the category of a setting formatted as strings
+
+        Parameters
+        ----------
+        md : pd.DataFrame
+            Metadata for each sample in the plot, see ``_sample_metadata``.
+        key : str
+            The name of the setting, for example ``'color'``.
+
+        Returns
+        -------
+        pd.Series
+            The values the way they are shown in the browser.
+        """
+        return md[self.settings[key]['category']].astype(str)
+
+    def _marker_colors(self, md):
+        """Color of each sample
+
+        Parameters
+        ----------
+        md : pd.DataFrame
+            Metadata for each sample in the plot, see ``_sample_metadata``.
+
+        Returns
+        -------
+        np.ndarray
+            ``(n, 3)`` array with the color of each sample (between 0 and 1).
+        """
+        if 'color' not in self.settings:
+            return np.tile(parse_color('#ff0000'), (len(md.index), 1))
+
+        color = self.settings['color']
+        values = self._marker_column(md, 'color')
+
+        # the numeric values are read from the column as it is
+        if color['continuous']:
+            colors = colormap_rgb(md[color['category']], color['colormap'],
+                                  True)
+        else:
+            colors = colormap_rgb(values.values, color['colormap'])
+
+        # colors set explicitly take precedence over the colormap
+        mapping = {str(k): v for k, v in color['data'].items()}
+        given = values.map(mapping)
+        for value in given.dropna().unique():
+            colors[(given == value).values] = parse_color(value)
+
+        return colors
+
+    def _marker_scalars(self, md, key):
+        """Scale or opacity of each sample
+
+        Parameters
+        ----------
+        md : pd.DataFrame
+            Metadata for each sample in the plot, see ``_sample_metadata``.
+        key : {'scale', 'opacity'}
+            The setting to resolve.
+
+        Returns
+        -------
+        np.ndarray
+            The scale or opacity of each sample.
+        """
+        low, high = {'scale': (1, 5), 'opacity': (0, 1)}[key]
+
+        values = np.ones(len(md.index))
+        if key in self.settings:
+            scalar = self.settings[key]
+
+            if scalar['data']:
+                mapping = {str(k): v for k, v in scalar['data'].items()}
+                values = (self._marker_column(md, key).map(mapping)
+                          .fillna(1.0).values)
+            elif scalar['scaleVal']:
+                values = scaled_array(md[scalar['category']], low, high)
+
+        return values.astype(np.float64)
+
+    def _sample_metadata(self, plot):
+        """Metadata of the samples in a plot
+
+        Parameters
+        ----------
+        plot : PlotData
+            The plot as returned by ``_build_plot``.
+
+        Returns
+        -------
+        pd.DataFrame
+            The metadata indexed by sample identifier, in the same order as
+            the coordinates in the plot.
+        """
+        headers, metadata = plot.headers, plot.metadata
+        if plot.replicates > 1:
+            headers, metadata = self._replicate_map(headers, metadata,
+                                                    plot.replicates)
+
+        return metadata.set_index(headers[0]).reindex(plot.sample_ids)
+
+    def to_vega(self, bins=None):
+        """Build a Vega specification of the plot without a browser
+
+        Parameters
+        ----------
+        bins: int, optional
+            If set, the samples are aggregated in a grid of ``bins`` by
+            ``bins`` cells of the visible 2D projection, and each cell is
+            drawn as one mark per color, sized by the number of samples in
+            it. Defaults to ``None`` (one mark per sample).
+
+        Returns
+        -------
+        dict
+            A JSON-serializable Vega (version 5) specification.
+
+        Raises
+        ------
+        TypeError
+            If ``bins`` is not an integer.
+        ValueError
+            If ``bins`` is not positive.
+            If a color in the settings cannot be interpreted.
+
+        Notes
+        -----
+        Without ``bins``, the specification is the same one that the "Open in
+        Vega Editor" option builds in the browser, i.e. the samples projected
+        on the first two visible dimensions, with the colors, visibility,
+        scale, opacity and shapes from the settings, and the metadata of
+        each sample as a tooltip.
+
+        With ``bins`` the size of the specification depends on the number of
+        cells and colors and not on the number of samples, and the metadata
+        is not included.
+
+        See Also
+        --------
+        emperor.core.Emperor.to_image
+        """
+        if bins is not None:
+            if not isinstance(bins, (int, np.integer)) or \
+               isinstance(bins, bool):
+                raise TypeError('The number of bins should be an integer')
+            if bins <= 0:
+                raise ValueError('The number of bins should be greater '
+                                 'than zero')
+
+        plot = self._build_plot(self.custom_axes, self.jackknifing_method)
+
+        # one row per point, procrustes replicates have their own identifiers
+        metadata = self._sample_metadata(plot)
+        (colors, visible, scale, opacity,
+         shapes) = self._marker_attributes(metadata)
+
+        positions, dims, _ = self._view_positions(plot.coords)
+
+        # format each distinct color once
+        unique, inverse = np.unique(np.round(colors * 255).astype(int),
+                                    axis=0, return_inverse=True)
+        colors = np.array(['rgb(%d,%d,%d)' % tuple(c) for c in unique],
+                          dtype=object)[inverse.ravel()]
+
+        symbols = pd.Series(shapes).map(VEGA_SHAPES).fillna('circle')
+
+        points = pd.DataFrame({'id': plot.sample_ids.values,
+                               'x': positions[:, 0],
+                               'y': positions[:, 1],
+                               'color': colors,
+                               'originalShape': shapes,
+                               'shape': symbols.values,
+                               'scale': scale,
+                               'opacity': opacity})[visible]
+
+        low = positions.min(axis=0).tolist()
+        high = positions.max(axis=0).tolist()
+        labels = self._axes_labels(plot.names, plot.pct_var)
+        axes = self.settings.get('axes', {})
+        axes_color = axes.get('axesColor', 'white')
+
+        if bins is None:
+            records = metadata.rename_axis(plot.headers[0]).reset_index()
+            values = [{'id': i, 'x': x, 'y': y, 'color': c,
+                       'originalShape': o, 'shape': sh,
+                       'scale': {'x': sc, 'y': sc}, 'opacity': op}
+                      for i, x, y, c, o, sh, sc, op in
+                      zip(*[points[c].tolist() for c in points.columns])]
+            datasets = [
+                {'name': 'metadata',
+                 'values': records.astype(str).to_dict('records')},
+                {'name': 'points', 'values': values,
+                 'transform': [{'type': 'lookup', 'from': 'metadata',
+                                'key': plot.headers[0], 'fields': ['id'],
+                                'as': ['metadata']}]}
+            ]
+            size = {'signal': 'datum.scale.x * datum.scale.y * 100'}
+            tooltip = {'signal': 'datum.metadata'}
+            scales = []
+        else:
+            # cells are half-open except for the last one
+            origin = np.array(low[:2])
+            span = np.array(high[:2]) - origin
+            span[span == 0] = 1
+            cells = np.floor((points[['x', 'y']].values - origin) / span *
+                             bins).clip(0, bins - 1).astype(int)
+
+            grouped = points.groupby([cells[:, 0], cells[:, 1], 'color'],
+                                     sort=True)
+            values = grouped.agg(x=('x', 'mean'), y=('y', 'mean'),
+                                 count=('id', 'size'),
+                                 opacity=('opacity', 'mean'))
+            values = values.reset_index(level='color').to_dict('records')
+
+            datasets = [{'name': 'points', 'values': values}]
+            size = {'scale': 'size', 'field': 'count'}
+            tooltip = {'field': 'count'}
+            scales = [{'name': 'size', 'type': 'sqrt', 'zero': True,
+                       'domain': {'data': 'points', 'field': 'count'},
+                       'range': [10, 400]}]
+
+        base_width = 800
+
+        return {
+            '$schema': 'https://vega.github.io/schema/vega/v5.json',
+            'padding': 5,
+            'background': axes.get('backgroundColor', 'black'),
+            'config': {
+                'axis': {'labelColor': axes_color, 'titleColor': axes_color},
+                'title': {'color': axes_color}
+            },
+            'title': 'Emperor PCoA',
+            'data': datasets,
+            'signals': [
+                {'name': 'width',
+                 'update': '%r * ((%r) - (%r))' % (base_width, high[0],
+                                                   low[0])},
+                {'name': 'height',
+                 'update': '%r * ((%r) - (%r))' % (base_width, high[1],
+                                                   low[1])}
+            ],
+            'scales': [
+                {'name': 'xScale', 'range': 'width',
+                 'domain': [low[0], high[0]]},
+                {'name': 'yScale', 'range': 'height',
+                 'domain': [low[1], high[1]]}
+            ] + scales,
+            'axes': [
+                {'orient': 'bottom', 'scale': 'xScale',
+                 'title': labels[dims[0]]},
+                {'orient': 'left', 'scale': 'yScale',
+                 'title': labels[dims[1]]}
+            ],
+            'marks': [
+                {
+                    'type': 'symbol',
+                    'from': {'data': 'points'},
+                    'encode': {
+                        'enter': {
+                            'fill': {'field': 'color'},
+                            'x': {'scale': 'xScale', 'field': 'x'},
+                            'y': {'scale': 'yScale', 'field': 'y'},
+                            'shape': ({'field': 'shape'} if bins is None
+                                      else {'value': 'circle'}),
+                            'size': size,
+                            'opacity': {'field': 'opacity'}
+                        },
+                        'update': {
+                            'tooltip': tooltip
+                        }
+                    }
+                }
+            ]
+        }
+
+    @staticmethod
+    def _axes_labels(names, percents):
+        """Build the labels of the axes, as done by DecompositionModel
+
+        Parameters
+        ----------
+        names : list
+            Names of the dimensions in the ordination.
+        percents : list of float
+            Percentage explained by each dimension, ``-1`` for custom axes.
+
+        Returns
+        -------
+        list of str
+            The label of each axis.
+        """
+        # scikit-bio names the axes with their index, replace them with a
+        # more informative name
+        numeric = [n for n in names if is_numeric(n)]
+        others = [n for n in names if not is_numeric(n)]
+        if numeric == list(range(len(numeric))) and names == others + numeric:
+            names = others + ['Axis %d' % (i + 1) for i in range(len(numeric))]
+
+        labels = []
+        for name, percent in zip(names, percents):
+            name = str(name)
+            if len(name) > 25:
+                name = name[:20] + '...'
+
+            # custom axes don't have a meaningful percentage explained
+            if percent >= 0:
+                name += ' (%s %%)' % format(percent, '#.4g')
+
+            labels.append(name)
+        return labels
+
+    def _to_dict(self, plot):
         """Convert processed data into a dictionary of decompositions
 
         Parameters
         ----------
-        data : tuple
-            The output of _process_data. Should contain information about the
+        plot : PlotData
+            The output of _build_plot. Should contain information about the
             scatter plot and the biplot.
 
         Returns
@@ -493,22 +1359,19 @@ class Emperor(object):
             A dictionary describing the plots contained in the ordination
             object and the sample + feature metadata.
         """
-        # data is a tuple as returned by _process_data
-        (coord_ids, coords, pct_var, ci,
-         headers, metadata, names,
-         edges,
-         bi_coords, bi_ids,
-         bi_headers, bi_metadata) = data
+        ci = None if plot.ci is None else plot.ci.tolist()
+
+        headers, metadata, _ = self._encode_sample_metadata(plot)
 
         data = {
             'plot': {
                 'decomposition': {
-                    'sample_ids': coord_ids,
-                    'coordinates': coords,
-                    'axes_names': names,
-                    'percents_explained': pct_var,
+                    'sample_ids': plot.sample_ids.tolist(),
+                    'coordinates': self._encode_coordinates(plot.coords),
+                    'axes_names': plot.names,
+                    'percents_explained': plot.pct_var,
                     'ci': ci,
-                    'edges': edges
+                    'edges': plot.edges.tolist()
                 },
                 'type': 'scatter',
                 'metadata_headers': headers,
@@ -517,20 +1380,215 @@ class Emperor(object):
             }
         }
 
-        # we can rely on the fact that the dictionary above will exist
-        if self.ordination.features is not None:
-            data['biplot'] = deepcopy(data['plot'])
-            data['biplot']['decomposition']['ci'] = []
-            data['biplot']['decomposition']['edges'] = []
-            data['biplot']['type'] = 'arrow'
-            data['biplot']['settings'] = None
+        # sorting and interpolating the trajectories is much faster here than
+        # in the browser
+        if 'animations' in self.settings:
+            data['plot']['animation'] = self._precompute_animations(plot)
+
+        # resolving the attributes here avoids mapping every sample in the
+        # browser, see color_by, scale_by and opacity_by
+        attributes = self._precompute_attributes(plot)
+        if attributes:
+            data['plot']['attributes'] = attributes
+
+        # we can rely on the fact that the dictionary above will exist, the
+        # animations and attributes are only read from the scatter plot so
+        # they're left out
+        if plot.bi_coords is not None:
+            data['biplot'] = deepcopy({key: value for key, value in
+                                       data['plot'].items()
+                                       if key not in {'animation',
+                                                      'attributes'}})
+            data['biplot']['decomposition']['ci'] = []
+            data['biplot']['decomposition']['edges'] = []
+            data['biplot']['type'] = 'arrow'
+            data['biplot']['settings'] = None
+
+            data['biplot']['metadata'] = self._encode_map(plot.bi_metadata)
+            data['biplot']['metadata_headers'] = plot.bi_headers
+            data['biplot']['decomposition']['sample_ids'] = \
+                plot.bi_ids.tolist()
+            data['biplot']['decomposition']['coordinates'] = \
+                self._encode_coordinates(plot.bi_coords)
+
+        return data
+
+    def _encode_coordinates(self, coords):
+        """Encode coordinates with the plot's precision
+
+        Parameters
+        ----------
+        coords : np.ndarray
+            A (n, d) matrix of coordinates.
+
+        Returns
+        -------
+        list or dict
+            The coordinates as a list of lists if ``precision`` is ``None``,
+            otherwise as described in ``emperor.util.quantize_coordinates``.
+
+        Raises
+        ------
+        ValueError
+            If the error introduced by ``precision`` is larger than
+            ``precision_tolerance``.
+        """
+        if self.precision is None:
+            return coords.tolist()
+
+        encoded, error = quantize_coordinates(coords, self.precision)
+
+        extent = np.max(np.ptp(coords, axis=0)) if coords.size else 0.0
+        if error > self.precision_tolerance * extent:
+            raise ValueError("Encoding the coordinates as %s introduces an "
+                             "error of %g, which is larger than the "
+                             "tolerance (%g of the plot's extent, %g)." %
+                             (self.precision, error, self.precision_tolerance,
+                              extent))
+
+        return encoded
+
+    def _encode_sample_metadata(self, plot):
+        """Encode the sample metadata to be sent to the browser
+
+        Parameters
+        ----------
+        plot : PlotData
+            The plot as returned by ``_build_plot``.
+
+        Returns
+        -------
+        list of str
+            Name of the metadata columns and the index name.
+        dict
+            The encoded metadata, see ``_encode_map``.
+        dict
+            The compressed blocks of the deferred columns keyed by file name,
+            empty unless ``lazy_metadata`` is set.
+        """
+        # send the metadata with its data types, so numeric columns don't
+        # need to be parsed in the browser, procrustes plots send it once
+        # and it's repeated for each ordination
+        headers, metadata = plot.headers, self._encode_map(plot.metadata)
+        if plot.replicates > 1:
+            metadata['replicates'] = plot.replicates
+
+            if self.procrustes_names:
+                headers = headers + ['__Procrustes_Names__']
+                metadata['columns'].append({
+                    'dtype': 'replicate',
+                    'categories': self.procrustes_names[:plot.replicates]})
+
+        blocks = {}
+        if self.lazy_metadata:
+            blocks = self._defer_columns(headers, metadata)
+
+        return headers, metadata, blocks
+
+    def _settings_categories(self):
+        """Metadata categories referenced by the settings
+
+        Returns
+        -------
+        set of str
+            The categories used to color, scale, shape, etc. the samples and
+            to animate the trajectories.
+        """
+        categories = set()
+        for value in self.settings.values():
+            for key in ('category', 'gradientCategory', 'trajectoryCategory'):
+                if value.get(key) is not None:
+                    categories.add(value[key])
+        return categories
+
+    def _defer_columns(self, headers, metadata):
+        """Replace the columns that aren't used with compressed blocks
+
+        Parameters
+        ----------
+        headers : list of str
+            Name of the metadata columns and the index name.
+        metadata : dict
+            The encoded metadata, see ``_encode_map``. The columns are
+            replaced in place.
+
+        Returns
+        -------
+        dict
+            The compressed blocks keyed by file name.
+
+        Notes
+        -----
+        The sample identifiers, the custom axes and the categories referenced
+        by the settings are not deferred. Each deferred column is encoded as
+        JSON, compressed with zlib and encoded with base64. The deferred column
+        has a ``'deferred'`` dtype and the block is either embedded as
+        ``block`` or referenced by ``url`` if ``metadata_url`` is set. Blocks
+        are named after their contents so they can be cached indefinitely.
+        """
+        keep = self._settings_categories() | set(self.custom_axes)
+
+        blocks = {}
+        for i, column in enumerate(metadata['columns']):
+            if i == 0 or headers[i] in keep or column['dtype'] == 'replicate':
+                continue
+
+            block = zlib.compress(json.dumps(column).encode('utf-8'))
+            block = b64encode(block).decode('ascii')
+            name = '%s.txt' % sha1(block.encode('ascii')).hexdigest()
+            blocks[name] = block
+
+            if self.metadata_url is None:
+                metadata['columns'][i] = {'dtype': 'deferred', 'block': block}
+            else:
+                metadata['columns'][i] = {
+                    'dtype': 'deferred',
+                    'url': '%s/%s' % (self.metadata_url.rstrip('/'), name)}
+
+        return blocks
+
+    def write_metadata_blocks(self, target):
+        """Write the deferred metadata columns to a directory
+
+        Parameters
+        ----------
+        target : str
+            The directory where the blocks are written to, it's created if it
+            doesn't exist. This directory should be served at
+            ``metadata_url``.
+
+        Returns
+        -------
+        list of str
+            The paths to the files that were written.
+
+        Raises
+        ------
+        ValueError
+            If ``lazy_metadata`` is not set.
+
+        See Also
+        --------
+        emperor.core.Emperor.make_emperor
+        """
+        if not self.lazy_metadata:
+            raise ValueError('Metadata columns are only deferred when '
+                             '`lazy_metadata` is set')
+
+        _, _, blocks = self._encode_sample_metadata(
+            self._build_plot(self.custom_axes, self.jackknifing_method))
 
-            data['biplot']['metadata'] = bi_metadata
-            data['biplot']['metadata_headers'] = bi_headers
-            data['biplot']['decomposition']['sample_ids'] = bi_ids
-            data['biplot']['decomposition']['coordinates'] = bi_coords
+        if not exists(target):
+            makedirs(target)
 
-        return data
+        paths = []
+        for name, block in sorted(blocks.items()):
+            path = join(target, name)
+            with open(path, 'w') as f:
+                f.write(block)
+            paths.append(path)
+
+        return paths
 
     def render_base_dependencies(self):
         """Render Emperor's Base dependencies
@@ -584,14 +1642,15 @@ class Emperor(object):
         str
             A string with Emperor's main JavaScript code.
         """
-        data = self._to_dict(self._process_data(self.custom_axes,
-                                                self.jackknifing_method))
+        data = self._to_dict(self._build_plot(self.custom_axes,
+                                              self.jackknifing_method))
 
         template = self._environment.get_template(LOGIC_PATH)
 
         plot = template.render(
             data=data, plot_id=plot_id,
             base_url=self.base_url, js_on_ready=self.js_on_ready,
+            shared_renderer=self.shared_renderer,
             width=self.width, height=self.height)
 
         return plot
@@ -662,6 +1721,63 @@ class Emperor(object):
         list of list of str
             Metadata for the biplots.
 
+        Notes
+        -----
+        This is the legacy representation of ``_build_plot``, the plot itself
+        is built from the arrays and DataFrames that ``_build_plot`` returns.
+        """
+        plot = self._build_plot(custom_axes, jackknifing_method)
+
+        ci, bi_coords, bi_ids, bi_metadata = None, None, None, None
+        if plot.ci is not None:
+            ci = plot.ci.tolist()
+        if plot.bi_coords is not None:
+            bi_coords = plot.bi_coords.tolist()
+            bi_ids = plot.bi_ids.tolist()
+            bi_metadata = plot.bi_metadata.astype(str).values.tolist()
+
+        headers, metadata = plot.headers, plot.metadata
+        if plot.replicates > 1:
+            headers, metadata = self._replicate_map(headers, metadata,
+                                                    plot.replicates)
+
+        return (plot.sample_ids.tolist(), plot.coords.tolist(),
+                plot.pct_var, ci, headers,
+                metadata.astype(str).values.tolist(), plot.names,
+                plot.sample_ids.values[plot.edges].tolist(),
+                bi_coords, bi_ids,
+                plot.bi_headers, bi_metadata)
+
+    def _build_plot(self, custom_axes, jackknifing_method):
+        """Compute the coordinates and metadata shown in the plot
+
+        Parameters
+        ----------
+        custom_axes : list of str, optional
+            Custom axes to embed in the ordination.
+        jackknifing_method : {'IQR', 'ideal_fourths', 'sdev'}, optional
+            Method used to summarize the jackknifed ordinations, see
+            ``_summarize_jackknifed``. This argument is ignored if
+            ``self.jackknifed`` is empty.
+
+        Returns
+        -------
+        PlotData
+            The sample identifiers (``pd.Index``), coordinates, percents
+            explained (``-1`` for custom axes), confidence intervals (``None``
+            if there are no jackknifed ordinations), metadata headers and
+            metadata (``pd.DataFrame`` with the index as the first column,
+            once for all the ``replicates``, see ``_replicate_map``), names
+            of the axes and procrustes edges (``(n, 2)`` array with the
+            positions of the samples), and the same attributes for the biplot
+            (``None`` if there are no features in the ordination).
+
+        Raises
+        ------
+        ValueError
+            If more than one custom axis is used in a jackknifed or procrustes
+            plot.
+
         Notes
         -----
         This method is exercised by testing the ``make_emperor`` method, and is
@@ -671,78 +1787,442 @@ class Emperor(object):
             raise ValueError("Jackknifed and Procrustes plots are limited to "
                              "one custom axis.")
 
-        # turn modern data into legacy data
         dims = self.dimensions
 
+        def normalized(values):
+            values = values[:, :dims]
+            return values / np.max(np.abs(values))
+
+        # the metadata is the same for all the procrustes ordinations
+        headers, metadata = self._prepare_map(self.mf, custom_axes)
+        replicates = len(self.procrustes) + 1
+
+        ids = self.ordination.samples.index
+        coords = normalized(self.ordination.samples.values)
+        edges = np.empty((0, 2), dtype=np.int64)
+
         ci = None
+        pct = self.ordination.proportion_explained.values[:dims] * 100
+
+        if self.procrustes:
+            n = len(ids)
+            coords = self._replicate_set(
+                self.procrustes, self.superimpose).coords.reshape(
+                    -1, coords.shape[1])
+
+            suffixes = np.array(['_%d' % i for i in range(replicates)],
+                                dtype=object)
+            ids = pd.Index(np.tile(ids.values.astype(object), replicates) +
+                           np.repeat(suffixes, n))
+
+            # connect each sample to its counterpart in the other ordinations
+            edges = np.column_stack([np.tile(np.arange(n), replicates - 1),
+                                     np.arange(n, n * replicates)])
+        elif self.jackknifed:
+            coords, low, high = self._summarize_jackknifed(
+                self._replicate_set(self.jackknifed).coords,
+                jackknifing_method)
+            ci = np.abs(high - low)
+
+        if pct[0] < 1.0:
+            pct = pct * 100
+
+        names = self.ordination.samples.columns[:dims].values.tolist()
+        pct = pct.tolist()
+
+        if custom_axes:
+            custom = (metadata.set_index(headers[0])[custom_axes]
+                      .reindex(self.ordination.samples.index)
+                      .values.astype(np.float64))
+            coords = np.hstack([np.tile(custom, (replicates, 1)), coords])
+
+            # samples without a value are not shown
+            keep = ~np.isnan(coords).any(axis=1)
+            ids, coords = ids[keep], coords[keep]
+
+            positions = np.cumsum(keep) - 1
+            edges = positions[edges[keep[edges].all(axis=1)]]
+
+            # scale the custom axes to match the first dimension
+            k = len(custom_axes)
+            custom = coords[:, :k]
+            to_mn, to_mx = coords[:, k].min(), 2 * coords[:, k].max()
+            from_mn, from_mx = custom.min(axis=0), custom.max(axis=0)
+            coords[:, :k] = ((custom - from_mn) / (from_mx - from_mn) *
+                             (to_mx - to_mn) + to_mn)
+
+            # the custom axes don't vary between jackknifed ordinations, but
+            # the ellipsoids can't be flat
+            if ci is not None:
+                ci = np.hstack([np.full((len(ci), k), 0.00001), ci])[keep]
+
+            names = custom_axes + names
+            pct = ([-1] * k) + pct
+
         bi_coords, bi_ids, bi_headers, bi_metadata = None, None, None, None
+        if self.ordination.features is not None:
+            bi_coords = normalized(self.ordination.features.values)
+            bi_ids = self.ordination.features.index
 
-        c_headers, c_data, c_eigenvals, c_pct, edges = [], [], [], [], []
-        ordinations = []
+            bi_headers, bi_metadata = self._prepare_map(self.feature_mf)
 
-        if self.jackknifed or self.procrustes:
-            ordinations = [self.ordination] + self.procrustes + self.jackknifed
+        return PlotData(ids, coords, pct, ci, headers, metadata, replicates,
+                        names, edges, bi_coords, bi_ids, bi_headers,
+                        bi_metadata)
 
-            for data in ordinations:
-                c_headers.append(data.samples.index.tolist())
+    def _replicate_set(self, ordinations, superimpose=False):
+        """Stack the master ordination and its replicates
+
+        Parameters
+        ----------
+        ordinations : list of OrdinationResults
+            The jackknifed or procrustes ordinations.
+        superimpose : bool, optional
+            Whether or not the ordinations should be superimposed onto the
+            master ordination, see ``procrustes_superimposition``.
 
-                coords = data.samples.values[:, :dims]
-                c_data.append(coords / np.max(np.abs(coords)))
+        Returns
+        -------
+        ReplicateSet
+            ``coords`` is a ``(k + 1, n, d)`` array with the coordinates of
+            the master ordination followed by each of the ``k`` ordinations,
+            with the samples in the order of the master ordination and each
+            ordination divided by its largest absolute value.
+            ``disparities`` has the M^2 of each of the ``k`` ordinations if
+            they were superimposed, otherwise it's ``None``.
 
-                c_eigenvals.append(data.eigvals.values[:dims])
+        Notes
+        -----
+        The coordinates are written into a single array of
+        ``replicates_dtype``, backed by a file if ``replicates_path`` is set.
+        Only the dimensions in the plot are copied, and the ordinations are
+        not modified, see ``_validate_ordinations``. The ordinations are
+        superimposed in place, and their disparities are kept for
+        ``procrustes_disparities``.
+        """
+        dims = self.dimensions
+        shape = ((len(ordinations) + 1, ) +
+                 self.ordination.samples.values[:, :dims].shape)
 
-                c_pct.append(data.proportion_explained[:dims] * 100)
+        if self.replicates_path is None:
+            coords = np.empty(shape, dtype=self.replicates_dtype)
         else:
-            data = self.ordination
-            c_headers = data.samples.index.tolist()
+            coords = np.memmap(self.replicates_path, mode='w+', shape=shape,
+                               dtype=self.replicates_dtype)
+
+        ordinations = [self.ordination] + ordinations
+        alignment = [None] + self._alignment
+
+        # fill one ordination at a time so there's never more than one extra
+        # copy of an ordination in memory
+        for i, (ordination, positions) in enumerate(zip(ordinations,
+                                                        alignment)):
+            values = ordination.samples.values[:, :dims]
+            if positions is None:
+                coords[i] = values
+            else:
+                coords[i] = values[positions]
 
-            coords = self.ordination.samples.values[:, :dims]
-            c_data = (coords / np.max(np.abs(coords)))
+        disparities = None
+        if superimpose:
+            coords[0], _, disparities = procrustes_superimposition(
+                coords[0], coords[1:], out=coords[1:])
+            self._disparities = (self._replicates_key(ordinations[1:]),
+                                 disparities)
 
-            c_eigenvals = data.eigvals.values[:dims]
+        for i in range(len(coords)):
+            coords[i] /= np.max(np.abs(coords[i]))
 
-            c_pct = data.proportion_explained[:dims] * 100
+        return ReplicateSet(coords, disparities)
 
-        # repeats is only dependant on procrustes
-        headers, metadata = self._to_legacy_map(self.mf, custom_axes,
-                                                len(self.procrustes))
+    def _replicates_key(self, ordinations):
+        """Fingerprint of what determines a set of superimposed replicates
 
-        # make an edge list for the procrustes plot
-        if self.procrustes:
-            for i in range(len(self.procrustes)):
-                for sample in self.mf.index:
-                    edges.append([sample + '_0', sample + '_%d' % (i + 1)])
+        Parameters
+        ----------
+        ordinations : list of OrdinationResults
+            The procrustes ordinations.
 
-        c_headers, c_data, _, c_pct, low, high, _ = \
-            preprocess_coords_file(c_headers, c_data, c_eigenvals, c_pct,
-                                   headers, metadata, custom_axes,
-                                   jackknifing_method,
-                                   is_comparison=bool(self.procrustes))
+        Returns
+        -------
+        str
+            The fingerprint of the ordinations, the master ordination, the
+            dimensions and ``replicates_dtype``.
+        """
+        return fingerprint(self.ordination, *ordinations, self.dimensions,
+                           np.dtype(self.replicates_dtype).str)
 
-        names = self.ordination.samples.columns[:dims].values.tolist()
-        c_pct = c_pct.tolist()
+    @staticmethod
+    def _summarize_jackknifed(coords, method):
+        """Summarize the coordinates of jackknifed ordinations
 
-        if custom_axes:
-            names = custom_axes + names
+        Parameters
+        ----------
+        coords : np.ndarray
+            ``(k, n, d)`` array with the coordinates of each ordination, the
+            first one is the master ordination. The array is modified in
+            place.
+        method : {'IQR', 'ideal_fourths', 'sdev'}
+            Method used to compute the ranges, the interquartile range, the
+            ideal fourths or the standard deviation.
+
+        Returns
+        -------
+        np.ndarray
+            Average coordinates.
+        np.ndarray
+            Lower end of the range of each coordinate.
+        np.ndarray
+            Higher end of the range of each coordinate.
+
+        Raises
+        ------
+        ValueError
+            If ``method`` is not one of the supported methods.
 
-            c_pct = ([-1] * len(custom_axes)) + c_pct
+        Notes
+        -----
+        The results are the same as the ones in ``summarize_pcoas`` without
+        procrustes, i.e. each axis of every ordination is flipped to match
+        the sign of the master ordination before summarizing. Ordinations are
+        flipped and sorted in place, so no copies of ``coords`` are made.
+        """
+        if method not in {'IQR', 'ideal_fourths', 'sdev'}:
+            raise ValueError('Unsupported jackknifing method "%s"' % method)
 
-        if low is not None or high is not None:
-            ci = np.abs(high - low).tolist()
+        k = len(coords)
+        master = coords[0]
 
-        if self.ordination.features is not None:
-            bi_coords = self.ordination.features.values[:, :dims]
-            bi_coords = bi_coords / np.max(np.abs(bi_coords))
-            bi_coords = bi_coords.tolist()
-            bi_ids = self.ordination.features.index.values.tolist()
+        for i in range(1, k):
+            same = np.abs(master - coords[i]).sum(axis=0)
+            flipped = np.abs(master + coords[i]).sum(axis=0)
+            coords[i] *= np.where(same > flipped, -1, 1)
 
-            bi_headers, bi_metadata = self._to_legacy_map(self.feature_mf)
+        average = coords.mean(axis=0)
 
-        return (c_headers, c_data.tolist(),
-                c_pct, ci, headers, metadata, names,
-                edges,
-                bi_coords, bi_ids,
-                bi_headers, bi_metadata)
+        if method == 'sdev':
+            sdevs = np.zeros_like(average)
+            for i in range(k):
+                deviation = coords[i] - average
+                sdevs += deviation * deviation
+            sdevs = np.sqrt(sdevs / (k - 1))
+
+            low, high = -sdevs / 2, sdevs / 2
+        else:
+            coords.sort(axis=0)
+
+        if method == 'IQR':
+            # medians of the lower and higher halves
+            low = np.median(coords[:k // 2], axis=0)
+            high = np.median(coords[(k + 1) // 2:], axis=0)
+        elif method == 'ideal_fourths':
+            if k < 3:
+                low = high = np.full(average.shape, np.nan)
+            else:
+                j, h = divmod(k / 4. + 5 / 12., 1)
+                j = int(j)
+                low = (1 - h) * coords[j - 1] + h * coords[j]
+                high = (1 - h) * coords[k - j] + h * coords[k - j - 1]
+
+        return average, low, high
+
+    def _view_positions(self, coords):
+        """Position of each sample as shown in the view
+
+        Parameters
+        ----------
+        coords : np.ndarray
+            Matrix of coordinates in the ordination data.
+
+        Returns
+        -------
+        np.ndarray
+            ``(n, 3)`` array with the positions of the samples, 2D plots are
+            drawn at z = 0.
+        list of int
+            The visible dimensions.
+        list of int
+            The orientation of each visible dimension (``-1`` if flipped).
+        """
+        axes = self.settings.get('axes', {})
+        visible = list(axes.get('visibleDimensions',
+                                range(min(3, coords.shape[1]))))
+        flipped = axes.get('flippedAxes', [False] * len(visible))
+        orientation = [-1 if f else 1 for f in flipped[:len(visible)]]
+
+        positions = np.zeros((coords.shape[0], 3))
+        positions[:, :len(visible)] = coords[:, visible] * orientation
+
+        return positions, visible, orientation
+
+    def _precompute_attributes(self, plot):
+        """Resolve the color, scale and opacity of each sample
+
+        Parameters
+        ----------
+        plot : PlotData
+            The plot as returned by ``_build_plot``.
+
+        Returns
+        -------
+        dict
+            Keyed by ``'color'``, ``'scale'`` and ``'opacity'``, but only for
+            the settings that were set with ``precompute=True``. Each value
+            has the metadata ``category`` and the ``values`` for each sample
+            in the plot. Colors are flattened RGB triplets with integers
+            between 0 and 255.
+
+        Notes
+        -----
+        The values are the same ones used by ``to_image`` and ``to_vega``.
+        """
+        keys = [key for key in ('color', 'scale', 'opacity')
+                if self.settings.get(key, {}).get('precomputed', False)]
+
+        if not keys:
+            return {}
+
+        md = self._sample_metadata(plot)
+
+        attributes = {}
+        for key in keys:
+            if key == 'color':
+                values = np.round(self._marker_colors(md) * 255).astype(int)
+            else:
+                values = self._marker_scalars(md, key)
+
+            attributes[key] = {'category': self.settings[key]['category'],
+                               'values': values.ravel().tolist()}
+        return attributes
+
+    def _precompute_animations(self, plot):
+        """Sort and interpolate the animated trajectories
+
+        Parameters
+        ----------
+        plot : PlotData
+            The plot as returned by ``_build_plot``.
+
+        Returns
+        -------
+        dict or None
+            Flat arrays describing the trajectories for the settings in
+            ``animations_by`` and the visible axes. Samples, gradient values
+            and coordinates are indexed with ``sampleOffsets``, interpolated
+            frames with ``frameOffsets``, and intervals (one per frame except
+            the last one) with ``frameOffsets[i] - i``. ``None`` if the
+            gradient is not numeric or if no trajectory can be animated.
+
+        Notes
+        -----
+        The results match the trajectories that the browser would compute in
+        ``AnimationDirector.initializeTrajectories``, so the director only
+        has to index into these arrays.
+        """
+        settings = self.settings['animations']
+        gradient = settings['gradientCategory']
+        trajectory = settings['trajectoryCategory']
+
+        positions, visible, orientation = self._view_positions(plot.coords)
+
+        # the values are formatted the way they are shown in the browser
+        md = self._sample_metadata(plot)
+        raw = md[gradient].astype(str)
+        trajectories = md[trajectory].astype(str)
+
+        values = pd.to_numeric(raw, errors='coerce')
+        if values.isnull().any():
+            return None
+
+        frame = pd.DataFrame({'name': plot.sample_ids.values,
+                              'group': pd.factorize(trajectories)[0],
+                              'trajectory': trajectories.values,
+                              'raw': raw.values,
+                              'value': values.values,
+                              'position': np.arange(len(md))})
+
+        # groups keep the order in which they first appear, and samples with
+        # the same gradient value keep their original order
+        frame = frame.sort_values(['group', 'value'], kind='mergesort')
+
+        # trajectories with less than two distinct values are not animated
+        distinct = frame.groupby('group')['raw'].transform('nunique')
+        frame = frame[distinct > 1]
+        if frame.empty:
+            return None
+
+        # left-pad the trajectories so they all start at the same time
+        firsts = frame.groupby('group', sort=False).head(1)
+        earliest = firsts.iloc[np.argmin(np.trunc(firsts['value'].values))]
+
+        pad = firsts[firsts['raw'] != earliest['raw']].copy()
+        pad['raw'] = earliest['raw']
+        pad['value'] = earliest['value']
+        pad['order'] = 0
+        frame = frame.assign(order=1)
+        frame = pd.concat([pad, frame]).sort_values(['group', 'order'],
+                                                    kind='mergesort')
+
+        points = positions[frame['position'].values]
+
+        # don't overlap the padded samples with the original ones
+        points[(frame['order'] == 0).values, 2] += 0.0001
+
+        group = frame['group'].values
+        value = frame['value'].values
+
+        # consecutive samples in the same trajectory, the first sample of each
+        # trajectory and the trajectory each sample belongs to
+        same = group[1:] == group[:-1]
+        starts = np.flatnonzero(np.r_[True, ~same])
+        sample_offsets = np.r_[starts, len(frame)]
+        owner = np.cumsum(np.r_[False, ~same])
+
+        deltas = np.abs(np.diff(value))[same]
+        minimum_delta = deltas[deltas != 0].min()
+
+        n = int(np.floor((1 / settings['speed']) * 10))
+        delta = np.abs(np.abs(value[:-1]) - np.abs(value[1:]))
+        steps = np.where(same, np.floor((delta * n) / minimum_delta), 0)
+        steps = steps.astype(np.int64)
+
+        # interpolate all the intervals at once, each interval contributes
+        # ``steps`` frames and excludes its end point
+        pairs = np.repeat(np.arange(len(steps)), steps)
+        offset = np.arange(len(pairs)) - (np.cumsum(steps) - steps)[pairs]
+        increments = ((points[1:] - points[:-1]) /
+                      np.maximum(steps, 1)[:, np.newaxis])
+        interpolated = points[pairs] + increments[pairs] * offset[:, None]
+
+        # the interval index is relative to the start of its trajectory
+        intervals = pairs - starts[owner[pairs]]
+
+        # close each trajectory with the end of its last interval
+        last = sample_offsets[1:] - 2
+        closing = np.where((steps[last] > 0)[:, np.newaxis],
+                           points[last] + (increments[last] *
+                                           steps[last][:, np.newaxis]),
+                           points[last + 1])
+        counts = np.bincount(owner[pairs], minlength=len(starts))
+        frames = np.insert(interpolated, np.cumsum(counts), closing, axis=0)
+
+        return {
+            'gradientCategory': gradient,
+            'trajectoryCategory': trajectory,
+            'speed': settings['speed'],
+            'dimensions': visible,
+            'axesOrientation': orientation,
+            'trajectories': frame['trajectory'].values[starts].tolist(),
+            'minimumDelta': float(minimum_delta),
+            'gradientPoints': np.unique(value).tolist(),
+            'sampleOffsets': sample_offsets.tolist(),
+            'sampleNames': frame['name'].tolist(),
+            'gradient': value.tolist(),
+            'coordinates': points.ravel().tolist(),
+            'frameOffsets': np.r_[0, np.cumsum(counts + 1)].tolist(),
+            'frames': frames.ravel().tolist(),
+            'intervals': intervals.tolist()
+        }
 
     def _to_legacy_map(self, mf, custom_axes=None, repeats=0):
         """Helper method to convert Pandas dataframe to legacy QIIME structure
@@ -768,6 +2248,80 @@ class Emperor(object):
         list of list of str
             Data in ``mf``.
         """
+        headers, mf = self._prepare_map(mf, custom_axes, repeats)
+
+        # create a list of lists representation for the entire dataframe
+        metadata = mf.astype(str).values.tolist()
+        return headers, metadata
+
+    def _to_columnar_map(self, mf, custom_axes=None, repeats=0):
+        """Helper method to convert Pandas dataframe to typed columns
+
+        Parameters
+        ----------
+        mf : pd.DataFrame
+            DataFrame with the metadata, this can be feature or sample
+            metadata. If the index name is ``None``, then it will be set as
+            ``'SampleID'``, otherwise it will be left untouched.
+        custom_axes : list of str, optional
+            Custom axes to embed in the ordination.
+        repeats : int
+            Number of times that the sample ids should be repeated. This is
+            used exclusively for procrustes plots.
+
+        Returns
+        -------
+        list of str
+            Name of the metadata columns and the index name.
+        dict
+            Number of rows (``length``) and one encoded column per header
+            (``columns``), see ``_encode_column``.
+        """
+        headers, mf = self._prepare_map(mf, custom_axes, repeats)
+        return headers, self._encode_map(mf)
+
+    @classmethod
+    def _encode_map(cls, mf):
+        """Encode each column of a prepared metadata DataFrame
+
+        Parameters
+        ----------
+        mf : pd.DataFrame
+            The metadata as returned by ``_prepare_map``.
+
+        Returns
+        -------
+        dict
+            Number of rows (``length``) and one encoded column per header
+            (``columns``), see ``_encode_column``.
+        """
+        columns = [cls._encode_column(mf.iloc[:, i])
+                   for i in range(mf.shape[1])]
+        return {'length': len(mf), 'columns': columns}
+
+    def _prepare_map(self, mf, custom_axes=None, repeats=0):
+        """Prepare a metadata DataFrame to be sent to the browser
+
+        Parameters
+        ----------
+        mf : pd.DataFrame
+            DataFrame with the metadata.
+        custom_axes : list of str, optional
+            Custom axes to embed in the ordination.
+        repeats : int
+            Number of times that the sample ids should be repeated.
+
+        Returns
+        -------
+        list of str
+            Name of the metadata columns and the index name.
+        pd.DataFrame
+            The metadata with the index as the first column.
+
+        See Also
+        --------
+        emperor.core.Emperor._to_legacy_map
+        """
         # there's a bug in old versions of Pandas that won't allow us to rename
         # a DataFrame's index, newer versions i.e 0.18 work just fine but 0.14
         # would overwrite the name and simply set it as None
@@ -779,24 +2333,117 @@ class Emperor(object):
         if custom_axes:
             mf = validate_and_process_custom_axes(mf, custom_axes)
 
+        headers = [index_name] + mf.columns.astype(str).tolist()
+
+        # a shallow copy with the index as the first column, none of the
+        # metadata columns are copied
+        mf = mf.copy(deep=False)
+        mf.insert(0, index_name, mf.index)
+        mf.reset_index(drop=True, inplace=True)
+        mf.columns = headers
+
         if repeats:
-            mfs = []
             # repeats and the original
-            for i in range(repeats + 1):
-                mfs.append(mf.copy())
-                mfs[i].index = pd.Index(mfs[i].index + '_%d' % i,
-                                        name=mfs[i].index.name)
+            headers, mf = self._replicate_map(headers, mf, repeats + 1)
 
-                # add to be able to differentiate between ordinations
-                if self.procrustes_names:
-                    mfs[i]['__Procrustes_Names__'] = self.procrustes_names[i]
+        return headers, mf
 
-            mf = pd.concat(mfs)
+    def _replicate_map(self, headers, mf, replicates):
+        """Repeat the rows of a prepared metadata DataFrame
 
-        # create a list of lists representation for the entire dataframe
-        headers = [index_name] + mf.columns.astype(str).tolist()
-        metadata = mf.reset_index().astype(str).values.tolist()
-        return headers, metadata
+        Parameters
+        ----------
+        headers : list of str
+            Name of the metadata columns and the index name.
+        mf : pd.DataFrame
+            The metadata as returned by ``_prepare_map``.
+        replicates : int
+            Number of times the rows are repeated.
+
+        Returns
+        -------
+        list of str
+            Name of the metadata columns and the index name.
+        pd.DataFrame
+            The rows of ``mf`` once per replicate. The identifiers in each
+            replicate are suffixed with ``'_%d'`` and the replicate number.
+            If the procrustes_names property is available a column will be
+            added with each procrustes name.
+        """
+        n = len(mf)
+        suffixes = np.array(['_%d' % i for i in range(replicates)],
+                            dtype=object)
+
+        mf = mf.iloc[np.tile(np.arange(n), replicates)].reset_index(drop=True)
+        mf[headers[0]] = (mf[headers[0]].values.astype(object) +
+                          np.repeat(suffixes, n))
+
+        # add to be able to differentiate between ordinations
+        if self.procrustes_names:
+            mf['__Procrustes_Names__'] = np.repeat(
+                np.array(self.procrustes_names[:replicates], dtype=object), n)
+            headers = headers + ['__Procrustes_Names__']
+
+        return headers, mf
+
+    @staticmethod
+    def _encode_column(column):
+        """Encode a metadata column preserving its data type
+
+        Parameters
+        ----------
+        column : pd.Series
+            The metadata column to encode.
+
+        Returns
+        -------
+        dict
+            The encoded column. The ``dtype`` key is one of:
+
+            - ``'float64'``, ``values`` is a list of floats where missing
+              values are ``None``.
+            - ``'int32'``, ``values`` is a list of integers.
+            - ``'category'``, ``categories`` is a list of the unique values as
+              strings and ``codes`` is the position of each value in it.
+            - ``'string'``, ``values`` is a list of strings.
+
+        Notes
+        -----
+        The browser formats the numbers the same way as ``str``, so the values
+        of any column can be matched against the ones in ``_to_legacy_map``.
+        Integers that don't fit in 32 bits, nullable integers with missing
+        values, and floats that are infinite or that have a smaller precision
+        are encoded as strings.
+        """
+        values = column.values
+
+        # nullable integers are only sent as numbers when nothing is missing,
+        # otherwise they are formatted as strings like in _to_legacy_map
+        if not isinstance(values, np.ndarray) and \
+           values.dtype.kind in 'iu' and not column.isna().any():
+            values = values.to_numpy(dtype=values.dtype.numpy_dtype)
+
+        if isinstance(values, np.ndarray):
+            if values.dtype == np.float64 and not np.isinf(values).any():
+                missing = np.isnan(values)
+                values = values.astype(object)
+                values[missing] = None
+                return {'dtype': 'float64', 'values': values.tolist()}
+
+            if values.dtype.kind in 'iu' and (
+                    len(values) == 0 or
+                    (values.min() >= -2**31 and values.max() < 2**31)):
+                return {'dtype': 'int32', 'values': values.tolist()}
+
+        values = column.astype(str)
+        codes, categories = pd.factorize(values)
+
+        # dictionary encoding only pays off when the values are repeated
+        if len(categories) < len(values):
+            return {'dtype': 'category', 'categories': categories.tolist(),
+                    'codes': codes.tolist()}
+
+        return {'dtype': 'string', 'values': values.tolist()}
 
     def _base_data_checks(self, category, data, d_type):
         """Perform common checks in the methods that modify the plot
@@ -851,7 +2498,17 @@ class Emperor(object):
 
         return data
 
-    def color_by(self, category, colors=None, colormap=None, continuous=False):
+    def _set_precomputed(self, key, precompute):
+        """Flag whether the attribute ``key`` is resolved in Python
+
+        The flag is only added when requested, so the settings of plots that
+        don't use it are unchanged.
+        """
+        if precompute:
+            self._settings[key]['precomputed'] = True
+
+    def color_by(self, category, colors=None, colormap=None, continuous=False,
+                 precompute=False):
         """Set the coloring settings for the plot elements
 
         Parameters
@@ -867,6 +2524,10 @@ class Emperor(object):
             colorscheme.
         continuous: bool, optional
             Whether or not the ``category`` should be interpreted as numeric.
+        precompute: bool, optional
+            Whether the color of each sample should be resolved in Python
+            and included in the plot, instead of being computed by the
+            browser. Defaults to ``False``.
 
         Returns
         -------
@@ -879,6 +2540,7 @@ class Emperor(object):
             If ``category`` is not part of the metadata.
         TypeError
             If ``category`` is not a string.
+            If ``precompute`` is not a boolean value.
         ValueError
             If ``colors`` describes fewer or more categories than the ones
             present in the ``category`` column.
@@ -984,12 +2646,16 @@ class Emperor(object):
         elif not isinstance(colormap, str):
             raise TypeError('The colormap argument must be a string')
 
+        if not isinstance(precompute, bool):
+            raise TypeError('The precompute argument must be a bool')
+
         self._settings.update({"color": {
             "category": category,
             "colormap": colormap,
             "continuous": continuous,
             "data": colors
         }})
+        self._set_precomputed('color', precompute)
 
         return self
 
@@ -1049,7 +2715,8 @@ class Emperor(object):
 
         return self
 
-    def scale_by(self, category, scales=None, global_scale=1.0, scaled=False):
+    def scale_by(self, category, scales=None, global_scale=1.0, scaled=False,
+                 precompute=False):
         """Set the scaling settings for the plot elements
 
         Parameters
@@ -1064,6 +2731,10 @@ class Emperor(object):
         scaled: bool
             Whether or not the values in ``scales`` should be assumed to be
             numeric and scaled in size according to their value.
+        precompute: bool, optional
+            Whether the size of each sample should be resolved in Python and
+            included in the plot, instead of being computed by the browser.
+            Defaults to ``False``.
 
         Returns
         -------
@@ -1078,6 +2749,7 @@ class Emperor(object):
             If ``category`` is not a string.
             If ``global_scale`` is not a number.
             If ``scaled`` is not a boolean value.
+            If ``precompute`` is not a boolean value.
         ValueError
             If ``scales`` describes fewer or more categories than the ones
             present in the ``category`` column.
@@ -1100,17 +2772,21 @@ class Emperor(object):
         if not isinstance(scaled, bool):
             raise TypeError('The scaled argument must be a bool')
 
+        if not isinstance(precompute, bool):
+            raise TypeError('The precompute argument must be a bool')
+
         self._settings.update({"scale": {
             "category": category,
             "globalScale": str(global_scale),
             "scaleVal": scaled,
             "data": scales
         }})
+        self._set_precomputed('scale', precompute)
 
         return self
 
     def opacity_by(self, category, opacities=None, global_scale=1.0,
-                   scaled=False):
+                   scaled=False, precompute=False):
         """Set the scaling settings for the plot elements
 
         Parameters
@@ -1125,6 +2801,10 @@ class Emperor(object):
         scaled: bool
             Whether or not the values in ``opacities`` should be assumed to be
             numeric and scaled in size according to their value.
+        precompute: bool, optional
+            Whether the opacity of each sample should be resolved in Python
+            and included in the plot, instead of being computed by the
+            browser. Defaults to ``False``.
 
         Returns
         -------
@@ -1139,6 +2819,7 @@ class Emperor(object):
             If ``category`` is not a string.
             If ``global_scale`` is not a number.
             If ``scaled`` is not a boolean value.
+            If ``precompute`` is not a boolean value.
         ValueError
             If ``opacities`` describes fewer or more categories than the ones
             present in the ``category`` column.
@@ -1162,12 +2843,16 @@ class Emperor(object):
         if not isinstance(scaled, bool):
             raise TypeError('The scaled argument must be a bool')
 
+        if not isinstance(precompute, bool):
+            raise TypeError('The precompute argument must be a bool')
+
         self._settings.update({"opacity": {
             "category": category,
             "globalScale": str(global_scale),
             "scaleVal": scaled,
             "data": opacities
         }})
+        self._set_precomputed('opacity', precompute)
 
         return self
 
@@ -1249,6 +2934,14 @@ class Emperor(object):
         TypeError
             If ``speed`` or ``radius`` are not numbers.
 
+        Notes
+        -----
+        When the plot is rendered, the trajectories are sorted and
+        interpolated for the visible axes, so the browser doesn't have to do
+        it when the animation starts. If the animation settings or the axes
+        are changed in the user interface, the trajectories are computed in
+        the browser instead.
+
         See Also
         --------
         emperor.core.Emperor.color_by
@@ -1421,6 +3114,104 @@ class Emperor(object):
 
         return self
 
+    def set_screenshot(self, scale=5, tile_size=1024):
+        """Save a high resolution PNG of the plot once it's displayed
+
+        Parameters
+        ----------
+        scale: float, optional
+            Factor by which the width and height of the plot are multiplied
+            in the saved image. Defaults to 5.
+        tile_size: int, optional
+            Maximum width and height (in pixels) of each of the tiles that the
+            image is rendered in. Smaller tiles use less GPU memory, larger
+            tiles render faster. Defaults to 1024.
+
+        Returns
+        -------
+        emperor.Emperor
+            Emperor object with updated settings.
+
+        Raises
+        ------
+        TypeError
+            If ``scale`` or ``tile_size`` are not numbers.
+        ValueError
+            If ``scale`` or ``tile_size`` are not positive.
+
+        Notes
+        -----
+        The image is rendered in the browser in tiles of at most
+        ``tile_size`` pixels, so its size is not limited by the maximum
+        texture size of the GPU. The tile size is further capped by the
+        limits of the GPU.
+
+        See Also
+        --------
+        emperor.core.Emperor.set_axes
+        emperor.core.Emperor.set_background_color
+        """
+
+        if (not isinstance(scale, (float, int)) or
+           isinstance(scale, bool)):
+            raise TypeError('The scale is not a number')
+        if (not isinstance(tile_size, int) or
+           isinstance(tile_size, bool)):
+            raise TypeError('The tile size is not an integer')
+
+        if scale <= 0:
+            raise ValueError('The scale has to be greater than zero')
+        if tile_size <= 0:
+            raise ValueError('The tile size has to be greater than zero')
+
+        self._settings.update({"screenshot": {
+            "scale": scale,
+            "tileSize": tile_size
+        }})
+
+        return self
+
+    @property
+    def fingerprint(self):
+        """Fingerprint of the inputs and settings of the plot
+
+        Notes
+        -----
+        The fingerprint covers the ordinations (including jackknifed and
+        procrustes replicates), the sample and feature metadata, the
+        settings, the custom axes, and the number of dimensions. It's
+        computed every time it's accessed, so changes made to the inputs in
+        place are detected.
+
+        See Also
+        --------
+        emperor.util.fingerprint
+        """
+        inputs = ([self.ordination, self.mf, getattr(self, 'feature_mf', None)]
+                  + list(self.jackknifed) + list(self.procrustes))
+
+        return fingerprint(fingerprint(*inputs), self.settings,
+                           self.custom_axes, self.dimensions,
+                           [len(self.jackknifed), len(self.procrustes)])
+
+    @property
+    def procrustes_disparities(self):
+        """M^2 of each procrustes ordination superimposed onto the ordination
+
+        Returns
+        -------
+        np.ndarray or None
+            The disparity of each of the ``procrustes`` ordinations, ``None``
+            if they are not superimposed (see ``superimpose``).
+        """
+        if not (self.procrustes and self.superimpose):
+            return None
+
+        # the disparities are kept when the plot is built
+        if self._disparities[0] != self._replicates_key(self.procrustes):
+            self._replicate_set(self.procrustes, True)
+        return self._disparities[1]
+
     @property
     def settings(self):
         """Dictionary to load default settings from, when displaying a plot"""
@@ -1440,21 +3231,25 @@ class Emperor(object):
             elif key == 'scale':
                 self.scale_by(val['category'], val['data'],
                               float(val['globalScale']),
-                              val['scaleVal'])
+                              val['scaleVal'], val.get('precomputed', False))
             elif key == 'axes':
                 self.set_axes(val['visibleDimensions'], val['flippedAxes'],
                               val['axesColor'])
                 self.set_background_color(val['backgroundColor'])
             elif key == 'color':
                 self.color_by(val['category'], val['data'], val['colormap'],
-                              val['continuous'])
+                              val['continuous'],
+                              val.get('precomputed', False))
             elif key == 'opacity':
                 self.opacity_by(val['category'], val['data'],
-                                float(val['globalScale']), val['scaleVal'])
+                                float(val['globalScale']), val['scaleVal'],
+                                val.get('precomputed', False))
             elif key == 'animations':
                 self.animations_by(val['gradientCategory'],
                                    val['trajectoryCategory'], val['colors'],
                                    val['speed'], val['radius'])
+            elif key == 'screenshot':
+                self.set_screenshot(val['scale'], val['tileSize'])
             else:
                 raise KeyError('Unrecognized settings key: %s' % key)
 
@@ -9,8 +9,6 @@ __maintainer__ = "Yoshiki Vazquez Baeza"
 __email__ = "yoshik89@gmail.com"
 __status__ = "Development"
 
-from scipy.spatial import procrustes
-
 from numpy.ma.extras import apply_along_axis
 from numpy.ma import MaskedArray
 from numpy import (shape, vstack, zeros, sum as numpy_sum, sort as numpy_sort,
@@ -26,11 +24,15 @@ def summarize_pcoas(master_pcoa, support_pcoas, method='IQR', apply_procrustes=T
         ideal fourths: Ideal fourths method as implemented in scipy
     """
     if apply_procrustes:
-        # perform procrustes before averaging
+        # imported here, emperor.util depends on this module
+        from emperor.util import procrustes_superimposition
+
+        # perform procrustes before averaging, all at once
         support_pcoas = [list(sp) for sp in support_pcoas]
         master_pcoa = list(master_pcoa)
-        for i, pcoa in enumerate(support_pcoas):
-            master_std, pcoa_std, m_squared = procrustes(master_pcoa[1],pcoa[1])
+        master_std, pcoas_std, m_squared = procrustes_superimposition(
+            master_pcoa[1], [pcoa[1] for pcoa in support_pcoas])
+        for i, pcoa_std in enumerate(pcoas_std):
             support_pcoas[i][1] = pcoa_std
         master_pcoa[1] = master_std
 
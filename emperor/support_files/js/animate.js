@@ -38,6 +38,10 @@ function(_, trajectory) {
    * usually be BODY_SITE, HOST_SUBJECT_ID, etc..
    * @param {speed} Positive real number determining the speed of an animation,
    * this is reflected in the number of frames produced for each time interval.
+   * @param {Object} [precomputed] Trajectories sorted and interpolated ahead
+   * of time by the Python API (see `Emperor._precompute_animations`). These
+   * should have been computed for the same categories, speed and
+   * coordinates.
    *
    * @return {AnimationDirector} returns an animation director if the parameters
    * passed in were all valid.
@@ -51,7 +55,7 @@ function(_, trajectory) {
    */
   function AnimationDirector(mappingFileHeaders, mappingFileData,
                              coordinatesData, gradientCategory,
-                             trajectoryCategory, speed) {
+                             trajectoryCategory, speed, precomputed) {
 
     // all arguments are required
     if (mappingFileHeaders === undefined || mappingFileData === undefined ||
@@ -168,7 +172,12 @@ function(_, trajectory) {
     // frames we want projected in the trajectory's interval
     this._n = Math.floor((1 / this.speed) * 10);
 
-    this.initializeTrajectories();
+    if (precomputed !== undefined && precomputed !== null) {
+      this._initializeFromBuffers(precomputed);
+    }
+    else {
+      this.initializeTrajectories();
+    }
     this.getMaximumTrajectoryLength();
 
     return this;
@@ -258,6 +267,69 @@ function(_, trajectory) {
     return;
   };
 
+  /**
+   *
+   * Initializes the trajectories from precomputed buffers.
+   *
+   * @param {Object} buffers Flat arrays with the sorted samples, their
+   * coordinates and the interpolated frames for each trajectory.
+   * @private
+   */
+  AnimationDirector.prototype._initializeFromBuffers = function(buffers) {
+    var sampleOffsets = buffers.sampleOffsets;
+    var frameOffsets = buffers.frameOffsets;
+    var coordinates = new Float64Array(buffers.coordinates);
+    var frames = new Float64Array(buffers.frames);
+    var intervals = new Int32Array(buffers.intervals);
+
+    var start, end, frameStart, frameEnd, trajectory;
+
+    this.minimumDelta = buffers.minimumDelta;
+
+    for (var i = 0; i < buffers.trajectories.length; i++) {
+      start = sampleOffsets[i];
+      end = sampleOffsets[i + 1];
+      frameStart = frameOffsets[i];
+      frameEnd = frameOffsets[i + 1];
+
+      // there's one interval per frame except for the closing frame of each
+      // trajectory
+      trajectory = new TrajectoryOfSamples(
+        buffers.sampleNames.slice(start, end), buffers.trajectories[i],
+        buffers.gradient.slice(start, end), _toPoints(coordinates, start, end),
+        this.minimumDelta, this._n, Infinity,
+        {'coordinates': _toPoints(frames, frameStart, frameEnd),
+         'intervals': intervals.subarray(frameStart - i, frameEnd - i - 1)});
+
+      this.trajectories.push(trajectory);
+    }
+
+    this.gradientPoints = buffers.gradientPoints;
+    this._frameIndices = this._computeFrameIndices();
+  };
+
+  /**
+   *
+   * Convert a range of a flat buffer into an array of points.
+   *
+   * @param {Float64Array} buffer Array of x, y and z values.
+   * @param {Integer} start Index of the first point.
+   * @param {Integer} end Index after the last point.
+   *
+   * @return {Object[]} Objects with x, y and z properties.
+   * @private
+   */
+  function _toPoints(buffer, start, end) {
+    var points = new Array(end - start);
+
+    for (var i = start, j = 0; i < end; i++, j++) {
+      points[j] = {'x': buffer[i * 3], 'y': buffer[i * 3 + 1],
+                   'z': buffer[i * 3 + 2]};
+    }
+
+    return points;
+  }
+
   /**
    * Check if the current frame represents one of the gradient points.
    *
@@ -11,9 +11,9 @@ define([
             draw, Color, ColorViewController) {
   var EmperorViewController = ViewControllers.EmperorViewController;
   var drawTrajectoryLineStatic = draw.drawTrajectoryLineStatic;
-  var drawTrajectoryLineDynamic = draw.drawTrajectoryLineDynamic;
   var disposeTrajectoryLineStatic = draw.disposeTrajectoryLineStatic;
   var disposeTrajectoryLineDynamic = draw.disposeTrajectoryLineDynamic;
+  var makeDynamicTubes = draw.makeDynamicTubes;
   var updateStaticTrajectoryDrawRange = draw.updateStaticTrajectoryDrawRange;
   var ColorEditor = Color.ColorEditor, ColorFormatter = Color.ColorFormatter;
 
@@ -121,6 +121,15 @@ define([
     this.director = null;
     this.playing = false;
 
+    /**
+     * @type {Object}
+     * Trajectories sorted and interpolated by the Python API, these are only
+     * used when the animation settings and visible axes match the ones used
+     * to compute them.
+     * @private
+     */
+    this._precomputed = null;
+
     /**
      * @type {Slick.Grid}
      * Container that lists the trajectories and their colors
@@ -179,12 +188,18 @@ define([
         placeholder_text_single: trajectoryTooltip
       });
 
+      // deferred metadata columns are loaded before they are used
       scope.$gradientSelect.chosen().change(function(e, p) {
-                                              scope._gradientChanged(e, p);
-                                            });
+        scope.loadCategories([scope.getGradientCategory()]).done(function() {
+          scope._gradientChanged(e, p);
+        });
+      });
       scope.$trajectorySelect.chosen().change(function(e, p) {
-                                                scope._trajectoryChanged(e, p);
-                                              });
+        scope.loadCategories([scope.getTrajectoryCategory()]).done(
+          function() {
+            scope._trajectoryChanged(e, p);
+          });
+      });
 
       scope.$rewind.button({icons: {primary: 'ui-icon-seek-first'}});
       scope.$rewind.attr('title', 'Restart the animation');
@@ -567,7 +582,10 @@ define([
     }
 
     this.director = new AnimationDirector(headers, data, positions, gradient,
-                                          trajectory, speed);
+                                          trajectory, speed,
+                                          this._getPrecomputed(gradient,
+                                                               trajectory,
+                                                               speed));
 
     this.director.updateFrame();
     this._currentFrame = 0;
@@ -619,30 +637,28 @@ define([
                                       view.staticTubes[i]);
     }
 
-    //Remove any old dynamic tubes from the scene
-    view.dynamicTubes.forEach(function(tube) {
-      if (tube === undefined || tube === null) {
-        return;
-      }
-      if (tube.parent !== null) {
-        tube.parent.remove(tube);
+    //The dynamic tubes are allocated once per animation, and only moved on
+    //every frame
+    tube = view.dynamicTubes[0];
+    if (tube === undefined || tube === null ||
+        tube.trajectories !== this.director.trajectories) {
+      if (tube !== undefined && tube !== null) {
+        if (tube.parent !== null) {
+          tube.parent.remove(tube);
+        }
         disposeTrajectoryLineDynamic(tube);
       }
-    });
 
-    if (this.UIState['view.viewType'] !== 'parallel-plot') {
-      //Construct new dynamic tubes containing necessary
-      //interpolated segment for the current frame
-      view.dynamicTubes = this.director.trajectories.map(function(trajectory) {
-        var color = scope._colors[trajectory.metadataCategoryName] || 'red';
-        var tube = drawTrajectoryLineDynamic(trajectory,
-                                    scope.director.currentFrame,
-                                    color,
-                                    radius);
-        return tube;
+      color = this.director.trajectories.map(function(trajectory) {
+        return scope._colors[trajectory.metadataCategoryName] || 'red';
       });
+      tube = makeDynamicTubes(this.director.trajectories, color, radius);
+      view.dynamicTubes = [tube];
     }
 
+    tube.visible = this.UIState['view.viewType'] !== 'parallel-plot';
+    tube.update(this.director.currentFrame);
+
     view.needsUpdate = true;
 
     if (this.director.currentFrameIsGradientPoint()) {
@@ -787,6 +803,45 @@ define([
     return this.$radius.slider('option', 'value');
   };
 
+  /**
+   *
+   * Setter for the trajectories computed ahead of time.
+   *
+   * @param {Object} precomputed Sorted and interpolated trajectories as
+   * computed by the Python API, or null to compute them in the browser.
+   */
+  AnimationsController.prototype.setPrecomputedTrajectories = function(
+      precomputed) {
+    this._precomputed = precomputed === undefined ? null : precomputed;
+  };
+
+  /**
+   *
+   * Get the precomputed trajectories if they can be used for an animation.
+   *
+   * @param {String} gradient The gradient category of the animation.
+   * @param {String} trajectory The trajectory category of the animation.
+   * @param {Float} speed The speed of the animation.
+   *
+   * @return {Object} The precomputed trajectories or null if they were
+   * computed for a different animation or for different visible axes.
+   * @private
+   */
+  AnimationsController.prototype._getPrecomputed = function(gradient,
+                                                            trajectory,
+                                                            speed) {
+    var view = this.getView(), pre = this._precomputed;
+
+    if (pre === null || pre.gradientCategory !== gradient ||
+        pre.trajectoryCategory !== trajectory || pre.speed !== speed ||
+        !_.isEqual(pre.dimensions, view.visibleDimensions) ||
+        !_.isEqual(pre.axesOrientation, view.axesOrientation)) {
+      return null;
+    }
+
+    return pre;
+  };
+
   /**
    * Converts the current instance into a JSON string.
    *
@@ -808,8 +863,21 @@ define([
    * Decodes JSON string and modifies its own instance variables accordingly.
    *
    * @param {Object} Parsed JSON string representation of self.
+   *
+   * @return {Promise|undefined} If the categories have to be loaded first, a
+   * jQuery promise resolved once the settings are applied.
    */
   AnimationsController.prototype.fromJSON = function(json) {
+    var scope = this, loading = this.loadCategories([json.gradientCategory,
+                                                     json.trajectoryCategory]);
+
+    // deferred metadata columns are loaded before the settings are applied
+    if (loading.state() !== 'resolved') {
+      return loading.done(function() {
+        scope.fromJSON(json);
+      });
+    }
+
     this._rewindButtonClicked();
 
     this.setGradientCategory(json.gradientCategory);
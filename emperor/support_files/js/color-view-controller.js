@@ -132,9 +132,11 @@ define([
           // getting all unique values per categories
           var uniqueVals = decompViewDict.decomp.getUniqueValuesByCategory(
             category);
+          var numbers = decompViewDict.decomp.getNumericValuesByCategory(
+            category);
           // getting color for each uniqueVals
           var colorInfo = ColorViewController.getColorList(
-            uniqueVals, colorScheme, discrete, scaled);
+            uniqueVals, colorScheme, discrete, scaled, numbers);
           var attributes = colorInfo[0];
           // fetch the slickgrid-formatted data
           var data = decompViewDict.setCategory(
@@ -143,7 +145,7 @@ define([
           if (scaled) {
             scope.$searchBar.prop('hidden', true);
             plottables = ColorViewController._nonNumericPlottables(
-              uniqueVals, data);
+              uniqueVals, data, numbers);
             // Set SlickGrid for color of non-numeric values and show color bar
             // for rest if there are non numeric categories
             if (plottables.length > 0) {
@@ -214,14 +216,17 @@ define([
    *
    * @param {String[]} uniqueVals Array of unique values for the category
    * @param {Object} data SlickGrid formatted data from setCategory function
+   * @param {Object} [numbers] Numeric values in the category, see
+   * `util.splitNumericValues`.
    *
    * @return {Plottable[]} Array of plottables for all non-numeric values
    * @private
    *
    */
-   ColorViewController._nonNumericPlottables = function(uniqueVals, data) {
+   ColorViewController._nonNumericPlottables = function(uniqueVals, data,
+                                                        numbers) {
      // Filter down to only non-numeric data
-     var split = util.splitNumericValues(uniqueVals);
+     var split = util.splitNumericValues(uniqueVals, numbers);
      var plotList = data.filter(function(x) {
        return $.inArray(x.category, split.nonNumeric) !== -1;
      });
@@ -289,6 +294,8 @@ define([
    * discrete set of colors or use interpolation to create gradient of colors
    * @param {Boolean} [scaled = false] Whether to use a scaled colormap or
    * equidistant colors for each value
+   * @param {Object} [numbers] Numeric values in the category, used by scaled
+   * colormaps to avoid parsing the values, see `util.splitNumericValues`.
    * @see ColorViewController.getDiscreteColors
    * @see ColorViewController.getInterpolatedColors
    * @see ColorViewController.getScaledColors
@@ -298,7 +305,8 @@ define([
    * @return {String} gradientSVG The SVG string for the scaled data or null
    *
    */
-  ColorViewController.getColorList = function(values, map, discrete, scaled) {
+  ColorViewController.getColorList = function(values, map, discrete, scaled,
+                                              numbers) {
     var colors = {}, gradientSVG;
     scaled = scaled || false;
 
@@ -318,7 +326,8 @@ define([
     }
     else if (scaled) {
       try {
-        var info = ColorViewController.getScaledColors(values, map);
+        var info = ColorViewController.getScaledColors(values, map,
+                                                       undefined, numbers);
       } catch (e) {
         alert('Category can not be shown as continuous values. Continuous ' +
               'coloration requires at least 2 numeric values in the category.');
@@ -389,35 +398,40 @@ define([
    * category in a given metadata column.
    * @param {String} [map = 'Viridis'] name of the discrete color map to use.
    * @param {String} [nanColor = '#64655d'] Color to use for non-numeric values.
+   * @param {Object} [numbers] Numeric values in the category, if provided the
+   * values are not parsed, see `util.splitNumericValues`.
    *
    * @return {Object} colors The object containing the hex colors keyed to
    * each sample
    * @return {String} gradientSVG The SVG string for the scaled data or null
    *
    */
-  ColorViewController.getScaledColors = function(values, map, nanColor) {
+  ColorViewController.getScaledColors = function(values, map, nanColor,
+                                                 numbers) {
     map = map || 'Viridis';
     nanColor = nanColor || '#64655d';
     map = chroma.brewer[map];
 
     // Get list of only numeric values, error if none
-    var split = util.splitNumericValues(values), numbers;
+    var split = util.splitNumericValues(values, numbers), converted;
     if (split.numeric.length < 2) {
       throw new Error('non-numeric category');
     }
 
     // convert objects to numbers so we can map them to a color, we keep a copy
     // of the untransformed object so we can search the metadata
-    numbers = _.map(split.numeric, parseFloat);
-    min = _.min(numbers);
-    max = _.max(numbers);
+    converted = _.map(split.numeric, function(element) {
+      return numbers ? numbers[element] : parseFloat(element);
+    });
+    min = _.min(converted);
+    max = _.max(converted);
 
     var interpolator = chroma.scale(map).domain([min, max]);
     var colors = {};
 
     // Color all the numeric values
-    _.each(split.numeric, function(element) {
-      colors[element] = interpolator(+element).hex();
+    _.each(split.numeric, function(element, index) {
+      colors[element] = interpolator(converted[index]).hex();
     });
     //Gray out non-numeric values
     _.each(split.nonNumeric, function(element) {
@@ -491,9 +505,19 @@ define([
    * Decodes JSON string and modifies its own instance variables accordingly.
    *
    * @param {Object} Parsed JSON string representation of self.
+   *
+   * @return {Promise|undefined} If the category has to be loaded first, a
+   * jQuery promise resolved once the settings are applied.
    */
   ColorViewController.prototype.fromJSON = function(json) {
-    var data;
+    var data, scope = this, loading = this.loadCategories([json.category]);
+
+    // deferred metadata columns are loaded before the settings are applied
+    if (loading.state() !== 'resolved') {
+      return loading.done(function() {
+        scope.fromJSON(json);
+      });
+    }
 
     // NOTE: We do not call super here because of the non-numeric values issue
     // Order here is important. We want to set all the extra controller
@@ -532,6 +556,9 @@ define([
     if (!_.isEmpty(data)) {
       this.setSlickGridDataset(data);
     }
+
+    // colors resolved in Python take precedence over the ones set above
+    this._setPrecomputedAttributes(json.category);
   };
 
   /**
@@ -572,6 +599,23 @@ define([
     scope.setColor(color, group);
   };
 
+  /**
+   *
+   * Get the color of a plottable from the precomputed colors.
+   *
+   * @param {Integer[]} values Flattened RGB triplets, with values between 0
+   * and 255.
+   * @param {Integer} index The index of the plottable.
+   *
+   * @return {Integer} The color as a hexadecimal number, plottables with the
+   * same color share the same value.
+   * @private
+   */
+  ColorViewController.prototype._precomputedValue = function(values, index) {
+    var i = index * 3;
+    return (values[i] << 16) | (values[i + 1] << 8) | values[i + 2];
+  };
+
   var DISCRETE = 'Discrete';
   var SEQUENTIAL = 'Sequential';
   var DIVERGING = 'Diverging';
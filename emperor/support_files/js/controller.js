@@ -19,14 +19,17 @@ define([
     'canvasrenderer',
     'canvastoblob',
     'multi-model',
-    'uistate'
+    'uistate',
+    'rendererpool'
 ], function($, _, contextMenu, THREE, DecompositionView, ScenePlotView3D,
             ColorViewController, VisibilityController, OpacityViewController,
             ShapeController, AxesController, ScaleViewController,
             AnimationsController, FileSaver, viewcontroller, SVGRenderer, Draw,
-            CanvasRenderer, canvasToBlob, MultiModel, UIStateInit) {
+            CanvasRenderer, canvasToBlob, MultiModel, UIStateInit,
+            RendererPool) {
 
   var EmperorAttributeABC = viewcontroller.EmperorAttributeABC;
+  var EmperorViewController = viewcontroller.EmperorViewController;
 
   var TAB_ORDER = ['color', 'visibility', 'opacity', 'scale',
                    'shape', 'axes', 'animations'];
@@ -58,12 +61,17 @@ define([
    * @param {node} [webglcanvas = undefined] the canvas to use to render the
    * information. This parameter is optional, and should rarely be set. But is
    * useful for external applications like SAGE2.
+   * @param {Object} [options = {}] Additional options for the controller.
+   * Setting `sharedRenderer` to `true` will draw this plot using a WebGL
+   * context that is shared with all the other plots in the page, see
+   * RendererPool. This option is ignored if `webglcanvas` is set.
    *
    * @return {EmperorController}
    * @constructs EmperorController
    *
    */
-  function EmperorController(scatter, biplot, divId, webglcanvas) {
+  function EmperorController(scatter, biplot, divId, webglcanvas, options) {
+    options = options || {};
 
     /**
      * The state shared across one instance of the UI
@@ -201,6 +209,17 @@ define([
         this.renderer = new THREE.WebGLRenderer({canvas: webglcanvas,
                                                  antialias: true});
     }
+    else if (options.sharedRenderer) {
+        this.renderer = RendererPool.getSharedPool().register();
+
+        // off-screen plots are not rendered, so redraw as soon as they are
+        // scrolled back into view
+        this.renderer.onResume = function() {
+          _.each(scope.sceneViews, function(sv) {
+            sv.needsUpdate = true;
+          });
+        };
+    }
     else {
         this.renderer = new THREE.WebGLRenderer({antialias: true});
     }
@@ -509,6 +528,11 @@ define([
   EmperorController.prototype.render = function() {
     var scope = this;
 
+    // plots using a shared renderer are suspended while off-screen
+    if (this.renderer.suspended) {
+      return;
+    }
+
     if (this.controllers.animations !== undefined) {
       this.controllers.animations.drawFrame();
     }
@@ -707,14 +731,14 @@ define([
           }
         },
         'sep1': '---------',
-        // With large datasets we can't save to SVG. The PNG file will not be
-        // high resolution.
+        // With large datasets we can't save to SVG. The PNG file is rendered
+        // in tiles, so it's always high resolution.
         'fold1': {
             'name': 'Save Image',
             icon: 'file-picture-o',
             'items': {
               'saveImagePNG': {
-                name: 'PNG' + (isLargeDataset ? '' : ' (high resolution)'),
+                name: 'PNG (high resolution)',
                 callback: function(key, opts) {
                   scope.screenshot('png');
                 }
@@ -781,38 +805,24 @@ define([
    * Save the current canvas view to a new window
    *
    * @param {string} [type = png] Format to save the file as: ('png', 'svg')
+   * @param {Float} [scale = 5] Size of PNG images relative to the size of the
+   * plot.
+   * @param {Integer} [tileSize = 1024] Size of the tiles used to render PNG
+   * images, see ScenePlotView3D.renderTiled.
    *
    */
-  EmperorController.prototype.screenshot = function(type) {
-    var img, renderer, factor = 5;
+  EmperorController.prototype.screenshot = function(type, scale, tileSize) {
+    var img, renderer;
     type = type || 'png';
 
     if (type === 'png') {
-      var pngRenderer;
-
-      // Point clouds can't be rendered by the CanvasRenderer, therefore we
-      // have to use the WebGLRenderer and can't increase the image size.
-      if (this.UIState['view.usesPointCloud'] ||
-          this.UIState['view.viewType'] === 'parallel-plot') {
-        pngRenderer = this.sceneViews[0].renderer;
-      }
-      else {
-        pngRenderer = new THREE.CanvasRenderer({
-          antialias: true,
-          preserveDrawingBuffer: true
-        });
-
-        pngRenderer.autoClear = true;
-        pngRenderer.sortObjects = true;
-        pngRenderer.setSize(this.$plotSpace.width() * factor,
-                            this.$plotSpace.height() * factor);
-        pngRenderer.setPixelRatio(window.devicePixelRatio);
-      }
-      pngRenderer.render(this.sceneViews[0].scene, this.sceneViews[0].camera);
+      // the image is rendered in tiles, so its size is not limited by the
+      // size of the WebGL buffers
+      var canvas = this.sceneViews[0].renderTiled(scale || 5, tileSize);
 
       // toBlob is only available in some browsers, that's why we use
       // canvas-toBlob
-      pngRenderer.domElement.toBlob(function(blob) {
+      canvas.toBlob(function(blob) {
         saveAs(blob, 'emperor.png');
       });
     }
@@ -921,11 +931,35 @@ define([
     saveAs(blob, 'emperor-settings.json');
    };
 
+  /**
+   *
+   * Setter for the attributes computed ahead of time.
+   *
+   * @param {Object} [attributes] Colors, scales and opacities of each sample
+   * as computed by the Python API, keyed by the name of the controller that
+   * uses them. If not provided, the attributes are computed in the browser.
+   *
+   */
+  EmperorController.prototype.setPrecomputedAttributes = function(
+      attributes) {
+    var scope = this;
+    attributes = attributes || {};
+
+    _.each(['color', 'scale', 'opacity'], function(name) {
+      if (scope.controllers[name] !== undefined) {
+        scope.controllers[name].setPrecomputedAttributes(attributes[name]);
+      }
+    });
+  };
+
   /**
    *
    * Load a settings file and set all controller variables.
    *
-   * This method will trigger a rendering callback.
+   * The changes made by all the controllers are applied to the views at once
+   * (see `DecompositionView.beginUpdate`). Deferred metadata categories used
+   * by the settings are loaded before any of the changes are applied. This
+   * method will trigger a rendering callback.
    *
    * @param {object} json Information about the emperor session to load.
    *
@@ -969,19 +1003,64 @@ define([
     sceneview.camera.updateProjectionMatrix();
     sceneview.control.update();
 
-    //load the rest of the controller settings
+    // deferred metadata categories used by the controllers
+    var scope = this, categories = [];
     _.each(this.controllers, function(controller, index) {
-      if (controller !== undefined && json[index] !== undefined) {
-        // wrap everything inside this "ready" call to prevent problems with
-        // the jQuery elements not being loaded yet
-        $(function() {
-          controller.fromJSON(json[index]);
-        });
+      if (controller !== undefined && _.isObject(json[index])) {
+        categories.push(json[index].category, json[index].gradientCategory,
+                        json[index].trajectoryCategory);
       }
     });
 
-    sceneview.needsUpdate = true;
-   };
+    //load the rest of the controller settings, wrap everything inside this
+    //"ready" call to prevent problems with the jQuery elements not being
+    //loaded yet
+    $(function() {
+      EmperorViewController.loadCategories(scope.decViews,
+                                           _.uniq(categories)).done(function() {
+        scope._applyConfig(json);
+      });
+    });
+  };
+
+  /**
+   *
+   * Set the controller variables once the metadata has been loaded.
+   *
+   * @param {object} json Information about the emperor session to load.
+   * @private
+   *
+   */
+  EmperorController.prototype._applyConfig = function(json) {
+    var scope = this, sceneview = this.sceneViews[0];
+
+    // collect the changes from all the controllers and write them to the
+    // views at once, so the plot isn't updated for every controller
+    _.each(scope.decViews, function(view) {
+      view.beginUpdate();
+    });
+
+    try {
+      _.each(scope.controllers, function(controller, index) {
+        if (controller !== undefined && json[index] !== undefined) {
+          controller.fromJSON(json[index]);
+        }
+      });
+    }
+    finally {
+      _.each(scope.decViews, function(view) {
+        view.endUpdate();
+      });
+      sceneview.needsUpdate = true;
+    }
+
+    // images requested with the settings (for example from Python) are
+    // saved once everything else has been loaded
+    if (json.screenshot !== undefined) {
+      scope.screenshot('png', json.screenshot.scale,
+                       json.screenshot.tileSize);
+    }
+  };
 
   /**
    *
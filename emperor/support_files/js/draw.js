@@ -7,6 +7,15 @@ define(['underscore', 'three', 'jquery'], function(_, THREE, $) {
   // useful for some calculations
   var ZERO = new THREE.Vector3();
 
+  // font size in pixels of the labels
+  var LABEL_FONT_SIZE = 32;
+
+  // scratch objects used to update instanced arrows and labels
+  var _up = new THREE.Vector3(0, 1, 0), _origin = new THREE.Vector3(),
+      _direction = new THREE.Vector3(), _position = new THREE.Vector3(),
+      _scale = new THREE.Vector3(), _quaternion = new THREE.Quaternion(),
+      _matrix = new THREE.Matrix4(), _raycastMesh = new THREE.Mesh();
+
   /**
    *
    * @class EmperorTrajectory
@@ -105,6 +114,23 @@ define(['underscore', 'three', 'jquery'], function(_, THREE, $) {
     this.label.material.color.set(color);
   };
 
+  /**
+   *
+   * Set the arrow's opacity
+   *
+   * @param {Float} value The opacity value (from 0 to 1).
+   *
+   */
+  EmperorArrowHelper.prototype.setOpacity = function(value) {
+    // webgl acts up with transparent objects, so we only set them to be
+    // explicitly transparent if the opacity is not at full
+    this.line.material.transparent = value !== 1;
+    this.line.material.opacity = value;
+
+    this.cone.material.transparent = value !== 1;
+    this.cone.material.opacity = value;
+  };
+
   /**
    *
    * Change the vector where the arrow points to
@@ -303,6 +329,1022 @@ define(['underscore', 'three', 'jquery'], function(_, THREE, $) {
     return arrow;
   }
 
+  /**
+   *
+   * Create a Phong material that reads its color, opacity and visibility
+   * from per-instance attributes.
+   *
+   * Geometries drawn with this material need three InstancedBufferAttributes:
+   * `instanceColor` (3 components), `instanceOpacity` and `instanceVisible`
+   * (1 component each). The instance colors and opacities are multiplied by
+   * the material's color and opacity. Hidden instances (visible set to 0) are
+   * collapsed into a point and are not rasterized.
+   *
+   * @param {Object} [parameters] Parameters passed to
+   * THREE.MeshPhongMaterial.
+   *
+   * @return {THREE.MeshPhongMaterial}
+   * @function makeInstancedMaterial
+   */
+  function makeInstancedMaterial(parameters) {
+    var material = new THREE.MeshPhongMaterial(parameters);
+
+    // MeshPhongMaterial has no per-instance colors, so the attributes are
+    // patched into the built-in shader
+    material.onBeforeCompile = function(shader) {
+      shader.vertexShader = [
+        'attribute vec3 instanceColor;',
+        'attribute float instanceOpacity;',
+        'attribute float instanceVisible;',
+        'varying vec3 vInstanceColor;',
+        'varying float vInstanceOpacity;',
+        shader.vertexShader.replace('#include <begin_vertex>', [
+          '#include <begin_vertex>',
+          'vInstanceColor = instanceColor;',
+          'vInstanceOpacity = instanceOpacity;',
+          'transformed *= instanceVisible;'].join('\n'))
+      ].join('\n');
+
+      shader.fragmentShader = [
+        'varying vec3 vInstanceColor;',
+        'varying float vInstanceOpacity;',
+        shader.fragmentShader.replace(
+          'vec4 diffuseColor = vec4( diffuse, opacity );',
+          'vec4 diffuseColor = vec4( diffuse * vInstanceColor, ' +
+          'opacity * vInstanceOpacity );')
+      ].join('\n');
+    };
+
+    return material;
+  }
+
+  /**
+   *
+   * @class GlyphAtlas
+   *
+   * Bitmap with the glyphs used to draw labels, see
+   * {@link EmperorLabelCollection}. The glyphs are drawn in white on a grid of
+   * square cells, each glyph's index determines its cell. Characters are
+   * added on demand and never removed, so indices remain valid as the atlas
+   * grows.
+   *
+   * All the label collections in the page share a single atlas, see
+   * getGlyphAtlas.
+   *
+   * @param {Integer} fontSize Size in pixels of the font used to draw the
+   * glyphs.
+   *
+   * @return {GlyphAtlas}
+   * @constructs GlyphAtlas
+   */
+  function GlyphAtlas(fontSize) {
+    /**
+     * Size in pixels of the font used to draw the glyphs.
+     * @type {Integer}
+     */
+    this.fontSize = fontSize;
+
+    /**
+     * Size in pixels of the cells in the atlas.
+     * @type {Integer}
+     */
+    this.cellSize = THREE.Math.ceilPowerOfTwo(fontSize);
+
+    /**
+     * Number of cells in each row of the atlas.
+     * @type {Integer}
+     */
+    this.columns = 16;
+
+    /**
+     * Mapping of characters to their index and width (relative to the font
+     * size).
+     * @type {Object}
+     */
+    this.glyphs = {};
+
+    /**
+     * Characters in the atlas, in the order they were added.
+     * @type {String[]}
+     */
+    this.characters = [];
+
+    this.canvas = document.createElement('canvas');
+    this.canvas.width = this.columns * this.cellSize;
+    this.canvas.height = this.cellSize;
+
+    /**
+     * Texture with the contents of the atlas' canvas.
+     * @type {THREE.Texture}
+     */
+    this.texture = new THREE.Texture(this.canvas);
+    this.texture.minFilter = THREE.LinearFilter;
+    this.texture.generateMipmaps = false;
+
+    /**
+     * Uniforms shared by all the materials that sample from this atlas.
+     * @type {Object}
+     */
+    this.uniforms = {
+      atlas: {value: this.texture},
+      atlasGrid: {value: new THREE.Vector2(this.columns, 1)},
+      atlasCell: {value: this.cellSize / this.fontSize}
+    };
+
+    // most labels are made of printable ASCII characters
+    this.addCharacters(_.map(_.range(32, 127), function(code) {
+      return String.fromCharCode(code);
+    }).join(''));
+  }
+
+  /**
+   *
+   * Add characters to the atlas.
+   *
+   * If any of the characters is not in the atlas, the atlas is redrawn.
+   *
+   * @param {String} text Characters to add.
+   *
+   */
+  GlyphAtlas.prototype.addCharacters = function(text) {
+    var scope = this, context, rows, added = false;
+
+    _.each(text, function(character) {
+      if (scope.glyphs[character] === undefined) {
+        scope.glyphs[character] = {index: scope.characters.length, width: 0};
+        scope.characters.push(character);
+        added = true;
+      }
+    });
+
+    if (!added) {
+      return;
+    }
+
+    rows = THREE.Math.ceilPowerOfTwo(Math.ceil(this.characters.length /
+                                               this.columns));
+    this.canvas.height = rows * this.cellSize;
+    this.uniforms.atlasGrid.value.set(this.columns, rows);
+
+    // after changing the canvas' size we need to reset the font attributes
+    context = this.canvas.getContext('2d');
+    context.font = this.fontSize + 'px Arial';
+    context.textAlign = 'left';
+    context.textBaseline = 'middle';
+    context.fillStyle = '#ffffff';
+
+    _.each(this.characters, function(character, index) {
+      var glyph = scope.glyphs[character];
+
+      glyph.width = Math.min(context.measureText(character).width,
+                             scope.cellSize) / scope.fontSize;
+
+      context.fillText(character,
+                       (index % scope.columns) * scope.cellSize,
+                       (Math.floor(index / scope.columns) + 0.5) *
+                       scope.cellSize);
+    });
+
+    this.texture.needsUpdate = true;
+  };
+
+  /**
+   * Atlas shared by all the label collections (created on demand).
+   * @type {GlyphAtlas}
+   * @private
+   */
+  var _sharedAtlas = null;
+
+  /**
+   *
+   * Get the glyph atlas shared by all the label collections in the page.
+   *
+   * @return {GlyphAtlas} The shared atlas.
+   * @function getGlyphAtlas
+   */
+  function getGlyphAtlas() {
+    if (_sharedAtlas === null) {
+      _sharedAtlas = new GlyphAtlas(48);
+    }
+    return _sharedAtlas;
+  }
+
+  /**
+   *
+   * @class EmperorLabel
+   *
+   * Represents a single label in an {@link EmperorLabelCollection}. This
+   * object has the same attributes as the sprites created by makeLabel
+   * (`position`, `scale`, `visible`, `text` and `material.color`), but it has
+   * no geometry or texture of its own. The collection reads these attributes
+   * every time it is updated.
+   *
+   * @param {String} text The text to be shown on screen.
+   * @param {integer|string} color Hexadecimal base that represents the color
+   * of the text.
+   * @param {Float} width Width of the text relative to the font size.
+   *
+   * @return {EmperorLabel}
+   * @extends THREE.Object3D
+   */
+  function EmperorLabel(text, color, width) {
+    THREE.Object3D.call(this);
+
+    this.text = text;
+
+    /**
+     * Width of the text relative to the font size.
+     * @type {Float}
+     */
+    this.width = width;
+
+    /**
+     * Mirrors the material of a sprite label.
+     * @type {Object}
+     */
+    this.material = {color: new THREE.Color(color)};
+
+    // same dimensions in pixels as the sprites created by makeLabel
+    this.scale.set(THREE.Math.ceilPowerOfTwo(width * LABEL_FONT_SIZE),
+                   THREE.Math.ceilPowerOfTwo(LABEL_FONT_SIZE), 1);
+
+    return this;
+  }
+  EmperorLabel.prototype = Object.create(THREE.Object3D.prototype);
+  EmperorLabel.prototype.constructor = THREE.Object3D;
+
+  /**
+   *
+   * @class EmperorLabelCollection
+   *
+   * Draws a group of labels in a single draw call. Each glyph is an instance
+   * of a quad that samples from a shared {@link GlyphAtlas}, so no textures
+   * are allocated per label.
+   *
+   * Before each frame is drawn, the labels are culled (see `update`): labels
+   * outside the screen are hidden and, starting with the labels closest to
+   * the camera, labels that overlap a label already on screen are hidden.
+   * At most `maxLabels` are shown at once.
+   *
+   * @param {String[]} texts The text of each label.
+   * @param {integer|string} color Hexadecimal base that represents the color
+   * of the labels.
+   *
+   * @return {EmperorLabelCollection}
+   * @extends THREE.Object3D
+   */
+  function EmperorLabelCollection(texts, color) {
+    THREE.Object3D.call(this);
+
+    var scope = this, atlas = getGlyphAtlas(), count = 0, geometry,
+        material, quad;
+
+    /**
+     * Atlas the glyphs are sampled from.
+     * @type {GlyphAtlas}
+     */
+    this.atlas = atlas;
+
+    /**
+     * Maximum number of labels shown at once.
+     * @type {Integer}
+     */
+    this.maxLabels = 1000;
+
+    /**
+     * Whether or not labels that overlap on screen are hidden.
+     * @type {Boolean}
+     */
+    this.hideOverlapping = true;
+
+    /**
+     * Objects representing each label in the collection.
+     * @type {EmperorLabel[]}
+     */
+    this.labels = [];
+
+    /**
+     * Index of the first glyph of each label, the last element is the total
+     * number of glyphs.
+     * @type {Integer[]}
+     * @private
+     */
+    this._offsets = [0];
+
+    _.each(texts, function(text) {
+      atlas.addCharacters(text);
+      count += text.length;
+      scope._offsets.push(count);
+    });
+
+    quad = new THREE.PlaneBufferGeometry(1, 1);
+    quad.translate(0.5, 0, 0);
+
+    geometry = new THREE.InstancedBufferGeometry();
+    geometry.setIndex(quad.index);
+    geometry.setAttribute('position', quad.attributes.position);
+    geometry.setAttribute('uv', quad.attributes.uv);
+    geometry.maxInstancedCount = count;
+
+    _.each({labelPosition: 3, labelColor: 3, labelScale: 1, labelVisible: 1,
+            glyphOffset: 1, glyphIndex: 1, glyphWidth: 1},
+           function(size, name) {
+      geometry.setAttribute(name, new THREE.InstancedBufferAttribute(
+        new Float32Array(count * size), size));
+    });
+
+    // the layout of the glyphs doesn't change, each label is centered
+    _.each(texts, function(text, i) {
+      var offset = 0, glyph, j, width;
+
+      width = _.reduce(text, function(memo, character) {
+        return memo + atlas.glyphs[character].width;
+      }, 0);
+
+      for (j = 0; j < text.length; j++) {
+        glyph = atlas.glyphs[text[j]];
+
+        geometry.attributes.glyphOffset.setX(scope._offsets[i] + j,
+                                             offset - (width / 2));
+        geometry.attributes.glyphIndex.setX(scope._offsets[i] + j,
+                                            glyph.index);
+        geometry.attributes.glyphWidth.setX(scope._offsets[i] + j,
+                                            glyph.width);
+        offset += glyph.width;
+      }
+
+      scope.labels.push(new EmperorLabel(text, color, width));
+    });
+
+    material = new THREE.ShaderMaterial({
+      uniforms: atlas.uniforms,
+      vertexShader: [
+        'attribute vec3 labelPosition;',
+        'attribute vec3 labelColor;',
+        'attribute float labelScale;',
+        'attribute float labelVisible;',
+        'attribute float glyphOffset;',
+        'attribute float glyphIndex;',
+        'attribute float glyphWidth;',
+
+        'uniform vec2 atlasGrid;',
+        'uniform float atlasCell;',
+
+        'varying vec2 vUv;',
+        'varying vec3 vColor;',
+
+        'void main() {',
+        '  vColor = labelColor;',
+
+        // the glyphs face the camera, so they are laid out in view space
+        '  vec4 mvPosition = modelViewMatrix * vec4(labelPosition, 1.0);',
+        '  vec2 corner = vec2(glyphOffset + position.x * glyphWidth,',
+        '                     position.y * atlasCell);',
+        '  mvPosition.xy += corner * labelScale * labelVisible;',
+        '  gl_Position = projectionMatrix * mvPosition;',
+
+        '  float column = mod(glyphIndex, atlasGrid.x);',
+        '  float row = floor(glyphIndex / atlasGrid.x);',
+        '  vUv = vec2((column + uv.x * glyphWidth / atlasCell) / atlasGrid.x,',
+        '             1.0 - (row + 1.0 - uv.y) / atlasGrid.y);',
+        '}'
+      ].join('\n'),
+      fragmentShader: [
+        'uniform sampler2D atlas;',
+
+        'varying vec2 vUv;',
+        'varying vec3 vColor;',
+
+        'void main() {',
+        '  float alpha = texture2D(atlas, vUv).a;',
+        '  if (alpha < 0.05) discard;',
+        '  gl_FragColor = vec4(vColor, alpha);',
+        '}'
+      ].join('\n'),
+      transparent: true,
+      depthWrite: false
+    });
+
+    /**
+     * Mesh with the glyphs of all the labels.
+     * @type {THREE.Mesh}
+     */
+    this.mesh = new THREE.Mesh(geometry, material);
+
+    // instances are spread out across the scene and labels are not pickable
+    this.mesh.frustumCulled = false;
+    this.mesh.raycast = function() {};
+    this.add(this.mesh);
+
+    // until the collection is updated with a camera, all labels are shown
+    this._sync(_.range(this.labels.length));
+
+    return this;
+  }
+  EmperorLabelCollection.prototype = Object.create(THREE.Object3D.prototype);
+  EmperorLabelCollection.prototype.constructor = THREE.Object3D;
+
+  /**
+   *
+   * Cull the labels and update the glyphs.
+   *
+   * This method should be called before each frame is drawn.
+   *
+   * @param {THREE.Camera} camera The camera used to draw the scene.
+   * @param {Float} width The width of the drawing area in pixels.
+   * @param {Float} height The height of the drawing area in pixels.
+   *
+   */
+  EmperorLabelCollection.prototype.update = function(camera, width, height) {
+    var candidates = [], shown = [], grid = {}, cellSize = 64, scope = this;
+
+    this.updateWorldMatrix(true, false);
+    camera.updateMatrixWorld();
+    _matrix.multiplyMatrices(camera.matrixWorldInverse, this.matrixWorld);
+
+    _.each(this.labels, function(label, index) {
+      var size, depth, x, y, halfWidth, halfHeight;
+
+      if (!scope._isVisible(label)) {
+        return;
+      }
+
+      size = label.scale.y * scope._emRatio();
+
+      // the label's center and top-right corner in view space
+      _position.copy(label.position).applyMatrix4(_matrix);
+      depth = -_position.z;
+      _direction.set(_position.x + (label.width * size / 2),
+                     _position.y + (size / 2), _position.z);
+
+      _position.applyMatrix4(camera.projectionMatrix);
+      _direction.applyMatrix4(camera.projectionMatrix);
+
+      if (_position.z < -1 || _position.z > 1) {
+        return;
+      }
+
+      // bounding box in pixels
+      x = (_position.x + 1) * width / 2;
+      y = (1 - _position.y) * height / 2;
+      halfWidth = Math.abs(_direction.x - _position.x) * width / 2;
+      halfHeight = Math.abs(_direction.y - _position.y) * height / 2;
+
+      if (x + halfWidth < 0 || x - halfWidth > width ||
+          y + halfHeight < 0 || y - halfHeight > height) {
+        return;
+      }
+
+      candidates.push({index: index, depth: depth,
+                       left: x - halfWidth, right: x + halfWidth,
+                       top: y - halfHeight, bottom: y + halfHeight});
+    });
+
+    // labels closest to the camera take precedence
+    candidates = _.sortBy(candidates, 'depth');
+
+    _.find(candidates, function(box) {
+      var i, j, cells = [], overlaps = false;
+
+      if (scope.hideOverlapping) {
+        for (i = Math.floor(box.left / cellSize);
+             i <= Math.floor(box.right / cellSize); i++) {
+          for (j = Math.floor(box.top / cellSize);
+               j <= Math.floor(box.bottom / cellSize); j++) {
+            cells.push(i + ',' + j);
+          }
+        }
+
+        overlaps = _.some(cells, function(cell) {
+          return _.some(grid[cell], function(other) {
+            return box.left < other.right && other.left < box.right &&
+                   box.top < other.bottom && other.top < box.bottom;
+          });
+        });
+
+        if (overlaps) {
+          return false;
+        }
+
+        _.each(cells, function(cell) {
+          (grid[cell] = grid[cell] || []).push(box);
+        });
+      }
+
+      shown.push(box.index);
+
+      // stop once the density limit is reached
+      return shown.length >= scope.maxLabels;
+    });
+
+    this._sync(shown);
+  };
+
+  /**
+   *
+   * Write the state of the labels into the per-glyph attributes.
+   *
+   * @param {Integer[]} shown Indices of the labels that should be drawn, any
+   * other label is hidden.
+   *
+   * @private
+   */
+  EmperorLabelCollection.prototype._sync = function(shown) {
+    var attributes = this.mesh.geometry.attributes, scope = this, visible,
+        label, size, i, j;
+
+    visible = new Uint8Array(this.labels.length);
+    _.each(shown, function(index) {
+      visible[index] = 1;
+    });
+
+    for (i = 0; i < this.labels.length; i++) {
+      label = this.labels[i];
+      size = label.scale.y * this._emRatio();
+
+      for (j = this._offsets[i]; j < this._offsets[i + 1]; j++) {
+        attributes.labelPosition.setXYZ(j, label.position.x, label.position.y,
+                                        label.position.z);
+        attributes.labelColor.setXYZ(j, label.material.color.r,
+                                     label.material.color.g,
+                                     label.material.color.b);
+        attributes.labelScale.setX(j, size);
+        attributes.labelVisible.setX(j, visible[i] && this._isVisible(label));
+      }
+    }
+
+    _.each(['labelPosition', 'labelColor', 'labelScale', 'labelVisible'],
+           function(name) {
+      attributes[name].needsUpdate = true;
+    });
+  };
+
+  /**
+   *
+   * Whether a label and the object it is attached to are visible.
+   *
+   * @private
+   */
+  EmperorLabelCollection.prototype._isVisible = function(label) {
+    return label.visible && (label.parent === null || label.parent.visible);
+  };
+
+  /**
+   *
+   * Ratio between a label's font size and its height, the labels' `scale`
+   * includes padding to mirror the sprites created by makeLabel.
+   *
+   * @private
+   */
+  EmperorLabelCollection.prototype._emRatio = function() {
+    return LABEL_FONT_SIZE / THREE.Math.ceilPowerOfTwo(LABEL_FONT_SIZE);
+  };
+
+  /**
+   * Dispose of underlying objects
+   *
+   * The glyph atlas is shared with other collections and is not disposed.
+   */
+  EmperorLabelCollection.prototype.dispose = function() {
+    this.mesh.geometry.dispose();
+    this.mesh.material.dispose();
+    this.remove(this.mesh);
+    this.labels = [];
+  };
+
+  /**
+   *
+   * Create a collection of labels drawn in a single draw call.
+   *
+   * This function is specially useful when creating a lot of labels, see
+   * {@link EmperorLabelCollection}.
+   *
+   * @param {String[]} texts The text of each label.
+   * @param {integer|string} color Hexadecimal base that represents the color
+   * of the labels.
+   *
+   * @return {EmperorLabelCollection}
+   * @function makeLabelCollection
+   */
+  function makeLabelCollection(texts, color) {
+    return new EmperorLabelCollection(texts, color);
+  }
+
+  /**
+   *
+   * @class EmperorArrowCollection
+   *
+   * Draws a group of arrows using two THREE.InstancedMesh objects, one for
+   * all the shafts and one for all the heads. Regardless of the number of
+   * arrows only two draw calls are needed (plus one for the labels, see
+   * {@link EmperorLabelCollection}).
+   *
+   * Each arrow is represented by an {@link EmperorInstancedArrow}, these
+   * objects mirror the API of {@link EmperorArrowHelper} and are available in
+   * the `arrows` attribute.
+   *
+   * @param {Array[]} origins The x, y and z coordinates where each arrow
+   * originates from.
+   * @param {Array[]} targets The x, y and z coordinates where each arrow
+   * points to.
+   * @param {integer} color Hexadecimal base that specifies the color of the
+   * arrows.
+   * @param {String[]} names The text to be used in the label of each arrow.
+   *
+   * @return {EmperorArrowCollection}
+   * @extends THREE.Object3D
+   */
+  function EmperorArrowCollection(origins, targets, color, names) {
+    THREE.Object3D.call(this);
+
+    var count = origins.length, shaftGeometry, headGeometry, attribute;
+
+    // geometries with unit dimensions, the sizes and directions are set in
+    // the matrix of each instance (see setArrowAt). The shafts start at the
+    // origin and the heads end at the origin, both pointing towards +Y
+    shaftGeometry = new THREE.CylinderBufferGeometry(0.5, 0.5, 1, 6, 1);
+    shaftGeometry.translate(0, 0.5, 0);
+    headGeometry = new THREE.CylinderBufferGeometry(0, 0.5, 1, 6, 1);
+    headGeometry.translate(0, -0.5, 0);
+
+    // both meshes share the same per-instance attributes
+    attribute = new THREE.InstancedBufferAttribute(
+      new Float32Array(count * 3), 3);
+    shaftGeometry.setAttribute('instanceColor', attribute);
+    headGeometry.setAttribute('instanceColor', attribute);
+
+    attribute = new THREE.InstancedBufferAttribute(
+      new Float32Array(count), 1);
+    shaftGeometry.setAttribute('instanceOpacity', attribute);
+    headGeometry.setAttribute('instanceOpacity', attribute);
+
+    attribute = new THREE.InstancedBufferAttribute(
+      new Float32Array(count), 1);
+    shaftGeometry.setAttribute('instanceVisible', attribute);
+    headGeometry.setAttribute('instanceVisible', attribute);
+
+    /**
+     * Mesh with the shafts of the arrows.
+     * @type {THREE.InstancedMesh}
+     */
+    this.shafts = new THREE.InstancedMesh(shaftGeometry,
+                                          makeInstancedMaterial(), count);
+    /**
+     * Mesh with the heads of the arrows.
+     * @type {THREE.InstancedMesh}
+     */
+    this.heads = new THREE.InstancedMesh(headGeometry,
+                                         makeInstancedMaterial(), count);
+
+    // instances are spread out across the scene
+    this.shafts.frustumCulled = false;
+    this.heads.frustumCulled = false;
+
+    // raycasting is done by each arrow
+    this.shafts.raycast = function() {};
+    this.heads.raycast = function() {};
+
+    this.add(this.shafts);
+    this.add(this.heads);
+
+    /**
+     * Labels of the arrows.
+     * @type {EmperorLabelCollection}
+     */
+    this.labels = new EmperorLabelCollection(names, color);
+    this.add(this.labels);
+
+    /**
+     * Objects representing each arrow in the collection.
+     * @type {EmperorInstancedArrow[]}
+     */
+    this.arrows = [];
+
+    for (var i = 0; i < count; i++) {
+      this.arrows.push(new EmperorInstancedArrow(this, i, names[i], color));
+      this.setArrowAt(i, origins[i], targets[i]);
+    }
+
+    return this;
+  }
+  EmperorArrowCollection.prototype = Object.create(THREE.Object3D.prototype);
+  EmperorArrowCollection.prototype.constructor = THREE.Object3D;
+
+  /**
+   *
+   * Set the origin and target of an arrow in the collection.
+   *
+   * The proportions of the arrow follow THREE.ArrowHelper's defaults, the
+   * head's length is 20% of the arrow's length and the head's width is 20% of
+   * the head's length.
+   *
+   * @param {Integer} i The index of the arrow.
+   * @param {Float[]} origin The x, y and z coordinates where the arrow
+   * originates from.
+   * @param {Float[]} target The x, y and z coordinates where the arrow points
+   * to.
+   *
+   */
+  EmperorArrowCollection.prototype.setArrowAt = function(i, origin, target) {
+    var length, headLength, headWidth;
+
+    _origin.fromArray(origin);
+    _direction.fromArray(target).sub(_origin);
+
+    length = _direction.length();
+    headLength = 0.2 * length;
+    headWidth = 0.2 * headLength;
+
+    if (length > 0) {
+      _direction.divideScalar(length);
+    }
+    else {
+      _direction.set(0, 1, 0);
+    }
+    _quaternion.setFromUnitVectors(_up, _direction);
+
+    // the shaft is an order of magnitude thinner than the head
+    _scale.set(0.1 * headWidth, Math.max(0.0001, length - headLength),
+               0.1 * headWidth);
+    _matrix.compose(_origin, _quaternion, _scale);
+    this.shafts.setMatrixAt(i, _matrix);
+
+    _position.copy(_origin).addScaledVector(_direction, length);
+    _scale.set(headWidth, headLength, headWidth);
+    _matrix.compose(_position, _quaternion, _scale);
+    this.heads.setMatrixAt(i, _matrix);
+
+    this.shafts.instanceMatrix.needsUpdate = true;
+    this.heads.instanceMatrix.needsUpdate = true;
+
+    this.arrows[i].origin = origin;
+    this.arrows[i].label.position.copy(_position);
+  };
+
+  /**
+   *
+   * Set the color of an arrow in the collection.
+   *
+   * @param {Integer} i The index of the arrow.
+   * @param {THREE.Color} color The color to set.
+   *
+   */
+  EmperorArrowCollection.prototype.setColorAt = function(i, color) {
+    var attribute = this.heads.geometry.attributes.instanceColor;
+
+    attribute.setXYZ(i, color.r, color.g, color.b);
+    attribute.needsUpdate = true;
+  };
+
+  /**
+   *
+   * Set the opacity of an arrow in the collection.
+   *
+   * @param {Integer} i The index of the arrow.
+   * @param {Float} value The opacity value (from 0 to 1).
+   *
+   */
+  EmperorArrowCollection.prototype.setOpacityAt = function(i, value) {
+    var attribute = this.heads.geometry.attributes.instanceOpacity;
+
+    attribute.setX(i, value);
+    attribute.needsUpdate = true;
+
+    // webgl acts up with transparent objects, so the meshes are only made
+    // transparent once an arrow is not fully opaque
+    if (value !== 1) {
+      this.shafts.material.transparent = true;
+      this.heads.material.transparent = true;
+    }
+  };
+
+  /**
+   *
+   * Set the visibility of an arrow in the collection.
+   *
+   * @param {Integer} i The index of the arrow.
+   * @param {Boolean} visible Whether or not the arrow should be visible.
+   *
+   */
+  EmperorArrowCollection.prototype.setVisibleAt = function(i, visible) {
+    var attribute = this.heads.geometry.attributes.instanceVisible;
+
+    attribute.setX(i, visible * 1);
+    attribute.needsUpdate = true;
+  };
+
+  /**
+   * Dispose of underlying objects
+   */
+  EmperorArrowCollection.prototype.dispose = function() {
+    _.each(this.arrows, function(arrow) {
+      arrow.dispose();
+    });
+
+    this.shafts.material.dispose();
+    this.shafts.geometry.dispose();
+
+    this.heads.material.dispose();
+    this.heads.geometry.dispose();
+
+    this.labels.dispose();
+
+    this.remove(this.shafts);
+    this.remove(this.heads);
+    this.remove(this.labels);
+
+    this.arrows = [];
+  };
+
+  /**
+   *
+   * @class EmperorInstancedArrow
+   *
+   * Represents a single arrow in an {@link EmperorArrowCollection}. This
+   * object has the same methods as {@link EmperorArrowHelper} but it has no
+   * geometry of its own, only the arrow's label is a child of this object.
+   *
+   * @param {EmperorArrowCollection} collection The collection that draws
+   * this arrow.
+   * @param {Integer} index The index of this arrow in the collection.
+   * @param {String} name The text to be used in the label.
+   * @param {integer} color Hexadecimal base that specifies the color of the
+   * arrow.
+   *
+   * @return {EmperorInstancedArrow}
+   * @extends THREE.Object3D
+   */
+  function EmperorInstancedArrow(collection, index, name, color) {
+    THREE.Object3D.call(this);
+
+    /**
+     * The collection that draws this arrow.
+     * @type {EmperorArrowCollection}
+     */
+    this.collection = collection;
+
+    /**
+     * The index of this arrow in the collection.
+     * @type {Integer}
+     */
+    this.index = index;
+    this.name = name;
+
+    /**
+     * The x, y and z coordinates where the arrow originates from.
+     * @type {Float[]}
+     */
+    this.origin = [0, 0, 0];
+
+    /**
+     * Mirrors the material properties of a single arrow, the values are
+     * stored in the collection's per-instance attributes.
+     * @type {Object}
+     */
+    this.material = {color: new THREE.Color(color), opacity: 1.0,
+                     transparent: false};
+
+    this.label = collection.labels.labels[index];
+    this.add(this.label);
+
+    collection.setColorAt(index, this.material.color);
+    collection.setOpacityAt(index, 1.0);
+    collection.setVisibleAt(index, true);
+
+    return this;
+  }
+  EmperorInstancedArrow.prototype = Object.create(THREE.Object3D.prototype);
+  EmperorInstancedArrow.prototype.constructor = THREE.Object3D;
+
+  /**
+   * Whether or not the arrow is visible.
+   *
+   * Setting this property hides the arrow's instances in the collection.
+   */
+  Object.defineProperty(EmperorInstancedArrow.prototype, 'visible', {
+    get: function() {
+      return this._visible;
+    },
+    set: function(value) {
+      this._visible = value;
+
+      // THREE.Object3D sets this value before the collection is available
+      if (this.collection !== undefined) {
+        this.collection.setVisibleAt(this.index, value);
+      }
+    }
+  });
+
+  /**
+   *
+   * Check for ray casting with the arrow's head.
+   *
+   * Intersections are reported with this object (instead of the collection's
+   * mesh), so they can be resolved to a name.
+   *
+   */
+  EmperorInstancedArrow.prototype.raycast = function(raycaster, intersects) {
+    var heads = this.collection.heads, hits = [], scope = this;
+
+    heads.getMatrixAt(this.index, _matrix);
+
+    _raycastMesh.geometry = heads.geometry;
+    _raycastMesh.material = heads.material;
+    _raycastMesh.matrixWorld.multiplyMatrices(heads.matrixWorld, _matrix);
+
+    _raycastMesh.raycast(raycaster, hits);
+
+    _.each(hits, function(hit) {
+      hit.object = scope;
+      intersects.push(hit);
+    });
+  };
+
+  /**
+   *
+   * Set the arrow's color
+   *
+   * @param {THREE.Color} color The color to set for the arrow and label.
+   *
+   */
+  EmperorInstancedArrow.prototype.setColor = function(color) {
+    this.material.color.set(color);
+    this.collection.setColorAt(this.index, this.material.color);
+    this.label.material.color.set(color);
+  };
+
+  /**
+   *
+   * Get the arrow's color
+   *
+   * @return {THREE.Color} The color of the arrow.
+   *
+   */
+  EmperorInstancedArrow.prototype.getColor = function() {
+    return this.material.color;
+  };
+
+  /**
+   *
+   * Set the arrow's opacity
+   *
+   * @param {Float} value The opacity value (from 0 to 1).
+   *
+   */
+  EmperorInstancedArrow.prototype.setOpacity = function(value) {
+    this.material.opacity = value;
+    this.material.transparent = value !== 1;
+    this.collection.setOpacityAt(this.index, value);
+  };
+
+  /**
+   *
+   * Change the vector where the arrow points to
+   *
+   * @param {THREE.Vector3} target The vector where the arrow will point to.
+   * Note, the label will also change position.
+   *
+   */
+  EmperorInstancedArrow.prototype.setPointsTo = function(target) {
+    this.collection.setArrowAt(this.index, this.origin, target.toArray());
+  };
+
+  /**
+   * Dispose of underlying objects
+   */
+  EmperorInstancedArrow.prototype.dispose = function() {
+    if (this.label === null) {
+      return;
+    }
+
+    // the label is drawn by the collection, there's nothing else to release
+    this.remove(this.label);
+    this.label = null;
+  };
+
+  /**
+   *
+   * Create a collection of arrows drawn with instanced meshes.
+   *
+   * This function is specially useful when creating a lot of arrows, see
+   * {@link EmperorArrowCollection}.
+   *
+   * @param {Array[]} origins The x, y and z coordinates where each arrow
+   * originates from.
+   * @param {Array[]} targets The x, y and z coordinates where each arrow
+   * points to.
+   * @param {integer} color Hexadecimal base that specifies the color of the
+   * arrows.
+   * @param {String[]} names The text to be used in the label of each arrow,
+   * and the name of each arrow (used for raycasting).
+   *
+   * @return {EmperorArrowCollection}
+   * @function makeArrowCollection
+   */
+  function makeArrowCollection(origins, targets, color, names) {
+    return new EmperorArrowCollection(origins, targets, color, names);
+  }
+
   /**
    * Returns a new trajectory line dynamic mesh
    */
@@ -339,6 +1381,124 @@ define(['underscore', 'three', 'jquery'], function(_, THREE, $) {
     return new THREE.Mesh(lineGeometry, material);
   }
 
+  /**
+   *
+   * @class EmperorDynamicTubes
+   *
+   * Draws the moving end of every trajectory in an animation, i.e. the
+   * segment between the last sample that was reached and the current
+   * interpolated position (see
+   * TrajectoryOfSamples.representativeInterpolatedCoordinatesAtIndex).
+   *
+   * All the segments share a single open cylinder of unit length, the buffers
+   * are allocated once and each frame only updates the matrix of each
+   * instance, so there's a single draw call regardless of the number of
+   * trajectories and no geometries are created or disposed during playback.
+   *
+   * @param {TrajectoryOfSamples[]} trajectories The trajectories in the
+   * animation.
+   * @param {String[]} colors The CSS color of each trajectory.
+   * @param {Float} radius The radius of the tubes.
+   *
+   * @return {EmperorDynamicTubes}
+   * @extends THREE.InstancedMesh
+   */
+  function EmperorDynamicTubes(trajectories, colors, radius) {
+    var count = trajectories.length, geometry, attribute, color;
+
+    // the tube starts at the origin and points towards +Y
+    geometry = new THREE.CylinderBufferGeometry(radius, radius, 1,
+                                                NUM_TUBE_CROSS_SECTION_POINTS,
+                                                NUM_TUBE_SEGMENTS, true);
+    geometry.translate(0, 0.5, 0);
+
+    geometry.setAttribute('instanceColor', new THREE.InstancedBufferAttribute(
+      new Float32Array(count * 3), 3));
+    geometry.setAttribute('instanceOpacity', new THREE.InstancedBufferAttribute(
+      new Float32Array(count).fill(1), 1));
+    geometry.setAttribute('instanceVisible', new THREE.InstancedBufferAttribute(
+      new Float32Array(count), 1));
+
+    THREE.InstancedMesh.call(this, geometry, makeInstancedMaterial(), count);
+
+    /**
+     * The trajectories this object draws.
+     * @type {TrajectoryOfSamples[]}
+     */
+    this.trajectories = trajectories;
+
+    // instances are spread out across the scene
+    this.frustumCulled = false;
+
+    attribute = geometry.attributes.instanceColor;
+    color = new THREE.Color();
+    for (var i = 0; i < count; i++) {
+      color.set(colors[i]);
+      attribute.setXYZ(i, color.r, color.g, color.b);
+    }
+
+    return this;
+  }
+  EmperorDynamicTubes.prototype = Object.create(
+    THREE.InstancedMesh.prototype);
+  EmperorDynamicTubes.prototype.constructor = THREE.InstancedMesh;
+
+  /**
+   *
+   * Move the tubes to their position in a frame of the animation.
+   *
+   * Trajectories without a segment in this frame are hidden.
+   *
+   * @param {Integer} currentFrame The frame in the animation.
+   *
+   */
+  EmperorDynamicTubes.prototype.update = function(currentFrame) {
+    var visible = this.geometry.attributes.instanceVisible, trajectory,
+        segment, length;
+
+    for (var i = 0; i < this.trajectories.length; i++) {
+      trajectory = this.trajectories[i];
+      segment = trajectory.representativeInterpolatedCoordinatesAtIndex(
+        currentFrame);
+
+      if (segment === null) {
+        visible.setX(i, 0);
+        continue;
+      }
+
+      _origin.set(segment[0].x, segment[0].y, segment[0].z);
+      _direction.set(segment[1].x, segment[1].y, segment[1].z).sub(_origin);
+
+      length = _direction.length();
+      _quaternion.setFromUnitVectors(_up, _direction.divideScalar(length));
+      _scale.set(1, length, 1);
+
+      _matrix.compose(_origin, _quaternion, _scale);
+      this.setMatrixAt(i, _matrix);
+      visible.setX(i, 1);
+    }
+
+    visible.needsUpdate = true;
+    this.instanceMatrix.needsUpdate = true;
+  };
+
+  /**
+   *
+   * Create the tubes that follow the moving end of each trajectory in an
+   * animation, see {@link EmperorDynamicTubes}.
+   *
+   * @param {TrajectoryOfSamples[]} trajectories The trajectories in the
+   * animation.
+   * @param {String[]} colors The CSS color of each trajectory.
+   * @param {Float} radius The radius of the tubes.
+   *
+   * @return {EmperorDynamicTubes}
+   * @function makeDynamicTubes
+   */
+  function makeDynamicTubes(trajectories, colors, radius) {
+    return new EmperorDynamicTubes(trajectories, colors, radius);
+  }
+
   /**
    * Disposes a trajectory line dynamic mesh
    */
@@ -431,7 +1591,7 @@ define(['underscore', 'three', 'jquery'], function(_, THREE, $) {
    **/
   function makeLabel(position, text, color) {
     // the font size determines the resolution relative to the sprite object
-    var fontSize = 32, canvas, context, measure;
+    var fontSize = LABEL_FONT_SIZE, canvas, context, measure;
 
     canvas = document.createElement('canvas');
     context = canvas.getContext('2d');
@@ -521,10 +1681,15 @@ define(['underscore', 'three', 'jquery'], function(_, THREE, $) {
 
   return {'formatSVGLegend': formatSVGLegend, 'makeLine': makeLine,
           'makeLabel': makeLabel, 'makeArrow': makeArrow,
+          'makeArrowCollection': makeArrowCollection,
+          'makeLabelCollection': makeLabelCollection,
+          'getGlyphAtlas': getGlyphAtlas,
+          'makeInstancedMaterial': makeInstancedMaterial,
           'drawTrajectoryLineStatic': drawTrajectoryLineStatic,
           'disposeTrajectoryLineStatic': disposeTrajectoryLineStatic,
           'drawTrajectoryLineDynamic': drawTrajectoryLineDynamic,
           'disposeTrajectoryLineDynamic': disposeTrajectoryLineDynamic,
           'updateStaticTrajectoryDrawRange': updateStaticTrajectoryDrawRange,
+          'makeDynamicTubes': makeDynamicTubes,
           'makeLineCollection': makeLineCollection};
 });
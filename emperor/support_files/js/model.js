@@ -103,7 +103,9 @@ function($, _, util) {
    * - `ids` An array of strings where each string is a sample
    *   identifier
    * - `coords` A 2D Array of floats where each row contains the
-   *   coordinates of a sample. The rows are in ids order.
+   *   coordinates of a sample. The rows are in ids order. Alternatively,
+   *   an object with the encoded coordinates as described in
+   *   `DecompositionModel._decodeCoordinates`.
    * - `names` A 1D Array of strings where each element is the name of one of
    *   the dimensions in the model.
    * - `pct_var` An Array of floats where each position contains
@@ -114,9 +116,11 @@ function($, _, util) {
    *   coordinates of a sample. The rows are in ids order.
    * @param {float[]} md_headers An Array of string where each string is a
    * metadata column header
-   * @param {string[]} metadata A 2D Array of strings where each row contains
-   * the metadata values for a given sample. The rows are in ids order. The
-   * columns are in `md_headers` order.
+   * @param {string[]|Object} metadata A 2D Array of strings where each row
+   * contains the metadata values for a given sample. The rows are in ids
+   * order. The columns are in `md_headers` order. Alternatively, an object
+   * with typed metadata columns as described in
+   * `DecompositionModel._decodeMetadata`.
    *
    * @throws {Error} In any of the following cases:
    * - The number of coordinates does not match the number of samples.
@@ -165,6 +169,7 @@ function($, _, util) {
     if (coords === undefined) {
       throw new Error('Coordinates are required to initialize this object.');
     }
+    coords = DecompositionModel._decodeCoordinates(coords);
 
     /*
       Check that the number of coordinates set provided are the same as the
@@ -194,6 +199,54 @@ function($, _, util) {
                       this.percExpl.length + ' Num coord: ' + num_coords);
     }
 
+    /**
+     * Numeric metadata columns keyed by category name.
+     * @type {Object}
+     * @private
+     */
+    this._numericColumns = {};
+
+    /**
+     * Metadata columns that haven't been decoded, keyed by category name.
+     * Each value has the encoded `column` and the number of rows (`length`)
+     * in the column. See `loadCategory`.
+     * @type {Object}
+     * @private
+     */
+    this._deferredColumns = {};
+
+    /**
+     * Promises for the deferred columns that are being loaded, keyed by
+     * category name.
+     * @type {Object}
+     * @private
+     */
+    this._loadingColumns = {};
+
+    // typed columns are decoded into rows so that all the plottables share
+    // the same representation
+    if (!_.isArray(metadata)) {
+      var decoded = DecompositionModel._decodeMetadata(metadata);
+
+      _.each(decoded.numeric, function(values, idx) {
+        this._numericColumns[md_headers[idx]] = values;
+      }, this);
+      _.each(decoded.deferred, function(column, idx) {
+        this._deferredColumns[md_headers[idx]] = {'column': column,
+                                                  'length': metadata.length};
+      }, this);
+
+      metadata = decoded.rows;
+    }
+
+    /**
+     * Numeric values in a metadata category keyed by their string
+     * representation. Computed on demand (see `getNumericValuesByCategory`).
+     * @type {Object}
+     * @private
+     */
+    this._numericIndex = {};
+
     /*
       Check that we have the metadata for all samples
     */
@@ -240,6 +293,14 @@ function($, _, util) {
      */
     this.length = this.plottable.length;
 
+    /**
+     * Plottables grouped by their value in each metadata category, keyed by
+     * category name. Computed on demand (see `_getCategoryIndex`).
+     * @type {Object}
+     * @private
+     */
+    this._categoryIndex = {};
+
     /**
      * Number of dimensions in this decomposition model
      * @type {integer}
@@ -332,6 +393,44 @@ function($, _, util) {
     return md_idx;
   };
 
+  /**
+   *
+   * Group the plottables by their value in a metadata category.
+   *
+   * The groups are computed in a single pass over the plottables, and cached
+   * so that looking up the plottables for several values of the same category
+   * doesn't require scanning all the plottables for each value.
+   *
+   * @param {string} category A string with the metadata header.
+   *
+   * @return {Object} Mapping of values in the category to the plottables that
+   * have that value, in the same order as in `plottable`.
+   * @private
+   *
+   */
+  DecompositionModel.prototype._getCategoryIndex = function(category) {
+    var md_idx, index, value;
+
+    if (_.has(this._categoryIndex, category)) {
+      return this._categoryIndex[category];
+    }
+
+    md_idx = this._getMetadataIndex(category);
+    index = {};
+
+    for (var i = 0; i < this.plottable.length; i++) {
+      value = this.plottable[i].metadata[md_idx];
+
+      if (!_.has(index, value)) {
+        index[value] = [];
+      }
+      index[value].push(this.plottable[i]);
+    }
+
+    this._categoryIndex[category] = index;
+    return index;
+  };
+
   /**
    *
    * Retrieve all the plottable objects under the metadata header value.
@@ -346,10 +445,8 @@ function($, _, util) {
   DecompositionModel.prototype.getPlottablesByMetadataCategoryValue = function(
       category, value) {
 
-    var md_idx = this._getMetadataIndex(category);
-    var res = _.filter(this.plottable, function(pl) {
-      return pl.metadata[md_idx] === value;
-    });
+    var index = this._getCategoryIndex(category);
+    var res = _.has(index, value) ? index[value].slice() : [];
 
     if (res.length === 0) {
       throw new Error('The value ' + value +
@@ -377,6 +474,160 @@ function($, _, util) {
     return naturalSort(_.uniq(values));
   };
 
+  /**
+   *
+   * Whether or not the values of a metadata category are available
+   *
+   * @param {string} category A string with the metadata header.
+   *
+   * @return {Boolean} `false` if the category is deferred and hasn't been
+   * loaded, `true` otherwise.
+   *
+   */
+  DecompositionModel.prototype.isCategoryLoaded = function(category) {
+    return !_.has(this._deferredColumns, category);
+  };
+
+  /**
+   *
+   * Decode the values of a deferred metadata category
+   *
+   * The column is decompressed from the page, or fetched from its URL first,
+   * and the values are set in the metadata of each plottable.
+   *
+   * @param {string} category A string with the metadata header.
+   *
+   * @return {Promise} A jQuery promise that's resolved once the values are
+   * available, categories that are already loaded resolve immediately. If
+   * the values cannot be loaded, the promise is rejected with an `Error`.
+   *
+   */
+  DecompositionModel.prototype.loadCategory = function(category) {
+    var scope = this, deferred, column, text, fail;
+
+    if (this.isCategoryLoaded(category)) {
+      return $.Deferred().resolve().promise();
+    }
+    if (_.has(this._loadingColumns, category)) {
+      return this._loadingColumns[category];
+    }
+
+    deferred = $.Deferred();
+    column = this._deferredColumns[category];
+
+    if (column.column.url !== undefined) {
+      text = $.ajax({url: column.column.url, dataType: 'text'});
+    }
+    else {
+      text = $.Deferred().resolve(column.column.block);
+    }
+
+    fail = function(reason) {
+      delete scope._loadingColumns[category];
+      deferred.reject(new Error('Could not load the metadata category "' +
+                                category + '": ' + reason));
+    };
+
+    text.then(function(block) {
+      var inflated;
+
+      // decoding errors are thrown before the promise is created
+      try {
+        inflated = DecompositionModel._inflateColumn(block);
+      }
+      catch (error) {
+        fail(error.message);
+        return;
+      }
+
+      inflated.then(function(decoded) {
+        scope._setCategoryValues(category, decoded, column.length);
+        delete scope._loadingColumns[category];
+        deferred.resolve();
+      }, function(error) {
+        fail(error.message);
+      });
+    }, function(xhr, status, error) {
+      fail(error || status);
+    });
+
+    this._loadingColumns[category] = deferred.promise();
+    return this._loadingColumns[category];
+  };
+
+  /**
+   *
+   * Set the values of a deferred metadata category
+   *
+   * @param {string} category A string with the metadata header.
+   * @param {Object} column The encoded column, as described in
+   * `_decodeMetadata`.
+   * @param {integer} length The number of rows in the column, the values are
+   * repeated for the replicates of each sample.
+   * @private
+   *
+   */
+  DecompositionModel.prototype._setCategoryValues = function(category, column,
+                                                             length) {
+    var md_idx = this._getMetadataIndex(category), decoded, numeric;
+
+    decoded = DecompositionModel._decodeMetadata({'length': length,
+                                                  'columns': [column]});
+
+    for (var i = 0; i < this.plottable.length; i++) {
+      this.plottable[i].metadata[md_idx] = decoded.rows[i % length][0];
+    }
+
+    if (_.has(decoded.numeric, 0)) {
+      numeric = new decoded.numeric[0].constructor(this.plottable.length);
+      for (i = 0; i < this.plottable.length; i++) {
+        numeric[i] = decoded.numeric[0][i % length];
+      }
+      this._numericColumns[category] = numeric;
+    }
+
+    delete this._deferredColumns[category];
+    delete this._categoryIndex[category];
+    delete this._numericIndex[category];
+  };
+
+  /**
+   *
+   * Retrieve the numeric values for a given metadata category
+   *
+   * @param {string} category A string with the metadata header.
+   *
+   * @return {Object|null} Mapping of the values in the category (as shown in
+   * the metadata of the plottables) to their numeric value. Missing values are
+   * not included. If the category was not sent as a numeric column, `null` is
+   * returned.
+   *
+   */
+  DecompositionModel.prototype.getNumericValuesByCategory = function(
+      category) {
+    var md_idx = this._getMetadataIndex(category), values, lookup;
+
+    if (!_.has(this._numericColumns, category)) {
+      return null;
+    }
+
+    if (_.has(this._numericIndex, category)) {
+      return this._numericIndex[category];
+    }
+
+    values = this._numericColumns[category];
+    lookup = {};
+
+    for (var i = 0; i < values.length; i++) {
+      if (!isNaN(values[i])) {
+        lookup[this.plottable[i].metadata[md_idx]] = values[i];
+      }
+    }
+
+    this._numericIndex[category] = lookup;
+    return lookup;
+  };
+
   /**
    *
    * Method to determine if this is an arrow decomposition
@@ -412,7 +663,10 @@ function($, _, util) {
 
   /**
    *
-   * Transform observation names into plottable objects.
+   * Transform observation names or positions into plottable objects.
+   *
+   * @param {Array[]} edges An array of pairs, each pair has either the names
+   * of two observations or their positions in the model.
    *
    * @return {Array[]} An array of plottable pairs.
    * @private
@@ -430,8 +684,15 @@ function($, _, util) {
                         edge[0] + ' and ' + edge[1] + ')');
       }
 
-      u = scope.getPlottableByID(edge[0]);
-      v = scope.getPlottableByID(edge[1]);
+      // positions avoid looking up every name
+      if (_.isNumber(edge[0])) {
+        u = scope.plottable[edge[0]];
+        v = scope.plottable[edge[1]];
+      }
+      else {
+        u = scope.getPlottableByID(edge[0]);
+        v = scope.getPlottableByID(edge[1]);
+      }
 
       return [u, v];
     });
@@ -469,6 +730,262 @@ function($, _, util) {
     return accumulator;
   };
 
+  /**
+   *
+   * Decode the typed metadata columns sent by the Python API.
+   *
+   * @param {Object} metadata An object with a `length` attribute (the number
+   * of rows), and a `columns` array. Each column has a `dtype` attribute that
+   * describes how the column is encoded:
+   * - `float64` and `int32`, `values` is an array of numbers, missing values
+   *   are represented as `null`.
+   * - `category`, `categories` is an array of strings and `codes` is an array
+   *   with the position of the value of each row in `categories`.
+   * - `string`, `values` is an array of strings.
+   * - `replicate`, `categories` is an array of strings with one value per
+   *   replicate (see below).
+   * - `deferred`, the column is encoded in a compressed `block` or stored at
+   *   `url`, see `loadCategory`. The values are empty strings until the
+   *   column is loaded.
+   *
+   * Procrustes plots show the same samples once per ordination, so the
+   * metadata is only sent once and the optional `replicates` attribute says
+   * how many times the rows are repeated. In each replicate, the first column
+   * (the sample identifier) is suffixed with `_` and the replicate number,
+   * and `replicate` columns take the value for that replicate.
+   *
+   * @return {Object} An object with a `rows` attribute, a 2D Array of strings
+   * as expected by the constructor, a `numeric` attribute, an object
+   * with a typed array for every numeric column keyed by the column's index,
+   * and a `deferred` attribute, an object with the deferred columns keyed by
+   * the column's index.
+   *
+   * @throws {Error} If a column has an unknown `dtype`.
+   * @private
+   *
+   */
+  DecompositionModel._decodeMetadata = function(metadata) {
+    var rows = new Array(metadata.length), numeric = {}, deferred = {};
+    var column, values;
+    var i, j, r, format = DecompositionModel._formatNumber;
+    var replicates = metadata.replicates || 1, expanded, row;
+
+    for (i = 0; i < metadata.length; i++) {
+      rows[i] = new Array(metadata.columns.length);
+    }
+
+    for (j = 0; j < metadata.columns.length; j++) {
+      column = metadata.columns[j];
+
+      if (column.dtype === 'float64' || column.dtype === 'int32') {
+        if (column.dtype === 'float64') {
+          values = new Float64Array(metadata.length);
+        }
+        else {
+          values = new Int32Array(metadata.length);
+        }
+
+        for (i = 0; i < metadata.length; i++) {
+          if (column.values[i] === null) {
+            values[i] = NaN;
+            rows[i][j] = 'nan';
+          }
+          else {
+            values[i] = column.values[i];
+            rows[i][j] = format(column.values[i], column.dtype === 'float64');
+          }
+        }
+        numeric[j] = values;
+      }
+      else if (column.dtype === 'category') {
+        for (i = 0; i < metadata.length; i++) {
+          rows[i][j] = column.categories[column.codes[i]];
+        }
+      }
+      else if (column.dtype === 'string') {
+        for (i = 0; i < metadata.length; i++) {
+          rows[i][j] = column.values[i];
+        }
+      }
+      else if (column.dtype === 'deferred') {
+        for (i = 0; i < metadata.length; i++) {
+          rows[i][j] = '';
+        }
+        deferred[j] = column;
+      }
+      else if (column.dtype !== 'replicate') {
+        throw new Error('Unknown metadata column type: ' + column.dtype);
+      }
+    }
+
+    if (replicates === 1) {
+      return {'rows': rows, 'numeric': numeric, 'deferred': deferred};
+    }
+
+    expanded = new Array(metadata.length * replicates);
+    for (r = 0; r < replicates; r++) {
+      for (i = 0; i < metadata.length; i++) {
+        row = rows[i].slice();
+        row[0] = row[0] + '_' + r;
+
+        for (j = 0; j < metadata.columns.length; j++) {
+          if (metadata.columns[j].dtype === 'replicate') {
+            row[j] = metadata.columns[j].categories[r];
+          }
+        }
+        expanded[(r * metadata.length) + i] = row;
+      }
+    }
+
+    _.each(numeric, function(base, idx) {
+      values = new base.constructor(expanded.length);
+      for (r = 0; r < replicates; r++) {
+        values.set(base, r * metadata.length);
+      }
+      numeric[idx] = values;
+    });
+
+    return {'rows': expanded, 'numeric': numeric, 'deferred': deferred};
+  };
+
+  /**
+   *
+   * Decode a compressed metadata column.
+   *
+   * @param {string} block The column encoded as JSON, compressed with zlib and
+   * encoded with base64.
+   *
+   * @return {Promise} A promise that resolves to the column object.
+   * @private
+   *
+   */
+  DecompositionModel._inflateColumn = function(block) {
+    var stream;
+
+    if (typeof DecompressionStream === 'undefined') {
+      return Promise.reject(new Error('This browser cannot decompress the ' +
+                                      'metadata columns'));
+    }
+
+    stream = new Blob([DecompositionModel._decodeBase64(block)]).stream();
+    stream = stream.pipeThrough(new DecompressionStream('deflate'));
+    return new Response(stream).text().then(JSON.parse);
+  };
+
+  /**
+   *
+   * Decode a base64 string.
+   *
+   * @param {string} text The base64 encoded data.
+   *
+   * @return {Uint8Array} The decoded bytes.
+   * @private
+   *
+   */
+  DecompositionModel._decodeBase64 = function(text) {
+    var binary = atob(text), bytes = new Uint8Array(binary.length);
+
+    for (var i = 0; i < binary.length; i++) {
+      bytes[i] = binary.charCodeAt(i);
+    }
+    return bytes;
+  };
+
+  /**
+   *
+   * Decode the coordinates sent by the Python API.
+   *
+   * @param {Array|Object} coords A 2D Array of floats, or an object with the
+   * encoded coordinates. The object has a `dtype` (one of `float32`, `int16`
+   * or `uint16`), the `shape` of the matrix, and the little-endian values in
+   * row-major order encoded as base64 (`data`). Integer types are fixed point
+   * representations of each axis, and include a `scale` and an `offset` for
+   * each axis, such that the coordinate is `value * scale + offset`.
+   *
+   * @return {Array} A 2D Array of floats where each row contains the
+   * coordinates of a sample.
+   *
+   * @throws {Error} If the coordinates have an unknown `dtype`.
+   * @private
+   *
+   */
+  DecompositionModel._decodeCoordinates = function(coords) {
+    var types = {'float32': Float32Array, 'int16': Int16Array,
+                 'uint16': Uint16Array};
+    var values, rows, row, n, d, i, j, scale, offset;
+
+    if (_.isArray(coords)) {
+      return coords;
+    }
+
+    if (!_.has(types, coords.dtype)) {
+      throw new Error('Unknown coordinates type: ' + coords.dtype);
+    }
+
+    values = new types[coords.dtype](
+      DecompositionModel._decodeBase64(coords.data).buffer);
+    n = coords.shape[0];
+    d = coords.shape[1];
+    scale = coords.scale;
+    offset = coords.offset;
+
+    rows = new Array(n);
+    for (i = 0; i < n; i++) {
+      row = new Array(d);
+      for (j = 0; j < d; j++) {
+        row[j] = values[(i * d) + j];
+
+        if (scale !== undefined) {
+          row[j] = (row[j] * scale[j]) + offset[j];
+        }
+      }
+      rows[i] = row;
+    }
+
+    return rows;
+  };
+
+  /**
+   *
+   * Format a number the same way Python's `str` does.
+   *
+   * The metadata values are matched against the values the user specifies
+   * with the Python API, so numbers need to be written exactly as Python
+   * writes them.
+   *
+   * @param {Number} value The number to format.
+   * @param {Boolean} isFloat Whether the number is a floating point number,
+   * floats always include a decimal point or an exponent.
+   *
+   * @return {string} The formatted number.
+   * @private
+   *
+   */
+  DecompositionModel._formatNumber = function(value, isFloat) {
+    var parts, exponent, text;
+
+    if (!isFloat) {
+      return String(value);
+    }
+
+    // Python uses scientific notation for exponents smaller than -4 or larger
+    // than 15, JavaScript only does so past -7 and 20
+    parts = value.toExponential().split('e');
+    exponent = parseInt(parts[1]);
+
+    if (value !== 0 && (exponent < -4 || exponent >= 16)) {
+      text = Math.abs(exponent) < 10 ? '0' + Math.abs(exponent) :
+                                       String(Math.abs(exponent));
+      return parts[0] + 'e' + (exponent < 0 ? '-' : '+') + text;
+    }
+
+    text = String(value);
+    if (value === 0 && 1 / value < 0) {
+      text = '-0';
+    }
+    return text.indexOf('.') === -1 ? text + '.0' : text;
+  };
+
   /**
    *
    * Fix the names of the axes.
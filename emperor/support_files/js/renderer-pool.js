@@ -0,0 +1,459 @@
+define(['underscore', 'three'], function(_, THREE) {
+  /**
+   *
+   * @class RendererPool
+   *
+   * Owns a single off-screen WebGL context that is shared by every Emperor
+   * instance that opts into it. Browsers limit the number of live WebGL
+   * contexts per page (usually between 8 and 16), so documents with many
+   * plots (for example Jupyter notebooks) end up losing the oldest contexts.
+   *
+   * Each plot gets a {@link PooledRenderer} that draws into the shared
+   * context and copies (blits) the result into the plot's own 2D canvas.
+   * Plots that are scrolled out of the viewport are suspended, they don't
+   * render and their GPU buffers are released until they become visible
+   * again.
+   *
+   * @return {RendererPool}
+   * @constructs RendererPool
+   *
+   */
+  function RendererPool() {
+    /**
+     * The renderer whose context is shared by all the clients in the pool.
+     * @type {THREE.WebGLRenderer}
+     */
+    this.renderer = new THREE.WebGLRenderer({antialias: true});
+
+    /**
+     * Clients that are currently registered with this pool.
+     * @type {PooledRenderer[]}
+     */
+    this.clients = [];
+
+    /**
+     * Client whose size and flags are currently set in the shared renderer.
+     * @type {PooledRenderer}
+     * @private
+     */
+    this._bound = null;
+
+    /**
+     * Tracks the visibility of the clients' canvases, null if the browser
+     * does not implement IntersectionObserver (clients are never suspended).
+     * @type {IntersectionObserver}
+     * @private
+     */
+    this._observer = null;
+
+    var scope = this;
+    if (typeof IntersectionObserver !== 'undefined') {
+      this._observer = new IntersectionObserver(function(entries) {
+        _.each(entries, function(entry) {
+          var client = _.find(scope.clients, function(c) {
+            return c.domElement === entry.target;
+          });
+
+          if (client === undefined) {
+            return;
+          }
+
+          if (entry.isIntersecting) {
+            client.resume();
+          }
+          else {
+            client.suspend();
+          }
+        });
+      });
+    }
+  }
+
+  /**
+   *
+   * Create a new client renderer that draws through the shared context.
+   *
+   * @param {Object} [parameters] Parameters for the client, currently only
+   * `canvas` is supported (a 2D canvas to blit the output into).
+   *
+   * @return {PooledRenderer} A renderer with an API compatible with the
+   * subset of THREE.WebGLRenderer used in Emperor.
+   */
+  RendererPool.prototype.register = function(parameters) {
+    var client = new PooledRenderer(this, parameters);
+
+    this.clients.push(client);
+
+    if (this._observer !== null) {
+      this._observer.observe(client.domElement);
+    }
+
+    return client;
+  };
+
+  /**
+   *
+   * Remove a client from the pool and release its resources.
+   *
+   * @param {PooledRenderer} client The client to remove.
+   */
+  RendererPool.prototype.unregister = function(client) {
+    if (this._observer !== null) {
+      this._observer.unobserve(client.domElement);
+    }
+
+    client.suspend();
+    this.clients = _.without(this.clients, client);
+
+    if (this._bound === client) {
+      this._bound = null;
+    }
+  };
+
+  /**
+   *
+   * Make the shared renderer match a client's size and flags.
+   *
+   * This is a no-op if the client is already bound, so that calls to
+   * `setViewport` made by the client are not reset.
+   *
+   * @param {PooledRenderer} client The client that is about to draw.
+   * @private
+   */
+  RendererPool.prototype._bind = function(client) {
+    if (this._bound === client && !client._dirty) {
+      return;
+    }
+
+    this.renderer.setPixelRatio(client._pixelRatio);
+    this.renderer.setSize(client._width, client._height, false);
+    this.renderer.autoClear = client.autoClear;
+    this.renderer.sortObjects = client.sortObjects;
+
+    client._dirty = false;
+    this._bound = client;
+  };
+
+  /**
+   *
+   * @class PooledRenderer
+   *
+   * Stand-in for a THREE.WebGLRenderer that draws using a shared context, see
+   * {@link RendererPool}. The `domElement` attribute is a 2D canvas that
+   * holds a copy of the last frame, event handlers and controls can be
+   * attached to it as they would to a WebGL canvas.
+   *
+   * @param {RendererPool} pool The pool that owns the shared context.
+   * @param {Object} [parameters] See {@link RendererPool.register}.
+   *
+   * @return {PooledRenderer}
+   * @constructs PooledRenderer
+   *
+   */
+  function PooledRenderer(pool, parameters) {
+    parameters = parameters || {};
+
+    /**
+     * The pool this renderer belongs to.
+     * @type {RendererPool}
+     */
+    this.pool = pool;
+
+    /**
+     * Canvas where the frames are copied to.
+     * @type {Node}
+     */
+    this.domElement = parameters.canvas || document.createElement('canvas');
+
+    /**
+     * 2D context of the `domElement`.
+     * @type {CanvasRenderingContext2D}
+     * @private
+     */
+    this._context = this.domElement.getContext('2d');
+
+    /**
+     * Whether or not the plot is out of the browser's viewport. While
+     * suspended, calls to `clear` and `render` are ignored.
+     * @type {Boolean}
+     */
+    this.suspended = false;
+
+    /**
+     * Callback executed when the plot becomes visible after being suspended.
+     * Consumers should use this to schedule a new frame.
+     * @type {Function}
+     */
+    this.onResume = null;
+
+    /**
+     * Same as THREE.WebGLRenderer.autoClear.
+     * @type {Boolean}
+     */
+    this.autoClear = true;
+
+    /**
+     * Same as THREE.WebGLRenderer.sortObjects.
+     * @type {Boolean}
+     */
+    this.sortObjects = true;
+
+    /**
+     * Scenes that have been rendered by this client, used to release their
+     * buffers when the client is suspended.
+     * @type {THREE.Scene[]}
+     * @private
+     */
+    this._scenes = [];
+
+    this._width = this.domElement.width;
+    this._height = this.domElement.height;
+    this._pixelRatio = 1;
+    this._dirty = true;
+  }
+
+  /**
+   *
+   * Set the size of the output canvas.
+   *
+   * @param {Float} width The width of the canvas.
+   * @param {Float} height The height of the canvas.
+   * @param {Boolean} [updateStyle = true] Whether or not to update the CSS
+   * dimensions of the canvas.
+   */
+  PooledRenderer.prototype.setSize = function(width, height, updateStyle) {
+    this._width = width;
+    this._height = height;
+
+    this.domElement.width = Math.floor(width * this._pixelRatio);
+    this.domElement.height = Math.floor(height * this._pixelRatio);
+
+    if (updateStyle !== false) {
+      this.domElement.style.width = width + 'px';
+      this.domElement.style.height = height + 'px';
+    }
+
+    this._dirty = true;
+  };
+
+  /**
+   *
+   * Get the size of the output canvas.
+   *
+   * @param {THREE.Vector2} target Object where the size is stored.
+   *
+   * @return {THREE.Vector2} The width and height of the canvas.
+   */
+  PooledRenderer.prototype.getSize = function(target) {
+    return target.set(this._width, this._height);
+  };
+
+  /**
+   *
+   * Set the device pixel ratio.
+   *
+   * @param {Float} value The pixel ratio.
+   */
+  PooledRenderer.prototype.setPixelRatio = function(value) {
+    this._pixelRatio = value;
+    this.setSize(this._width, this._height, false);
+  };
+
+  /**
+   *
+   * Get the device pixel ratio.
+   *
+   * @return {Float} The pixel ratio.
+   */
+  PooledRenderer.prototype.getPixelRatio = function() {
+    return this._pixelRatio;
+  };
+
+  /**
+   *
+   * Set the viewport in the shared context.
+   *
+   * @param {Float} x Horizontal position of the viewport.
+   * @param {Float} y Vertical position of the viewport.
+   * @param {Float} width Width of the viewport.
+   * @param {Float} height Height of the viewport.
+   */
+  PooledRenderer.prototype.setViewport = function(x, y, width, height) {
+    this.pool._bind(this);
+    this.pool.renderer.setViewport(x, y, width, height);
+  };
+
+  /**
+   *
+   * Clear the shared context.
+   *
+   * @param {Boolean} [color] Whether to clear the color buffer.
+   * @param {Boolean} [depth] Whether to clear the depth buffer.
+   * @param {Boolean} [stencil] Whether to clear the stencil buffer.
+   */
+  PooledRenderer.prototype.clear = function(color, depth, stencil) {
+    if (this.suspended) {
+      return;
+    }
+
+    this.pool._bind(this);
+    this.pool.renderer.clear(color, depth, stencil);
+  };
+
+  /**
+   *
+   * Render a scene in the shared context and copy the result into
+   * `domElement`.
+   *
+   * @param {THREE.Scene} scene The scene to render.
+   * @param {THREE.Camera} camera The camera to render the scene with.
+   */
+  PooledRenderer.prototype.render = function(scene, camera) {
+    if (this.suspended) {
+      return;
+    }
+
+    if (!_.contains(this._scenes, scene)) {
+      this._scenes.push(scene);
+    }
+
+    this.pool._bind(this);
+    this.pool.renderer.render(scene, camera);
+
+    // only blit the frame when drawing to the screen, render targets are
+    // read back by the caller
+    if (this.pool.renderer.getRenderTarget() === null) {
+      this._blit();
+    }
+  };
+
+  /**
+   *
+   * Set the active render target in the shared context.
+   *
+   * @param {THREE.WebGLRenderTarget} target The target, or null to draw to
+   * the shared canvas.
+   */
+  PooledRenderer.prototype.setRenderTarget = function(target) {
+    this.pool._bind(this);
+    this.pool.renderer.setRenderTarget(target);
+  };
+
+  /**
+   *
+   * Get the active render target in the shared context.
+   *
+   * @return {THREE.WebGLRenderTarget} The active target or null.
+   */
+  PooledRenderer.prototype.getRenderTarget = function() {
+    return this.pool.renderer.getRenderTarget();
+  };
+
+  /**
+   *
+   * Read pixels from a render target, see
+   * THREE.WebGLRenderer.readRenderTargetPixels.
+   */
+  PooledRenderer.prototype.readRenderTargetPixels = function(target, x, y,
+                                                             width, height,
+                                                             buffer) {
+    this.pool.renderer.readRenderTargetPixels(target, x, y, width, height,
+                                              buffer);
+  };
+
+  /**
+   *
+   * Get the shared WebGL context.
+   *
+   * @return {WebGLRenderingContext} The shared context.
+   */
+  PooledRenderer.prototype.getContext = function() {
+    return this.pool.renderer.getContext();
+  };
+
+  /**
+   *
+   * Copy the contents of the shared canvas into `domElement`.
+   *
+   * @private
+   */
+  PooledRenderer.prototype._blit = function() {
+    var source = this.pool.renderer.domElement;
+
+    this._context.clearRect(0, 0, this.domElement.width,
+                            this.domElement.height);
+    this._context.drawImage(source, 0, 0, this.domElement.width,
+                            this.domElement.height, 0, 0,
+                            this.domElement.width, this.domElement.height);
+  };
+
+  /**
+   *
+   * Stop rendering and release the GPU buffers of the rendered scenes.
+   *
+   * The geometries are kept in memory, THREE.js uploads them again the next
+   * time they are rendered.
+   */
+  PooledRenderer.prototype.suspend = function() {
+    if (this.suspended) {
+      return;
+    }
+    this.suspended = true;
+
+    _.each(this._scenes, function(scene) {
+      scene.traverse(function(object) {
+        if (object.geometry !== undefined) {
+          object.geometry.dispose();
+        }
+      });
+    });
+  };
+
+  /**
+   *
+   * Resume rendering after a call to `suspend`.
+   */
+  PooledRenderer.prototype.resume = function() {
+    if (!this.suspended) {
+      return;
+    }
+    this.suspended = false;
+    this._dirty = true;
+
+    if (this.onResume !== null) {
+      this.onResume();
+    }
+  };
+
+  /**
+   *
+   * Remove this renderer from its pool.
+   */
+  PooledRenderer.prototype.dispose = function() {
+    this.pool.unregister(this);
+  };
+
+  /**
+   * Pool shared by all the plots in the page (created on demand).
+   * @type {RendererPool}
+   * @private
+   */
+  var _sharedPool = null;
+
+  /**
+   *
+   * Get the pool shared by all the plots in the page.
+   *
+   * @return {RendererPool} The shared pool.
+   */
+  function getSharedPool() {
+    if (_sharedPool === null) {
+      _sharedPool = new RendererPool();
+    }
+    return _sharedPool;
+  }
+
+  return {'RendererPool': RendererPool,
+          'PooledRenderer': PooledRenderer,
+          'getSharedPool': getSharedPool};
+});
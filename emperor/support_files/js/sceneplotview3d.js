@@ -89,6 +89,14 @@ define([
      */
     this.visibleDimensions = _.clone(this.decViews.scatter.visibleDimensions);
 
+    /**
+     * Label collections in the scene, these are culled against the camera
+     * before each frame is drawn.
+     * @type {EmperorLabelCollection[]}
+     * @private
+     */
+    this._labelCollections = [];
+
     // used to name the axis lines/labels in the scene
     this._axisPrefix = 'emperor-axis-line-';
     this._axisLabelPrefix = 'emperor-axis-label-';
@@ -134,6 +142,32 @@ define([
     this._raycaster = new THREE.Raycaster();
     this._mouse = new THREE.Vector2();
 
+    /**
+     * Position (in pixels) where the current box selection started.
+     * @type {THREE.Vector2}
+     * @private
+     */
+    this._selectionStart = new THREE.Vector2();
+
+    /**
+     * Offscreen buffer where pickable objects are rendered with a color that
+     * encodes their index, see _gpuPick.
+     * @type {THREE.WebGLRenderTarget}
+     * @private
+     */
+    this._pickingTarget = new THREE.WebGLRenderTarget(1, 1, {
+      minFilter: THREE.NearestFilter,
+      magFilter: THREE.NearestFilter
+    });
+
+    /**
+     * Offscreen buffer where each tile of a high resolution image is
+     * rendered, see renderTiled. Created on demand and reused.
+     * @type {THREE.WebGLRenderTarget}
+     * @private
+     */
+    this._tileTarget = null;
+
     /**
      * Special purpose group for points that are selectable with the
      * SelectionBox.
@@ -434,6 +468,12 @@ define([
           marker.label.scale.set(marker.label.scale.x * scaling,
                                  marker.label.scale.y * scaling, 1);
           this.scene.add(marker);
+
+          // the geometry of all the arrows is drawn by their collection
+          if (marker.collection.parent !== this.scene) {
+            this.scene.add(marker.collection);
+            this._labelCollections.push(marker.collection.labels);
+          }
         }
         else {
           this._selectable.add(marker);
@@ -834,10 +874,23 @@ define([
 
           if (isArrowType) {
             marker.dispose();
+
+            // the collection is shared by all the arrows, only release it
+            // once
+            if (marker.collection.arrows.length) {
+              scope._labelCollections = _.without(scope._labelCollections,
+                                                  marker.collection.labels);
+              group.remove(marker.collection);
+              marker.collection.dispose();
+            }
           }
           else {
             marker.material.dispose();
             marker.geometry.dispose();
+
+            if (marker.userData.pickingMaterial !== undefined) {
+              marker.userData.pickingMaterial.dispose();
+            }
           }
         }
 
@@ -854,6 +907,11 @@ define([
             if (isArrowType) {
               marker.label.scale.set(marker.label.scale.x * scaling,
                                      marker.label.scale.y * scaling, 1);
+
+              if (marker.collection.parent !== group) {
+                group.add(marker.collection);
+                scope._labelCollections.push(marker.collection.labels);
+              }
             }
             group.add(marker);
           }
@@ -959,9 +1017,15 @@ define([
    *
    */
   ScenePlotView3D.prototype.render = function() {
+    var camera = this.camera, scope = this;
+
+    // only draw labels that are on screen and that don't overlap
+    _.each(this._labelCollections, function(labels) {
+      labels.update(camera, scope.width, scope.height);
+    });
+
     this.renderer.setViewport(this.xView, this.yView, this.width, this.height);
     this.renderer.render(this.scene, this.camera);
-    var camera = this.camera;
 
     // if autorotation is enabled, then update the controls
     if (this.control.autoRotate) {
@@ -984,6 +1048,347 @@ define([
     });
   };
 
+  /**
+   *
+   * Render the scene into an image larger than the view.
+   *
+   * The image is split into tiles, each tile is rendered offscreen (by
+   * offsetting the camera's frustum) and copied into a 2D canvas. This makes
+   * it possible to produce images larger than the maximum size of a WebGL
+   * buffer, for example poster-size figures of large point clouds.
+   *
+   * @param {Float} [scale = 1] Size of the image relative to the size of the
+   * view.
+   * @param {Integer} [tileSize = 1024] Maximum width and height of the tiles
+   * (in pixels), this is further limited by the GPU's maximum texture size.
+   *
+   * @return {Node} A canvas with the rendered image.
+   */
+  ScenePlotView3D.prototype.renderTiled = function(scale, tileSize) {
+    var scope = this, camera = this.camera, gl = this.renderer.getContext(),
+        width, height, canvas, context, image, buffer, target, w, h, row;
+
+    scale = scale || 1;
+    tileSize = Math.min(tileSize || 1024,
+                        gl.getParameter(gl.MAX_TEXTURE_SIZE),
+                        gl.getParameter(gl.MAX_RENDERBUFFER_SIZE));
+
+    width = Math.round(this.width * scale);
+    height = Math.round(this.height * scale);
+
+    canvas = document.createElement('canvas');
+    canvas.width = width;
+    canvas.height = height;
+    context = canvas.getContext('2d');
+
+    if (this._tileTarget === null) {
+      this._tileTarget = new THREE.WebGLRenderTarget(tileSize, tileSize);
+    }
+    target = this._tileTarget;
+    target.setSize(tileSize, tileSize);
+
+    image = context.createImageData(tileSize, tileSize);
+    buffer = new Uint8Array(tileSize * tileSize * 4);
+
+    // labels are laid out once for the whole image, laying them out for each
+    // tile would produce different results on each side of the tile edges
+    _.each(this._labelCollections, function(labels) {
+      labels.update(camera, scope.width, scope.height);
+    });
+
+    // points are sized in pixels, so they have to grow with the image
+    this._setPointScale(scale);
+
+    for (var y = 0; y < height; y += tileSize) {
+      for (var x = 0; x < width; x += tileSize) {
+        w = Math.min(tileSize, width - x);
+        h = Math.min(tileSize, height - y);
+
+        camera.setViewOffset(width, height, x, y, w, h);
+        target.viewport.set(0, 0, w, h);
+
+        this.renderer.setRenderTarget(target);
+        this.renderer.clear();
+        this.renderer.render(this.scene, camera);
+        this.renderer.setRenderTarget(null);
+
+        this.renderer.readRenderTargetPixels(target, 0, 0, w, h, buffer);
+
+        // the buffer's origin is at the bottom left corner
+        for (row = 0; row < h; row++) {
+          image.data.set(buffer.subarray((h - row - 1) * w * 4,
+                                         (h - row) * w * 4),
+                         row * tileSize * 4);
+        }
+        context.putImageData(image, x, y, 0, 0, w, h);
+      }
+    }
+
+    camera.clearViewOffset();
+    target.viewport.set(0, 0, tileSize, tileSize);
+    this._setPointScale(1);
+
+    this.needsUpdate = true;
+
+    return canvas;
+  };
+
+  /**
+   *
+   * Set the size of the points in point clouds relative to their default.
+   *
+   * @param {Float} scale The relative size of the points.
+   * @private
+   */
+  ScenePlotView3D.prototype._setPointScale = function(scale) {
+    _.each(this.decViews, function(view) {
+      _.each(view.markers, function(marker) {
+        if (marker.isPoints && marker.material.uniforms !== undefined &&
+            marker.material.uniforms.pointScale !== undefined) {
+          marker.material.uniforms.pointScale.value = scale;
+        }
+      });
+    });
+  };
+
+  /**
+   * Layer used to render the pickable objects into the picking buffer.
+   * @type {Integer}
+   * @private
+   */
+  ScenePlotView3D.prototype._PICKING_LAYER = 1;
+
+  /**
+   * Number of pixels around the cursor that are searched when picking a
+   * single object, this makes it easier to click on small points and lines.
+   * @type {Integer}
+   * @private
+   */
+  ScenePlotView3D.prototype._PICKING_TOLERANCE = 3;
+
+  /**
+   *
+   * Whether or not objects are picked by reading back an offscreen buffer
+   * rendered by the GPU (as opposed to raycasting).
+   *
+   * Raycasting is a linear scan over every vertex, which is too slow for
+   * point clouds and parallel plots. Both of these use a single shader-based
+   * object per decomposition, so they can be rendered into the picking
+   * buffer.
+   *
+   * @return {Boolean} True if GPU picking is used, false otherwise.
+   * @private
+   */
+  ScenePlotView3D.prototype._usesGPUPicking = function() {
+    return (this.UIState.getProperty('view.usesPointCloud') ||
+            this.UIState.getProperty('view.viewType') === 'parallel-plot');
+  };
+
+  /**
+   *
+   * Get (or create) the material used to render an object into the picking
+   * buffer.
+   *
+   * Each vertex is drawn with a flat color that encodes its index (plus an
+   * offset so that indices are unique across objects). Vertices that are not
+   * visible or that are fully transparent are discarded.
+   *
+   * @param {THREE.Points|THREE.LineSegments} object The object to render.
+   *
+   * @return {THREE.ShaderMaterial} The picking material.
+   * @private
+   */
+  ScenePlotView3D.prototype._pickingMaterial = function(object) {
+    var geometry = object.geometry, ids, material;
+
+    // WebGL1 has no gl_VertexID so the index is added as an attribute, note
+    // a float represents integers exactly up to 2^24
+    if (geometry.attributes.pickId === undefined) {
+      ids = new Float32Array(geometry.attributes.position.count);
+      for (var i = 0; i < ids.length; i++) {
+        ids[i] = i;
+      }
+      geometry.setAttribute('pickId', new THREE.BufferAttribute(ids, 1));
+    }
+
+    if (object.userData.pickingMaterial !== undefined) {
+      return object.userData.pickingMaterial;
+    }
+
+    var vertexShader = [
+      'attribute float pickId;',
+      'attribute float opacity;',
+      'attribute float visible;',
+      '#ifdef PICK_POINTS',
+      'attribute float scale;',
+      '#endif',
+
+      'uniform float offset;',
+
+      'varying vec3 vId;',
+      'varying float vVisible;',
+
+      'void main() {',
+      '  float id = pickId + offset + 1.0;',
+
+      // 24 bits of the identifier are spread across the RGB channels
+      '  vId = vec3(mod(id, 256.0), mod(floor(id / 256.0), 256.0),',
+      '             floor(id / 65536.0)) / 255.0;',
+      '  vVisible = visible * step(0.0001, opacity);',
+
+      '  vec4 mvPosition = modelViewMatrix * vec4(position, 1.0);',
+      '  gl_Position = projectionMatrix * mvPosition;',
+      '#ifdef PICK_POINTS',
+      '  gl_PointSize = kSIZE * scale * (800.0 / length(mvPosition.xyz));',
+      '#endif',
+      '}'].join('\n');
+
+    var fragmentShader = [
+      'precision highp float;',
+      'varying vec3 vId;',
+      'varying float vVisible;',
+
+      'void main() {',
+      '  if (vVisible <= 0.0) discard;',
+      '#ifdef PICK_POINTS',
+      '  vec2 cxy = 2.0 * gl_PointCoord - 1.0;',
+      '  if (dot(cxy, cxy) > 1.0) discard;',
+      '#endif',
+      '  gl_FragColor = vec4(vId, 1.0);',
+      '}'].join('\n');
+
+    material = new THREE.ShaderMaterial({
+      vertexShader: vertexShader,
+      fragmentShader: fragmentShader,
+      uniforms: {offset: {value: 0}},
+      blending: THREE.NoBlending
+    });
+
+    if (object.isPoints) {
+      material.defines.PICK_POINTS = 1;
+      material.defines.kSIZE = object.material.defines.kSIZE;
+    }
+
+    object.userData.pickingMaterial = material;
+
+    return material;
+  };
+
+  /**
+   *
+   * Find the pickable objects under a rectangle of the view.
+   *
+   * Instead of raycasting, the pickable objects are rendered into an
+   * offscreen buffer (only the requested rectangle), with each vertex
+   * colored by its index. The buffer is then read back and decoded. Only the
+   * closest vertex to the camera is reported for each pixel.
+   *
+   * @param {Float} x Horizontal position of the rectangle (in pixels, from the
+   * left edge of the canvas).
+   * @param {Float} y Vertical position of the rectangle (in pixels, from the
+   * top edge of the canvas).
+   * @param {Float} width Width of the rectangle.
+   * @param {Float} height Height of the rectangle.
+   *
+   * @return {Object[]} Unique hits sorted by their distance to the center of
+   * the rectangle. Each hit has an `object` attribute (the rendered object),
+   * an `index` attribute (the vertex index in the object) and a `view`
+   * attribute (the DecompositionView the object belongs to).
+   * @private
+   */
+  ScenePlotView3D.prototype._gpuPick = function(x, y, width, height) {
+    var scope = this, pickable = [], offset = 0, hits = [], seen = {};
+
+    x = Math.max(Math.floor(x), 0);
+    y = Math.max(Math.floor(y), 0);
+    width = Math.min(Math.max(Math.ceil(width), 1), this.width - x);
+    height = Math.min(Math.max(Math.ceil(height), 1), this.height - y);
+
+    if (width <= 0 || height <= 0) {
+      return hits;
+    }
+
+    _.each(this.decViews, function(view) {
+      _.each(view.markers, function(marker) {
+        if ((marker.isPoints || marker.isLineSegments) &&
+            marker.geometry.attributes.visible !== undefined) {
+          pickable.push({object: marker, view: view, offset: offset,
+                         material: marker.material});
+          offset += marker.geometry.attributes.position.count;
+        }
+      });
+    });
+
+    if (pickable.length === 0) {
+      return hits;
+    }
+
+    // swap the materials and only render the pickable objects
+    _.each(pickable, function(item) {
+      var material = scope._pickingMaterial(item.object);
+      material.uniforms.offset.value = item.offset;
+
+      item.object.material = material;
+      item.object.layers.enable(scope._PICKING_LAYER);
+    });
+
+    var background = this.scene.background, camera = this.camera;
+    this.scene.background = null;
+    camera.layers.set(this._PICKING_LAYER);
+
+    // only render the pixels we are interested in
+    camera.setViewOffset(this.width, this.height, x, y, width, height);
+    this._pickingTarget.setSize(width, height);
+
+    this.renderer.setRenderTarget(this._pickingTarget);
+    this.renderer.clear();
+    this.renderer.render(this.scene, camera);
+    this.renderer.setRenderTarget(null);
+
+    var buffer = new Uint8Array(width * height * 4);
+    this.renderer.readRenderTargetPixels(this._pickingTarget, 0, 0, width,
+                                         height, buffer);
+
+    // restore the state of the scene
+    camera.clearViewOffset();
+    camera.layers.set(0);
+    this.scene.background = background;
+
+    _.each(pickable, function(item) {
+      item.object.material = item.material;
+      item.object.layers.disable(scope._PICKING_LAYER);
+    });
+
+    var cx = (width - 1) / 2, cy = (height - 1) / 2, id, i, j, k, p;
+    for (i = 0; i < width * height; i++) {
+      p = i * 4;
+      id = buffer[p] + (buffer[p + 1] << 8) + (buffer[p + 2] << 16);
+
+      if (id === 0 || seen[id] !== undefined) {
+        continue;
+      }
+
+      // the buffer's origin is at the bottom left corner
+      j = i % width;
+      k = height - 1 - Math.floor(i / width);
+      seen[id] = true;
+      hits.push({id: id - 1,
+                 distance: (j - cx) * (j - cx) + (k - cy) * (k - cy)});
+    }
+
+    hits = _.sortBy(hits, 'distance');
+
+    return _.map(hits, function(hit) {
+      var item = _.find(pickable, function(candidate) {
+        return hit.id >= candidate.offset &&
+               hit.id < (candidate.offset +
+                         candidate.object.geometry.attributes.position.count);
+      });
+      return {object: item.object, index: hit.id - item.offset,
+              view: item.view};
+    });
+  };
+
   /**
    * Helper method to highlight and return selected objects.
    *
@@ -1090,6 +1495,8 @@ define([
         ((event.clientX - offset.left) / element.width) * 2 - 1,
         -((event.clientY - offset.top) / element.height) * 2 + 1,
         0.5);
+      scope._selectionStart.set(event.clientX - offset.left,
+                                event.clientY - offset.top);
     })
     .on('mousemove', function(event) {
       // ignore if the user is not holding the shift key or the orbit control
@@ -1109,7 +1516,7 @@ define([
 
       // reset everything before updating the selected color
       scope._highlightSelected(scope._selectionBox.collection, 0x000000);
-      scope._highlightSelected(scope._selectionBox.select(), 0x8c8c8f);
+      scope._highlightSelected(scope._boxSelect(event), 0x8c8c8f);
 
       scope.needsUpdate = true;
     })
@@ -1128,7 +1535,7 @@ define([
           - ((event.clientY - offset.top) / element.height) * 2 + 1,
           0.5);
 
-        selected = scope._highlightSelected(scope._selectionBox.select(),
+        selected = scope._highlightSelected(scope._boxSelect(event),
                                             0x8c8c8f);
 
         // get the list of sample names from the views
@@ -1175,6 +1582,47 @@ define([
   };
 
 
+  /**
+   *
+   * Select the objects inside the selection box.
+   *
+   * The selection box spans from the position where the selection started to
+   * the current position of the mouse. When GPU picking is used, only the
+   * visible points (the ones closest to the camera) are selected.
+   *
+   * @param {event} event The event from jQuery, with x and y mouse coords.
+   *
+   * @return {Array} Selected objects, for point clouds and parallel plots the
+   * `userData.selected` attribute lists the indices of the selected vertices.
+   * @private
+   */
+  ScenePlotView3D.prototype._boxSelect = function(event) {
+    if (!this._usesGPUPicking()) {
+      return this._selectionBox.select();
+    }
+
+    var offset = $(this.renderer.domElement).offset(), collection = [];
+    var x = event.clientX - offset.left, y = event.clientY - offset.top;
+
+    var hits = this._gpuPick(Math.min(x, this._selectionStart.x),
+                             Math.min(y, this._selectionStart.y),
+                             Math.abs(x - this._selectionStart.x) + 1,
+                             Math.abs(y - this._selectionStart.y) + 1);
+
+    _.each(_.groupBy(hits, function(hit) {
+      return hit.object.uuid;
+    }), function(group) {
+      var object = group[0].object;
+      object.userData.selected = _.pluck(group, 'index');
+      collection.push(object);
+    });
+
+    // keep track of the selection so it can be cleared later on
+    this._selectionBox.collection = collection;
+
+    return collection;
+  };
+
   /**
    * Handle selection events.
    * @private
@@ -1208,8 +1656,28 @@ define([
       return;
     }
 
-    var element = this.renderer.domElement, scope = this;
+    var element = this.renderer.domElement, scope = this, intersect;
     var offset = $(element).offset();
+
+    if (this._usesGPUPicking()) {
+      var tolerance = this._PICKING_TOLERANCE;
+      var hits = this._gpuPick(event.clientX - offset.left - tolerance,
+                               event.clientY - offset.top - tolerance,
+                               2 * tolerance + 1, 2 * tolerance + 1);
+
+      // if there's no hits then finish the execution
+      if (hits.length === 0) {
+        return;
+      }
+
+      var modelIndex = hits[0].view.getModelPointIndex(
+        hits[0].index, this.UIState['view.viewType']);
+      intersect = hits[0].view.decomp.plottable[modelIndex];
+
+      this._notifySubscribers(eventType, intersect);
+      return;
+    }
+
     this._mouse.x = ((event.clientX - offset.left) / element.width) * 2 - 1;
     this._mouse.y = -((event.clientY - offset.top) / element.height) * 2 + 1;
 
@@ -1226,7 +1694,7 @@ define([
 
     // Get first intersected item and call callback with it.
     if (intersects && intersects.length > 0) {
-      var firstObj = intersects[0].object, intersect;
+      var firstObj = intersects[0].object;
       /*
        * When the intersect object is a Points object, the raycasting method
        * won't intersect individual mesh objects. Instead it intersects a point
@@ -1263,15 +1731,30 @@ define([
         intersect = intersects[0].object;
       }
 
-      for (var i = 0; i < this._subscribers[eventType].length; i++) {
-        // keep going if one of the callbacks fails
-        try {
-          this._subscribers[eventType][i](intersect.name, intersect);
-        } catch (e) {
-          console.error(e);
-        }
-        this.needsUpdate = true;
+      this._notifySubscribers(eventType, intersect);
+    }
+  };
+
+  /**
+   *
+   * Call the functions subscribed to an event with the picked object.
+   *
+   * @param {String} eventType Event type being called.
+   * @param {Object} intersect The picked object (a THREE.Mesh or Plottable),
+   * must have a name attribute.
+   * @private
+   *
+   */
+  ScenePlotView3D.prototype._notifySubscribers = function(eventType,
+                                                          intersect) {
+    for (var i = 0; i < this._subscribers[eventType].length; i++) {
+      // keep going if one of the callbacks fails
+      try {
+        this._subscribers[eventType][i](intersect.name, intersect);
+      } catch (e) {
+        console.error(e);
       }
+      this.needsUpdate = true;
     }
   };
 
@@ -23,13 +23,18 @@ define([
    * in the the trajectory.
    * @param {integer} [maxN = 10] Maximum number of samples allowed per
    * interpolation interval.
+   * @param {Object} [interpolation] Interpolated coordinates computed ahead
+   * of time (for example by the Python API), with two properties:
+   * `coordinates` (an Array of objects with x, y and z properties) and
+   * `intervals` (the index of the interval each interpolated point belongs
+   * to). If provided, the interpolation is not computed.
    *
    * @return {TrajectoryOfSamples} An instance of TrajectoryOfSamples
    * @constructs TrajectoryOfSamples
    **/
   function TrajectoryOfSamples(sampleNames, metadataCategoryName,
                                gradientPoints, coordinates, minimumDelta,
-                               suppliedN, maxN) {
+                               suppliedN, maxN, interpolation) {
     /**
      * Sample identifiers
      * @type {string[]}
@@ -82,7 +87,14 @@ define([
      * @type {Object[]}
      */
     this.interpolatedCoordinates = null;
-    this._generateInterpolatedCoordinates();
+
+    if (interpolation !== undefined) {
+      this.interpolatedCoordinates = interpolation.coordinates;
+      this._intervalValues = interpolation.intervals;
+    }
+    else {
+      this._generateInterpolatedCoordinates();
+    }
 
     return this;
   }
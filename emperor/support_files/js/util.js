@@ -94,16 +94,28 @@ define(['underscore'], function(_) {
    * Split list of string values into numeric and non-numeric values
    *
    * @param {String[]} values The values to check
+   * @param {Object} [numbers] Mapping of the numeric values to their number,
+   * as returned by `DecompositionModel.getNumericValuesByCategory`. If
+   * provided, only the values in this object are considered numeric and the
+   * values are not parsed.
    * @return {Object} Object with two keys, `numeric` and `nonNumeric`.
    * `numeric` holds an array of all numeric values found. `nonNumeric` holds
    * an array of the remaining values.
    */
-   function splitNumericValues(values) {
+   function splitNumericValues(values, numbers) {
     var numeric = [];
     var nonNumeric = [];
     _.each(values, function(element) {
+        if (numbers) {
+          if (_.has(numbers, element)) {
+            numeric.push(element);
+          }
+          else {
+            nonNumeric.push(element);
+          }
+        }
         // http://stackoverflow.com/a/9716488
-        if (!isNaN(parseFloat(element)) && isFinite(element)) {
+        else if (!isNaN(parseFloat(element)) && isFinite(element)) {
           numeric.push(element);
         }
         else {
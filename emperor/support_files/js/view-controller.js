@@ -86,6 +86,54 @@ define([
     return this.decompViewDict[Object.keys(this.decompViewDict)[0]];
   };
 
+  /**
+   *
+   * Load deferred metadata categories in a group of decomposition views.
+   *
+   * If any of the categories cannot be loaded (for example because the
+   * browser cannot decompress them), an alert is shown to the user.
+   *
+   * @param {Object} views The decomposition views keyed by name.
+   * @param {String[]} categories Metadata categories to load, `null` and
+   * `undefined` values are ignored.
+   *
+   * @return {Promise} A jQuery promise resolved once all the categories are
+   * loaded, or immediately if they are already loaded.
+   *
+   */
+  EmperorViewController.loadCategories = function(views, categories) {
+    var promises = [];
+
+    categories = _.filter(categories, function(category) {
+      return category !== null && category !== undefined;
+    });
+
+    _.each(views, function(view) {
+      _.each(categories, function(category) {
+        promises.push(view.decomp.loadCategory(category));
+      });
+    });
+
+    return $.when.apply($, promises).fail(function(error) {
+      alert(error.message);
+    });
+  };
+
+  /**
+   *
+   * Load deferred metadata categories in the views of this controller.
+   *
+   * @param {String[]} categories Metadata categories to load.
+   *
+   * @return {Promise} A jQuery promise resolved once all the categories are
+   * loaded, see `EmperorViewController.loadCategories`.
+   *
+   */
+  EmperorViewController.prototype.loadCategories = function(categories) {
+    return EmperorViewController.loadCategories(this.decompViewDict,
+                                                categories);
+  };
+
   /**
    * Check if a metadata field is present
    *
@@ -157,6 +205,14 @@ define([
      */
     this._metadata = {};
 
+    /**
+     * @type {Object}
+     * Values for each plottable resolved by the Python API, these are only
+     * used once, when the settings for the same category are loaded.
+     * @private
+     */
+    this._precomputed = null;
+
     /**
      * @type {Node}
      * jQuery element for the div containing the slickgrid of sample information
@@ -234,7 +290,12 @@ define([
         scope.$select.val('');
         scope.$select.prop('disabled', false).trigger('chosen:updated');
 
-        scope.$select.chosen().change(options.categorySelectionCallback);
+        // deferred metadata columns are loaded before they are used
+        scope.$select.chosen().change(function(evt, params) {
+          scope.loadCategories([scope.getMetadataField()]).done(function() {
+            options.categorySelectionCallback(evt, params);
+          });
+        });
       }
 
       // general events
@@ -519,8 +580,20 @@ define([
    *
    * @param {Object} json Parsed JSON string representation of self.
    *
+   * @return {Promise|undefined} If the category has to be loaded first, a
+   * jQuery promise resolved once the settings are applied.
+   *
    */
   EmperorAttributeABC.prototype.fromJSON = function(json) {
+    var scope = this, loading = this.loadCategories([json.category]);
+
+    // deferred metadata columns are loaded before the settings are applied
+    if (loading.state() !== 'resolved') {
+      return loading.done(function() {
+        scope.fromJSON(json);
+      });
+    }
+
     this.setMetadataField(json.category);
 
     // if the category is null, then we just reset the controller
@@ -534,6 +607,67 @@ define([
     }
   };
 
+  /**
+   *
+   * Setter for the attribute values computed ahead of time.
+   *
+   * @param {Object} precomputed An object with the metadata `category` and
+   * the `values` for each plottable as computed by the Python API, or null to
+   * compute them in the browser.
+   */
+  EmperorAttributeABC.prototype.setPrecomputedAttributes = function(
+      precomputed) {
+    this._precomputed = precomputed === undefined ? null : precomputed;
+  };
+
+  /**
+   *
+   * Get the attribute value of a plottable from the precomputed values.
+   *
+   * Subclasses should override this method if the precomputed values are not
+   * in the format expected by `setPlottableAttributes`.
+   *
+   * @param {Array} values The precomputed values.
+   * @param {Integer} index The index of the plottable.
+   *
+   * @return {Object} The attribute value for the plottable.
+   * @private
+   */
+  EmperorAttributeABC.prototype._precomputedValue = function(values, index) {
+    return values[index];
+  };
+
+  /**
+   *
+   * Set the precomputed values for all the plottables in the view.
+   *
+   * The values are only used once, any later changes are computed in the
+   * browser.
+   *
+   * @param {String} category The metadata category that is being loaded.
+   *
+   * @return {Boolean} Whether or not the precomputed values were applied.
+   * @private
+   */
+  EmperorAttributeABC.prototype._setPrecomputedAttributes = function(
+      category) {
+    var precomputed = this._precomputed, view = this.getView(), scope = this;
+
+    if (precomputed === null || precomputed.category !== category) {
+      return false;
+    }
+    this._precomputed = null;
+
+    _.each(view.decomp.plottable, function(plottable) {
+      scope.setPlottableAttributes(
+        view, scope._precomputedValue(precomputed.values, plottable.idx),
+        [plottable]);
+    });
+    view.needsUpdate = true;
+
+    return true;
+  };
+
   /**
    *
    * Update the metadata selection menu.
@@ -690,10 +824,12 @@ define([
       // getting all unique values per categories
       var uniqueVals = decompViewDict.decomp.getUniqueValuesByCategory(
         category);
+      var numbers = decompViewDict.decomp.getNumericValuesByCategory(
+        category);
       // getting a scalar value for each point
       var scaled = scope.$scaledValue.is(':checked');
       try {
-        attributes = scope.getScale(uniqueVals, scaled);
+        attributes = scope.getScale(uniqueVals, scaled, numbers);
       }
       catch (err) {
         scope.$scaledValue.attr('checked', false);
@@ -756,8 +892,20 @@ define([
    * Decodes JSON string and modifies its own instance variables accordingly.
    *
    * @param {Object} Parsed JSON string representation of self.
+   *
+   * @return {Promise|undefined} If the category has to be loaded first, a
+   * jQuery promise resolved once the settings are applied.
    */
   ScalarViewControllerABC.prototype.fromJSON = function(json) {
+    var scope = this, loading = this.loadCategories([json.category]);
+
+    // deferred metadata columns are loaded before the settings are applied
+    if (loading.state() !== 'resolved') {
+      return loading.done(function() {
+        scope.fromJSON(json);
+      });
+    }
+
     // Can't call super because select needs to be set first Order here is
     // important. We want to set all the extra controller settings before we
     // load from json, as they can override the JSON when set
@@ -782,6 +930,9 @@ define([
                                           json.category);
     this.setSlickGridDataset(data);
 
+    // values resolved in Python take precedence over the ones set above
+    this._setPrecomputedAttributes(json.category);
+
     // set all to needsUpdate
     this.getView().needsUpdate = true;
   };
@@ -896,12 +1047,15 @@ define([
    * @param {String[]} values The values to get scale for
    * @param {Boolean} scaled Whether or not to scale by values or just reset to
    * standard scale (1.0)
+   * @param {Object} [numbers] Numeric values in the category, if provided the
+   * values are not parsed, see `util.splitNumericValues`.
    *
    * @throws {Error} No or one numeric value in category and trying to scale by
    * value
    */
-  ScalarViewControllerABC.prototype.getScale = function(values, scaled) {
-    var scale = {}, numbers, val, scope = this;
+  ScalarViewControllerABC.prototype.getScale = function(values, scaled,
+                                                        numbers) {
+    var scale = {}, converted, val, scope = this;
 
     if (!scaled) {
       _.each(values, function(element) {
@@ -910,7 +1064,7 @@ define([
     }
     else {
       //See if we have numeric values, fail if no
-      var split = util.splitNumericValues(values);
+      var split = util.splitNumericValues(values, numbers);
 
       if (split.numeric.length < 2) {
         alert('Not enough numeric values in category, can not scale by value!');
@@ -927,16 +1081,18 @@ define([
 
       // convert objects to numbers so we can map them to a color, we keep a
       // copy of the untransformed object so we can search the metadata
-      numbers = _.map(split.numeric, parseFloat);
+      converted = _.map(split.numeric, function(element) {
+        return numbers ? numbers[element] : parseFloat(element);
+      });
 
       //scale remaining values between 1 and 5 scale
-      var min = _.min(numbers);
-      var max = _.max(numbers);
+      var min = _.min(converted);
+      var max = _.max(converted);
       var range = max - min;
 
-      _.each(split.numeric, function(element) {
+      _.each(split.numeric, function(element, index) {
         // note these elements are not numbers
-        val = parseFloat(element);
+        val = converted[index];
 
         // Scale the values, then round to 4 decimal places.
         scale[element] = scope.scaleValue(val, min, range);
@@ -7,7 +7,8 @@ define([
     'multi-model',
     'util'
 ], function($, _, THREE, shapes, draw, multiModel, util) {
-  var makeArrow = draw.makeArrow;
+  var makeArrowCollection = draw.makeArrowCollection;
+  var makeInstancedMaterial = draw.makeInstancedMaterial;
   var makeLineCollection = draw.makeLineCollection;
 /**
  *
@@ -78,8 +79,8 @@ function DecompositionView(multiModel, modelKey, uiState) {
    */
   this.staticTubes = [];
   /**
-   * Dynamic tubes covering the final tube segment of a trajectory
-   * Must be rebuilt each frame by the animations controller
+   * Dynamic tubes covering the final tube segment of each trajectory, these
+   * are moved on each frame by the animations controller.
    * @type {THREE.Mesh[]}
    */
   this.dynamicTubes = [];
@@ -113,6 +114,16 @@ function DecompositionView(multiModel, modelKey, uiState) {
    */
   this.lines = {'left': null, 'right': null};
 
+  /**
+   * Attribute changes collected between calls to `beginUpdate` and
+   * `endUpdate`, keyed by attribute name. Each value is an array with the
+   * latest value set for each plottable. Null when changes are applied
+   * right away.
+   * @type {Object}
+   * @private
+   */
+  this._pending = null;
+
   /**
    * The shared state for the UI
    * @type {UIState}
@@ -222,16 +233,20 @@ DecompositionView.prototype._initBaseView = function() {
     });
   }
   else if (this.decomp.isArrowType()) {
-    var arrow, zero = [0, 0, 0], point;
+    var origins = [], targets = [], names = [], zero = [0, 0, 0];
 
+    // all the arrows are drawn by a single collection with two instanced
+    // meshes, the markers are lightweight objects for each arrow
     this.decomp.apply(function(plottable) {
-      point = [plottable.coordinates[x],
-               plottable.coordinates[y],
-               plottable.coordinates[z] || 0];
-      arrow = makeArrow(zero, point, 0xc0c0c0, plottable.name);
-
-      scope.markers.push(arrow);
+      origins.push(zero);
+      targets.push([plottable.coordinates[x],
+                    plottable.coordinates[y],
+                    plottable.coordinates[z] || 0]);
+      names.push(plottable.name);
     });
+
+    this.markers = makeArrowCollection(origins, targets, 0xc0c0c0,
+                                       names).arrows;
   }
   else {
     throw new Error('Unsupported decomposition type');
@@ -261,9 +276,6 @@ DecompositionView.prototype._initBaseView = function() {
 };
 
 DecompositionView.prototype._fastInit = function() {
-  if (this.decomp.hasConfidenceIntervals()) {
-    throw new Error('Ellipsoids are not supported in fast mode');
-  }
   if (this.decomp.isArrowType()) {
     throw new Error('Only scatter type is supported in fast mode');
   }
@@ -294,6 +306,7 @@ DecompositionView.prototype._fastInit = function() {
    *
    */
   var vertexShader = [
+    'uniform float pointScale;',
     'attribute float scale;',
 
     'attribute vec3 color;',
@@ -314,7 +327,8 @@ DecompositionView.prototype._fastInit = function() {
 
       'vec4 mvPosition = modelViewMatrix * vec4(position, 1.0);',
       'gl_Position = projectionMatrix * mvPosition; ',
-      'gl_PointSize = kSIZE * scale * (800.0 / length(mvPosition.xyz));',
+      'gl_PointSize = kSIZE * scale * pointScale * ' +
+      '(800.0 / length(mvPosition.xyz));',
     '}'].join('\n');
 
   var fragmentShader = [
@@ -360,6 +374,8 @@ DecompositionView.prototype._fastInit = function() {
   var material = new THREE.ShaderMaterial({
     vertexShader: vertexShader,
     fragmentShader: fragmentShader,
+    // used to enlarge the points in high resolution images
+    uniforms: {pointScale: {value: 1}},
     transparent: true
   });
 
@@ -401,6 +417,92 @@ DecompositionView.prototype._fastInit = function() {
   geometry.attributes.emissive.needsUpdate = true;
 
   this.markers.push(cloud);
+
+  if (this.decomp.hasConfidenceIntervals()) {
+    this._fastInitEllipsoids();
+  }
+};
+
+/**
+ *
+ * Helper method to initialize the confidence intervals in fast mode.
+ *
+ * All the ellipsoids are drawn with a single THREE.InstancedMesh that shares
+ * one sphere geometry, the center and radii of each ellipsoid are set in the
+ * instance's matrix (see _updateEllipsoidMatrix). Colors, opacities and
+ * visibilities are stored as per-instance attributes.
+ *
+ * @private
+ *
+ */
+DecompositionView.prototype._fastInitEllipsoids = function() {
+  var geometry, material, mesh;
+
+  // release the instances from a previous initialization
+  _.each(this.ellipsoids, function(ellipsoid) {
+    ellipsoid.geometry.dispose();
+    ellipsoid.material.dispose();
+  });
+
+  geometry = new THREE.SphereBufferGeometry(1, 8, 8);
+  geometry.setAttribute('instanceColor', new THREE.InstancedBufferAttribute(
+    new Float32Array(this.decomp.length * 3), 3));
+  geometry.setAttribute('instanceOpacity', new THREE.InstancedBufferAttribute(
+    new Float32Array(this.decomp.length), 1));
+  geometry.setAttribute('instanceVisible', new THREE.InstancedBufferAttribute(
+    new Float32Array(this.decomp.length), 1));
+
+  material = makeInstancedMaterial({transparent: true, depthWrite: false});
+
+  mesh = new THREE.InstancedMesh(geometry, material, this.decomp.length);
+  mesh.name = this.decomp.abbreviatedName + '_ci';
+
+  // instances are spread out across the scene
+  mesh.frustumCulled = false;
+
+  this.decomp.apply(function(plottable) {
+    // set default to red, visible and half opacity
+    geometry.attributes.instanceColor.setXYZ(plottable.idx, 1, 0, 0);
+    geometry.attributes.instanceOpacity.setX(plottable.idx, 0.5);
+    geometry.attributes.instanceVisible.setX(plottable.idx, 1);
+  });
+
+  this.ellipsoids = [mesh];
+  this._updateEllipsoidMatrices();
+};
+
+/**
+ *
+ * Helper method to update the position and radii of the instanced
+ * ellipsoids, see _fastInitEllipsoids.
+ *
+ * @private
+ *
+ */
+DecompositionView.prototype._updateEllipsoidMatrices = function() {
+  var x = this.visibleDimensions[0], y = this.visibleDimensions[1],
+      z = this.visibleDimensions[2], scope = this,
+      is2D = (z === null || z === undefined), mesh = this.ellipsoids[0];
+
+  var matrix = new THREE.Matrix4(), position = new THREE.Vector3(),
+      quaternion = new THREE.Quaternion(), scale = new THREE.Vector3(),
+      radius = this.getGeometryFactor();
+
+  this.decomp.apply(function(plottable) {
+    position.set(
+      plottable.coordinates[x] * scope.axesOrientation[0],
+      plottable.coordinates[y] * scope.axesOrientation[1],
+      is2D ? 0 : plottable.coordinates[z] * scope.axesOrientation[2]);
+
+    // flatten the ellipsoids ever so slightly
+    scale.set(plottable.ci[x], plottable.ci[y],
+              is2D ? 0.01 * radius : plottable.ci[z]);
+
+    matrix.compose(position, quaternion, scale);
+    mesh.setMatrixAt(plottable.idx, matrix);
+  });
+
+  mesh.instanceMatrix.needsUpdate = true;
 };
 
 /**
@@ -616,6 +718,10 @@ DecompositionView.prototype.updatePositions = function() {
         is2D ? 0 : plottable.coordinates[z] * scope.axesOrientation[2]);
     });
     cloud.geometry.attributes.position.needsUpdate = true;
+
+    if (hasConfidenceIntervals) {
+      this._updateEllipsoidMatrices();
+    }
   }
   else if (this.decomp.isScatterType() &&
            (this.UIState['view.viewType'] === 'parallel-plot')) {
@@ -894,6 +1000,10 @@ DecompositionView.prototype.showEdgesForPlottables = function(plottables) {
 DecompositionView.prototype.setColor = function(color, group) {
   var idx, hasConfidenceIntervals, scope = this;
 
+  if (this._queue('color', color, group)) {
+    return;
+  }
+
   group = group || this.decomp.plottable;
   hasConfidenceIntervals = this.decomp.hasConfidenceIntervals();
 
@@ -907,6 +1017,15 @@ DecompositionView.prototype.setColor = function(color, group) {
                                              color.r, color.g, color.b);
     });
     cloud.geometry.attributes.color.needsUpdate = true;
+
+    if (hasConfidenceIntervals) {
+      var colors = this.ellipsoids[0].geometry.attributes.instanceColor;
+
+      group.forEach(function(plottable) {
+        colors.setXYZ(plottable.idx, color.r, color.g, color.b);
+      });
+      colors.needsUpdate = true;
+    }
   }
   else if (this.UIState['view.viewType'] == 'parallel-plot' &&
            this.decomp.isScatterType()) {
@@ -950,6 +1069,10 @@ DecompositionView.prototype.setColor = function(color, group) {
 DecompositionView.prototype.setVisibility = function(visible, group) {
   var hasConfidenceIntervals, scope = this;
 
+  if (this._queue('visibility', visible, group)) {
+    return;
+  }
+
   group = group || this.decomp.plottable;
 
   hasConfidenceIntervals = this.decomp.hasConfidenceIntervals();
@@ -962,6 +1085,15 @@ DecompositionView.prototype.setVisibility = function(visible, group) {
       cloud.geometry.attributes.visible.setX(plottable.idx, visible * 1);
     });
     cloud.geometry.attributes.visible.needsUpdate = true;
+
+    if (hasConfidenceIntervals) {
+      var attributes = this.ellipsoids[0].geometry.attributes;
+
+      _.each(group, function(plottable) {
+        attributes.instanceVisible.setX(plottable.idx, visible * 1);
+      });
+      attributes.instanceVisible.needsUpdate = true;
+    }
   }
   else if (this.UIState['view.viewType'] == 'parallel-plot' &&
            this.decomp.isScatterType()) {
@@ -1011,6 +1143,10 @@ DecompositionView.prototype.setScale = function(scale, group) {
     throw Error('Cannot change the scale of an arrow.');
   }
 
+  if (this._queue('scale', scale, group)) {
+    return;
+  }
+
   group = group || this.decomp.plottable;
 
   if (this.UIState['view.usesPointCloud'] &&
@@ -1048,6 +1184,10 @@ DecompositionView.prototype.setOpacity = function(opacity, group) {
   // explicitly transparent if the opacity is not at full
   var transparent = opacity !== 1, funk, scope = this;
 
+  if (this._queue('opacity', opacity, group)) {
+    return;
+  }
+
   group = group || this.decomp.plottable;
 
   if (this.UIState['view.usesPointCloud'] &&
@@ -1086,6 +1226,136 @@ DecompositionView.prototype.setOpacity = function(opacity, group) {
   this.needsUpdate = true;
 };
 
+/**
+ * Set the shape for a group of plottables.
+ *
+ * @param {String} shape The name of the shape, see `shapes.getGeometry`.
+ * @param {Plottable[]} group An array of plottables for which the shape
+ * should be set. If this object is not provided, all the plottables in the
+ * view will be have the shape set.
+ *
+ * @throws {Error} If the shape is not known.
+ */
+DecompositionView.prototype.setShape = function(shape, group) {
+  var geometry, scope = this;
+
+  if (this.UIState['view.viewType'] == 'parallel-plot') {
+    return;
+  }
+
+  // get the appropriately sized geometry
+  geometry = shapes.getGeometry(shape, this.getGeometryFactor());
+
+  if (geometry === undefined) {
+    throw new Error('Unknown shape ' + shape);
+  }
+
+  if (this._queue('shape', shape, group)) {
+    return;
+  }
+
+  group = group || this.decomp.plottable;
+
+  _.each(group, function(element) {
+    scope.markers[element.idx].geometry = geometry;
+    scope.markers[element.idx].userData.shape = shape;
+  });
+  this.needsUpdate = true;
+};
+
+/**
+ *
+ * Collect attribute changes instead of applying them.
+ *
+ * Until `endUpdate` is called, changes made with `setColor`,
+ * `setVisibility`, `setScale`, `setOpacity` and `setShape` are only
+ * recorded. If a plottable's attribute is set more than once, only the last
+ * value is kept, so loading several settings at once writes each buffer a
+ * single time.
+ */
+DecompositionView.prototype.beginUpdate = function() {
+  if (this._pending === null) {
+    this._pending = {};
+  }
+};
+
+/**
+ *
+ * Apply the attribute changes collected since `beginUpdate` was called.
+ *
+ * Plottables that share the same value are updated together, i.e. each
+ * setter is called once per distinct value.
+ */
+DecompositionView.prototype.endUpdate = function() {
+  var pending = this._pending, plottables = this.decomp.plottable, scope = this;
+
+  if (pending === null) {
+    return;
+  }
+  this._pending = null;
+
+  _.each({'shape': 'setShape', 'color': 'setColor', 'scale': 'setScale',
+          'opacity': 'setOpacity', 'visibility': 'setVisibility'},
+         function(setter, attribute) {
+    var values = pending[attribute], groups = new Map(), value;
+
+    if (values === undefined) {
+      return;
+    }
+
+    for (var i = 0; i < values.length; i++) {
+      value = values[i];
+
+      // plottables that were not changed
+      if (value === undefined) {
+        continue;
+      }
+
+      if (!groups.has(value)) {
+        groups.set(value, []);
+      }
+      groups.get(value).push(plottables[i]);
+    }
+
+    groups.forEach(function(group, value) {
+      scope[setter](value, group);
+    });
+  });
+};
+
+/**
+ *
+ * Record an attribute change if the view is collecting changes.
+ *
+ * @param {String} attribute The name of the attribute.
+ * @param {Object} value The new value of the attribute.
+ * @param {Plottable[]} [group] The plottables to change, all plottables if
+ * not provided.
+ *
+ * @return {Boolean} Whether the change was recorded, if false the change
+ * should be applied right away.
+ * @private
+ */
+DecompositionView.prototype._queue = function(attribute, value, group) {
+  var values;
+
+  if (this._pending === null) {
+    return false;
+  }
+
+  if (this._pending[attribute] === undefined) {
+    this._pending[attribute] = new Array(this.decomp.length);
+  }
+  values = this._pending[attribute];
+
+  group = group || this.decomp.plottable;
+  for (var i = 0; i < group.length; i++) {
+    values[group[i].idx] = value;
+  }
+
+  return true;
+};
+
 /**
  * Toggles the visibility of arrow labels
  *
@@ -1362,11 +1632,7 @@ DecompositionView.prototype.getAndClearOldMarkers = function() {
  * @private
  */
 function _changeArrowOpacity(arrow, value, transparent) {
-  arrow.line.material.transparent = transparent;
-  arrow.line.material.opacity = value;
-
-  arrow.cone.material.transparent = transparent;
-  arrow.cone.material.opacity = value;
+  arrow.setOpacity(value);
 }
 
 /**
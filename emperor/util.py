@@ -7,11 +7,15 @@
 # ----------------------------------------------------------------------------
 from __future__ import division
 
+import json
+import zlib
 import pandas as pd
 import numpy as np
 import warnings
 
+from base64 import b64encode
 from os.path import abspath, dirname, join
+from skbio import OrdinationResults
 
 from emperor.qiime_backports.make_3d_plots import (get_custom_coords,
                                                    remove_nans,
@@ -312,8 +316,8 @@ def validate_and_process_custom_axes(mf, custom_axes):
         When there are non-numeric values in the categories selected by
         `custom_axes`.
     """
-    # avoid side-effects
-    mf = mf.copy()
+    # avoid side-effects, only the custom axes are replaced
+    mf = mf.copy(deep=False)
 
     headers = [mf.index.name] + mf.columns.tolist()
     missing_headers = set(custom_axes).difference(set(headers))
@@ -376,3 +380,287 @@ def resolve_stable_url(version, base_url):
         if 'b' in version:
             version = version.replace('b', '-beta.')
         return base_url % version
+
+
+# number of bytes of ordinations superimposed at a time by
+# procrustes_superimposition
+_PROCRUSTES_BLOCK = 2 ** 24
+
+
+def procrustes_superimposition(master, ordinations, out=None):
+    """Superimpose many ordinations onto a master ordination at once
+
+    Parameters
+    ----------
+    master : array_like
+        ``(n, d)`` matrix with the coordinates of the master ordination.
+    ordinations : array_like
+        ``(k, n, d)`` array with the coordinates of the ``k`` ordinations to
+        superimpose, the samples should be in the same order as in
+        ``master``.
+    out : np.ndarray, optional
+        ``(k, n, d)`` array where the superimposed ordinations are written,
+        it can be ``ordinations`` itself. By default a new ``np.float64``
+        array is allocated.
+
+    Returns
+    -------
+    np.ndarray
+        ``(n, d)`` standardized version of ``master``.
+    np.ndarray
+        ``(k, n, d)`` array with each ordination rotated, scaled and
+        translated to best match the standardized ``master``, this is
+        ``out`` if it was provided.
+    np.ndarray
+        The M^2 (disparity) of each ordination.
+
+    Raises
+    ------
+    ValueError
+        If the shapes of ``master``, ``ordinations`` or ``out`` don't match.
+        If any of the matrices has less than two unique points.
+
+    Notes
+    -----
+    The results are the same as calling ``scipy.spatial.procrustes`` with
+    ``master`` and each of the ordinations, but the master is only centered
+    and scaled once, and the rotations are solved with a stacked singular
+    value decomposition of the ``(k, d, d)`` cross-covariance matrices.
+
+    The ordinations are superimposed in blocks of about ``2 ** 24`` bytes,
+    so only one block is copied as ``np.float64`` at a time, regardless of
+    the data type of ``ordinations`` (for example a ``np.float32`` memory
+    map). If ``out`` is ``ordinations`` and an ordination has less than two
+    unique points, the blocks before it are already superimposed.
+
+    See Also
+    --------
+    scipy.spatial.procrustes
+    """
+    master = np.array(master, dtype=np.float64)
+    ordinations = np.asarray(ordinations)
+
+    if (master.ndim != 2 or ordinations.ndim != 3 or
+            ordinations.shape[1:] != master.shape):
+        raise ValueError('The ordinations should be a (k, n, d) array and the'
+                         ' master ordination a (n, d) matrix')
+    if master.size == 0:
+        raise ValueError('Input matrices must be >0 rows and >0 cols')
+
+    if out is None:
+        out = np.empty(ordinations.shape)
+    elif out.shape != ordinations.shape:
+        raise ValueError('The output should have the same shape as the '
+                         'ordinations')
+
+    master -= master.mean(axis=0)
+    norm = np.linalg.norm(master)
+    if norm == 0:
+        raise ValueError('Input matrices must contain >1 unique points')
+    master /= norm
+
+    disparities = np.empty(len(ordinations))
+    step = max(1, _PROCRUSTES_BLOCK // (master.size * 8))
+
+    for start in range(0, len(ordinations), step):
+        stop = start + step
+        block = np.array(ordinations[start:stop], dtype=np.float64)
+
+        block -= block.mean(axis=1)[:, np.newaxis, :]
+        norms = np.linalg.norm(block, axis=(1, 2))
+        if (norms == 0).any():
+            raise ValueError('Input matrices must contain >1 unique points')
+        block /= norms[:, np.newaxis, np.newaxis]
+
+        u, w, vt = np.linalg.svd(np.matmul(master.T, block))
+        rotations = np.matmul(u, vt).transpose(0, 2, 1)
+
+        block = np.matmul(block, rotations)
+        block *= w.sum(axis=1)[:, np.newaxis, np.newaxis]
+        out[start:stop] = block
+
+        block -= master
+        disparities[start:stop] = np.einsum('kij,kij->k', block, block)
+
+    return master, out, disparities
+
+
+def quantize_coordinates(coords, precision):
+    """Encode coordinates with a lower precision data type
+
+    Parameters
+    ----------
+    coords : np.ndarray
+        A (n, d) matrix of coordinates.
+    precision : {'float32', 'int16', 'uint16'}
+        The data type used to encode the coordinates. Integer types are fixed
+        point representations of each axis, the decoded value is ``value *
+        scale + offset``.
+
+    Returns
+    -------
+    dict
+        The encoded coordinates, with the ``dtype``, the ``shape`` of the
+        matrix, and the little-endian bytes of the values in row-major order
+        encoded as base64 (``data``). Integer types also include the ``scale``
+        and ``offset`` for each axis.
+    float
+        Maximum absolute difference between ``coords`` and the decoded
+        coordinates.
+
+    Raises
+    ------
+    ValueError
+        If the precision is not supported.
+        If ``coords`` is not a matrix.
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+
+    if coords.ndim != 2:
+        raise ValueError('The coordinates should be a (n, d) matrix')
+
+    encoded = {'dtype': precision, 'shape': list(coords.shape)}
+
+    if precision == 'float32':
+        values = coords.astype('<f4')
+        decoded = values.astype(np.float64)
+    elif precision in {'int16', 'uint16'}:
+        info = np.iinfo(precision)
+
+        # int16 is symmetric around zero so the extremes are -32767 and 32767
+        low = info.min + 1 if info.min else 0
+        steps = info.max - low
+
+        if len(coords):
+            mn, mx = coords.min(axis=0), coords.max(axis=0)
+        else:
+            mn, mx = np.zeros(coords.shape[1]), np.zeros(coords.shape[1])
+
+        # flat axes are all encoded as zero
+        flat = mx == mn
+        scale = np.where(flat, 1.0, (mx - mn) / steps)
+        offset = np.where(flat, mn, mn - low * scale)
+
+        values = np.clip(np.round((coords - offset) / scale), info.min,
+                         info.max)
+        values = values.astype(np.dtype(precision).newbyteorder('<'))
+        decoded = values * scale + offset
+
+        encoded['scale'] = scale.tolist()
+        encoded['offset'] = offset.tolist()
+    else:
+        raise ValueError("Unsupported precision '%s', should be one of "
+                         "'float32', 'int16' or 'uint16'" % precision)
+
+    encoded['data'] = b64encode(values.tobytes()).decode('ascii')
+
+    error = np.max(np.abs(decoded - coords)) if coords.size else 0.0
+
+    return encoded, float(error)
+
+
+# number of bytes hashed at a time by fingerprint
+_FINGERPRINT_BLOCK = 2 ** 24
+
+
+def fingerprint(*objects):
+    """Compute a fast fingerprint of ordinations, metadata and settings
+
+    Parameters
+    ----------
+    objects : OrdinationResults, pd.DataFrame, pd.Series, np.ndarray or object
+        The objects to fingerprint, usually an ordination and its metadata.
+        Ordinations are fingerprinted by their sample and feature
+        coordinates, eigenvalues and proportion explained. Data frames and
+        series include their index and column labels. Any other object (for
+        example a dictionary of settings) is serialized as JSON.
+
+    Returns
+    -------
+    str
+        A 16 character hexadecimal fingerprint.
+
+    Notes
+    -----
+    Numeric data is hashed straight from its NumPy buffer in blocks of
+    ``2 ** 24`` bytes with CRC-32 and Adler-32, two fast non-cryptographic
+    checksums, so no copy of the data is made unless it's not contiguous in
+    memory. Text is hashed in blocks of values. The fingerprint is meant to
+    detect changes in the data, it is not a cryptographic hash.
+
+    See Also
+    --------
+    emperor.core.Emperor.fingerprint
+    """
+    state = [0, 1]
+    for obj in objects:
+        _fingerprint_object(state, obj)
+    return '%08x%08x' % (state[0], state[1])
+
+
+def _fingerprint_bytes(state, data):
+    view = memoryview(data).cast('B')
+    for start in range(0, len(view), _FINGERPRINT_BLOCK):
+        block = view[start:start + _FINGERPRINT_BLOCK]
+        state[0] = zlib.crc32(block, state[0])
+        state[1] = zlib.adler32(block, state[1])
+
+
+def _fingerprint_array(state, values):
+    if isinstance(values, pd.Categorical):
+        _fingerprint_bytes(state, b'category')
+        _fingerprint_array(state, values.categories.values)
+        values = values.codes
+
+    values = np.asarray(values)
+    _fingerprint_bytes(state, ('%s%s' % (values.dtype.str, values.shape))
+                       .encode('ascii'))
+
+    if values.dtype.kind in 'biufcmM':
+        # contiguous blocks of rows, only copied if the array isn't
+        # contiguous
+        itemsize = max(values[:1].nbytes, 1)
+        rows = max(_FINGERPRINT_BLOCK // itemsize, 1)
+        for start in range(0, len(values), rows):
+            _fingerprint_bytes(state, np.ascontiguousarray(
+                values[start:start + rows]))
+    else:
+        values = values.ravel()
+        rows = _FINGERPRINT_BLOCK // 64
+        for start in range(0, len(values), rows):
+            text = '\x1f'.join(map(str, values[start:start + rows]))
+            _fingerprint_bytes(state, text.encode('utf-8', 'surrogatepass'))
+
+
+def _fingerprint_object(state, obj):
+    if isinstance(obj, OrdinationResults):
+        _fingerprint_bytes(state, b'ordination')
+        for data in (obj.samples, obj.features, obj.eigvals,
+                     obj.proportion_explained):
+            _fingerprint_object(state, data)
+    elif isinstance(obj, pd.DataFrame):
+        _fingerprint_bytes(state, b'frame')
+        _fingerprint_object(state, obj.index)
+        _fingerprint_object(state, obj.columns)
+
+        # numeric frames with a single data type (like coordinates) are
+        # hashed from their buffer, otherwise one column at a time to avoid
+        # converting the frame to an array of objects
+        dtypes = set(obj.dtypes)
+        if len(dtypes) == 1 and dtypes.pop().kind in 'biufc':
+            _fingerprint_array(state, obj.values)
+        else:
+            for i in range(obj.shape[1]):
+                _fingerprint_array(state, obj.iloc[:, i].values)
+    elif isinstance(obj, pd.Series):
+        _fingerprint_bytes(state, b'series')
+        _fingerprint_object(state, obj.index)
+        _fingerprint_array(state, obj.values)
+    elif isinstance(obj, pd.Index):
+        _fingerprint_bytes(state, ('index%s' % obj.names).encode('utf-8'))
+        _fingerprint_array(state, obj.values)
+    elif isinstance(obj, np.ndarray):
+        _fingerprint_array(state, obj)
+    else:
+        _fingerprint_bytes(state, json.dumps(obj, sort_keys=True,
+                                             default=str).encode('utf-8'))
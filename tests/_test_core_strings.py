@@ -129,6 +129,7 @@ var emperorRequire = require.config({
   'animationdirector': 'https://cdn.rawgit.com/biocore/emperor/new-api/emperor/support_files/js/animate',
   'trajectory': 'https://cdn.rawgit.com/biocore/emperor/new-api/emperor/support_files/js/trajectory',
   'uistate': 'https://cdn.rawgit.com/biocore/emperor/new-api/emperor/support_files/js/ui-state',
+  'rendererpool': 'https://cdn.rawgit.com/biocore/emperor/new-api/emperor/support_files/js/renderer-pool',
 
   /* controllers */
   'abcviewcontroller': 'https://cdn.rawgit.com/biocore/emperor/new-api/emperor/support_files/js/abc-view-controller',
@@ -181,7 +182,7 @@ function($, model, EmperorController) {
 
   var div = $('#emperor-notebook-0x9cb72f54');
 
-  var data = {"plot": {"decomposition": {"axes_names": [0, 1, 2, 3, 4], "ci": null, "coordinates": [[-0.651995810831719, -0.3417784983371589, 0.15713116241738878, -0.15964022322388774, 0.41511600449567154], [-0.5603276951316744, 0.10857735915373172, -0.32567898978232684, 0.3750137797216106, -0.583487828830988], [0.5394835270542403, -0.3068324227225251, -0.6770043110217822, 0.203820501907719, 0.1044335488558445], [0.09964194790906594, -0.03293232371368659, 0.14978636968698092, -0.8160388524355932, -0.301343079001781], [0.661089243947507, -0.014176279685000464, 0.05537095913733857, -0.11036487613740434, -0.3456924105084198], [0.5490376828031979, 0.32957520954888647, 0.7612242145083941, 0.4322721667939822, 0.04825249860931067], [0.40202458647314415, -0.4576554852461752, -0.0728438902229666, 0.04670222577076932, 0.36567512814466946], [-0.21532604614952783, 1.0, -0.31976501999316115, -0.13561208920603846, 0.35686551552017187], [-0.8236274360749414, -0.2847775589983077, 0.27177950526966277, 0.16384736680860681, -0.05981937728235736]], "edges": [], "percents_explained": [26.6887048633, 16.256370402199998, 13.775412916099999, 11.217215823, 10.024774995000001], "sample_ids": ["PC.636", "PC.635", "PC.356", "PC.481", "PC.354", "PC.593", "PC.355", "PC.607", "PC.634"]}, "metadata": [["PC.636", "Fast", "20080116", "Fasting_mouse_I.D._636"], ["PC.635", "Fast", "20080116", "Fasting_mouse_I.D._635"], ["PC.356", "Control", "20061126", "Control_mouse_I.D._356"], ["PC.481", "Control", "20070314", "Control_mouse_I.D._481"], ["PC.354", "Control", "20061218", "Ctrol_mouse_I.D._354"], ["PC.593", "Control", "20071210", "Control_mouse_I.D._593"], ["PC.355", "Control", "20061218", "Control_mouse_I.D._355"], ["PC.607", "Fast", "20071112", "Fasting_mouse_I.D._607"], ["PC.634", "Fast", "20080116", "Fasting_mouse_I.D._634"]], "metadata_headers": ["SampleID", "Treatment", "DOB", "Description"], "settings": {}, "type": "scatter"}};
+  var data = {"plot": {"decomposition": {"axes_names": [0, 1, 2, 3, 4], "ci": null, "coordinates": [[-0.651995810831719, -0.3417784983371589, 0.15713116241738878, -0.15964022322388774, 0.41511600449567154], [-0.5603276951316744, 0.10857735915373172, -0.32567898978232684, 0.3750137797216106, -0.583487828830988], [0.5394835270542403, -0.3068324227225251, -0.6770043110217822, 0.203820501907719, 0.1044335488558445], [0.09964194790906594, -0.03293232371368659, 0.14978636968698092, -0.8160388524355932, -0.301343079001781], [0.661089243947507, -0.014176279685000464, 0.05537095913733857, -0.11036487613740434, -0.3456924105084198], [0.5490376828031979, 0.32957520954888647, 0.7612242145083941, 0.4322721667939822, 0.04825249860931067], [0.40202458647314415, -0.4576554852461752, -0.0728438902229666, 0.04670222577076932, 0.36567512814466946], [-0.21532604614952783, 1.0, -0.31976501999316115, -0.13561208920603846, 0.35686551552017187], [-0.8236274360749414, -0.2847775589983077, 0.27177950526966277, 0.16384736680860681, -0.05981937728235736]], "edges": [], "percents_explained": [26.6887048633, 16.256370402199998, 13.775412916099999, 11.217215823, 10.024774995000001], "sample_ids": ["PC.636", "PC.635", "PC.356", "PC.481", "PC.354", "PC.593", "PC.355", "PC.607", "PC.634"]}, "metadata": {"columns": [{"dtype": "string", "values": ["PC.636", "PC.635", "PC.356", "PC.481", "PC.354", "PC.593", "PC.355", "PC.607", "PC.634"]}, {"categories": ["Fast", "Control"], "codes": [0, 0, 1, 1, 1, 1, 1, 0, 0], "dtype": "category"}, {"categories": ["20080116", "20061126", "20070314", "20061218", "20071210", "20071112"], "codes": [0, 0, 1, 2, 3, 4, 3, 5, 0], "dtype": "category"}, {"dtype": "string", "values": ["Fasting_mouse_I.D._636", "Fasting_mouse_I.D._635", "Control_mouse_I.D._356", "Control_mouse_I.D._481", "Ctrol_mouse_I.D._354", "Control_mouse_I.D._593", "Control_mouse_I.D._355", "Fasting_mouse_I.D._607", "Fasting_mouse_I.D._634"]}], "length": 9}, "metadata_headers": ["SampleID", "Treatment", "DOB", "Description"], "settings": {}, "type": "scatter"}};
 
   var plot, biplot = null, ec;
 
@@ -200,7 +201,9 @@ function($, model, EmperorController) {
                                       data.biplot.type);
     }
 
-    ec = new EmperorController(plot, biplot, "emperor-notebook-0x9cb72f54");
+    ec = new EmperorController(plot, biplot, "emperor-notebook-0x9cb72f54",
+                               undefined,
+                               {'sharedRenderer': false});
   }
 
   function animate() {
@@ -218,6 +221,14 @@ function($, model, EmperorController) {
     ec.ready = function () {
       // any other code that needs to be executed when emperor is loaded should
       // go here
+
+      // trajectories sorted and interpolated in Python (if any)
+      ec.controllers.animations.setPrecomputedTrajectories(
+        data.plot.animation);
+
+      // colors, scales and opacities resolved in Python (if any)
+      ec.setPrecomputedAttributes(data.plot.attributes);
+
       ec.loadConfig(data.plot.settings);
 
       // sets up generic callbacks for 3rd party consumers
@@ -329,6 +340,7 @@ var emperorRequire = require.config({
   'animationdirector': './some-local-path//js/animate',
   'trajectory': './some-local-path//js/trajectory',
   'uistate': './some-local-path//js/ui-state',
+  'rendererpool': './some-local-path//js/renderer-pool',
 
   /* controllers */
   'abcviewcontroller': './some-local-path//js/abc-view-controller',
@@ -381,7 +393,7 @@ function($, model, EmperorController) {
 
   var div = $('#emperor-notebook-0x9cb72f54');
 
-  var data = {"plot": {"decomposition": {"axes_names": [0, 1, 2, 3, 4], "ci": null, "coordinates": [[-0.651995810831719, -0.3417784983371589, 0.15713116241738878, -0.15964022322388774, 0.41511600449567154], [-0.5603276951316744, 0.10857735915373172, -0.32567898978232684, 0.3750137797216106, -0.583487828830988], [0.5394835270542403, -0.3068324227225251, -0.6770043110217822, 0.203820501907719, 0.1044335488558445], [0.09964194790906594, -0.03293232371368659, 0.14978636968698092, -0.8160388524355932, -0.301343079001781], [0.661089243947507, -0.014176279685000464, 0.05537095913733857, -0.11036487613740434, -0.3456924105084198], [0.5490376828031979, 0.32957520954888647, 0.7612242145083941, 0.4322721667939822, 0.04825249860931067], [0.40202458647314415, -0.4576554852461752, -0.0728438902229666, 0.04670222577076932, 0.36567512814466946], [-0.21532604614952783, 1.0, -0.31976501999316115, -0.13561208920603846, 0.35686551552017187], [-0.8236274360749414, -0.2847775589983077, 0.27177950526966277, 0.16384736680860681, -0.05981937728235736]], "edges": [], "percents_explained": [26.6887048633, 16.256370402199998, 13.775412916099999, 11.217215823, 10.024774995000001], "sample_ids": ["PC.636", "PC.635", "PC.356", "PC.481", "PC.354", "PC.593", "PC.355", "PC.607", "PC.634"]}, "metadata": [["PC.636", "Fast", "20080116", "Fasting_mouse_I.D._636"], ["PC.635", "Fast", "20080116", "Fasting_mouse_I.D._635"], ["PC.356", "Control", "20061126", "Control_mouse_I.D._356"], ["PC.481", "Control", "20070314", "Control_mouse_I.D._481"], ["PC.354", "Control", "20061218", "Ctrol_mouse_I.D._354"], ["PC.593", "Control", "20071210", "Control_mouse_I.D._593"], ["PC.355", "Control", "20061218", "Control_mouse_I.D._355"], ["PC.607", "Fast", "20071112", "Fasting_mouse_I.D._607"], ["PC.634", "Fast", "20080116", "Fasting_mouse_I.D._634"]], "metadata_headers": ["SampleID", "Treatment", "DOB", "Description"], "settings": {}, "type": "scatter"}};
+  var data = {"plot": {"decomposition": {"axes_names": [0, 1, 2, 3, 4], "ci": null, "coordinates": [[-0.651995810831719, -0.3417784983371589, 0.15713116241738878, -0.15964022322388774, 0.41511600449567154], [-0.5603276951316744, 0.10857735915373172, -0.32567898978232684, 0.3750137797216106, -0.583487828830988], [0.5394835270542403, -0.3068324227225251, -0.6770043110217822, 0.203820501907719, 0.1044335488558445], [0.09964194790906594, -0.03293232371368659, 0.14978636968698092, -0.8160388524355932, -0.301343079001781], [0.661089243947507, -0.014176279685000464, 0.05537095913733857, -0.11036487613740434, -0.3456924105084198], [0.5490376828031979, 0.32957520954888647, 0.7612242145083941, 0.4322721667939822, 0.04825249860931067], [0.40202458647314415, -0.4576554852461752, -0.0728438902229666, 0.04670222577076932, 0.36567512814466946], [-0.21532604614952783, 1.0, -0.31976501999316115, -0.13561208920603846, 0.35686551552017187], [-0.8236274360749414, -0.2847775589983077, 0.27177950526966277, 0.16384736680860681, -0.05981937728235736]], "edges": [], "percents_explained": [26.6887048633, 16.256370402199998, 13.775412916099999, 11.217215823, 10.024774995000001], "sample_ids": ["PC.636", "PC.635", "PC.356", "PC.481", "PC.354", "PC.593", "PC.355", "PC.607", "PC.634"]}, "metadata": {"columns": [{"dtype": "string", "values": ["PC.636", "PC.635", "PC.356", "PC.481", "PC.354", "PC.593", "PC.355", "PC.607", "PC.634"]}, {"categories": ["Fast", "Control"], "codes": [0, 0, 1, 1, 1, 1, 1, 0, 0], "dtype": "category"}, {"categories": ["20080116", "20061126", "20070314", "20061218", "20071210", "20071112"], "codes": [0, 0, 1, 2, 3, 4, 3, 5, 0], "dtype": "category"}, {"dtype": "string", "values": ["Fasting_mouse_I.D._636", "Fasting_mouse_I.D._635", "Control_mouse_I.D._356", "Control_mouse_I.D._481", "Ctrol_mouse_I.D._354", "Control_mouse_I.D._593", "Control_mouse_I.D._355", "Fasting_mouse_I.D._607", "Fasting_mouse_I.D._634"]}], "length": 9}, "metadata_headers": ["SampleID", "Treatment", "DOB", "Description"], "settings": {}, "type": "scatter"}};
 
   var plot, biplot = null, ec;
 
@@ -400,7 +412,9 @@ function($, model, EmperorController) {
                                       data.biplot.type);
     }
 
-    ec = new EmperorController(plot, biplot, "emperor-notebook-0x9cb72f54");
+    ec = new EmperorController(plot, biplot, "emperor-notebook-0x9cb72f54",
+                               undefined,
+                               {'sharedRenderer': false});
   }
 
   function animate() {
@@ -418,6 +432,14 @@ function($, model, EmperorController) {
     ec.ready = function () {
       // any other code that needs to be executed when emperor is loaded should
       // go here
+
+      // trajectories sorted and interpolated in Python (if any)
+      ec.controllers.animations.setPrecomputedTrajectories(
+        data.plot.animation);
+
+      // colors, scales and opacities resolved in Python (if any)
+      ec.setPrecomputedAttributes(data.plot.attributes);
+
       ec.loadConfig(data.plot.settings);
 
       // sets up generic callbacks for 3rd party consumers
@@ -512,6 +534,7 @@ var emperorRequire = require.config({
   'animationdirector': '/nbextensions/emperor/support_files/js/animate',
   'trajectory': '/nbextensions/emperor/support_files/js/trajectory',
   'uistate': '/nbextensions/emperor/support_files/js/ui-state',
+  'rendererpool': '/nbextensions/emperor/support_files/js/renderer-pool',
 
   /* controllers */
   'abcviewcontroller': '/nbextensions/emperor/support_files/js/abc-view-controller',
@@ -564,7 +587,7 @@ function($, model, EmperorController) {
 
   var div = $('#emperor-notebook-0x9cb72f54');
 
-  var data = {"plot": {"decomposition": {"axes_names": [0, 1, 2, 3, 4], "ci": null, "coordinates": [[-0.651995810831719, -0.3417784983371589, 0.15713116241738878, -0.15964022322388774, 0.41511600449567154], [-0.5603276951316744, 0.10857735915373172, -0.32567898978232684, 0.3750137797216106, -0.583487828830988], [0.5394835270542403, -0.3068324227225251, -0.6770043110217822, 0.203820501907719, 0.1044335488558445], [0.09964194790906594, -0.03293232371368659, 0.14978636968698092, -0.8160388524355932, -0.301343079001781], [0.661089243947507, -0.014176279685000464, 0.05537095913733857, -0.11036487613740434, -0.3456924105084198], [0.5490376828031979, 0.32957520954888647, 0.7612242145083941, 0.4322721667939822, 0.04825249860931067], [0.40202458647314415, -0.4576554852461752, -0.0728438902229666, 0.04670222577076932, 0.36567512814466946], [-0.21532604614952783, 1.0, -0.31976501999316115, -0.13561208920603846, 0.35686551552017187], [-0.8236274360749414, -0.2847775589983077, 0.27177950526966277, 0.16384736680860681, -0.05981937728235736]], "edges": [], "percents_explained": [26.6887048633, 16.256370402199998, 13.775412916099999, 11.217215823, 10.024774995000001], "sample_ids": ["PC.636", "PC.635", "PC.356", "PC.481", "PC.354", "PC.593", "PC.355", "PC.607", "PC.634"]}, "metadata": [["PC.636", "Fast", "20080116", "Fasting_mouse_I.D._636"], ["PC.635", "Fast", "20080116", "Fasting_mouse_I.D._635"], ["PC.356", "Control", "20061126", "Control_mouse_I.D._356"], ["PC.481", "Control", "20070314", "Control_mouse_I.D._481"], ["PC.354", "Control", "20061218", "Ctrol_mouse_I.D._354"], ["PC.593", "Control", "20071210", "Control_mouse_I.D._593"], ["PC.355", "Control", "20061218", "Control_mouse_I.D._355"], ["PC.607", "Fast", "20071112", "Fasting_mouse_I.D._607"], ["PC.634", "Fast", "20080116", "Fasting_mouse_I.D._634"]], "metadata_headers": ["SampleID", "Treatment", "DOB", "Description"], "settings": {}, "type": "scatter"}};
+  var data = {"plot": {"decomposition": {"axes_names": [0, 1, 2, 3, 4], "ci": null, "coordinates": [[-0.651995810831719, -0.3417784983371589, 0.15713116241738878, -0.15964022322388774, 0.41511600449567154], [-0.5603276951316744, 0.10857735915373172, -0.32567898978232684, 0.3750137797216106, -0.583487828830988], [0.5394835270542403, -0.3068324227225251, -0.6770043110217822, 0.203820501907719, 0.1044335488558445], [0.09964194790906594, -0.03293232371368659, 0.14978636968698092, -0.8160388524355932, -0.301343079001781], [0.661089243947507, -0.014176279685000464, 0.05537095913733857, -0.11036487613740434, -0.3456924105084198], [0.5490376828031979, 0.32957520954888647, 0.7612242145083941, 0.4322721667939822, 0.04825249860931067], [0.40202458647314415, -0.4576554852461752, -0.0728438902229666, 0.04670222577076932, 0.36567512814466946], [-0.21532604614952783, 1.0, -0.31976501999316115, -0.13561208920603846, 0.35686551552017187], [-0.8236274360749414, -0.2847775589983077, 0.27177950526966277, 0.16384736680860681, -0.05981937728235736]], "edges": [], "percents_explained": [26.6887048633, 16.256370402199998, 13.775412916099999, 11.217215823, 10.024774995000001], "sample_ids": ["PC.636", "PC.635", "PC.356", "PC.481", "PC.354", "PC.593", "PC.355", "PC.607", "PC.634"]}, "metadata": {"columns": [{"dtype": "string", "values": ["PC.636", "PC.635", "PC.356", "PC.481", "PC.354", "PC.593", "PC.355", "PC.607", "PC.634"]}, {"categories": ["Fast", "Control"], "codes": [0, 0, 1, 1, 1, 1, 1, 0, 0], "dtype": "category"}, {"categories": ["20080116", "20061126", "20070314", "20061218", "20071210", "20071112"], "codes": [0, 0, 1, 2, 3, 4, 3, 5, 0], "dtype": "category"}, {"dtype": "string", "values": ["Fasting_mouse_I.D._636", "Fasting_mouse_I.D._635", "Control_mouse_I.D._356", "Control_mouse_I.D._481", "Ctrol_mouse_I.D._354", "Control_mouse_I.D._593", "Control_mouse_I.D._355", "Fasting_mouse_I.D._607", "Fasting_mouse_I.D._634"]}], "length": 9}, "metadata_headers": ["SampleID", "Treatment", "DOB", "Description"], "settings": {}, "type": "scatter"}};
 
   var plot, biplot = null, ec;
 
@@ -583,7 +606,9 @@ function($, model, EmperorController) {
                                       data.biplot.type);
     }
 
-    ec = new EmperorController(plot, biplot, "emperor-notebook-0x9cb72f54");
+    ec = new EmperorController(plot, biplot, "emperor-notebook-0x9cb72f54",
+                               undefined,
+                               {'sharedRenderer': false});
   }
 
   function animate() {
@@ -601,6 +626,14 @@ function($, model, EmperorController) {
     ec.ready = function () {
       // any other code that needs to be executed when emperor is loaded should
       // go here
+
+      // trajectories sorted and interpolated in Python (if any)
+      ec.controllers.animations.setPrecomputedTrajectories(
+        data.plot.animation);
+
+      // colors, scales and opacities resolved in Python (if any)
+      ec.setPrecomputedAttributes(data.plot.attributes);
+
       ec.loadConfig(data.plot.settings);
 
       // sets up generic callbacks for 3rd party consumers
@@ -724,4 +757,4 @@ JACKKNIFED_SDEV = {'plot': {'decomposition': {'axes_names': [0, 1, 2, 3, 4],
           'settings': {},
           'type': 'scatter'}}
 
-CUSTOM_AXES_JSON = '  var data = {"plot": {"decomposition": {"axes_names": ["DOB", 0, 1, 2, 3, 4], "ci": null, "coordinates": [[1.322178487895014, -0.651995810831719, -0.3417784983371589, 0.15713116241738878, -0.15964022322388774, 0.41511600449567154], [1.322178487895014, -0.5603276951316744, 0.10857735915373172, -0.32567898978232684, 0.3750137797216106, -0.583487828830988], [-0.8236274360749414, 0.5394835270542403, -0.3068324227225251, -0.6770043110217822, 0.203820501907719, 0.1044335488558445], [0.21458556178898447, 0.09964194790906594, -0.03293232371368659, 0.14978636968698092, -0.8160388524355932, -0.301343079001781], [-0.813231746501206, 0.661089243947507, -0.014176279685000464, 0.05537095913733857, -0.11036487613740434, -0.3456924105084198], [0.3158305385071034, 0.5490376828031979, 0.32957520954888647, 0.7612242145083941, 0.4322721667939822, 0.04825249860931067], [-0.813231746501206, 0.40202458647314415, -0.4576554852461752, -0.0728438902229666, 0.04670222577076932, 0.36567512814466946], [0.30475686917855915, -0.21532604614952783, 1.0, -0.31976501999316115, -0.13561208920603846, 0.35686551552017187], [1.322178487895014, -0.8236274360749414, -0.2847775589983077, 0.27177950526966277, 0.16384736680860681, -0.05981937728235736]], "edges": [], "percents_explained": [-1, 26.6887048633, 16.256370402199998, 13.775412916099999, 11.217215823, 10.024774995000001], "sample_ids": ["PC.636", "PC.635", "PC.356", "PC.481", "PC.354", "PC.593", "PC.355", "PC.607", "PC.634"]}, "metadata": [["PC.636", "Fast", "20080116", "Fasting_mouse_I.D._636"], ["PC.635", "Fast", "20080116", "Fasting_mouse_I.D._635"], ["PC.356", "Control", "20061126", "Control_mouse_I.D._356"], ["PC.481", "Control", "20070314", "Control_mouse_I.D._481"], ["PC.354", "Control", "20061218", "Ctrol_mouse_I.D._354"], ["PC.593", "Control", "20071210", "Control_mouse_I.D._593"], ["PC.355", "Control", "20061218", "Control_mouse_I.D._355"], ["PC.607", "Fast", "20071112", "Fasting_mouse_I.D._607"], ["PC.634", "Fast", "20080116", "Fasting_mouse_I.D._634"]], "metadata_headers": ["SampleID", "Treatment", "DOB", "Description"], "settings": {}, "type": "scatter"}};'
+CUSTOM_AXES_JSON = '  var data = {"plot": {"decomposition": {"axes_names": ["DOB", 0, 1, 2, 3, 4], "ci": null, "coordinates": [[1.322178487895014, -0.651995810831719, -0.3417784983371589, 0.15713116241738878, -0.15964022322388774, 0.41511600449567154], [1.322178487895014, -0.5603276951316744, 0.10857735915373172, -0.32567898978232684, 0.3750137797216106, -0.583487828830988], [-0.8236274360749414, 0.5394835270542403, -0.3068324227225251, -0.6770043110217822, 0.203820501907719, 0.1044335488558445], [0.21458556178898447, 0.09964194790906594, -0.03293232371368659, 0.14978636968698092, -0.8160388524355932, -0.301343079001781], [-0.813231746501206, 0.661089243947507, -0.014176279685000464, 0.05537095913733857, -0.11036487613740434, -0.3456924105084198], [0.3158305385071034, 0.5490376828031979, 0.32957520954888647, 0.7612242145083941, 0.4322721667939822, 0.04825249860931067], [-0.813231746501206, 0.40202458647314415, -0.4576554852461752, -0.0728438902229666, 0.04670222577076932, 0.36567512814466946], [0.30475686917855915, -0.21532604614952783, 1.0, -0.31976501999316115, -0.13561208920603846, 0.35686551552017187], [1.322178487895014, -0.8236274360749414, -0.2847775589983077, 0.27177950526966277, 0.16384736680860681, -0.05981937728235736]], "edges": [], "percents_explained": [-1, 26.6887048633, 16.256370402199998, 13.775412916099999, 11.217215823, 10.024774995000001], "sample_ids": ["PC.636", "PC.635", "PC.356", "PC.481", "PC.354", "PC.593", "PC.355", "PC.607", "PC.634"]}, "metadata": {"columns": [{"dtype": "string", "values": ["PC.636", "PC.635", "PC.356", "PC.481", "PC.354", "PC.593", "PC.355", "PC.607", "PC.634"]}, {"categories": ["Fast", "Control"], "codes": [0, 0, 1, 1, 1, 1, 1, 0, 0], "dtype": "category"}, {"dtype": "int32", "values": [20080116, 20080116, 20061126, 20070314, 20061218, 20071210, 20061218, 20071112, 20080116]}, {"dtype": "string", "values": ["Fasting_mouse_I.D._636", "Fasting_mouse_I.D._635", "Control_mouse_I.D._356", "Control_mouse_I.D._481", "Ctrol_mouse_I.D._354", "Control_mouse_I.D._593", "Control_mouse_I.D._355", "Fasting_mouse_I.D._607", "Fasting_mouse_I.D._634"]}], "length": 9}, "metadata_headers": ["SampleID", "Treatment", "DOB", "Description"], "settings": {}, "type": "scatter"}};'
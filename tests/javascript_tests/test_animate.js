@@ -346,6 +346,60 @@ requirejs([
       assert.ok(director.currentFrameIsGradientPoint());
     });
 
+    test('Test the director can use precomputed trajectories',
+         function(assert) {
+      var expected = new AnimationDirector(mappingFileHeaders, mappingFileData,
+                                           coordinatesData, 'DOB',
+                                           'Treatment', 1);
+
+      // flatten the trajectories the same way the Python API does
+      var buffers = {'trajectories': [], 'sampleOffsets': [0],
+                     'sampleNames': [], 'gradient': [], 'coordinates': [],
+                     'frameOffsets': [0], 'frames': [], 'intervals': [],
+                     'minimumDelta': expected.minimumDelta,
+                     'gradientPoints': expected.gradientPoints};
+
+      expected.trajectories.forEach(function(trajectory) {
+        buffers.trajectories.push(trajectory.metadataCategoryName);
+        buffers.sampleNames = buffers.sampleNames.concat(
+          trajectory.sampleNames);
+        buffers.gradient = buffers.gradient.concat(trajectory.gradientPoints);
+        buffers.sampleOffsets.push(buffers.sampleNames.length);
+
+        trajectory.coordinates.forEach(function(p) {
+          buffers.coordinates.push(p.x, p.y, p.z);
+        });
+        trajectory.interpolatedCoordinates.forEach(function(p) {
+          buffers.frames.push(p.x, p.y, p.z);
+        });
+        buffers.frameOffsets.push(buffers.frames.length / 3);
+        buffers.intervals = buffers.intervals.concat(
+          Array.prototype.slice.call(trajectory._intervalValues));
+      });
+
+      var director = new AnimationDirector(mappingFileHeaders, mappingFileData,
+                                           coordinatesData, 'DOB',
+                                           'Treatment', 1, buffers);
+
+      equal(director.trajectories.length, 2);
+      equal(director.minimumDelta, expected.minimumDelta);
+      deepEqual(director.gradientPoints, expected.gradientPoints);
+      deepEqual(director._frameIndices, expected._frameIndices);
+      equal(director.getMaximumTrajectoryLength(),
+            expected.getMaximumTrajectoryLength());
+
+      for (var i = 0; i < 2; i++) {
+        var obs = director.trajectories[i], exp = expected.trajectories[i];
+
+        equal(obs.metadataCategoryName, exp.metadataCategoryName);
+        deepEqual(obs.sampleNames, exp.sampleNames);
+        deepEqual(obs.coordinates, exp.coordinates);
+        deepEqual(obs.interpolatedCoordinates, exp.interpolatedCoordinates);
+        deepEqual(Array.prototype.slice.call(obs._intervalValues),
+                  Array.prototype.slice.call(exp._intervalValues));
+      }
+    });
+
 
   });
 });
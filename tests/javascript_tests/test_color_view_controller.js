@@ -324,6 +324,20 @@ requirejs([
       ]);
     });
 
+    test('Test getScaledColors with numeric values', function() {
+      var values = ['0.0', '4.0', 'nan', '2.0'];
+      var numbers = {'0.0': 0, '4.0': 4, '2.0': 2};
+      var color = ColorViewController.getScaledColors(values, 'Viridis',
+                                                      undefined, numbers);
+      deepEqual(color[0], {'0.0': '#440154', '2.0': '#26838f',
+                           '4.0': '#fee825', 'nan': '#64655d'});
+
+      color = ColorViewController.getColorList(values, 'Viridis', false,
+                                               true, numbers);
+      deepEqual(color[0], {'0.0': '#440154', '2.0': '#26838f',
+                           '4.0': '#fee825', 'nan': '#64655d'});
+    });
+
     test('Test getInterpolatedColors', function() {
       var five = ['0', '1', '2', '3', '4'];
       var color = ColorViewController.getInterpolatedColors(five, 'Viridis');
@@ -627,6 +641,52 @@ requirejs([
       equal(controller.$searchBar.prop('hidden'), false);
     });
 
+    test('Testing fromJSON with precomputed colors', function(assert) {
+      var json = {category: 'DOB',
+                  colormap: 'discrete-coloring-qiime',
+                  continuous: false,
+                  data: {20070314: '#ff0000', 20071112: '#0000ff'}};
+
+      var container = $('<div style="height:11px; width:12px"></div>');
+      var controller = new ColorViewController(new UIState(),
+        container, this.sharedDecompositionViewDict);
+
+      controller.setPrecomputedAttributes({category: 'DOB',
+                                           values: [0, 255, 0, 0, 0, 255,
+                                                    255, 255, 255]});
+      controller.fromJSON(json);
+
+      var markers = controller.decompViewDict.scatter.markers;
+      equal(markers[0].material.color.getHexString(), '00ff00');
+      equal(markers[1].material.color.getHexString(), '0000ff');
+      equal(markers[2].material.color.getHexString(), 'ffffff');
+
+      // the precomputed colors are only used once
+      controller.fromJSON(json);
+      equal(markers[0].material.color.getHexString(), 'ff0000');
+      equal(markers[2].material.color.getHexString(), '0000ff');
+    });
+
+    test('Testing fromJSON ignores colors for other categories', function() {
+      var json = {category: 'DOB',
+                  colormap: 'discrete-coloring-qiime',
+                  continuous: false,
+                  data: {20070314: '#ff0000', 20071112: '#0000ff'}};
+
+      var container = $('<div style="height:11px; width:12px"></div>');
+      var controller = new ColorViewController(new UIState(),
+        container, this.sharedDecompositionViewDict);
+
+      controller.setPrecomputedAttributes({category: 'Treatment',
+                                           values: [0, 255, 0, 0, 0, 255,
+                                                    255, 255, 255]});
+      controller.fromJSON(json);
+
+      var markers = controller.decompViewDict.scatter.markers;
+      equal(markers[0].material.color.getHexString(), 'ff0000');
+      equal(markers[1].material.color.getHexString(), '0000ff');
+    });
+
     test('Testing fromJSON scaled', function(assert) {
       var json = {category: 'Mixed', colormap: 'Viridis',
                   continuous: true, data: {'Non-numeric values': '#ae1221'}};
@@ -173,6 +173,18 @@ requirejs([
       equal(dm.edges[1][1].name, 'PC.634');
     });
 
+    test('Test add edges by position', function(assert) {
+      this.data.edges = [[7, 8], [6, 8]];
+
+      var dm = new DecompositionModel(this.data, this.md_headers,
+                                      this.metadata, 'scatter');
+
+      equal(dm.edges[0][0].name, 'PC.607');
+      equal(dm.edges[0][1].name, 'PC.634');
+      equal(dm.edges[1][0].name, 'PC.355');
+      equal(dm.edges[1][1].name, 'PC.634');
+    });
+
     test('Test add edges error', function(assert) {
       this.data.edges = [['PC.607', 'PC.607'], ['PC.355', 'PC.634']];
 
@@ -589,6 +601,31 @@ requirejs([
           'successfully');
     });
 
+    /**
+     *
+     * Test the plottables are grouped once per category.
+     *
+     */
+    test('Test getPlottablesByMetadataCategoryValue reuses the groups',
+         function() {
+      var dm = new DecompositionModel(this.data, this.md_headers,
+                                      this.metadata);
+      var obs = dm.getPlottablesByMetadataCategoryValue('Treatment',
+                                                        'Control');
+
+      deepEqual(_.keys(dm._categoryIndex), ['Treatment']);
+      deepEqual(_.map(obs, function(p) { return p.idx; }), [0, 4, 6, 7, 8]);
+
+      // modifying the result doesn't modify the index
+      obs.pop();
+      obs = dm.getPlottablesByMetadataCategoryValue('Treatment', 'Control');
+      equal(obs.length, 5);
+      equal(dm._categoryIndex.Treatment.Control.length, 5);
+
+      obs = dm.getPlottablesByMetadataCategoryValue('Treatment', 'Fast');
+      deepEqual(_.map(obs, function(p) { return p.idx; }), [1, 2, 3, 5]);
+    });
+
     /**
      *
      * Test getPlottablesByMetadataCategoryValue throws an error if the
@@ -714,6 +751,242 @@ requirejs([
               );
         });
 
+    /**
+     *
+     * Tests the metadata can be provided as typed columns
+     *
+     */
+    test('Test constructor with typed metadata columns', function() {
+      var columns = {
+        length: 9,
+        columns: [
+          {dtype: 'string', values: ['PC.636', 'PC.635', 'PC.356', 'PC.481',
+                                     'PC.354', 'PC.593', 'PC.355', 'PC.607',
+                                     'PC.634']},
+          {dtype: 'category', categories: ['YATGCTGCCTCCCGTAGGAGT'],
+           codes: [0, 0, 0, 0, 0, 0, 0, 0, 0]},
+          {dtype: 'category', categories: ['Control', 'Fast'],
+           codes: [0, 1, 1, 1, 0, 1, 0, 0, 0]},
+          {dtype: 'int32', values: [20070314, 20071112, 20080116, 20080116,
+                                    20071210, 20080116, 20061218, 20061218,
+                                    20061126]}
+        ]
+      };
+      var rows = new DecompositionModel(this.data, this.md_headers,
+                                        this.metadata);
+      var dm = new DecompositionModel(this.data, this.md_headers, columns);
+
+      deepEqual(dm.apply(function(pl) {return pl.metadata;}),
+                rows.apply(function(pl) {return pl.metadata;}));
+      deepEqual(dm.getUniqueValuesByCategory('DOB'),
+                rows.getUniqueValuesByCategory('DOB'));
+    });
+
+    /**
+     *
+     * Tests the numeric values of a category are retrieved from the typed
+     * columns
+     *
+     */
+    test('Test getNumericValuesByCategory', function() {
+      var columns = {
+        length: 9,
+        columns: [
+          {dtype: 'string', values: ['PC.636', 'PC.635', 'PC.356', 'PC.481',
+                                     'PC.354', 'PC.593', 'PC.355', 'PC.607',
+                                     'PC.634']},
+          {dtype: 'category', categories: ['YATGCTGCCTCCCGTAGGAGT'],
+           codes: [0, 0, 0, 0, 0, 0, 0, 0, 0]},
+          {dtype: 'category', categories: ['Control', 'Fast'],
+           codes: [0, 1, 1, 1, 0, 1, 0, 0, 0]},
+          {dtype: 'float64', values: [1, 2.5, null, 1e-5, 1, 1, 1, 1, 1]}
+        ]
+      };
+      var dm = new DecompositionModel(this.data, this.md_headers, columns);
+
+      deepEqual(dm.getUniqueValuesByCategory('DOB'),
+                ['nan', '1e-05', '1.0', '2.5']);
+      deepEqual(dm.getNumericValuesByCategory('DOB'),
+                {'1.0': 1, '2.5': 2.5, '1e-05': 1e-5});
+      equal(dm.getNumericValuesByCategory('Treatment'), null);
+
+      // legacy metadata doesn't have numeric columns
+      dm = new DecompositionModel(this.data, this.md_headers, this.metadata);
+      equal(dm.getNumericValuesByCategory('DOB'), null);
+    });
+
+    /**
+     *
+     * Tests the metadata of procrustes plots is repeated for each ordination
+     *
+     */
+    test('Test constructor with replicated metadata columns', function() {
+      var data = {
+        sample_ids: ['a_0', 'b_0', 'a_1', 'b_1'],
+        coordinates: [[0, 1], [1, 0], [0, 0.5], [0.5, 0]],
+        percents_explained: [50, 30],
+        edges: [[0, 2], [1, 3]]
+      };
+      var columns = {
+        length: 2,
+        replicates: 2,
+        columns: [
+          {dtype: 'string', values: ['a', 'b']},
+          {dtype: 'float64', values: [1.5, null]},
+          {dtype: 'replicate', categories: ['Ordination 0', 'Ordination 1']}
+        ]
+      };
+      var dm = new DecompositionModel(data, ['SampleID', 'pH', 'Names'],
+                                      columns);
+
+      deepEqual(dm.apply(function(pl) {return pl.metadata;}),
+                [['a_0', '1.5', 'Ordination 0'], ['b_0', 'nan', 'Ordination 0'],
+                 ['a_1', '1.5', 'Ordination 1'],
+                 ['b_1', 'nan', 'Ordination 1']]);
+      deepEqual(dm.getNumericValuesByCategory('pH'), {'1.5': 1.5});
+      equal(dm.edges[1][0].name, 'b_0');
+      equal(dm.edges[1][1].name, 'b_1');
+    });
+
+    /**
+     *
+     * Tests deferred metadata columns are decoded when they are loaded
+     *
+     */
+    asyncTest('Test loadCategory with deferred columns', function() {
+      var data = {
+        sample_ids: ['a_0', 'b_0', 'a_1', 'b_1'],
+        coordinates: [[0, 1], [1, 0], [0, 0.5], [0.5, 0]],
+        percents_explained: [50, 30]
+      };
+      // {"dtype": "float64", "values": [7.0, null]} compressed with zlib
+      var block = ('eJyrVkopqSxIVbJSUErLyU8sMTNR0lFQKkvMKU0tBgpGm+sZ6Ck' +
+                   'lebkxNYCACXqDU8=');
+      var columns = {
+        length: 2,
+        replicates: 2,
+        columns: [
+          {dtype: 'string', values: ['a', 'b']},
+          {dtype: 'deferred', block: block}
+        ]
+      };
+      var dm = new DecompositionModel(data, ['SampleID', 'pH'], columns);
+
+      equal(dm.isCategoryLoaded('SampleID'), true);
+      equal(dm.isCategoryLoaded('pH'), false);
+      deepEqual(dm.getUniqueValuesByCategory('pH'), ['']);
+
+      dm.loadCategory('pH').done(function() {
+        equal(dm.isCategoryLoaded('pH'), true);
+        deepEqual(dm.apply(function(pl) {return pl.metadata;}),
+                  [['a_0', '7.0'], ['b_0', 'nan'], ['a_1', '7.0'],
+                   ['b_1', 'nan']]);
+        deepEqual(dm.getUniqueValuesByCategory('pH'), ['nan', '7.0']);
+        deepEqual(dm.getNumericValuesByCategory('pH'), {'7.0': 7});
+
+        start(); // qunit
+      });
+    });
+
+    /**
+     *
+     * Tests deferred metadata columns that cannot be decoded are rejected
+     *
+     */
+    asyncTest('Test loadCategory with invalid deferred columns', function() {
+      var data = {
+        sample_ids: ['a', 'b'],
+        coordinates: [[0, 1], [1, 0]],
+        percents_explained: [50, 30]
+      };
+      var columns = {
+        length: 2,
+        columns: [
+          {dtype: 'string', values: ['a', 'b']},
+          {dtype: 'deferred', block: '!!!'}
+        ]
+      };
+      var dm = new DecompositionModel(data, ['SampleID', 'pH'], columns);
+
+      dm.loadCategory('pH').fail(function(error) {
+        ok(error instanceof Error);
+        equal(error.message.indexOf('Could not load the metadata ' +
+                                    'category "pH": '), 0);
+        equal(dm.isCategoryLoaded('pH'), false);
+
+        start(); // qunit
+      });
+    });
+
+    /**
+     *
+     * Tests encoded coordinates are decoded
+     *
+     */
+    test('Test constructor with encoded coordinates', function() {
+      var data = {
+        sample_ids: ['a', 'b'],
+        coordinates: {dtype: 'float32', shape: [2, 2],
+                      data: 'AACAPwAAAMAAAAA/AACAQA=='},
+        percents_explained: [50, 30]
+      };
+      var dm = new DecompositionModel(data, ['SampleID'], [['a'], ['b']]);
+      deepEqual(dm.apply(function(pl) {return pl.coordinates;}),
+                [[1, -2], [0.5, 4]]);
+
+      // fixed point values are scaled and translated for each axis
+      data.coordinates = {dtype: 'int16', shape: [2, 2],
+                          data: 'AgD+/wAABAA=', scale: [0.5, 2],
+                          offset: [1, 0]};
+      dm = new DecompositionModel(data, ['SampleID'], [['a'], ['b']]);
+      deepEqual(dm.apply(function(pl) {return pl.coordinates;}),
+                [[2, -4], [1, 8]]);
+
+      data.coordinates = {dtype: 'float16', shape: [2, 2], data: ''};
+      throws(function() {
+        dm = new DecompositionModel(data, ['SampleID'], [['a'], ['b']]);
+      }, Error, 'An error is raised if the coordinates type is unknown');
+    });
+
+    /**
+     *
+     * Tests unknown column types are rejected
+     *
+     */
+    test('Test constructor excepts unknown column types', function() {
+      var data = this.data, headers = this.md_headers;
+      throws(
+          function() {
+            var dm = new DecompositionModel(data, headers, {
+              length: 9,
+              columns: [{dtype: 'complex', values: []}]
+            });
+          },
+          Error,
+          'An error is raised if a column type is unknown'
+          );
+    });
+
+    /**
+     *
+     * Tests numbers are formatted the same way as in Python
+     *
+     */
+    test('Test _formatNumber', function() {
+      var format = DecompositionModel._formatNumber;
+
+      equal(format(1, false), '1');
+      equal(format(1, true), '1.0');
+      equal(format(-0, true), '-0.0');
+      equal(format(0.1 + 0.2, true), '0.30000000000000004');
+      equal(format(1e-4, true), '0.0001');
+      equal(format(1e-5, true), '1e-05');
+      equal(format(-2.5e-7, true), '-2.5e-07');
+      equal(format(1e15, true), '1000000000000000.0');
+      equal(format(1e16, true), '1e+16');
+      equal(format(123456789012345680, true), '1.2345678901234568e+17');
+    });
+
     /**
      *
      * Tests apply executes the provided function for all the plottables
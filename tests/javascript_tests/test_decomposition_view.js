@@ -189,26 +189,44 @@ requirejs([
       // testing the markers
       assert.ok(view.markers.length === 2);
 
-      equal(view.markers[0].line.name, 'PC.636');
-      equal(view.markers[0].cone.name, 'PC.636');
-      equal(view.markers[1].line.name, 'PC.635');
-      equal(view.markers[1].cone.name, 'PC.635');
-
-      var a = [0.19977209326971626, 0, 0.8289251461730293, 0.52246934148585];
-      var b = [-0.3246511569372691, 0, 0.5585576432564162, 0.7632922018854449];
-
-      deepEqual(view.markers[0].quaternion.toArray(), a);
-      deepEqual(view.markers[1].quaternion.toArray(), b);
+      equal(view.markers[0].name, 'PC.636');
+      equal(view.markers[1].name, 'PC.635');
+
+      // both arrows are drawn by the same collection
+      var collection = view.markers[0].collection;
+      assert.ok(collection === view.markers[1].collection);
+      assert.ok(collection.shafts instanceof THREE.InstancedMesh);
+      assert.ok(collection.heads instanceof THREE.InstancedMesh);
+      equal(collection.shafts.count, 2);
+      equal(collection.heads.count, 2);
+
+      // the heads end where the arrows point to
+      var matrix = new THREE.Matrix4(), position = new THREE.Vector3();
+      collection.heads.getMatrixAt(0, matrix);
+      position.setFromMatrixPosition(matrix);
+      deepEqual(position.toArray().map(function(v) {
+        return Number(v.toFixed(6));
+      }), [-0.276542, -0.144964, 0.066647]);
+      deepEqual(view.markers[0].label.position.toArray().map(function(v) {
+        return Number(v.toFixed(6));
+      }), [-0.276542, -0.144964, 0.066647]);
+
+      collection.heads.getMatrixAt(1, matrix);
+      position.setFromMatrixPosition(matrix);
+      deepEqual(position.toArray().map(function(v) {
+        return Number(v.toFixed(6));
+      }), [-0.237661, 0.046053, -0.138136]);
 
       deepEqual(view.markers[0].position.toArray(), [0, 0, 0]);
       deepEqual(view.markers[1].position.toArray(), [0, 0, 0]);
 
       // bulk checks
       view.markers.map(function(marker) {
-        assert.ok(marker instanceof THREE.ArrowHelper);
-
-        deepEqual(marker.line.material.color.getHex(), 0xc0c0c0);
-        deepEqual(marker.cone.material.color.getHex(), 0xc0c0c0);
+        deepEqual(marker.material.color.getHex(), 0xc0c0c0);
+        deepEqual(collection.heads.geometry.attributes.instanceColor.getX(
+          marker.index), 0xc0 / 255);
+        deepEqual(collection.heads.geometry.attributes.instanceVisible.getX(
+          marker.index), 1);
       });
     });
 
@@ -333,7 +351,7 @@ requirejs([
       }, Error, 'Biplots are not supported in fast mode');
     });
 
-    test('Test constructor fails (jackknifed in fast mode)', function() {
+    test('Test constructor (jackknifed in fast mode)', function(assert) {
       // setup function
       var data = {
         name: 'pcoa',
@@ -355,11 +373,32 @@ requirejs([
                        '20071112']];
       this.decomp = new DecompositionModel(data, md_headers, metadata);
       var multiModel = new MultiModel({'scatter': this.decomp});
-      throws(function() {
-        var UIState1 = new UIState();
-        UIState1.setProperty('view.usesPointCloud', true);
-        var dv = new DecompositionView(multiModel, 'scatter', UIState1);
-      }, Error, 'Jaccknifed plots are not supported in fast mode');
+      var UIState1 = new UIState();
+      UIState1.setProperty('view.usesPointCloud', true);
+      var dv = new DecompositionView(multiModel, 'scatter', UIState1);
+
+      var mesh = dv.ellipsoids[0], matrix = new THREE.Matrix4();
+      var position = new THREE.Vector3(), scale = new THREE.Vector3();
+
+      equal(dv.ellipsoids.length, 1, 'All the ellipsoids share one mesh');
+      assert.ok(mesh instanceof THREE.InstancedMesh);
+      equal(mesh.count, 2);
+
+      mesh.getMatrixAt(1, matrix);
+      matrix.decompose(position, new THREE.Quaternion(), scale);
+      assert.ok(position.distanceTo(
+        new THREE.Vector3(-0.237661, 0.046053, -0.138136)) < 1e-6);
+      assert.ok(scale.distanceTo(new THREE.Vector3(0.3, 0.1, 0.06)) < 1e-6);
+
+      dv.setColor(0x00ff00, [this.decomp.plottable[1]]);
+      deepEqual(Array.from(mesh.geometry.attributes.instanceColor.array),
+                [1, 0, 0, 0, 1, 0]);
+
+      dv.setVisibility(false, [this.decomp.plottable[0]]);
+      deepEqual(Array.from(mesh.geometry.attributes.instanceVisible.array),
+                [0, 1]);
+      deepEqual(Array.from(mesh.geometry.attributes.instanceOpacity.array),
+                [0.5, 0.5]);
     });
 
     test('Test getGeometryFactor', function() {
@@ -803,24 +842,25 @@ requirejs([
       var dv = new DecompositionView(this.multiModel, 'scatter', UIState1);
       var plottables = [this.decomp.plottable[1]];
 
+      var attributes = dv.markers[0].collection.heads.geometry.attributes;
+
       // color
       dv.setColor(0x0f0f0f);
-      deepEqual(dv.markers[0].line.material.color.toArray(),
-                [15 / 255, 15 / 255, 15 / 255]);
-      deepEqual(dv.markers[0].cone.material.color.toArray(),
+      deepEqual(dv.markers[0].material.color.toArray(),
                 [15 / 255, 15 / 255, 15 / 255]);
-      deepEqual(dv.markers[1].line.material.color.toArray(),
+      deepEqual(dv.markers[1].material.color.toArray(),
                 [15 / 255, 15 / 255, 15 / 255]);
-      deepEqual(dv.markers[1].cone.material.color.toArray(),
+      deepEqual(dv.markers[1].label.material.color.toArray(),
                 [15 / 255, 15 / 255, 15 / 255]);
 
       dv.setColor(0xff00ff, plottables);
-      deepEqual(dv.markers[0].line.material.color.toArray(),
-                [15 / 255, 15 / 255, 15 / 255]);
-      deepEqual(dv.markers[0].cone.material.color.toArray(),
+      deepEqual(dv.markers[0].material.color.toArray(),
                 [15 / 255, 15 / 255, 15 / 255]);
-      deepEqual(dv.markers[1].line.material.color.toArray(), [1, 0, 1]);
-      deepEqual(dv.markers[1].cone.material.color.toArray(), [1, 0, 1]);
+      deepEqual(dv.markers[1].material.color.toArray(), [1, 0, 1]);
+      deepEqual([attributes.instanceColor.getX(1),
+                 attributes.instanceColor.getY(1),
+                 attributes.instanceColor.getZ(1)], [1, 0, 1]);
+      equal(dv.groupByColor(['PC.635'])['ff00ff'].length, 1);
 
       // visibility
       dv.setVisibility(false);
@@ -830,6 +870,8 @@ requirejs([
       dv.setVisibility(true, plottables);
       deepEqual(dv.markers[0].visible, false);
       deepEqual(dv.markers[1].visible, true);
+      equal(attributes.instanceVisible.getX(0), 0);
+      equal(attributes.instanceVisible.getX(1), 1);
 
       throws(
         function() {
@@ -851,24 +893,19 @@ requirejs([
 
       // opacity
       dv.setOpacity(0.5);
-      deepEqual(dv.markers[0].line.material.transparent, true);
-      deepEqual(dv.markers[0].cone.material.transparent, true);
-      deepEqual(dv.markers[0].line.material.opacity, 0.5);
-      deepEqual(dv.markers[0].cone.material.opacity, 0.5);
-      deepEqual(dv.markers[1].line.material.transparent, true);
-      deepEqual(dv.markers[1].cone.material.transparent, true);
-      deepEqual(dv.markers[1].line.material.opacity, 0.5);
-      deepEqual(dv.markers[1].cone.material.opacity, 0.5);
+      deepEqual(dv.markers[0].material.transparent, true);
+      deepEqual(dv.markers[0].material.opacity, 0.5);
+      deepEqual(dv.markers[1].material.transparent, true);
+      deepEqual(dv.markers[1].material.opacity, 0.5);
+      deepEqual(dv.markers[0].collection.heads.material.transparent, true);
 
       dv.setOpacity(1.0, plottables);
-      deepEqual(dv.markers[0].line.material.transparent, true);
-      deepEqual(dv.markers[0].cone.material.transparent, true);
-      deepEqual(dv.markers[0].line.material.opacity, 0.5);
-      deepEqual(dv.markers[0].cone.material.opacity, 0.5);
-      deepEqual(dv.markers[1].line.material.transparent, false);
-      deepEqual(dv.markers[1].cone.material.transparent, false);
-      deepEqual(dv.markers[1].line.material.opacity, 1.0);
-      deepEqual(dv.markers[1].cone.material.opacity, 1.0);
+      deepEqual(dv.markers[0].material.transparent, true);
+      deepEqual(dv.markers[0].material.opacity, 0.5);
+      deepEqual(dv.markers[1].material.transparent, false);
+      deepEqual(dv.markers[1].material.opacity, 1.0);
+      equal(attributes.instanceOpacity.getX(0), 0.5);
+      equal(attributes.instanceOpacity.getX(1), 1.0);
     });
 
     test('Test setters for attributes (using point cloud)', function(assert) {
@@ -943,5 +980,76 @@ requirejs([
       equal(obs['0f0f0f'].length, 1);
     });
 
+    test('Test setShape', function(assert) {
+      var UIState1 = new UIState();
+      UIState1.setProperty('view.usesPointCloud', false);
+      var dv = new DecompositionView(this.multiModel, 'scatter', UIState1);
+
+      dv.setShape('Square', [this.decomp.plottable[1]]);
+      equal(dv.markers[0].userData.shape, 'Sphere');
+      equal(dv.markers[1].userData.shape, 'Square');
+
+      dv.setShape('Cone');
+      equal(dv.markers[0].userData.shape, 'Cone');
+      equal(dv.markers[1].userData.shape, 'Cone');
+
+      throws(function() {
+        dv.setShape('Not a shape');
+      }, /Unknown shape Not a shape/);
+    });
+
+    test('Test beginUpdate and endUpdate', function(assert) {
+      var UIState1 = new UIState();
+      UIState1.setProperty('view.usesPointCloud', true);
+      var dv = new DecompositionView(this.multiModel, 'scatter', UIState1);
+      var plottables = [this.decomp.plottable[1]];
+      var attributes = dv.markers[0].geometry.attributes;
+
+      dv.beginUpdate();
+
+      dv.setColor(0x00ff00);
+      dv.setColor(0x0000ff, plottables);
+      dv.setVisibility(false, plottables);
+      dv.setScale(3);
+      dv.setOpacity(0.5, plottables);
+
+      // nothing is written until the update ends
+      deepEqual(Array.from(attributes.color.array), [1, 0, 0, 1, 0, 0]);
+      deepEqual(Array.from(attributes.visible.array), [1, 1]);
+      deepEqual(Array.from(attributes.scale.array), [1, 1]);
+      deepEqual(Array.from(attributes.opacity.array), [1, 1]);
+
+      dv.needsUpdate = false;
+      dv.endUpdate();
+
+      // the last value set for each plottable is kept
+      deepEqual(Array.from(attributes.color.array), [0, 1, 0, 0, 0, 1]);
+      deepEqual(Array.from(attributes.visible.array), [1, 0]);
+      deepEqual(Array.from(attributes.scale.array), [3, 3]);
+      deepEqual(Array.from(attributes.opacity.array), [1, 0.5]);
+      equal(dv.needsUpdate, true);
+
+      // once the update ends, changes are applied right away
+      dv.setScale(2, plottables);
+      deepEqual(Array.from(attributes.scale.array), [3, 2]);
+
+      // ending an update that was never started is a noop
+      dv.endUpdate();
+      deepEqual(Array.from(attributes.scale.array), [3, 2]);
+    });
+
+    test('Test beginUpdate validates the attributes (biplot)', function() {
+      this.decomp.type = 'arrow';
+      var UIState1 = new UIState();
+      UIState1.setProperty('view.usesPointCloud', false);
+      var dv = new DecompositionView(this.multiModel, 'scatter', UIState1);
+
+      dv.beginUpdate();
+      throws(function() {
+        dv.setScale(3);
+      }, /Cannot change the scale of an arrow./);
+      dv.endUpdate();
+    });
+
   });
 });
@@ -3,7 +3,11 @@ requirejs(['draw', 'three'], function(draw, THREE) {
   var makeLine = draw.makeLine;
   var makeLabel = draw.makeLabel;
   var makeArrow = draw.makeArrow;
+  var makeArrowCollection = draw.makeArrowCollection;
+  var makeLabelCollection = draw.makeLabelCollection;
+  var getGlyphAtlas = draw.getGlyphAtlas;
   var makeLineCollection = draw.makeLineCollection;
+  var makeDynamicTubes = draw.makeDynamicTubes;
   $(document).ready(function() {
 
     module('Drawing utilities', {
@@ -171,6 +175,187 @@ requirejs(['draw', 'three'], function(draw, THREE) {
       equal(arrow.children.length, 0);
     });
 
+    test('Test makeArrowCollection works correctly', function(assert) {
+      var collection = makeArrowCollection([[0, 0, 0], [0, 0, 0]],
+                                           [[9, 1, 1], [0, 2, 0]], 0x00ff00,
+                                           ['test', 'other']);
+      var matrix = new THREE.Matrix4(), position = new THREE.Vector3();
+      var attributes = collection.heads.geometry.attributes;
+
+      // shafts, heads and labels
+      equal(collection.children.length, 3);
+      equal(collection.arrows.length, 2);
+      assert.ok(collection.arrows[1].label ===
+                collection.labels.labels[1]);
+      equal(collection.heads.count, 2);
+      equal(collection.shafts.count, 2);
+
+      // the attributes are shared by the shafts and the heads
+      assert.ok(attributes.instanceColor ===
+                collection.shafts.geometry.attributes.instanceColor);
+
+      equal(collection.arrows[0].name, 'test');
+      equal(collection.arrows[1].name, 'other');
+      equal(collection.arrows[0].label.text, 'test');
+
+      deepEqual(collection.arrows[0].material.color.toArray(), [0, 1, 0]);
+      deepEqual([attributes.instanceColor.getX(1),
+                 attributes.instanceColor.getY(1),
+                 attributes.instanceColor.getZ(1)], [0, 1, 0]);
+
+      // the second arrow points straight up so the head's matrix has no
+      // rotation
+      collection.heads.getMatrixAt(1, matrix);
+      position.setFromMatrixPosition(matrix);
+      deepEqual(position.toArray(), [0, 2, 0]);
+      deepEqual(collection.arrows[1].label.position.toArray(), [0, 2, 0]);
+      deepEqual(matrix.elements.map(function(v) {
+        return Number(v.toFixed(6));
+      }), [0.08, 0, 0, 0, 0, 0.4, 0, 0, 0, 0, 0.08, 0, 0, 2, 0, 1]);
+    });
+
+    test('Test arrow setters in a collection', function(assert) {
+      var collection = makeArrowCollection([[0, 0, 0], [0, 0, 0]],
+                                           [[9, 1, 1], [0, 2, 0]], 0x00ff00,
+                                           ['test', 'other']);
+      var arrow = collection.arrows[0], matrix = new THREE.Matrix4(),
+          position = new THREE.Vector3();
+      var attributes = collection.heads.geometry.attributes;
+
+      arrow.setColor(new THREE.Color(0xff0000));
+      deepEqual(arrow.getColor().toArray(), [1, 0, 0]);
+      deepEqual(arrow.label.material.color.toArray(), [1, 0, 0]);
+      deepEqual([attributes.instanceColor.getX(0),
+                 attributes.instanceColor.getY(0),
+                 attributes.instanceColor.getZ(0)], [1, 0, 0]);
+
+      arrow.setOpacity(0.5);
+      equal(arrow.material.opacity, 0.5);
+      equal(arrow.material.transparent, true);
+      equal(attributes.instanceOpacity.getX(0), 0.5);
+      equal(collection.heads.material.transparent, true);
+      equal(collection.shafts.material.transparent, true);
+
+      arrow.visible = false;
+      equal(attributes.instanceVisible.getX(0), 0);
+      equal(attributes.instanceVisible.getX(1), 1);
+
+      arrow.setPointsTo(new THREE.Vector3(0, 0, 3));
+      collection.heads.getMatrixAt(0, matrix);
+      position.setFromMatrixPosition(matrix);
+      deepEqual(position.toArray(), [0, 0, 3]);
+      deepEqual(arrow.label.position.toArray(), [0, 0, 3]);
+    });
+
+    test('Test raycasting an arrow in a collection', function(assert) {
+      var collection = makeArrowCollection([[0, 0, 0], [0, 0, 0]],
+                                           [[2, 0, 0], [0, 2, 0]], 0x00ff00,
+                                           ['test', 'other']);
+      var raycaster = new THREE.Raycaster(new THREE.Vector3(1.9, 0, 5),
+                                          new THREE.Vector3(0, 0, -1));
+      var intersects = [];
+
+      collection.updateMatrixWorld();
+
+      collection.arrows[0].raycast(raycaster, intersects);
+      assert.ok(intersects.length > 0);
+      assert.ok(intersects[0].object === collection.arrows[0]);
+
+      intersects = [];
+      collection.arrows[1].raycast(raycaster, intersects);
+      equal(intersects.length, 0);
+    });
+
+    test('Test the glyph atlas is shared and grows', function(assert) {
+      var atlas = getGlyphAtlas(), index, rows;
+
+      assert.ok(atlas === getGlyphAtlas());
+
+      // printable ASCII characters are added by default
+      equal(atlas.glyphs.a.index, 65);
+      assert.ok(atlas.glyphs.a.width > 0);
+
+      index = atlas.characters.length;
+      rows = atlas.uniforms.atlasGrid.value.y;
+      atlas.addCharacters('\u00e9a');
+      equal(atlas.glyphs['\u00e9'].index, index);
+      equal(atlas.characters.length, index + 1);
+      assert.ok(atlas.uniforms.atlasGrid.value.y >= rows);
+      equal(atlas.canvas.height,
+            atlas.uniforms.atlasGrid.value.y * atlas.cellSize);
+    });
+
+    test('Test makeLabelCollection works correctly', function(assert) {
+      var labels = makeLabelCollection(['PC.636', 'ab'], 0x00ff00);
+      var attributes = labels.mesh.geometry.attributes;
+
+      equal(labels.labels.length, 2);
+      equal(labels.mesh.geometry.maxInstancedCount, 8);
+
+      equal(labels.labels[0].text, 'PC.636');
+      deepEqual(labels.labels[0].material.color.toArray(), [0, 1, 0]);
+      equal(labels.labels[0].scale.y, 32);
+
+      // the glyphs are centered around the label's position
+      equal(attributes.glyphOffset.getX(0), -labels.labels[0].width / 2);
+      equal(attributes.glyphIndex.getX(6),
+            labels.atlas.glyphs.a.index);
+      equal(attributes.glyphIndex.getX(7),
+            labels.atlas.glyphs.b.index);
+
+      // labels are visible until the collection is culled
+      deepEqual(Array.from(attributes.labelVisible.array),
+                [1, 1, 1, 1, 1, 1, 1, 1]);
+
+      labels.dispose();
+      equal(labels.children.length, 0);
+    });
+
+    test('Test culling labels', function(assert) {
+      var labels = makeLabelCollection(['abc', 'de', 'far'], 0x00ff00);
+      var visible = labels.mesh.geometry.attributes.labelVisible;
+      var camera = new THREE.OrthographicCamera(-1, 1, 1, -1, 0.1, 100);
+      camera.position.set(0, 0, 10);
+      camera.lookAt(0, 0, 0);
+
+      labels.labels.forEach(function(label) {
+        label.scale.multiplyScalar(0.004);
+      });
+
+      // the second label overlaps the first one but is closer to the camera
+      // and the third one is outside of the screen
+      labels.labels[1].position.set(0.01, 0, 1);
+      labels.labels[2].position.set(5, 0, 0);
+
+      labels.update(camera, 400, 400);
+      deepEqual(Array.from(visible.array), [0, 0, 0, 1, 1, 0, 0, 0]);
+
+      labels.hideOverlapping = false;
+      labels.update(camera, 400, 400);
+      deepEqual(Array.from(visible.array), [1, 1, 1, 1, 1, 0, 0, 0]);
+
+      labels.maxLabels = 1;
+      labels.update(camera, 400, 400);
+      deepEqual(Array.from(visible.array), [0, 0, 0, 1, 1, 0, 0, 0]);
+
+      // hidden labels are never shown
+      labels.labels[1].visible = false;
+      labels.update(camera, 400, 400);
+      deepEqual(Array.from(visible.array), [1, 1, 1, 0, 0, 0, 0, 0]);
+    });
+
+    test('Test dispose method in arrow collection works', function(assert) {
+      var collection = makeArrowCollection([[0, 0, 0]], [[9, 1, 1]], 0x00ff00,
+                                           ['test']);
+      var arrow = collection.arrows[0];
+      collection.dispose();
+
+      assert.ok(arrow.label === null);
+      equal(arrow.children.length, 0);
+      equal(collection.children.length, 0);
+      equal(collection.arrows.length, 0);
+    });
+
     /**
      *
      * Test that the SVG file is generated correctly.
@@ -238,5 +423,56 @@ requirejs(['draw', 'three'], function(draw, THREE) {
       res = formatSVGLegend(names, colors);
       deepEqual(res, e, 'SVG file is formatted correcly');
     });
+
+    /**
+     *
+     * Test the dynamic tubes are moved to the segment of each frame.
+     *
+     */
+    test('Test makeDynamicTubes', function() {
+      // only the method used by the tubes is needed
+      var segments = [[{'x': 0, 'y': 0, 'z': 0}, {'x': 0, 'y': 2, 'z': 0}],
+                      [{'x': 1, 'y': 1, 'z': 1}, {'x': 4, 'y': 1, 'z': 1}]];
+      var trajectories = [0, 1].map(function(i) {
+        return {
+          'representativeInterpolatedCoordinatesAtIndex': function(idx) {
+            return idx === 1 && i === 1 ? null : segments[i];
+          }
+        };
+      });
+
+      var tubes = makeDynamicTubes(trajectories, ['red', '#00ff00'], 0.5);
+      var attributes = tubes.geometry.attributes;
+      var matrix = new THREE.Matrix4(), position = new THREE.Vector3(),
+          scale = new THREE.Vector3(), quaternion = new THREE.Quaternion();
+
+      equal(tubes.count, 2);
+      equal(tubes.trajectories, trajectories);
+      deepEqual(Array.from(attributes.instanceColor.array), [1, 0, 0,
+                                                             0, 1, 0]);
+
+      tubes.update(0);
+      deepEqual(Array.from(attributes.instanceVisible.array), [1, 1]);
+
+      tubes.getMatrixAt(0, matrix);
+      matrix.decompose(position, quaternion, scale);
+      deepEqual(position.toArray(), [0, 0, 0]);
+      deepEqual(scale.toArray(), [1, 2, 1]);
+
+      tubes.getMatrixAt(1, matrix);
+      matrix.decompose(position, quaternion, scale);
+      deepEqual(position.toArray(), [1, 1, 1]);
+      equal(scale.y.toFixed(6), '3.000000');
+
+      // the end of the tube is along the direction of the segment
+      position = new THREE.Vector3(0, 1, 0).applyMatrix4(matrix);
+      deepEqual(position.toArray().map(function(v) {
+        return v.toFixed(6);
+      }), ['4.000000', '1.000000', '1.000000']);
+
+      // the second trajectory has no segment in this frame
+      tubes.update(1);
+      deepEqual(Array.from(attributes.instanceVisible.array), [1, 0]);
+    });
   });
 });
@@ -0,0 +1,77 @@
+requirejs(['jquery', 'underscore', 'three', 'rendererpool'],
+          function($, _, THREE, RendererPool) {
+  var getSharedPool = RendererPool.getSharedPool;
+  $(document).ready(function() {
+
+    module('RendererPool', {
+
+      setup: function() {
+        this.pool = getSharedPool();
+      },
+
+      teardown: function() {
+        _.each(this.pool.clients, function(client) {
+          client.dispose();
+        });
+      }
+
+    });
+
+    test('Test the shared pool is a singleton', function() {
+      equal(getSharedPool(), this.pool, 'The same pool is returned');
+      ok(this.pool.renderer instanceof THREE.WebGLRenderer,
+         'The pool owns a WebGL renderer');
+    });
+
+    test('Test register and unregister clients', function() {
+      var a = this.pool.register(), b = this.pool.register();
+
+      equal(this.pool.clients.length, 2, 'Two clients are registered');
+      notEqual(a.domElement, b.domElement, 'Each client has its own canvas');
+      notEqual(a.domElement.getContext('2d'), null, 'The canvas is 2D');
+
+      a.dispose();
+      deepEqual(this.pool.clients, [b], 'Only one client is left');
+    });
+
+    test('Test setSize', function() {
+      var client = this.pool.register(), size = new THREE.Vector2();
+
+      client.setSize(120, 80);
+      deepEqual(client.getSize(size).toArray(), [120, 80], 'Size is set');
+      equal(client.domElement.width, 120, 'Canvas width is set');
+      equal(client.domElement.height, 80, 'Canvas height is set');
+
+      client.setViewport(0, 0, 120, 80);
+      equal(this.pool.renderer.domElement.width, 120,
+            'The shared canvas matches the client');
+      equal(this.pool.renderer.domElement.height, 80,
+            'The shared canvas matches the client');
+    });
+
+    test('Test suspend and resume', function() {
+      var client = this.pool.register(), resumed = false;
+      var scene = new THREE.Scene(), camera = new THREE.PerspectiveCamera();
+      var geometry = new THREE.BoxGeometry(1, 1, 1), disposed = false;
+
+      scene.add(new THREE.Mesh(geometry, new THREE.MeshBasicMaterial()));
+      geometry.addEventListener('dispose', function() {
+        disposed = true;
+      });
+
+      client.setSize(10, 10);
+      client.render(scene, camera);
+      client.onResume = function() {
+        resumed = true;
+      };
+
+      client.suspend();
+      ok(client.suspended, 'Client is suspended');
+      ok(disposed, 'Geometries are released');
+
+      client.resume();
+      ok(!client.suspended, 'Client is not suspended');
+      ok(resumed, 'The resume callback is executed');
+    });
+  });
+});
@@ -182,6 +182,25 @@ requirejs([
       equal(controller.$scaledValue.is(':checked'), true);
     });
 
+    test('Testing fromJSON with precomputed scales', function() {
+      var json = {category: 'SampleID', globalScale: '1.0', scaleVal: false,
+                  data: {'PC.636': 1.1, 'PC.635': 1, 'PC.634': 0.7}};
+
+      var container = $('<div id="does-not-exist" style="height:11px; ' +
+                        'width:12px"></div>');
+      var controller = new ScaleViewController(new UIState(),
+        container, this.sharedDecompositionViewDict);
+
+      controller.setPrecomputedAttributes({category: 'SampleID',
+                                           values: [2, 3, 4]});
+      controller.fromJSON(json);
+
+      var scatter = controller.decompViewDict.scatter;
+      deepEqual(scatter.markers[0].scale.x, 2);
+      deepEqual(scatter.markers[1].scale.y, 3);
+      deepEqual(scatter.markers[2].scale.z, 4);
+    });
+
     test('Testing toJSON (null)', function() {
       var container = $('<div id="does-not-exist" style="height:11px; ' +
                         'width:12px"></div>');
@@ -237,5 +256,18 @@ requirejs([
       exp = {'1.0': 1, 'no': 0, 'false': 0, 'something': 0, '2.0': 5};
       deepEqual(obs, exp);
     });
+
+    test('Testing getScale with numeric values', function() {
+      var container = $('<div id="does-not-exist" style="height:11px; ' +
+                        'width:12px"></div>');
+      var controller = new ScaleViewController(new UIState(),
+        container, this.sharedDecompositionViewDict);
+      var data = ['1.0', 'nan', '2.0', '3.0'];
+
+      var obs = controller.getScale(data, true, {'1.0': 1, '2.0': 2,
+                                                 '3.0': 3});
+      var exp = {'1.0': 1, 'nan': 0, '2.0': 3, '3.0': 5};
+      deepEqual(obs, exp);
+    });
   });
 });
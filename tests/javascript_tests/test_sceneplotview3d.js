@@ -457,11 +457,12 @@ requirejs([
                                     this.sharedDecompositionViewDict,
                                     this.multiModel, this.div, 0, 0, 20, 20);
 
-      equal(spv.scene.children.length, 11);
+      // the biplot's collection is only added once
+      equal(spv.scene.children.length, 12);
       equal(spv._selectable.children.length, 2);
       spv.addDecompositionsToScene();
       equal(spv._selectable.children.length, 2);
-      equal(spv.scene.children.length, 11);
+      equal(spv.scene.children.length, 12);
 
       // release the control back to the main page
       spv.control.dispose();
@@ -479,7 +480,7 @@ requirejs([
                                     this.sharedDecompositionViewDict,
                                     this.multiModel, this.div, 0, 0, 20, 20);
 
-      equal(spv.scene.children.length, 11);
+      equal(spv.scene.children.length, 12);
 
       var data = {name: 'PCOA',
                   sample_ids: ['PC.636', 'PC.635'],
@@ -506,7 +507,8 @@ requirejs([
       this.sharedDecompositionViewDict.pleep = dv;
       spv.addDecompositionsToScene();
 
-      equal(spv.scene.children.length, 13);
+      // two arrows and the collection that draws them
+      equal(spv.scene.children.length, 15);
       equal(spv._selectable.children.length, 2);
 
       // after the labels are added to the scene, their scales change
@@ -929,5 +931,51 @@ requirejs([
       spv.control.dispose();
     });
 
+    test('Test _usesGPUPicking', function() {
+      var renderer = new THREE.SVGRenderer({antialias: true});
+      var spv = new ScenePlotView3D(this.UIState1, renderer,
+                                    this.sharedDecompositionViewDict,
+                                    this.multiModel, this.div, 0, 0, 20, 20);
+
+      equal(spv._usesGPUPicking(), false, 'Meshes are raycasted');
+
+      this.UIState1.setProperty('view.usesPointCloud', true);
+      equal(spv._usesGPUPicking(), true, 'Point clouds are picked');
+
+      this.UIState1.setProperty('view.usesPointCloud', false);
+      this.UIState1.setProperty('view.viewType', 'parallel-plot');
+      equal(spv._usesGPUPicking(), true, 'Parallel plots are picked');
+
+      this.UIState1.setProperty('view.viewType', 'scatter');
+
+      // release the control back to the main page
+      spv.control.dispose();
+    });
+
+    test('Test _pickingMaterial', function(assert) {
+      var renderer = new THREE.SVGRenderer({antialias: true});
+      var spv = new ScenePlotView3D(this.UIState1, renderer,
+                                    this.sharedDecompositionViewDict,
+                                    this.multiModel, this.div, 0, 0, 20, 20);
+
+      var dv = this.sharedDecompositionViewDict.scatter;
+      dv._fastInit();
+      var cloud = dv.markers[dv.markers.length - 1], material;
+
+      material = spv._pickingMaterial(cloud);
+
+      assert.ok(material instanceof THREE.ShaderMaterial);
+      equal(material.blending, THREE.NoBlending);
+      equal(material.defines.PICK_POINTS, 1);
+      equal(material.defines.kSIZE, cloud.material.defines.kSIZE);
+      deepEqual(Array.from(cloud.geometry.attributes.pickId.array), [0, 1]);
+
+      // materials are cached
+      equal(spv._pickingMaterial(cloud), material);
+
+      // release the control back to the main page
+      spv.control.dispose();
+    });
+
   });
 });
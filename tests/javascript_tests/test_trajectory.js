@@ -179,6 +179,27 @@ requirejs(['underscore', 'trajectory'], function(_, trajectory) {
       equal(trajectory.suppliedN, 5, 'Default value of N is set to 5');
     });
 
+    /**
+     *
+     * Test that precomputed interpolations are used as-is.
+     *
+     */
+    test('Test constructor with an interpolation', function() {
+      var trajectory, interpolation;
+
+      interpolation = {'coordinates': [{'x': 0, 'y': 0, 'z': 0},
+                                       {'x': 1, 'y': 1, 'z': 1}],
+                       'intervals': [0]};
+
+      trajectory = new TrajectoryOfSamples(sampleNames, 'Treatment',
+                                           gradientPoints, coordinates, 2, 10,
+                                           Infinity, interpolation);
+      equal(trajectory.interpolatedCoordinates, interpolation.coordinates,
+            'Interpolated coordinates are not recomputed');
+      equal(trajectory._intervalValues, interpolation.intervals,
+            'Interval values are not recomputed');
+    });
+
     /**
      *
      * Test the trajectory object raises the appropriate errors when
@@ -212,6 +212,15 @@ requirejs(['jquery', 'underscore', 'util'], function($, _, util) {
       deepEqual(split.nonNumeric, ['0.0.0', 'boaty']);
     });
 
+    test('Test splitNumericValues with known numeric values', function() {
+      // only the values in the lookup are numeric, even if they look like
+      // numbers
+      var split = util.splitNumericValues(['1.0', '2', 'nan', 'foo'],
+                                          {'1.0': 1, 'nan': 0});
+      deepEqual(split.numeric, ['1.0', 'nan']);
+      deepEqual(split.nonNumeric, ['2', 'foo']);
+    });
+
     test('Test regular expressions are escaped correctly', function() {
       equal(escapeRegularExpression('some.sample.id'), 'some\\.sample\\.id');
       equal(escapeRegularExpression('some-sample.id'), 'some\\-sample\\.id');
@@ -258,6 +258,53 @@ requirejs([
       deepEqual(attr.getView(), dv);
     });
 
+    /**
+     *
+     * Test loaded and missing categories resolve immediately
+     *
+     */
+    test('Test loadCategories', function() {
+      var container = $('<div id="does-not-exist"></div>');
+      var controller = new EmperorViewController(this.UIState1, container,
+          'foo', 'bar', this.sharedDecompositionViewDict);
+
+      equal(controller.loadCategories(['DOB', null, undefined]).state(),
+            'resolved');
+      equal(EmperorViewController.loadCategories(
+            this.sharedDecompositionViewDict, []).state(), 'resolved');
+    });
+
+    /**
+     *
+     * Test categories that cannot be loaded are reported to the user
+     *
+     */
+    asyncTest('Test loadCategories with invalid deferred columns',
+              function() {
+      var data = {sample_ids: ['a', 'b'], coordinates: [[0, 1], [1, 0]],
+                  percents_explained: [50, 30]};
+      var columns = {length: 2, columns: [
+        {dtype: 'string', values: ['a', 'b']},
+        {dtype: 'deferred', block: '!!!'}
+      ]};
+      var dm = new DecompositionModel(data, ['SampleID', 'pH'], columns);
+      var dv = new DecompositionView(new MultiModel({'scatter': dm}),
+                                     'scatter', this.UIState1);
+      var alert = window.alert, messages = [];
+
+      window.alert = function(message) {
+        messages.push(message);
+      };
+
+      EmperorViewController.loadCategories({'scatter': dv}, ['pH'])
+      .fail(function(error) {
+        window.alert = alert;
+        deepEqual(messages, [error.message]);
+
+        start(); // qunit
+      });
+    });
+
     module('EmperorAttributeABC', {
 
       setup: function() {
@@ -0,0 +1,71 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, emperor development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE.md, distributed with this software.
+# ----------------------------------------------------------------------------
+from __future__ import division
+
+import os
+from os.path import exists, join
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase, main
+
+from emperor._cache import RenderCache
+
+
+class RenderCacheTests(TestCase):
+    def setUp(self):
+        self.directory = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.directory)
+
+    def test_get_and_put(self):
+        cache = RenderCache(join(self.directory, 'plots'))
+        self.assertTrue(exists(join(self.directory, 'plots')))
+
+        self.assertIsNone(cache.get('abc123'))
+        cache.put('abc123', u'<div>plot</div>')
+        self.assertEqual(cache.get('abc123'), u'<div>plot</div>')
+
+        # entries are replaced
+        cache.put('abc123', u'<div>other</div>')
+        self.assertEqual(cache.get('abc123'), u'<div>other</div>')
+
+        self.assertEqual(os.listdir(join(self.directory, 'plots')),
+                         ['abc123.html'])
+
+    def test_evict_least_recently_used(self):
+        cache = RenderCache(self.directory, max_size=25)
+
+        cache.put('aa', 'x' * 10)
+        cache.put('bb', 'y' * 10)
+        os.utime(join(self.directory, 'aa.html'), (1, 1))
+        os.utime(join(self.directory, 'bb.html'), (2, 2))
+
+        # reading an entry marks it as recently used
+        self.assertEqual(cache.get('aa'), 'x' * 10)
+
+        cache.put('cc', 'z' * 10)
+        self.assertIsNone(cache.get('bb'))
+        self.assertEqual(cache.get('aa'), 'x' * 10)
+        self.assertEqual(cache.get('cc'), 'z' * 10)
+
+    def test_entries_larger_than_the_cache(self):
+        cache = RenderCache(self.directory, max_size=5)
+        cache.put('aa', 'x' * 10)
+        self.assertIsNone(cache.get('aa'))
+
+    def test_bad_key(self):
+        cache = RenderCache(self.directory)
+        with self.assertRaisesRegex(ValueError, 'hexadecimal'):
+            cache.get('../plot')
+        with self.assertRaisesRegex(ValueError, 'hexadecimal'):
+            cache.put('plot', 'text')
+
+
+if __name__ == "__main__":
+    main()
@@ -7,20 +7,27 @@
 # ----------------------------------------------------------------------------
 from __future__ import division
 
-from unittest import TestCase, main
+from unittest import TestCase, main, mock
 from copy import deepcopy
-from os.path import exists
+from os.path import exists, join
 from shutil import rmtree
+from tempfile import mkdtemp
 from io import StringIO
 from skbio import OrdinationResults
 from jinja2 import Template
+from scipy.spatial import procrustes
 
+import base64
+import json
+import os
+import tracemalloc
 import warnings
+import zlib
 import pandas as pd
 import numpy as np
 
 from emperor.core import Emperor
-from emperor.util import EmperorWarning
+from emperor.util import EmperorWarning, preprocess_coords_file
 
 # account for what's allowed in python 2 vs PY3K
 try:
@@ -319,6 +326,100 @@ class TopLevelTests(TestCase):
                                                emp.feature_mf.sort_index(),
                                                check_names=False)
 
+    def test_initial_extra_metadata(self):
+        # rows without coordinates are dropped and the rest are reordered
+        extra = pd.DataFrame([['x', 'y', 'z']] * 3, columns=self.mf.columns,
+                             index=['S.1', 'S.2', 'S.3'])
+        mf = pd.concat([extra, self.mf.iloc[::-1]])
+
+        emp = Emperor(self.ord_res, mf, remote=self.url)
+
+        expected = self.mf.loc[self.ord_res.samples.index]
+        pd.util.testing.assert_frame_equal(expected, emp.mf,
+                                           check_names=False)
+        self.assertEqual(emp.mf.index.name, self.ord_res.samples.index.name)
+
+    def test_initial_duplicated_metadata(self):
+        mf = pd.concat([self.mf, self.mf.loc[['PC.636']]])
+
+        emp = Emperor(self.ord_res, mf, remote=self.url)
+
+        self.assertEqual(len(emp.mf), len(self.ord_res.samples) + 1)
+
+    def test_initial_no_copy(self):
+        ids = self.ord_res.samples.index
+        mf = pd.DataFrame(np.ones((len(ids), 100000)), index=ids)
+
+        tracemalloc.start()
+        try:
+            emp = Emperor(self.ord_res, mf, remote=self.url, copy=False)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # the data is shared with the caller
+        self.assertTrue(np.shares_memory(emp.mf.values, mf.values))
+        self.assertLess(peak, mf.values.nbytes / 10)
+
+        emp = Emperor(self.ord_res, mf, remote=self.url)
+        self.assertFalse(np.shares_memory(emp.mf.values, mf.values))
+
+        # only the rows that are needed are copied
+        mf = self.mf.iloc[::-1]
+        emp = Emperor(self.ord_res, mf, remote=self.url, copy=False)
+        pd.util.testing.assert_frame_equal(self.mf.loc[ids], emp.mf,
+                                           check_names=False)
+
+    def test_initial_truncated(self):
+        emp = Emperor(self.biplot, self.mf, self.feature_mf, dimensions=3,
+                      remote=self.url)
+
+        self.assertEqual(emp.ordination.samples.shape[1], 3)
+        self.assertEqual(emp.ordination.features.shape[1], 3)
+        self.assertEqual(len(emp.ordination.eigvals), 3)
+        self.assertEqual(len(emp.ordination.proportion_explained), 3)
+        pd.util.testing.assert_frame_equal(emp.ordination.samples,
+                                           self.biplot.samples.iloc[:, :3])
+
+        # the original object is not modified nor referenced
+        self.assertTrue(self.biplot.samples.shape[1] > 3)
+        self.assertFalse(np.shares_memory(emp.ordination.samples.values,
+                                          self.biplot.samples.values))
+
+        # nothing to truncate
+        emp = Emperor(self.ord_res, self.mf, dimensions=20, remote=self.url)
+        self.assertIs(emp.ordination, self.ord_res)
+
+    def test_initial_metadata_columns(self):
+        emp = Emperor(self.ord_res, self.mf, remote=self.url,
+                      metadata_columns=['DOB', 'Treatment'])
+        self.assertEqual(emp.mf.columns.tolist(), ['DOB', 'Treatment'])
+
+        emp = Emperor(self.ord_res, self.mf, remote=self.url,
+                      exclude_columns=['DOB'])
+        self.assertEqual(emp.mf.columns.tolist(),
+                         ['Treatment', 'Description'])
+
+        # the descriptions are different for every sample
+        emp = Emperor(self.ord_res, self.mf, remote=self.url,
+                      drop_unique_columns=True)
+        self.assertEqual(emp.mf.columns.tolist(), ['Treatment', 'DOB'])
+
+        emp = Emperor(self.ord_res, self.mf, remote=self.url,
+                      metadata_columns=['Description'],
+                      drop_unique_columns=True)
+        self.assertEqual(emp.mf.columns.tolist(), ['Description'])
+
+        # the input is not modified
+        self.assertEqual(self.mf.columns.tolist(),
+                         ['Treatment', 'DOB', 'Description'])
+
+        with self.assertRaisesRegexp(KeyError, "One or more of the metadata "
+                                     "columns are not present in the sample "
+                                     "information: Name"):
+            Emperor(self.ord_res, self.mf, remote=self.url,
+                    exclude_columns=['Name'])
+
     def test_no_overlap(self):
         mf = self.mf.copy()
         mf.index = mf.index + '.not'
@@ -368,6 +469,13 @@ class TopLevelTests(TestCase):
         obs = emp.render_js('emperor-notebook-0x9cb72f54')
         self.assertEqual(tcs.JS_STRING, obs)
 
+    def test_render_js_shared_renderer(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        emp.shared_renderer = True
+        obs = emp.render_js('emperor-notebook-0x9cb72f54')
+        self.assertIn("{'sharedRenderer': true}", obs)
+        self.assertNotIn("{'sharedRenderer': false}", obs)
+
     def test_get_template_standalone(self):
         emp = Emperor(self.ord_res, self.mf, remote=False)
         obs = emp._get_template(True)
@@ -391,6 +499,98 @@ class TopLevelTests(TestCase):
 
         self.assertEqual(tcs.STANDALONE_HTML_STRING, obs)
 
+    def test_make_emperor_cache(self):
+        path = mkdtemp()
+        self.files_to_remove.append(path)
+
+        emp = Emperor(self.ord_res, self.mf, remote=self.url)
+        emp.cache = path
+        np.random.seed(0)
+        first = emp.make_emperor()
+
+        # the cached plot has a placeholder instead of the plot identifier
+        key = emp._render_key(False)
+        self.assertEqual(os.listdir(path), [key + '.html'])
+        with open(join(path, key + '.html')) as f:
+            cached = f.read()
+        self.assertIn('emperor-notebook-cached-' + key, cached)
+        self.assertNotIn('emperor-notebook-cached-', first)
+
+        # each plot gets its own identifier so it can be displayed again
+        np.random.seed(0)
+        plot_id = 'emperor-notebook-' + str(hex(np.random.randint(2**32)))
+        self.assertIn(plot_id, first)
+        self.assertEqual(cached.replace('emperor-notebook-cached-' + key,
+                                        plot_id), first)
+
+        second = emp.make_emperor()
+        self.assertNotEqual(second, first)
+        self.assertNotIn(plot_id, second)
+
+        # the same inputs result in the same plot
+        emp = Emperor(self.ord_res, self.mf.copy(), remote=self.url)
+        emp.cache = path
+        self.assertEqual(emp._render_key(False), key)
+        np.random.seed(0)
+        self.assertEqual(emp.make_emperor(), first)
+
+        # cached plots are returned without rendering them
+        with open(join(path, key + '.html'), 'w') as f:
+            f.write('cached')
+        self.assertEqual(emp.make_emperor(), 'cached')
+
+        # settings, options and data are part of the key
+        emp.color_by('Treatment')
+        self.assertNotEqual(emp._render_key(False), key)
+        self.assertNotEqual(emp.make_emperor(), 'cached')
+
+        emp = Emperor(self.ord_res, self.mf, remote=self.url)
+        self.assertNotEqual(emp._render_key(True), key)
+
+        mf = self.mf.copy()
+        mf.loc['PC.636', 'DOB'] = '20080117'
+        emp = Emperor(self.ord_res, mf, remote=self.url)
+        self.assertNotEqual(emp._render_key(False), key)
+
+        # changes made in place are not served from the cache
+        emp.cache = path
+        emp.make_emperor()
+        emp.mf.loc[emp.mf.index[0], 'Treatment'] = 'zzz'
+        self.assertIn('zzz', emp.make_emperor())
+
+    def test_fingerprint(self):
+        emp = Emperor(self.ord_res, self.mf, remote=self.url)
+        obs = emp.fingerprint
+
+        self.assertRegexpMatches(obs, '^[0-9a-f]{16}$')
+        self.assertEqual(Emperor(self.ord_res, self.mf.copy(),
+                                 remote=self.url).fingerprint, obs)
+
+        # settings and inputs are part of the fingerprint
+        emp.color_by('Treatment')
+        colored = emp.fingerprint
+        self.assertNotEqual(colored, obs)
+
+        original = emp.mf
+        mf = original.copy()
+        mf.loc['PC.636', 'DOB'] = '20080117'
+        emp.mf = mf
+        self.assertNotEqual(emp.fingerprint, colored)
+
+        emp.mf = original
+        self.assertEqual(emp.fingerprint, colored)
+
+        # changes made in place are detected
+        emp.mf.loc[emp.mf.index[0], 'DOB'] = '20080117'
+        edited = emp.fingerprint
+        self.assertNotEqual(edited, colored)
+
+        emp.ordination.samples.iloc[0, 0] += 1
+        self.assertNotEqual(emp.fingerprint, edited)
+
+        emp = Emperor(self.ord_res, self.mf, remote=self.url, dimensions=3)
+        self.assertNotEqual(emp.fingerprint, obs)
+
     def test_remote_url(self):
         emp = Emperor(self.ord_res, self.mf, remote=False)
         self.assertEqual(emp.base_url, "/nbextensions/emperor/support_files")
@@ -735,8 +935,8 @@ class TopLevelTests(TestCase):
                       jackknifed=self.jackknifed)
         emp.jackknifing_method = 'sdev'
 
-        observed = emp._to_dict(emp._process_data(emp.custom_axes,
-                                                  emp.jackknifing_method))
+        observed = emp._to_dict(emp._build_plot(emp.custom_axes,
+                                                emp.jackknifing_method))
         expected = tcs.JACKKNIFED_SDEV
 
         # the arrays need to be almost equal
@@ -812,6 +1012,291 @@ class TopLevelTests(TestCase):
         self.assertTrue(bi_headers is None)
         self.assertTrue(bi_metadata is None)
 
+    def test_build_plot(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        plot = emp._build_plot([], 'IQR')
+
+        self.assertIsInstance(plot.sample_ids, pd.Index)
+        self.assertIsInstance(plot.coords, np.ndarray)
+        self.assertIsInstance(plot.metadata, pd.DataFrame)
+        self.assertEqual(plot.metadata.columns.tolist(), plot.headers)
+        self.assertEqual(plot.edges.shape, (0, 2))
+        self.assertIsNone(plot.ci)
+
+        # custom axes are kept as numbers
+        plot = emp._build_plot(['DOB'], 'IQR')
+        self.assertEqual(plot.metadata['DOB'].dtype.kind, 'i')
+
+    def _legacy_process(self, emp, custom_axes, method):
+        # the coordinates as computed by preprocess_coords_file
+        dims = emp.dimensions
+        ordinations = [emp.ordination] + emp.procrustes + emp.jackknifed
+
+        c_headers, c_data, c_eigenvals, c_pct = [], [], [], []
+        for o in ordinations:
+            c_headers.append(o.samples.index.tolist())
+            coords = o.samples.values[:, :dims]
+            c_data.append(coords / np.max(np.abs(coords)))
+            c_eigenvals.append(o.eigvals.values[:dims])
+            c_pct.append(o.proportion_explained[:dims] * 100)
+
+        headers, metadata = emp._to_legacy_map(emp.mf, custom_axes,
+                                               len(emp.procrustes))
+        return preprocess_coords_file(c_headers, c_data, c_eigenvals, c_pct,
+                                      headers, metadata, custom_axes, method,
+                                      is_comparison=bool(emp.procrustes))
+
+    def test_build_plot_jackknifed_matches_legacy(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False,
+                      jackknifed=self.jackknifed)
+
+        for custom_axes in ([], ['DOB']):
+            for method in ('IQR', 'ideal_fourths', 'sdev'):
+                plot = emp._build_plot(custom_axes, method)
+                ids, coords, _, pct, low, high, _ = self._legacy_process(
+                    emp, custom_axes, method)
+
+                self.assertEqual(plot.sample_ids.tolist(), ids)
+                np.testing.assert_array_equal(plot.coords, coords)
+                np.testing.assert_array_equal(plot.ci, np.abs(high - low))
+                np.testing.assert_array_equal(plot.pct_var[len(custom_axes):],
+                                              pct)
+
+    def test_build_plot_procrustes_matches_legacy(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False,
+                      procrustes=self.jackknifed[1:])
+
+        for custom_axes in ([], ['DOB']):
+            plot = emp._build_plot(custom_axes, 'IQR')
+            ids, coords, _, pct, _, _, _ = self._legacy_process(
+                emp, custom_axes, 'IQR')
+
+            self.assertEqual(plot.sample_ids.tolist(), ids)
+            np.testing.assert_array_equal(plot.coords, coords)
+            np.testing.assert_array_equal(plot.pct_var[len(custom_axes):],
+                                          pct)
+            self.assertIsNone(plot.ci)
+
+    def test_to_dict_procrustes(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False,
+                      procrustes=self.jackknifed[1:])
+        obs = emp._to_dict(emp._build_plot([], 'IQR'))['plot']
+
+        # the metadata is sent once and repeated for each ordination
+        metadata = obs['metadata']
+        self.assertEqual(metadata['length'], 9)
+        self.assertEqual(metadata['replicates'], 3)
+        self.assertEqual(metadata['columns'][-1],
+                         {'dtype': 'replicate',
+                          'categories': ['Ordination 0', 'Ordination 1',
+                                         'Ordination 2']})
+        self.assertEqual(metadata['columns'][0]['values'][:2],
+                         ['PC.636', 'PC.635'])
+        self.assertEqual(obs['metadata_headers'],
+                         ['SampleID', 'Treatment', 'DOB', 'Description',
+                          '__Procrustes_Names__'])
+
+        # edges are the positions of the samples
+        edges = obs['decomposition']['edges']
+        self.assertEqual(len(edges), 18)
+        self.assertEqual(edges[:2], [[0, 9], [1, 10]])
+        self.assertEqual(edges[9:11], [[0, 18], [1, 19]])
+
+        ids = obs['decomposition']['sample_ids']
+        self.assertEqual(len(obs['decomposition']['coordinates']), 27)
+        self.assertEqual([ids[0], ids[18]], ['PC.636_0', 'PC.636_2'])
+
+    def test_to_dict_biplot_animations(self):
+        emp = Emperor(self.biplot, self.mf, self.feature_mf, remote=False)
+        emp.animations_by('DOB', 'Treatment',
+                          {"Fast": "red", "Control": "blue"})
+
+        obs = emp._to_dict(emp._build_plot([], 'sdev'))
+        self.assertIn('animation', obs['plot'])
+        self.assertNotIn('animation', obs['biplot'])
+
+    def test_to_dict_biplot_attributes(self):
+        emp = Emperor(self.biplot, self.mf, self.feature_mf, remote=False)
+        emp.color_by('DOB', colormap='Viridis', continuous=True,
+                     precompute=True)
+
+        obs = emp._to_dict(emp._build_plot([], 'sdev'))
+        self.assertIn('attributes', obs['plot'])
+        self.assertNotIn('attributes', obs['biplot'])
+
+    def test_to_dict_lazy_metadata(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        emp.lazy_metadata = True
+        emp.color_by('Treatment')
+        plot = emp._build_plot([], 'IQR')
+        obs = emp._to_dict(plot)['plot']['metadata']
+
+        # the identifiers and the categories in the settings are sent as is
+        self.assertEqual(obs['columns'][0]['dtype'], 'string')
+        self.assertEqual(obs['columns'][1]['dtype'], 'category')
+
+        for i in (2, 3):
+            column = obs['columns'][i]
+            self.assertEqual(sorted(column.keys()), ['block', 'dtype'])
+            self.assertEqual(column['dtype'], 'deferred')
+
+            block = zlib.decompress(base64.b64decode(column['block']))
+            self.assertEqual(json.loads(block.decode('utf-8')),
+                             emp._encode_column(plot.metadata.iloc[:, i]))
+
+        emp.metadata_url = 'columns/'
+        obs = emp._to_dict(plot)['plot']['metadata']
+        self.assertEqual(obs['columns'][2]['dtype'], 'deferred')
+        self.assertTrue(obs['columns'][2]['url'].startswith('columns/'))
+        self.assertTrue(obs['columns'][2]['url'].endswith('.txt'))
+
+    def test_write_metadata_blocks(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+
+        with self.assertRaisesRegexp(ValueError, 'Metadata columns are only '
+                                     'deferred when `lazy_metadata` is set'):
+            emp.write_metadata_blocks('columns')
+
+        emp.lazy_metadata = True
+        emp.metadata_url = 'columns'
+        obs = emp._to_dict(emp._build_plot([], 'IQR'))['plot']['metadata']
+
+        path = mkdtemp()
+        self.files_to_remove.append(path)
+        target = join(path, 'columns')
+
+        paths = emp.write_metadata_blocks(target)
+        self.assertEqual(len(paths), 3)
+
+        urls = sorted(c['url'] for c in obs['columns'][1:])
+        self.assertEqual([p[len(path) + 1:] for p in paths], urls)
+
+        with open(paths[0]) as f:
+            block = f.read()
+        column = json.loads(zlib.decompress(base64.b64decode(block)))
+        self.assertIn(column['dtype'], {'category', 'string'})
+
+    def test_to_dict_precision(self):
+        emp = Emperor(self.biplot, self.mf, self.feature_mf, remote=False)
+        plot = emp._build_plot([], 'IQR')
+
+        emp.precision = 'int16'
+        obs = emp._to_dict(plot)
+
+        for key, coords in [('plot', plot.coords),
+                            ('biplot', plot.bi_coords)]:
+            encoded = obs[key]['decomposition']['coordinates']
+            self.assertEqual(encoded['dtype'], 'int16')
+            self.assertEqual(encoded['shape'], list(coords.shape))
+
+            values = np.frombuffer(base64.b64decode(encoded['data']), '<i2')
+            decoded = (values.reshape(coords.shape) * encoded['scale'] +
+                       encoded['offset'])
+
+            extent = np.ptp(coords, axis=0).max()
+            self.assertLessEqual(np.abs(decoded - coords).max(),
+                                 emp.precision_tolerance * extent)
+
+        emp.precision = 'float32'
+        obs = emp._to_dict(plot)['plot']['decomposition']['coordinates']
+        self.assertEqual(obs['dtype'], 'float32')
+
+        emp.precision_tolerance = 1e-6
+        with self.assertRaisesRegexp(ValueError, 'Encoding the coordinates '
+                                     'as uint16 introduces an error of '):
+            emp.precision = 'uint16'
+            emp._to_dict(plot)
+
+    def test_replicate_set(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False,
+                      jackknifed=self.jackknifed)
+        obs = emp._replicate_set(emp.jackknifed)
+
+        self.assertEqual(obs.coords.shape, (4, 9, 5))
+        self.assertEqual(obs.coords.dtype, np.float64)
+        self.assertIsNone(obs.disparities)
+
+        for coords, ordination in zip(obs.coords,
+                                      [self.ord_res] + self.jackknifed):
+            exp = ordination.samples.values[:, :5]
+            np.testing.assert_array_equal(coords,
+                                          exp / np.max(np.abs(exp)))
+
+    def test_replicate_set_float32(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False,
+                      procrustes=self.jackknifed)
+        expected = emp._build_plot([], 'IQR')
+
+        emp.replicates_dtype = np.float32
+        self.assertEqual(emp._replicate_set(emp.procrustes).coords.dtype,
+                         np.float32)
+
+        obs = emp._build_plot([], 'IQR')
+        np.testing.assert_array_almost_equal(obs.coords, expected.coords)
+        np.testing.assert_array_equal(obs.edges, expected.edges)
+
+    def test_replicate_set_memmap(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False,
+                      jackknifed=self.jackknifed)
+        expected = emp._build_plot([], 'IQR')
+
+        path = mkdtemp()
+        try:
+            emp.replicates_path = join(path, 'replicates.dat')
+            self.assertIsInstance(emp._replicate_set(emp.jackknifed).coords,
+                                  np.memmap)
+
+            obs = emp._build_plot([], 'IQR')
+            np.testing.assert_array_equal(obs.coords, expected.coords)
+            np.testing.assert_array_equal(obs.ci, expected.ci)
+        finally:
+            rmtree(path)
+
+    def test_superimpose(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False,
+                      procrustes=self.jackknifed[1:])
+        self.assertIsNone(emp.procrustes_disparities)
+        not_superimposed = emp._build_plot([], 'IQR')
+
+        emp = Emperor(self.ord_res, self.mf, remote=False,
+                      procrustes=self.jackknifed[1:], superimpose=True)
+
+        master = self.ord_res.samples.values[:, :5]
+        obs = emp._build_plot([], 'IQR')
+        for i, ordination in enumerate(self.jackknifed[1:]):
+            exp_master, exp, m2 = procrustes(
+                master, ordination.samples.values[:, :5])
+            self.assertAlmostEqual(emp.procrustes_disparities[i], m2)
+
+            # each ordination is scaled as usual
+            np.testing.assert_array_almost_equal(
+                obs.coords[9 * (i + 1):9 * (i + 2)],
+                exp / np.max(np.abs(exp)))
+
+        np.testing.assert_array_almost_equal(
+            obs.coords[:9], exp_master / np.max(np.abs(exp_master)))
+        np.testing.assert_array_equal(obs.edges, not_superimposed.edges)
+
+    def test_superimpose_disparities_are_kept(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False,
+                      procrustes=self.jackknifed[1:], superimpose=True)
+        emp._build_plot([], 'IQR')
+
+        # the disparities of the plot are reused
+        with mock.patch('emperor.core.procrustes_superimposition',
+                        side_effect=AssertionError):
+            first = emp.procrustes_disparities
+
+        # but not after the ordinations change
+        emp.procrustes[0].samples.iloc[0, 0] += 1
+        second = emp.procrustes_disparities
+        self.assertNotAlmostEqual(first[0], second[0])
+        np.testing.assert_array_equal(first[1:], second[1:])
+
+    def test_summarize_jackknifed_bad_method(self):
+        with self.assertRaises(ValueError):
+            Emperor._summarize_jackknifed(np.zeros((3, 2, 2)), 'mean')
+
     def test_jackknifed_bad_data(self):
         with self.assertRaises(TypeError):
             Emperor(self.ord_res, self.mf, jackknifed=[1])
@@ -824,6 +1309,60 @@ class TopLevelTests(TestCase):
         with self.assertRaises(ValueError):
             Emperor(self.ord_res, self.mf, jackknifed=self.jackknifed)
 
+    def test_jackknifed_extra_sample_ids(self):
+        samples = self.jackknifed[0].samples
+        self.jackknifed[0].samples = pd.concat([samples, samples.iloc[:1]
+                                                .rename(index=lambda x: 'x')])
+        with self.assertRaisesRegex(ValueError, 'Mismatches are: x'):
+            Emperor(self.ord_res, self.mf, jackknifed=self.jackknifed)
+
+    def test_jackknifed_unaligned(self):
+        expected = Emperor(self.ord_res, self.mf, remote=False,
+                           jackknifed=deepcopy(self.jackknifed))
+        expected = expected._build_plot([], 'sdev')
+
+        # the first two replicates share the same order
+        order = self.ord_res.samples.index[::-1]
+        for ord_res in self.jackknifed[:2]:
+            ord_res.samples = ord_res.samples.loc[order]
+
+        emp = Emperor(self.ord_res, self.mf, remote=False,
+                      jackknifed=self.jackknifed)
+
+        # the replicates are not modified
+        self.assertEqual(emp.jackknifed[0].samples.index.tolist(),
+                         order.tolist())
+        self.assertIs(emp._alignment[0], emp._alignment[1])
+        self.assertIsNone(emp._alignment[2])
+
+        obs = emp._build_plot([], 'sdev')
+        self.assertEqual(obs.sample_ids.tolist(),
+                         expected.sample_ids.tolist())
+        np.testing.assert_array_equal(obs.coords, expected.coords)
+        np.testing.assert_array_equal(obs.ci, expected.ci)
+
+    def test_jackknifed_unaligned_fingerprint_collision(self):
+        expected = Emperor(self.ord_res, self.mf, remote=False,
+                           jackknifed=deepcopy(self.jackknifed))
+        expected = expected._build_plot([], 'sdev')
+
+        order = self.ord_res.samples.index[::-1]
+        self.jackknifed[0].samples = self.jackknifed[0].samples.loc[order]
+
+        # every index has the same fingerprint, so the indices are compared
+        with mock.patch('emperor.core.fingerprint', return_value='0'):
+            emp = Emperor(self.ord_res, self.mf, remote=False,
+                          jackknifed=self.jackknifed)
+
+            np.testing.assert_array_equal(emp._alignment[0],
+                                          np.arange(9)[::-1])
+            np.testing.assert_array_equal(emp._build_plot([], 'sdev').coords,
+                                          expected.coords)
+
+            self.jackknifed[1].samples.index = pd.Index(list('abcdefghi'))
+            with self.assertRaisesRegex(ValueError, 'exact same samples'):
+                Emperor(self.ord_res, self.mf, jackknifed=self.jackknifed)
+
     def test_jackknifed_and_procrustes(self):
         a, b, c = self.jackknifed
         with self.assertRaises(ValueError):
@@ -971,6 +1510,33 @@ class EmperorSettingsTests(TestCase):
         self.assertEqual(emp.settings['color'], exp['color'])
         self.assertEqual(obs.settings['color'], exp['color'])
 
+    def test_color_by_precompute(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+
+        obs = emp.color_by('DOB', colormap='Viridis', continuous=True,
+                           precompute=True)
+        exp = {"category": 'DOB',
+               "colormap": 'Viridis',
+               "continuous": True,
+               "data": {},
+               "precomputed": True}
+        self.assertEqual(obs.settings['color'], exp)
+
+        # the settings can be used to recreate the plot
+        other = Emperor(self.ord_res, self.mf, remote=False)
+        other.settings = emp.settings
+        self.assertEqual(other.settings['color'], exp)
+
+    def test_color_by_precompute_not_bool(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+
+        with self.assertRaises(TypeError):
+            emp.color_by('DOB', precompute=1)
+        with self.assertRaises(TypeError):
+            emp.scale_by('DOB', precompute='yes')
+        with self.assertRaises(TypeError):
+            emp.opacity_by('DOB', precompute=None)
+
     def test_color_by_colormap_not_str(self):
         emp = Emperor(self.ord_res, self.mf, remote=False)
 
@@ -1451,6 +2017,159 @@ class EmperorSettingsTests(TestCase):
             emp.animations_by('DOB', 'Treatment',
                               {"Fast": "red", "Control": "blue"}, radius='1.0')
 
+    def test_precompute_animations(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        emp.animations_by('DOB', 'Treatment',
+                          {"Fast": "red", "Control": "blue"})
+
+        obs = emp._to_dict(emp._build_plot([], 'sdev'))['plot']
+        obs = obs['animation']
+
+        self.assertEqual(obs['gradientCategory'], 'DOB')
+        self.assertEqual(obs['trajectoryCategory'], 'Treatment')
+        self.assertEqual(obs['dimensions'], [0, 1, 2])
+        self.assertEqual(obs['axesOrientation'], [1, 1, 1])
+        self.assertEqual(obs['trajectories'], ['Fast', 'Control'])
+        self.assertEqual(obs['minimumDelta'], 92)
+        self.assertEqual(obs['gradientPoints'],
+                         [20061126, 20061218, 20070314, 20071112, 20071210,
+                          20080116])
+
+        # the fast trajectory is padded to start with the earliest sample
+        self.assertEqual(obs['sampleOffsets'], [0, 5, 10])
+        self.assertEqual(obs['sampleNames'],
+                         ['PC.607', 'PC.607', 'PC.636', 'PC.635', 'PC.634',
+                          'PC.356', 'PC.354', 'PC.355', 'PC.481', 'PC.593'])
+        self.assertEqual(obs['gradient'],
+                         [20061126, 20071112, 20080116, 20080116, 20080116,
+                          20061126, 20061218, 20061218, 20070314, 20071210])
+
+        coords = np.array(obs['coordinates']).reshape(-1, 3)
+        np.testing.assert_allclose(coords[1], [-0.21532605, 1., -0.31976502])
+        np.testing.assert_allclose(coords[0], coords[1] + [0, 0, 0.0001])
+
+        # one interval per frame except for the last frame of each trajectory
+        frames = np.array(obs['frames']).reshape(-1, 3)
+        self.assertEqual(obs['frameOffsets'], [0, 2064, 3160])
+        self.assertEqual(len(frames), 3160)
+        self.assertEqual(len(obs['intervals']), 3158)
+
+        # trajectories start and end on their first and last samples
+        np.testing.assert_allclose(frames[[0, 2064]], coords[[0, 5]])
+        np.testing.assert_allclose(frames[[2063, 3159]], coords[[4, 9]])
+
+        self.assertEqual(obs['intervals'][0], 0)
+        self.assertEqual(obs['intervals'][2062], 1)
+        self.assertEqual(obs['intervals'][2063], 0)
+        self.assertEqual(obs['intervals'][-1], 3)
+
+    def test_precompute_animations_flipped_axes(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        emp.animations_by('DOB', 'Treatment',
+                          {"Fast": "red", "Control": "blue"}, speed=2)
+        emp.set_axes([3, 2, 0], [True, False, False])
+
+        obs = emp._to_dict(emp._build_plot([], 'sdev'))['plot']
+        obs = obs['animation']
+
+        self.assertEqual(obs['dimensions'], [3, 2, 0])
+        self.assertEqual(obs['axesOrientation'], [-1, 1, 1])
+
+        coords = np.array(obs['coordinates']).reshape(-1, 3)
+        np.testing.assert_allclose(coords[1], [0.13561209, -0.31976502,
+                                               -0.21532605])
+
+        # half the frames of an animation at speed 1
+        self.assertEqual(obs['frameOffsets'], [0, 1032, 1580])
+
+    def test_precompute_animations_non_numeric(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        emp.animations_by('Treatment', 'DOB',
+                          {"Fast": "red", "Control": "blue"})
+
+        obs = emp._to_dict(emp._build_plot([], 'sdev'))['plot']
+        self.assertIsNone(obs['animation'])
+
+    def test_precompute_animations_not_set(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+
+        obs = emp._to_dict(emp._build_plot([], 'sdev'))['plot']
+        self.assertNotIn('animation', obs)
+
+    def test_to_columnar_map(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+
+        headers, obs = emp._to_columnar_map(emp.mf, ['DOB'])
+        self.assertEqual(headers, ['SampleID', 'Treatment', 'DOB',
+                                   'Description'])
+        self.assertEqual(obs['length'], 9)
+        self.assertEqual([c['dtype'] for c in obs['columns']],
+                         ['string', 'category', 'int32', 'string'])
+        self.assertEqual(obs['columns'][1]['categories'], ['Fast', 'Control'])
+        self.assertEqual(obs['columns'][1]['codes'],
+                         [0, 0, 1, 1, 1, 1, 1, 0, 0])
+        self.assertEqual(obs['columns'][2]['values'][:3],
+                         [20080116, 20080116, 20061126])
+
+        # the metadata in the payload is in the same order as the rows
+        _, rows = emp._to_legacy_map(emp.mf)
+        obs = emp._to_dict(emp._build_plot([], 'sdev'))['plot']
+        self.assertEqual(obs['metadata']['length'], 9)
+        self.assertEqual(obs['metadata']['columns'][0]['values'],
+                         [row[0] for row in rows])
+
+    def test_encode_column(self):
+        obs = Emperor._encode_column(pd.Series([1.5, np.nan, 2.0]))
+        self.assertEqual(obs, {'dtype': 'float64',
+                               'values': [1.5, None, 2.0]})
+
+        obs = Emperor._encode_column(pd.Series([1, 2, 3]))
+        self.assertEqual(obs, {'dtype': 'int32', 'values': [1, 2, 3]})
+
+        obs = Emperor._encode_column(pd.Series([True, False, True]))
+        self.assertEqual(obs, {'dtype': 'category',
+                               'categories': ['True', 'False'],
+                               'codes': [0, 1, 0]})
+
+        obs = Emperor._encode_column(pd.Series(['a', 'b', 'c']))
+        self.assertEqual(obs, {'dtype': 'string',
+                               'values': ['a', 'b', 'c']})
+
+    def test_encode_column_as_strings(self):
+        # values that can't be represented with the numeric dtypes
+        obs = Emperor._encode_column(pd.Series([2**40, 1, 2]))
+        self.assertEqual(obs, {'dtype': 'string',
+                               'values': ['1099511627776', '1', '2']})
+
+        obs = Emperor._encode_column(pd.Series([np.inf, 1.0]))
+        self.assertEqual(obs, {'dtype': 'string', 'values': ['inf', '1.0']})
+
+        obs = Emperor._encode_column(pd.Series([0.5, 0.5],
+                                               dtype=np.float32))
+        self.assertEqual(obs, {'dtype': 'category', 'categories': ['0.5'],
+                               'codes': [0, 0]})
+
+    def test_encode_column_nullable_integers(self):
+        obs = Emperor._encode_column(pd.Series([3, 1, 2], dtype='Int64'))
+        self.assertEqual(obs, {'dtype': 'int32', 'values': [3, 1, 2]})
+        self.assertEqual([type(v) for v in obs['values']], [int] * 3)
+
+        # missing values are formatted like in the legacy map
+        obs = Emperor._encode_column(pd.Series([3, None, 3], dtype='Int64'))
+        self.assertEqual(obs, {'dtype': 'category',
+                               'categories': ['3', '<NA>'],
+                               'codes': [0, 1, 0]})
+
+    def test_make_emperor_nullable_integers(self):
+        for values in [[1, 2, 3, 4, 5, 6, 7, 8, 9],
+                       [1, 2, None, 4, 5, 6, 7, 8, 9]]:
+            self.mf['Age'] = pd.Series(values, index=self.mf.index,
+                                       dtype='Int64')
+            emp = Emperor(self.ord_res, self.mf, remote=False)
+
+            # make sure the plot can be serialized
+            self.assertIn('emperor-notebook-', emp.make_emperor())
+
     def test_set_axes(self):
         emp = Emperor(self.ord_res, self.mf, remote=False)
 
@@ -1558,6 +2277,283 @@ class EmperorSettingsTests(TestCase):
                }
         self.assertEqual(obs.settings['axes'], exp['axes'])
 
+    def test_set_screenshot(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+
+        obs = emp.set_screenshot()
+        self.assertEqual(obs, emp)
+        self.assertEqual(obs.settings['screenshot'],
+                         {'scale': 5, 'tileSize': 1024})
+
+        obs = emp.set_screenshot(2.5, 256)
+        self.assertEqual(obs.settings['screenshot'],
+                         {'scale': 2.5, 'tileSize': 256})
+
+    def test_set_screenshot_exceptions(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+
+        with self.assertRaises(TypeError):
+            emp.set_screenshot('5')
+        with self.assertRaises(TypeError):
+            emp.set_screenshot(5, 1024.5)
+        with self.assertRaises(TypeError):
+            emp.set_screenshot(True)
+
+        with self.assertRaises(ValueError):
+            emp.set_screenshot(0)
+        with self.assertRaises(ValueError):
+            emp.set_screenshot(2, -1)
+
+        self.assertTrue('screenshot' not in emp.settings)
+
+    def test_precompute_attributes(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        emp.color_by('DOB', colormap='Viridis', continuous=True,
+                     precompute=True)
+        emp.scale_by('DOB', scaled=True, precompute=True)
+        emp.opacity_by('Treatment', {'Control': 1.0, 'Fast': 0.5},
+                       precompute=True)
+
+        plot = emp._to_dict(emp._build_plot([], 'sdev'))['plot']
+        obs = plot['attributes']
+        ids = plot['decomposition']['sample_ids']
+
+        self.assertEqual(obs['color']['category'], 'DOB')
+        self.assertEqual(len(obs['color']['values']), len(ids) * 3)
+
+        # the earliest and latest samples are at the ends of the colormap
+        colors = np.array(obs['color']['values']).reshape(-1, 3)
+        np.testing.assert_equal(colors[ids.index('PC.356')], [68, 1, 84])
+        np.testing.assert_equal(colors[ids.index('PC.636')], [254, 232, 37])
+
+        scales = dict(zip(ids, obs['scale']['values']))
+        self.assertEqual(scales['PC.356'], 1.0)
+        self.assertEqual(scales['PC.636'], 5.0)
+
+        opacities = dict(zip(ids, obs['opacity']['values']))
+        self.assertEqual(opacities['PC.354'], 1.0)
+        self.assertEqual(opacities['PC.636'], 0.5)
+
+    def test_precompute_attributes_only_requested(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        emp.color_by('DOB', colormap='Viridis', continuous=True,
+                     precompute=True)
+
+        # the scale can't be resolved, but it's not precomputed either
+        emp.scale_by('Treatment', scaled=True)
+        with self.assertRaises(ValueError):
+            emp.to_image()
+
+        obs = emp._to_dict(emp._build_plot([], 'sdev'))['plot']
+        self.assertEqual(list(obs['attributes'].keys()), ['color'])
+
+    def test_precompute_attributes_not_requested(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        emp.color_by('DOB', colormap='Viridis', continuous=True)
+        emp.scale_by('DOB', scaled=True, precompute=True)
+
+        obs = emp._to_dict(emp._build_plot([], 'sdev'))['plot']
+        self.assertEqual(list(obs['attributes'].keys()), ['scale'])
+
+        emp.scale_by('DOB', scaled=True)
+        obs = emp._to_dict(emp._build_plot([], 'sdev'))['plot']
+        self.assertNotIn('attributes', obs)
+
+    def test_to_image_png(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+
+        obs = emp.to_image(width=40, height=30)
+        self.assertEqual(obs[:8], b'\x89PNG\r\n\x1a\n')
+        self.assertEqual(obs[12:16], b'IHDR')
+        self.assertEqual(obs[16:24], b'\x00\x00\x00\x28\x00\x00\x00\x1e')
+
+    def test_to_image_svg(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        emp.color_by('Treatment', {'Control': 'blue', 'Fast': '#00ff00'})
+        emp.set_background_color('white')
+
+        obs = emp.to_image(width=200, height=100, format='svg')
+
+        self.assertTrue(obs.startswith('<svg '))
+        self.assertTrue('width="200" height="100"' in obs)
+        self.assertTrue('<rect width="100%" height="100%" fill="#ffffff"/>'
+                        in obs)
+        self.assertEqual(obs.count('<circle '), 9)
+        self.assertEqual(obs.count('fill="#0000ff"'), 5)
+        self.assertEqual(obs.count('fill="#00ff00"'), 4)
+
+    def test_to_image_svg_colormap(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        emp.color_by('Treatment')
+
+        obs = emp.to_image(format='svg')
+        self.assertEqual(obs.count('fill="#ff0000"'), 5)
+        self.assertEqual(obs.count('fill="#0000ff"'), 4)
+
+    def test_to_image_svg_visibility_and_opacity(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        emp.visibility_by('Treatment', {'Control': False, 'Fast': True})
+        emp.opacity_by('Treatment', {'Control': 1.0, 'Fast': 0.5})
+
+        obs = emp.to_image(format='svg')
+        self.assertEqual(obs.count('<circle '), 4)
+        self.assertEqual(obs.count('fill-opacity="0.5"'), 4)
+
+    def test_to_image_svg_scale(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        emp.set_axes([0, 1, 2])
+
+        default = emp.to_image(format='svg')
+
+        emp.scale_by('Treatment', {'Control': 2.0, 'Fast': 2.0})
+        scaled = emp.to_image(format='svg')
+
+        def radii(svg):
+            return [float(line.split(' r="')[1].split('"')[0])
+                    for line in svg.split('\n') if line.startswith('<circ')]
+
+        np.testing.assert_allclose(np.array(radii(default)) * 2,
+                                   radii(scaled), atol=0.01)
+
+    def test_to_image_path(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+
+        directory = mkdtemp()
+        try:
+            path = join(directory, 'plot.png')
+            self.assertIsNone(emp.to_image(path, 20, 20))
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), emp.to_image(width=20, height=20))
+        finally:
+            rmtree(directory)
+
+    def test_to_image_exceptions(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+
+        with self.assertRaises(ValueError):
+            emp.to_image(format='jpeg')
+        with self.assertRaises(TypeError):
+            emp.to_image(width=10.5)
+        with self.assertRaises(ValueError):
+            emp.to_image(height=0)
+
+        emp.color_by('Treatment', {'Control': 'notacolor', 'Fast': 'red'})
+        with self.assertRaises(ValueError):
+            emp.to_image()
+
+    def test_to_vega(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        emp.color_by('Treatment', {'Control': 'blue', 'Fast': '#00ff00'})
+        emp.shape_by('Treatment', {'Control': 'Diamond', 'Fast': 'Cone'})
+
+        obs = emp.to_vega()
+
+        self.assertEqual(obs['$schema'],
+                         'https://vega.github.io/schema/vega/v5.json')
+        self.assertEqual(obs['background'], 'black')
+        self.assertEqual([d['name'] for d in obs['data']],
+                         ['metadata', 'points'])
+
+        metadata, points = obs['data'][0]['values'], obs['data'][1]['values']
+        self.assertEqual(metadata[0], {'SampleID': 'PC.636',
+                                       'Treatment': 'Fast',
+                                       'DOB': '20080116',
+                                       'Description':
+                                       'Fasting_mouse_I.D._636'})
+        self.assertEqual(len(points), 9)
+
+        exp = {'id': 'PC.636', 'color': 'rgb(0,255,0)',
+               'originalShape': 'Cone', 'shape': 'triangle-down',
+               'scale': {'x': 1.0, 'y': 1.0}, 'opacity': 1.0}
+        obs_point = {k: v for k, v in points[0].items() if k not in 'xy'}
+        self.assertEqual(obs_point, exp)
+        self.assertAlmostEqual(points[0]['x'], -0.65199581083171)
+        self.assertAlmostEqual(points[0]['y'], -0.34177849833716)
+
+        self.assertEqual(obs['axes'][0]['title'], 'Axis 1 (26.69 %)')
+        self.assertEqual(obs['axes'][1]['title'], 'Axis 2 (16.26 %)')
+
+        # make sure the spec can be serialized
+        json.dumps(obs, allow_nan=False)
+
+        # every procrustes point has its own metadata record
+        other = OrdinationResults(
+            eigvals=self.ord_res.eigvals.copy(),
+            samples=np.abs(self.ord_res.samples),
+            proportion_explained=self.ord_res.proportion_explained.copy(),
+            short_method_name='PCoA',
+            long_method_name='Principal Coordinates Analysis')
+        emp = Emperor(self.ord_res, self.mf, remote=False,
+                      procrustes=[other])
+        obs = emp.to_vega()
+
+        metadata, points = obs['data'][0]['values'], obs['data'][1]['values']
+        self.assertEqual(len(metadata), 18)
+        self.assertEqual(len(points), 18)
+        self.assertEqual(sorted(m['SampleID'] for m in metadata),
+                         sorted(p['id'] for p in points))
+        self.assertEqual(metadata[0]['SampleID'], 'PC.636_0')
+        self.assertEqual(metadata[0]['Treatment'], 'Fast')
+
+    def test_to_vega_axes_and_visibility(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        emp.set_axes([2, 0, 1], [True, False, False], color='red')
+        emp.visibility_by('Treatment', {'Control': False, 'Fast': True})
+
+        obs = emp.to_vega()
+        points = obs['data'][1]['values']
+
+        self.assertEqual(len(points), 4)
+        self.assertEqual(obs['config']['axis']['labelColor'], 'red')
+        self.assertEqual(obs['axes'][0]['title'], 'Axis 3 (13.78 %)')
+        self.assertEqual(obs['axes'][1]['title'], 'Axis 1 (26.69 %)')
+
+        # the first visible axis is flipped
+        self.assertAlmostEqual(points[0]['x'], -0.15713116241739)
+        self.assertAlmostEqual(points[0]['y'], -0.65199581083171)
+
+    def test_to_vega_bins(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+        emp.color_by('Treatment', {'Control': 'blue', 'Fast': 'red'})
+
+        obs = emp.to_vega(bins=2)
+
+        self.assertEqual([d['name'] for d in obs['data']], ['points'])
+        values = obs['data'][0]['values']
+        self.assertEqual(sorted(v['count'] for v in values), [1, 1, 3, 4])
+        self.assertEqual(sum(v['count'] for v in values), 9)
+        self.assertEqual({v['color'] for v in values},
+                         {'rgb(0,0,255)', 'rgb(255,0,0)'})
+        self.assertEqual(obs['scales'][-1]['name'], 'size')
+
+        mark = obs['marks'][0]['encode']['enter']
+        self.assertEqual(mark['size'], {'scale': 'size', 'field': 'count'})
+        self.assertEqual(mark['shape'], {'value': 'circle'})
+
+        # a single bin aggregates all the samples by color
+        values = emp.to_vega(bins=1)['data'][0]['values']
+        self.assertEqual(sorted(v['count'] for v in values), [4, 5])
+
+        json.dumps(obs, allow_nan=False)
+
+    def test_to_vega_exceptions(self):
+        emp = Emperor(self.ord_res, self.mf, remote=False)
+
+        with self.assertRaises(TypeError):
+            emp.to_vega(bins=2.5)
+        with self.assertRaises(ValueError):
+            emp.to_vega(bins=0)
+
+    def test_axes_labels(self):
+        obs = Emperor._axes_labels([0, 1, 2], [26.68870, 16.25637, 5.0])
+        self.assertEqual(obs, ['Axis 1 (26.69 %)', 'Axis 2 (16.26 %)',
+                               'Axis 3 (5.000 %)'])
+
+        obs = Emperor._axes_labels(['DOB', 'PC1', 'A very long name for an '
+                                    'axis, so long'], [-1, 50.0, 10.0])
+        self.assertEqual(obs, ['DOB', 'PC1 (50.00 %)',
+                               'A very long name for... (10.00 %)'])
+
     def test_del_settings(self):
         exp_settings = {'scale': {"category": 'DOB',
                                   "data": {'20061126': 5.0,
@@ -1659,7 +2655,9 @@ class EmperorSettingsTests(TestCase):
                                        "radius": 1,
                                        "colors": {"Fast": "red",
                                                   "Control": "blue"}
-                                       }
+                                       },
+                        'screenshot': {"scale": 3,
+                                       "tileSize": 512}
                         }
 
         emp = Emperor(self.ord_res, self.mf, remote=False)
@@ -0,0 +1,260 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, emperor development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE.md, distributed with this software.
+# ----------------------------------------------------------------------------
+from __future__ import division
+
+import struct
+import time
+import zlib
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+import pandas as pd
+
+from emperor._image import (parse_color, to_hex, natural_sort,
+                            colormap_colors, scaled_values, colormap_lut,
+                            colormap_rgb, scaled_array, rasterize,
+                            encode_png, encode_svg, LUT_SIZE)
+
+
+class TopLevelTests(TestCase):
+    def test_parse_color(self):
+        npt.assert_equal(parse_color('red'), [1, 0, 0])
+        npt.assert_equal(parse_color('Blue'), [0, 0, 1])
+        npt.assert_equal(parse_color('#00ff00'), [0, 1, 0])
+        npt.assert_equal(parse_color('#0f0'), [0, 1, 0])
+        npt.assert_equal(parse_color('rgb(0, 0, 255)'), [0, 0, 1])
+        npt.assert_equal(parse_color(0xffffff), [1, 1, 1])
+        npt.assert_almost_equal(parse_color('gray'), [128 / 255] * 3)
+
+    def test_parse_color_exceptions(self):
+        with self.assertRaises(ValueError):
+            parse_color('not-a-color')
+        with self.assertRaises(ValueError):
+            parse_color('#12345')
+
+    def test_to_hex(self):
+        self.assertEqual(to_hex([1, 0, 0]), '#ff0000')
+        self.assertEqual(to_hex(parse_color('gray')), '#808080')
+
+    def test_natural_sort(self):
+        obs = natural_sort(['b', '10', 'A', '2', 'x1', '1.5'])
+        self.assertEqual(obs, ['A', 'b', 'x1', '1.5', '2', '10'])
+
+    def test_colormap_colors_discrete(self):
+        obs = colormap_colors(['a', 'b', 'c'], 'discrete-coloring-qiime')
+        self.assertEqual(obs, {'a': '#ff0000', 'b': '#0000ff',
+                               'c': '#f27304'})
+
+        # palettes are reused when there's more values than colors
+        values = [str(i) for i in range(10)]
+        obs = colormap_colors(values, 'Dark2')
+        self.assertEqual(obs['0'], obs['8'])
+
+    def test_colormap_colors_interpolated(self):
+        obs = colormap_colors(['a', 'b', 'c', 'd', 'e'], 'Viridis')
+        self.assertEqual(obs, {'a': '#440154', 'b': '#3f4a8a',
+                               'c': '#26838f', 'd': '#6cce5a',
+                               'e': '#fee825'})
+
+        obs = colormap_colors(['a'], 'Viridis')
+        self.assertEqual(obs, {'a': '#440154'})
+
+    def test_colormap_colors_continuous(self):
+        obs = colormap_colors(['1', '3', '5', 'x'], 'Viridis', True)
+        self.assertEqual(obs, {'1': '#440154', '3': '#26838f',
+                               '5': '#fee825', 'x': '#64655d'})
+
+    def test_colormap_colors_exceptions(self):
+        with self.assertRaises(ValueError):
+            colormap_colors(['a', 'b'], 'Fancy')
+        with self.assertRaises(ValueError):
+            colormap_colors(['a', 'b'], 'Viridis', True)
+
+    def test_scaled_values(self):
+        obs = scaled_values(['1', '3', 'x'], 1, 5)
+        self.assertEqual(obs, {'1': 1.0, '3': 5.0, 'x': 0.0})
+
+        obs = scaled_values(['1', '2', '5'], 0, 1)
+        self.assertEqual(obs, {'1': 0.0, '2': 0.25, '5': 1.0})
+
+        with self.assertRaises(ValueError):
+            scaled_values(['1', 'x'], 0, 1)
+
+    def test_colormap_lut(self):
+        obs = colormap_lut('Viridis')
+        self.assertEqual(obs.shape, (LUT_SIZE, 3))
+        self.assertEqual(to_hex(obs[0]), '#440154')
+        self.assertEqual(to_hex(obs[LUT_SIZE // 2]), '#26838f')
+        self.assertEqual(to_hex(obs[-1]), '#fee825')
+
+        with self.assertRaises(ValueError):
+            colormap_lut('Dark2')
+
+    def test_colormap_rgb(self):
+        # same colors as colormap_colors but for each sample
+        values = ['5', '1', 'x', '3', '1']
+        exp = colormap_colors(natural_sort(set(values)), 'Viridis', True)
+        obs = colormap_rgb(values, 'Viridis', True)
+        self.assertEqual([to_hex(c) for c in obs],
+                         [exp[v] for v in values])
+
+        exp = colormap_colors(['a', 'b'], 'discrete-coloring-qiime')
+        obs = colormap_rgb(['b', 'a', 'b'], 'discrete-coloring-qiime')
+        self.assertEqual([to_hex(c) for c in obs],
+                         [exp['b'], exp['a'], exp['b']])
+
+        # discrete colormaps ignore the continuous argument
+        obs = colormap_rgb(['b', 'a', 'b'], 'discrete-coloring-qiime', True)
+        self.assertEqual([to_hex(c) for c in obs],
+                         [exp['b'], exp['a'], exp['b']])
+
+    def test_colormap_rgb_exceptions(self):
+        with self.assertRaises(ValueError):
+            colormap_rgb(['a', 'b'], 'Fancy')
+        with self.assertRaises(ValueError):
+            colormap_rgb(['1', '1', 'x'], 'Viridis', True)
+
+    def test_scaled_array(self):
+        obs = scaled_array(['3', '1', 'x', '3'], 1, 5)
+        npt.assert_equal(obs, [5.0, 1.0, 0.0, 5.0])
+
+        obs = scaled_array(['1', '2', '5'], 0, 1)
+        npt.assert_equal(obs, [0.0, 0.25, 1.0])
+
+        with self.assertRaises(ValueError):
+            scaled_array(['1', 'x', '1'], 0, 1)
+
+    def test_scaled_array_typed(self):
+        # numeric columns are used as they are
+        obs = scaled_array(pd.Series([3, 1, 5]), 1, 5)
+        npt.assert_equal(obs, [3.0, 1.0, 5.0])
+
+        obs = scaled_array(pd.Series([0.5, np.nan, np.inf, 1.5]), 0, 1)
+        npt.assert_equal(obs, [0.0, 0.0, 0.0, 1.0])
+
+        obs = scaled_array(pd.Series([2, None, 4], dtype='Int64'), 0, 1)
+        npt.assert_equal(obs, [0.0, 0.0, 1.0])
+
+        # booleans are not numeric
+        with self.assertRaises(ValueError):
+            scaled_array(pd.Series([True, False, True]), 0, 1)
+
+    def test_colormap_rgb_typed(self):
+        exp = colormap_rgb(['1', '3', 'x', '5'], 'Viridis', True)
+        obs = colormap_rgb(pd.Series([1, 3, 'x', 5]), 'Viridis', True)
+        npt.assert_equal(obs, exp)
+
+        obs = colormap_rgb(pd.Series([1.0, 3.0, np.nan, 5.0]), 'Viridis',
+                           True)
+        npt.assert_equal(obs, exp)
+
+    def test_rasterize(self):
+        x, y = np.array([2., 2.]), np.array([2., 2.])
+        radius = np.array([1., 0.5])
+        rgb = np.array([[1., 0., 0.], [0., 0., 1.]])
+        alpha = np.array([1., 1.])
+        background = np.array([0., 0., 0.])
+
+        # the second marker is closer to the camera
+        obs = rasterize(x, y, np.array([0., 1.]), radius, rgb, alpha, 5, 4,
+                        background)
+        self.assertEqual(obs.shape, (4, 5, 3))
+        self.assertEqual(obs.dtype, np.uint8)
+        npt.assert_equal(obs[2, 2], [0, 0, 255])
+        npt.assert_equal(obs[1, 2], [255, 0, 0])
+        npt.assert_equal(obs[2, 3], [255, 0, 0])
+        npt.assert_equal(obs[1, 1], [0, 0, 0])
+        npt.assert_equal(obs[0, 0], [0, 0, 0])
+
+        # now the first marker hides the second one
+        obs = rasterize(x, y, np.array([1., 0.]), radius, rgb, alpha, 5, 4,
+                        background)
+        npt.assert_equal(obs[2, 2], [255, 0, 0])
+
+    def test_rasterize_translucent_and_clipped(self):
+        obs = rasterize(np.array([0., 10.]), np.array([0., 10.]),
+                        np.array([0., 0.]), np.array([1., 1.]),
+                        np.array([[1., 1., 1.], [1., 0., 0.]]),
+                        np.array([0.5, 1.]), 3, 3, np.array([0., 0., 0.]))
+        npt.assert_equal(obs[0, 0], [128, 128, 128])
+        npt.assert_equal(obs[0, 1], [128, 128, 128])
+        npt.assert_equal(obs[2, 2], [0, 0, 0])
+
+    def test_rasterize_overlapping(self):
+        # more markers than fit in a batch, most of them hidden
+        rng = np.random.RandomState(0)
+        n, width, height = 5000, 30, 20
+        x, y = rng.uniform(-5, 35, n), rng.uniform(-5, 25, n)
+        z, radius = rng.permutation(n).astype(float), rng.uniform(0, 6, n)
+        rgb, alpha = rng.rand(n, 3), np.ones(n)
+
+        obs = rasterize(x, y, z, radius, rgb, alpha, width, height,
+                        np.zeros(3))
+
+        # the marker in front of each pixel
+        cx, cy = np.round(x), np.round(y)
+        r = np.maximum(np.round(radius * 2) / 2, 0.5)
+        exp = np.zeros((height, width, 3), dtype=np.uint8)
+        for i in range(height):
+            for j in range(width):
+                inside = (cx - j) ** 2 + (cy - i) ** 2 <= r ** 2
+                if inside.any():
+                    front = np.flatnonzero(inside)[np.argmax(z[inside])]
+                    exp[i, j] = np.round(rgb[front] * 255)
+        npt.assert_equal(obs, exp)
+
+    def test_rasterize_scaling(self):
+        def elapsed(n):
+            rng = np.random.RandomState(0)
+            args = (rng.rand(n) * 800, rng.rand(n) * 600, rng.rand(n),
+                    rng.uniform(4, 24, n), rng.rand(n, 3), np.ones(n), 800,
+                    600, np.zeros(3))
+            times = []
+            for _ in range(3):
+                start = time.process_time()
+                rasterize(*args)
+                times.append(time.process_time() - start)
+            return min(times)
+
+        # hidden markers are skipped, so ten times as many overlapping
+        # markers take much less than ten times as long
+        self.assertLess(elapsed(100000), 3 * elapsed(10000))
+
+    def test_encode_png(self):
+        image = np.zeros((2, 3, 3), dtype=np.uint8)
+        image[1, 2] = [10, 20, 30]
+
+        obs = encode_png(image)
+        self.assertEqual(obs[:8], b'\x89PNG\r\n\x1a\n')
+        self.assertEqual(struct.unpack('>II', obs[16:24]), (3, 2))
+
+        # IHDR is 25 bytes long, so IDAT starts at 33
+        length = struct.unpack('>I', obs[33:37])[0]
+        raw = zlib.decompress(obs[41:41 + length])
+        self.assertEqual(raw, b'\x00' + b'\x00' * 9 + b'\x00' + b'\x00' * 6 +
+                         b'\x0a\x14\x1e')
+        self.assertTrue(obs.endswith(b'IEND\xaeB`\x82'))
+
+    def test_encode_svg(self):
+        obs = encode_svg(np.array([1., 2.]), np.array([3., 4.]),
+                         np.array([1., 0.]), np.array([5., 6.]),
+                         ['#ff0000', '#0000ff'], np.array([1., 0.5]), 10, 20,
+                         '#000000')
+        exp = ('<svg xmlns="http://www.w3.org/2000/svg" width="10" '
+               'height="20" viewBox="0 0 10 20">\n'
+               '<rect width="100%" height="100%" fill="#000000"/>\n'
+               '<circle cx="2.00" cy="4.00" r="6.00" fill="#0000ff" '
+               'fill-opacity="0.5"/>\n'
+               '<circle cx="1.00" cy="3.00" r="5.00" fill="#ff0000"/>\n'
+               '</svg>\n')
+        self.assertEqual(obs, exp)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,20 +7,27 @@
 # ----------------------------------------------------------------------------
 from __future__ import division
 
-from unittest import TestCase, main
+from unittest import TestCase, main, mock
 from os.path import exists, join
 from shutil import rmtree
 from tempfile import gettempdir
 
 import pandas as pd
+import tracemalloc
 import warnings
-from numpy import array
+from base64 import b64decode
+from numpy import array, float32, frombuffer
+from numpy.random import RandomState
 from numpy.testing import assert_almost_equal
+from scipy.spatial import procrustes
+from skbio import OrdinationResults
 
 from emperor.util import (
                           preprocess_coords_file,
                           nbinstall, validate_and_process_custom_axes,
-                          resolve_stable_url, EmperorWarning)
+                          resolve_stable_url, procrustes_superimposition,
+                          quantize_coordinates, fingerprint,
+                          EmperorWarning)
 
 
 warnings.simplefilter('always', category=EmperorWarning)
@@ -344,6 +351,145 @@ class TopLevelTests(TestCase):
             self.assertTrue(issubclass(w[-1].category, EmperorWarning))
             self.assertEqual(obs, url % 'new-api')
 
+    def test_procrustes_superimposition(self):
+        state = RandomState(0)
+        master = state.normal(size=(10, 3))
+        ordinations = state.normal(size=(4, 10, 3))
+
+        master_std, obs, disparities = procrustes_superimposition(
+            master, ordinations)
+        self.assertEqual(obs.shape, (4, 10, 3))
+
+        for ordination, o, m2 in zip(ordinations, obs, disparities):
+            exp_master, exp, exp_m2 = procrustes(master, ordination)
+            assert_almost_equal(master_std, exp_master)
+            assert_almost_equal(o, exp)
+            assert_almost_equal(m2, exp_m2)
+
+        # the inputs are not modified
+        assert_almost_equal(master, RandomState(0).normal(size=(10, 3)))
+
+    def test_procrustes_superimposition_in_place(self):
+        state = RandomState(0)
+        master = state.normal(size=(500, 3))
+        ordinations = state.normal(size=(200, 500, 3))
+        exp_master, exp, exp_m2 = procrustes_superimposition(master,
+                                                             ordinations)
+
+        # superimpose a few ordinations at a time into the same buffer
+        obs = ordinations.astype(float32)
+        with mock.patch('emperor.util._PROCRUSTES_BLOCK', 8 * 1500 * 4):
+            tracemalloc.start()
+            try:
+                obs_master, out, obs_m2 = procrustes_superimposition(
+                    master, obs, out=obs)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        self.assertIs(out, obs)
+        self.assertLess(peak, obs.nbytes / 4)
+        assert_almost_equal(obs_master, exp_master)
+        assert_almost_equal(obs, exp, decimal=5)
+        assert_almost_equal(obs_m2, exp_m2, decimal=5)
+
+    def test_procrustes_superimposition_errors(self):
+        with self.assertRaisesRegex(ValueError, 'should be a'):
+            procrustes_superimposition(array([[1, 2], [3, 4]]),
+                                       array([[1, 2], [3, 4]]))
+
+        with self.assertRaisesRegex(ValueError, 'unique points'):
+            procrustes_superimposition(array([[1, 2], [1, 2]]),
+                                       array([[[1, 2], [3, 4]]]))
+
+        with self.assertRaisesRegex(ValueError, 'unique points'):
+            procrustes_superimposition(array([[1, 2], [3, 4]]),
+                                       array([[[1, 2], [1, 2]]]))
+
+        with self.assertRaisesRegex(ValueError, 'same shape'):
+            procrustes_superimposition(array([[1, 2], [3, 4]]),
+                                       array([[[1, 2], [3, 4]]]),
+                                       out=array([[1, 2], [3, 4]]))
+
+    def test_quantize_coordinates(self):
+        coords = RandomState(0).uniform(-1, 1, (50, 3))
+        coords[:, 2] = 0.5
+
+        obs, error = quantize_coordinates(coords, 'float32')
+        self.assertEqual(obs['dtype'], 'float32')
+        self.assertEqual(obs['shape'], [50, 3])
+        self.assertNotIn('scale', obs)
+        decoded = frombuffer(b64decode(obs['data']), '<f4').reshape(50, 3)
+        assert_almost_equal(decoded, coords, decimal=6)
+        self.assertAlmostEqual(error, abs(decoded - coords).max())
+
+        for precision, low, high in [('int16', -32767, 32767),
+                                     ('uint16', 0, 65535)]:
+            obs, error = quantize_coordinates(coords, precision)
+            self.assertEqual(obs['dtype'], precision)
+
+            values = frombuffer(b64decode(obs['data']),
+                                '<' + precision[0] + '2').reshape(50, 3)
+            self.assertEqual(values[:, :2].min(), low)
+            self.assertEqual(values[:, :2].max(), high)
+
+            # flat axes are encoded as zero
+            self.assertTrue((values[:, 2] == 0).all())
+
+            decoded = values * obs['scale'] + obs['offset']
+            self.assertAlmostEqual(error, abs(decoded - coords).max())
+            self.assertLessEqual(error, max(obs['scale'][:2]) / 2)
+
+    def test_fingerprint(self):
+        samples = pd.DataFrame(RandomState(0).rand(20, 4),
+                               index=['s%d' % i for i in range(20)])
+        eigvals = pd.Series([4., 3., 2., 1.])
+        ordination = OrdinationResults('PCoA', 'Principal Coordinates',
+                                       eigvals, samples,
+                                       proportion_explained=eigvals / 10)
+        metadata = pd.DataFrame({'group': ['a', 'b'] * 10,
+                                 'value': range(20)}, index=samples.index)
+
+        obs = fingerprint(ordination, metadata)
+        self.assertRegex(obs, '^[0-9a-f]{16}$')
+
+        # equal inputs have the same fingerprint regardless of their layout
+        copied = OrdinationResults('PCoA', 'Principal Coordinates',
+                                   eigvals.copy(),
+                                   pd.DataFrame(samples.values.copy('F'),
+                                                index=samples.index),
+                                   proportion_explained=eigvals / 10)
+        self.assertEqual(fingerprint(copied, metadata.copy()), obs)
+
+        # any change in the values or the labels changes the fingerprint
+        changed = samples.copy()
+        changed.iloc[3, 2] += 1e-12
+        ordination.samples = changed
+        self.assertNotEqual(fingerprint(ordination, metadata), obs)
+        ordination.samples = samples
+
+        changed = metadata.copy()
+        changed.loc['s2', 'group'] = 'c'
+        self.assertNotEqual(fingerprint(ordination, changed), obs)
+
+        changed = metadata.rename(index={'s0': 'x0'})
+        self.assertNotEqual(fingerprint(ordination, changed), obs)
+
+        changed = metadata.copy()
+        changed['group'] = changed['group'].astype('category')
+        self.assertNotEqual(fingerprint(ordination, changed), obs)
+
+        self.assertNotEqual(fingerprint(ordination, metadata, {'a': 1}), obs)
+        self.assertEqual(fingerprint(ordination, metadata), obs)
+
+    def test_quantize_coordinates_errors(self):
+        with self.assertRaisesRegex(ValueError, "Unsupported precision "
+                                    "'float16'"):
+            quantize_coordinates(array([[1, 2], [3, 4]]), 'float16')
+
+        with self.assertRaisesRegex(ValueError, 'should be a'):
+            quantize_coordinates(array([1, 2]), 'int16')
+
 
 MAPPING_FILE_DATA = [
     ['PC.354', 'AGCACGAGCCTA', 'YATGCTGCCTCCCGTAGGAGT', 'Control', '20061218',